@@ -0,0 +1,106 @@
+"""
+NetPulse - Cascade Gate Benchmark
+
+Simüle bir filo üzerinde cascade gate'in:
+- modele gönderilmeden elediği abone oranını (model hesabındaki azalma),
+- kural tabanlı sınıflandırmanın (classify_subscriber_status) GREEN demediği
+  abonelerden yanlışlıkla elenenleri (kaçırma = recall kaybı),
+- abone başına gate süresini
+- hedef azalmaya (--target) ve ulaşılabilir üst sınıra (son ölçümü kural
+  tabanlı GREEN olan abone oranı; diğerlerini elemek kaçırmadır) göre durumu
+raporlar. Pencereler üretimdeki yoldan doldurulur: simulate_metrics_single →
+scoring.lstm_measurement → LSTMPredictionService.add_measurement; aboneler
+--trouble oranında bilerek sorunlu ölçümlerle bitirilir.
+
+Kullanım:
+    python benchmarks/cascade_gate.py
+    python benchmarks/cascade_gate.py --fleet 100000 --trouble 0.05 --max-latency 40
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+from cascade_gate import CascadeGate, GateConfig  # noqa: E402
+from lstm_service import LSTMPredictionService  # noqa: E402
+from scoring import simulate_metrics_single, classify_subscriber_status, lstm_measurement  # noqa: E402
+
+FIRST_SUBSCRIBER_ID = 1001
+WINDOW_SIZE = 12
+PLANS = ["24 Mbps VDSL", "35 Mbps VDSL", "100 Mbps Fiber", "500 Mbps Fiber", "1000 Mbps Gamer"]
+
+
+def build_fleet(fleet_size: int, trouble_rate: float, seed: int):
+    random.seed(seed)
+    service = LSTMPredictionService("", "", "", window_size=WINDOW_SIZE, lazy=True)
+    live = {}
+    for i in range(fleet_size):
+        sid = FIRST_SUBSCRIBER_ID + i
+        plan = random.choice(PLANS)
+        troubled = random.random() < trouble_rate
+        for step in range(WINDOW_SIZE):
+            metrics, _, _ = simulate_metrics_single(plan, force_trouble=troubled and step >= WINDOW_SIZE - 3)
+            service.add_measurement(sid, lstm_measurement(metrics))
+        live[sid] = metrics
+    return service.measurement_cache, live
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NetPulse cascade gate benchmark")
+    parser.add_argument("--fleet", type=int, default=50_000)
+    parser.add_argument("--trouble", type=float, default=0.05, help="Son ölçümleri sorunlu abone oranı")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-latency", type=float, default=GateConfig.max_latency)
+    parser.add_argument("--max-packet-loss", type=float, default=GateConfig.max_packet_loss)
+    parser.add_argument("--max-jitter", type=float, default=GateConfig.max_jitter)
+    parser.add_argument("--max-z-score", type=float, default=GateConfig.max_z_score)
+    parser.add_argument("--max-window-risk", type=float, default=GateConfig.max_window_risk)
+    parser.add_argument("--window-risk-percentile", type=float, default=GateConfig.window_risk_percentile)
+    parser.add_argument("--target", type=float, default=10.0, help="Hedef model hesabı azalması (x)")
+    args = parser.parse_args()
+
+    print(f"🧪 {args.fleet:,} abone simüle ediliyor (sorunlu oran %{args.trouble * 100:.0f})...")
+    cache, live = build_fleet(args.fleet, args.trouble, args.seed)
+    ids = list(cache)
+
+    gate = CascadeGate(GateConfig(
+        max_latency=args.max_latency,
+        max_packet_loss=args.max_packet_loss,
+        max_jitter=args.max_jitter,
+        max_z_score=args.max_z_score,
+        max_window_risk=args.max_window_risk,
+        window_risk_percentile=args.window_risk_percentile
+    ))
+    started = time.perf_counter()
+    stable, _ = gate.split(ids, live, cache, WINDOW_SIZE)
+    elapsed = time.perf_counter() - started
+
+    not_green = [classify_subscriber_status(live[sid], 0) != "GREEN" for sid in ids]
+    missed = sum(1 for s, bad in zip(stable.tolist(), not_green) if s and bad)
+    gated = int(stable.sum())
+    reduction = len(ids) / max(1, len(ids) - gated)
+    ceiling = len(ids) / max(1, sum(not_green))
+
+    print("\n" + "=" * 56)
+    print(f"{'Elenen (modele gitmeyen)':<36}{gated:>10,}  (%{gated / len(ids) * 100:.1f})")
+    print(f"{'Modelle skorlanan':<36}{len(ids) - gated:>10,}")
+    print(f"{'Model hesabı azalması':<36}{reduction:>10.1f}x")
+    print(f"{'Hedef':<36}{args.target:>10.1f}x")
+    print(f"{'Üst sınır (son ölçüm GREEN)':<36}{ceiling:>10.1f}x  (sınırın %{reduction / ceiling * 100:.0f}'i)")
+    print(f"{'Kural GREEN değil ama elendi':<36}{missed:>10,}")
+    print(f"{'Gate süresi (abone başına)':<36}{elapsed / len(ids) * 1e9:>10,.0f} ns")
+    print("=" * 56)
+    if missed:
+        print("⚠️ Gate eşikleri kural eşiklerinden gevşek; kaçırılan aboneler var")
+        sys.exit(1)
+    if reduction < args.target:
+        print(f"⚠️ Hedef {args.target:.0f}x'e ulaşılamadı; kaçırmasız ulaşılabilecek en fazla {ceiling:.1f}x "
+              f"(abonelerin %{sum(not_green) / len(ids) * 100:.0f}'inin son ölçümü GREEN değil)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+NetPulse - Technician Dispatch Benchmark
+
+İstanbul kutusuna dağılmış rastgele teknisyen ve açık ticket'larla
+dispatch.solve'u ölçer:
+- toplu çözüm süresi (linear assignment ve greedy),
+- atanan ticket, ortalama yol (km), yetenek uyuşmazlığı ve toplam maliyet,
+- --exact ile kümelere bölünmeden tek parça çözümle maliyet farkı,
+- artımlı tur: ilk atamalar sabitlenip kapasiteden düşüldükten sonra
+  --arrivals yeni ticket'ın çözüm süresi.
+
+Kullanım:
+    python benchmarks/dispatch.py
+    python benchmarks/dispatch.py --tickets 5000 --technicians 300 --capacity 6
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+import numpy as np  # noqa: E402
+
+import dispatch  # noqa: E402
+from dispatch import DispatchConfig, FAULT_TYPES, OpenTickets, TechnicianPool, cost_matrix  # noqa: E402
+
+LAT_RANGE = (40.95, 41.10)
+LON_RANGE = (28.80, 29.15)
+
+
+def random_tickets(rng, n: int, first_id: int = 1) -> OpenTickets:
+    return OpenTickets(
+        ids=np.arange(first_id, first_id + n, dtype=np.int64),
+        lat=rng.uniform(*LAT_RANGE, n),
+        lon=rng.uniform(*LON_RANGE, n),
+        fault=rng.integers(0, len(FAULT_TYPES), n),
+        priority=rng.choice([1.0, 2.0, 3.0], n, p=[0.5, 0.35, 0.15]),
+        age_hours=rng.exponential(4.0, n)
+    )
+
+
+def random_technicians(rng, n: int, capacity: int) -> TechnicianPool:
+    skills = rng.random((n, len(FAULT_TYPES))) < 0.5
+    skills[np.arange(n), rng.integers(0, len(FAULT_TYPES), n)] = True
+    return TechnicianPool(
+        ids=np.arange(1, n + 1, dtype=np.int64),
+        names=[f"Teknisyen {i}" for i in range(1, n + 1)],
+        lat=rng.uniform(*LAT_RANGE, n),
+        lon=rng.uniform(*LON_RANGE, n),
+        skills=skills,
+        free=np.full(n, capacity, dtype=np.int64)
+    )
+
+
+def evaluate(tickets, techs, ticket_idx, tech_idx, config) -> dict:
+    cost = cost_matrix(tickets, techs, config)
+    distance = dispatch.haversine_km(tickets.lat[ticket_idx], tickets.lon[ticket_idx],
+                                     techs.lat[tech_idx], techs.lon[tech_idx])
+    mismatch = ~techs.skills[tech_idx, tickets.fault[ticket_idx]]
+    load = np.bincount(tech_idx, minlength=len(techs.ids))
+    return {
+        "assigned": len(ticket_idx),
+        "high_assigned": int((tickets.priority[ticket_idx] == 3).sum()),
+        "mean_km": float(distance.mean()) if len(distance) else 0.0,
+        "mismatch": int(mismatch.sum()),
+        "cost": float(cost[ticket_idx, tech_idx].sum()),
+        "over_capacity": int((load > techs.free).sum())
+    }
+
+
+def timed_solve(tickets, techs, config, use_scipy: bool):
+    dispatch.SCIPY_AVAILABLE = use_scipy
+    started = time.perf_counter()
+    ticket_idx, tech_idx, solver = dispatch.solve(tickets, techs, config)
+    return ticket_idx, tech_idx, solver, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NetPulse technician dispatch benchmark")
+    parser.add_argument("--tickets", type=int, default=3000)
+    parser.add_argument("--technicians", type=int, default=200)
+    parser.add_argument("--capacity", type=int, default=4)
+    parser.add_argument("--arrivals", type=int, default=50, help="Artımlı turda gelen yeni ticket")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--exact", action="store_true", help="Tek parça linear assignment ile de çöz (yavaş)")
+    args = parser.parse_args()
+
+    scipy_installed = dispatch.SCIPY_AVAILABLE
+    rng = np.random.default_rng(args.seed)
+    config = DispatchConfig()
+    tickets = random_tickets(rng, args.tickets)
+    techs = random_technicians(rng, args.technicians, args.capacity)
+    print(f"🧪 {args.tickets:,} açık ticket, {args.technicians} teknisyen × {args.capacity} kapasite")
+
+    # İlk çağrıdaki scipy import süresi ölçüme girmesin
+    dispatch.solve(random_tickets(rng, 10), random_technicians(rng, 2, 1), config)
+
+    results = {}
+    for use_scipy in ([True, False] if scipy_installed else [False]):
+        ticket_idx, tech_idx, solver, elapsed = timed_solve(tickets, techs, config, use_scipy)
+        results[solver] = (evaluate(tickets, techs, ticket_idx, tech_idx, config), elapsed, tech_idx)
+    if args.exact and scipy_installed:
+        exact = DispatchConfig(direct_cells=2 ** 62)
+        ticket_idx, tech_idx, _, elapsed = timed_solve(tickets, techs, exact, True)
+        results["lsa (tek parça)"] = (evaluate(tickets, techs, ticket_idx, tech_idx, config), elapsed, tech_idx)
+
+    print("\n" + "=" * 64)
+    print(f"{'':<26}" + "".join(f"{name:>19}" for name in results))
+    rows = [
+        ("Atanan ticket", lambda r: f"{r[0]['assigned']:,}"),
+        ("Atanan HIGH", lambda r: f"{r[0]['high_assigned']:,}"),
+        ("Ortalama yol", lambda r: f"{r[0]['mean_km']:.2f} km"),
+        ("Yetenek uyuşmazlığı", lambda r: f"{r[0]['mismatch']:,}"),
+        ("Toplam maliyet", lambda r: f"{r[0]['cost']:,.0f}"),
+        ("Kapasite aşımı", lambda r: f"{r[0]['over_capacity']:,}"),
+        ("Çözüm süresi", lambda r: f"{r[1] * 1000:.1f} ms"),
+    ]
+    for label, fmt in rows:
+        print(f"{label:<26}" + "".join(f"{fmt(r):>19}" for r in results.values()))
+
+    # Artımlı tur: ilk atamalar sabit, kalan kapasiteye yeni ticket'lar.
+    # Kapasite tamamen dolduysa her teknisyenin bir işi kapanmış sayılır
+    dispatch.SCIPY_AVAILABLE = scipy_installed
+    first = next(iter(results.values()))
+    techs.free = techs.free - np.bincount(first[2], minlength=len(techs.ids))
+    if techs.free.sum() == 0:
+        techs.free = techs.free + 1
+    arrivals = random_tickets(rng, args.arrivals, first_id=args.tickets + 1)
+    started = time.perf_counter()
+    new_idx, _, solver = dispatch.solve(arrivals, techs, config)
+    incremental = time.perf_counter() - started
+    print(f"{'Artımlı tur':<26}{f'{len(new_idx)}/{args.arrivals} atandı, {incremental * 1000:.1f} ms ({solver})':>38}")
+    print("=" * 64)
+
+    if any(r[0]["over_capacity"] for r in results.values()):
+        print("⚠️ Kapasite aşan teknisyen var")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+NetPulse - Hot Query EXPLAIN ANALYZE Benchmark
+
+Ayrı bir veritabanında (varsayılan: netpulse_bench) N abonelik sentetik veri
+üretir ve main.py / status_tracker.py / debug_status.py içindeki sık çalışan
+sorguları 004_hot_path_indexes migration'ı öncesi ve sonrası ölçer.
+
+Kullanım:
+    python benchmarks/explain_hot_queries.py --subscribers 1000000
+    python benchmarks/explain_hot_queries.py --subscribers 100000 --json results.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import psycopg2
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+from init_db_postgres import create_schema, DISTRICTS  # noqa: E402
+from migrate import apply_migrations  # noqa: E402
+
+INDEX_MIGRATION_VERSION = 4
+
+DB_CONFIG = {
+    "user": "postgres",
+    "password": "admin",
+    "host": "localhost",
+    "port": "5432"
+}
+
+# (isim, sql, parametreler) - parametreler veri üretildikten sonra doldurulur
+HOT_QUERIES = [
+    (
+        "region_fault_count (simulate_network)",
+        """
+        SELECT COUNT(*) FROM customers c
+        JOIN subscriber_status ss ON c.subscriber_id = ss.subscriber_id
+        WHERE c.region_id = %(region)s AND ss.current_status IN ('RED', 'YELLOW')
+        """
+    ),
+    (
+        "neighbor_faults (generate_ticket_note)",
+        """
+        SELECT COUNT(*)
+        FROM customers c
+        JOIN subscriber_status s ON c.subscriber_id = s.subscriber_id
+        WHERE c.region_id = %(region)s
+          AND s.current_status IN ('RED', 'YELLOW')
+          AND c.subscriber_id != %(subscriber_id)s
+        """
+    ),
+    (
+        "subscriber_history (simulate_network)",
+        """
+        SELECT t.created_at, t.fault_type, t.status, t.assigned_to
+        FROM tickets t
+        WHERE t.subscriber_id = %(subscriber_id)s
+        ORDER BY t.created_at DESC LIMIT 5
+        """
+    ),
+    (
+        "subscriber_tickets_30d (get_subscriber_tickets)",
+        """
+        SELECT ticket_id, status, priority, fault_type, scope,
+               assigned_to, created_at, updated_at, resolved_at
+        FROM tickets
+        WHERE subscriber_id = %(subscriber_id)s
+          AND created_at >= NOW() - INTERVAL '30 days'
+        ORDER BY created_at DESC
+        """
+    ),
+    (
+        "open_ticket_queue (get_all_tickets)",
+        """
+        SELECT t.ticket_id, t.subscriber_id, t.status, t.priority,
+               t.fault_type, t.scope, t.assigned_to, t.created_at,
+               c.full_name, c.region_id, c.phone_number, t.priority_rank
+        FROM tickets t
+        LEFT JOIN customers c ON t.subscriber_id = c.subscriber_id
+        WHERE t.status <> 'CLOSED'
+        ORDER BY t.priority_rank DESC, t.created_at DESC, t.ticket_id DESC
+        LIMIT 51
+        """
+    ),
+    (
+        "current_status (StatusTracker.get_current_status)",
+        """
+        SELECT current_status, previous_status FROM subscriber_status WHERE subscriber_id = %(subscriber_id)s
+        """
+    ),
+    (
+        "faulty_subscribers (debug_status.py)",
+        """
+        SELECT c.subscriber_id, c.full_name, ss.current_status, ss.fault_type
+        FROM customers c
+        JOIN subscriber_status ss ON c.subscriber_id = ss.subscriber_id
+        WHERE ss.current_status != 'GREEN'
+        """
+    ),
+]
+
+
+def ensure_database(dbname: str):
+    """Benchmark veritabanı yoksa oluşturur"""
+    conn = psycopg2.connect(dbname="postgres", **DB_CONFIG)
+    conn.autocommit = True
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", (dbname,))
+    if not cursor.fetchone():
+        cursor.execute(f'CREATE DATABASE "{dbname}"')
+        print(f"✅ '{dbname}' veritabanı oluşturuldu")
+    conn.close()
+
+
+def generate_dataset(cursor, subscribers: int, tickets_per_subscriber: float):
+    """generate_series ile sunucu tarafında sentetik veri üretir"""
+    started = time.perf_counter()
+
+    cursor.execute("""
+        INSERT INTO customers (subscriber_id, full_name, gender, phone_number, subscription_plan,
+                               region_id, telegram_chat_id, is_vip, modem_model, ip_address, uptime)
+        SELECT 1000 + g,
+               'Abone ' || g,
+               CASE WHEN g %% 2 = 0 THEN 'Kadın' ELSE 'Erkek' END,
+               '+90 5' || lpad((g %% 1000000000)::text, 9, '0'),
+               (ARRAY['24 Mbps VDSL', '35 Mbps VDSL', '100 Mbps Fiber', '500 Mbps Fiber', '1000 Mbps Gamer'])[1 + g %% 5],
+               (%(districts)s::text[])[1 + (g * 7919) %% %(district_count)s],
+               '',
+               g %% 5 = 4,
+               'Huawei HG255s',
+               '192.168.1.' || (2 + g %% 253),
+               '0g 0s 0dk'
+        FROM generate_series(1, %(n)s) AS g
+    """, {"n": subscribers, "districts": DISTRICTS, "district_count": len(DISTRICTS)})
+
+    # ~%0.5 RED, ~%1 YELLOW
+    cursor.execute("""
+        INSERT INTO subscriber_status (subscriber_id, current_status, previous_status, status_changed_at, fault_type)
+        SELECT subscriber_id,
+               CASE WHEN r < 0.005 THEN 'RED' WHEN r < 0.015 THEN 'YELLOW' ELSE 'GREEN' END,
+               'GREEN',
+               NOW() - (r * INTERVAL '2 hours'),
+               CASE WHEN r < 0.015 THEN 'packet_loss' END
+        FROM (SELECT subscriber_id, random() AS r FROM customers) s
+    """)
+
+    ticket_count = int(subscribers * tickets_per_subscriber)
+    cursor.execute("""
+        INSERT INTO tickets (subscriber_id, status, priority, fault_type, scope, technician_note, assigned_to, created_at)
+        SELECT 1001 + (random() * (%(n)s - 1))::int,
+               (ARRAY['CREATED', 'ASSIGNED', 'EN_ROUTE', 'ON_SITE', 'RESOLVED', 'CLOSED', 'CLOSED', 'CLOSED', 'CLOSED', 'CLOSED'])[1 + g %% 10],
+               (ARRAY['HIGH', 'MEDIUM', 'LOW'])[1 + g %% 3],
+               'CPE',
+               'INDIVIDUAL',
+               'bench',
+               'Teknisyen Ekibi',
+               NOW() - (random() * INTERVAL '365 days')
+        FROM generate_series(1, %(tickets)s) AS g
+    """, {"n": subscribers, "tickets": ticket_count})
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {subscribers:,} abone, {ticket_count:,} ticket üretildi ({elapsed:.1f} sn)")
+
+
+def explain_all(cursor, params: dict, repeat: int) -> dict:
+    """Her hot query için EXPLAIN ANALYZE çalıştırır, en iyi süreyi döndürür"""
+    results = {}
+    for name, sql in HOT_QUERIES:
+        best = None
+        for _ in range(repeat):
+            cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, params)
+            plan = cursor.fetchone()[0][0]
+            if best is None or plan["Execution Time"] < best["Execution Time"]:
+                best = plan
+        results[name] = {
+            "execution_ms": round(best["Execution Time"], 3),
+            "planning_ms": round(best["Planning Time"], 3),
+            "root_node": best["Plan"]["Node Type"],
+            "shared_hit_blocks": best["Plan"].get("Shared Hit Blocks", 0),
+            "shared_read_blocks": best["Plan"].get("Shared Read Blocks", 0),
+        }
+    return results
+
+
+def print_comparison(before: dict, after: dict):
+    print("\n" + "=" * 96)
+    print(f"{'Sorgu':<52}{'Önce (ms)':>12}{'Sonra (ms)':>12}{'Hızlanma':>10}  Plan")
+    print("=" * 96)
+    for name in before:
+        b = before[name]["execution_ms"]
+        a = after[name]["execution_ms"]
+        speedup = f"{b / a:.1f}x" if a > 0 else "-"
+        print(f"{name:<52}{b:>12.2f}{a:>12.2f}{speedup:>10}  {after[name]['root_node']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NetPulse hot query EXPLAIN ANALYZE benchmark")
+    parser.add_argument("--subscribers", type=int, default=1_000_000)
+    parser.add_argument("--tickets-per-subscriber", type=float, default=0.2)
+    parser.add_argument("--dbname", default="netpulse_bench")
+    parser.add_argument("--repeat", type=int, default=3, help="Her sorgu için tekrar sayısı (en iyisi alınır)")
+    parser.add_argument("--json", help="Sonuçları JSON dosyasına yaz")
+    args = parser.parse_args()
+
+    ensure_database(args.dbname)
+    conn = psycopg2.connect(dbname=args.dbname, **DB_CONFIG)
+    conn.autocommit = True
+    cursor = conn.cursor()
+
+    print(f"🔧 Şema oluşturuluyor ({args.dbname})...")
+    create_schema(cursor)
+    apply_migrations(conn, target_version=INDEX_MIGRATION_VERSION - 1)
+
+    generate_dataset(cursor, args.subscribers, args.tickets_per_subscriber)
+    cursor.execute("ANALYZE")
+
+    params = {"region": DISTRICTS[0], "subscriber_id": 1001 + args.subscribers // 2}
+
+    print("📊 Index paketi öncesi ölçülüyor...")
+    before = explain_all(cursor, params, args.repeat)
+
+    apply_migrations(conn, target_version=INDEX_MIGRATION_VERSION)
+
+    print("📊 Index paketi sonrası ölçülüyor...")
+    after = explain_all(cursor, params, args.repeat)
+
+    print_comparison(before, after)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "subscribers": args.subscribers,
+                "tickets_per_subscriber": args.tickets_per_subscriber,
+                "before": before,
+                "after": after
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Sonuçlar kaydedildi: {args.json}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
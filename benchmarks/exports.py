@@ -0,0 +1,152 @@
+"""
+NetPulse - Streaming Export Benchmark
+
+exports.stream_csv / stream_xlsx'i DB olmadan, named cursor gibi davranan
+sentetik bir satır kaynağıyla (fetchmany parçaları) ölçer:
+- satır / sn ve toplam çıktı boyutu,
+- tracemalloc tepe belleği (2 ve 8 parçalık export): akışta satır sayısı
+  büyüdükçe sabit kalmalı; tüm listeyi bellekte tutan tek parça yazımla
+  karşılaştırılır.
+
+Kullanım:
+    python benchmarks/exports.py
+    python benchmarks/exports.py --rows 2000000 --format csv
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+import exports  # noqa: E402
+from exports import ExportFilters, SUBSCRIBER_EXPORT  # noqa: E402
+
+REGIONS = ("İstanbul/Kadıköy", "İstanbul/Beşiktaş", "İstanbul/Şişli", "İstanbul/Üsküdar", "İstanbul/Bakırköy")
+STATUSES = ("GREEN", "YELLOW", "RED")
+BASE_TIME = datetime(2026, 1, 1)
+
+
+def make_row(i: int) -> tuple:
+    return (
+        1000 + i, f"Abone {i}", REGIONS[i % len(REGIONS)], "Fiber 100 Mbps", f"0555{i:07d}",
+        i % 17 == 0, "ZTE F660", STATUSES[i % 7 % 3], None if i % 3 else "CPE",
+        BASE_TIME + timedelta(minutes=i), (i % 100) / 100.0, BASE_TIME + timedelta(seconds=i)
+    )
+
+
+class SyntheticCursor:
+    """Named cursor arayüzü: execute + fetchmany; satırlar istendikçe üretilir"""
+
+    def __init__(self, rows: int):
+        self.rows = rows
+        self.position = 0
+        self.itersize = 2000
+
+    def execute(self, query, params=None):
+        self.position = 0
+
+    def fetchmany(self, size: int):
+        end = min(self.position + size, self.rows)
+        chunk = [make_row(i) for i in range(self.position, end)]
+        self.position = end
+        return chunk
+
+    def close(self):
+        pass
+
+
+class SyntheticConnection:
+    def __init__(self, rows: int):
+        self.rows = rows
+
+    def cursor(self, name=None):
+        return SyntheticCursor(self.rows)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def timed(fn):
+    started = time.perf_counter()
+    size = fn()
+    return size, time.perf_counter() - started
+
+
+def traced_peak(fn) -> int:
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def streamed(fmt: str, rows: int):
+    def run():
+        return sum(len(chunk) for chunk in exports.STREAMERS[fmt](SyntheticConnection(rows), SUBSCRIBER_EXPORT, ExportFilters()))
+    return run
+
+
+def buffered_csv(rows: int):
+    """Eski yol: tüm liste bellekte, tek parça yazım"""
+    def run():
+        data = [make_row(i) for i in range(rows)]
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(SUBSCRIBER_EXPORT.headers)
+        writer.writerows(data)
+        return len(buf.getvalue().encode("utf-8"))
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NetPulse streaming export benchmark")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--format", choices=["csv", "xlsx", "all"], default="all")
+    args = parser.parse_args()
+
+    formats = ["csv", "xlsx"] if args.format == "all" else [args.format]
+    if "xlsx" in formats and not exports.OPENPYXL_AVAILABLE:
+        print("⚠️ openpyxl kurulu değil, XLSX atlanıyor")
+        formats.remove("xlsx")
+
+    print(f"🧪 {args.rows:,} satır abone export'u (parça: {exports.EXPORT_CHUNK_ROWS:,})")
+    print("\n" + "=" * 64)
+    print(f"{'Yöntem':<28}{'Boyut':>12}{'Süre':>10}{'Satır/sn':>14}")
+    cases = [(f"stream {fmt}", streamed(fmt, args.rows)) for fmt in formats]
+    if "csv" in formats:
+        cases.append(("tek parça csv (bellekte)", buffered_csv(args.rows)))
+    for label, fn in cases:
+        size, elapsed = timed(fn)
+        print(f"{label:<28}{size / 1e6:>10.1f}MB{elapsed:>9.2f}s{args.rows / elapsed:>14,.0f}")
+
+    # Tepe bellek (tracemalloc yavaş; 2 ve 8 parçalık export): akışta satır sayısıyla büyümemeli
+    small, large = 2 * exports.EXPORT_CHUNK_ROWS, 8 * exports.EXPORT_CHUNK_ROWS
+    print("-" * 64)
+    print(f"{'Tepe bellek':<28}{f'{small:,} satır':>16}{f'{large:,} satır':>20}")
+    growing = []
+    peak_cases = [(f"stream {fmt}", lambda rows, fmt=fmt: streamed(fmt, rows)) for fmt in formats]
+    if "csv" in formats:
+        peak_cases.append(("tek parça csv (bellekte)", buffered_csv))
+    for label, factory in peak_cases:
+        peaks = [traced_peak(factory(rows)) for rows in (small, large)]
+        print(f"{label:<28}{peaks[0] / 1e6:>14.1f}MB{peaks[1] / 1e6:>18.1f}MB")
+        if label.startswith("stream") and peaks[1] > 1.5 * peaks[0] + 1e6:
+            growing.append(label)
+    print("=" * 64)
+
+    if growing:
+        print(f"⚠️ Tepe bellek satır sayısıyla büyüyor: {growing}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+NetPulse - Backend Import Time Benchmark
+
+`python -X importtime -c "import main"` çıktısını src/backend içinde çalıştırıp
+toplam import süresini ve en pahalı (kümülatif) modülleri raporlar.
+Ağır bağımlılıklar (tensorflow, pandas, google.generativeai...) lazy
+yüklendiği için bu listede görünmemelidir.
+
+Kullanım:
+    python benchmarks/import_time.py --top 15
+    python benchmarks/import_time.py --json import_time.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'backend')
+
+HEAVY_MODULES = ("tensorflow", "pandas", "sklearn", "joblib", "google.generativeai", "vonage")
+
+
+def run_importtime(module: str):
+    """Modülü yeni bir süreçte import eder; (wall süre, [(kümülatif_us, self_us, modül)]) döndürür"""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    wall = time.perf_counter() - started
+
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        print(f"❌ 'import {module}' başarısız")
+        sys.exit(1)
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        self_us, cumulative_us = int(parts[0]), int(parts[1])
+        entries.append((cumulative_us, self_us, parts[2].strip()))
+    return wall, entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend import time benchmark")
+    parser.add_argument("--module", default="main", help="src/backend içinden import edilecek modül")
+    parser.add_argument("--top", type=int, default=20, help="Gösterilecek en pahalı modül sayısı")
+    parser.add_argument("--json", help="Sonuçları JSON dosyasına yaz")
+    args = parser.parse_args()
+
+    wall, entries = run_importtime(args.module)
+    top_level = [e for e in entries if e[2] == args.module]
+    total_ms = (top_level[-1][0] if top_level else max(e[0] for e in entries)) / 1000
+    top = sorted(entries, reverse=True)[:args.top]
+    heavy = sorted({e[2].split(".")[0] for e in entries if e[2].startswith(HEAVY_MODULES)})
+
+    print("=" * 72)
+    print(f"import {args.module}: {total_ms:.1f} ms (süreç toplam: {wall * 1000:.0f} ms)")
+    print("=" * 72)
+    print(f"{'Kümülatif (ms)':>15}{'Self (ms)':>12}  Modül")
+    for cumulative_us, self_us, name in top:
+        print(f"{cumulative_us / 1000:>15.1f}{self_us / 1000:>12.1f}  {name}")
+
+    if heavy:
+        print(f"\n⚠️ Import sırasında yüklenen ağır modüller: {', '.join(heavy)}")
+    else:
+        print("\n✅ Ağır modüller import sırasında yüklenmiyor")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "module": args.module,
+                "import_ms": round(total_ms, 2),
+                "process_ms": round(wall * 1000, 2),
+                "heavy_modules": heavy,
+                "top": [
+                    {"module": name, "cumulative_ms": c / 1000, "self_ms": s / 1000}
+                    for c, s, name in top
+                ]
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Sonuçlar kaydedildi: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
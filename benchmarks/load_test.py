@@ -0,0 +1,333 @@
+"""
+NetPulse - NOC API Load Benchmark
+
+Çalışan bir backend'e (uvicorn main:app) eşzamanlı istemcilerle ayarlanabilir
+bir istek karışımı gönderir ve şunları raporlar:
+- Throughput (istek/sn)
+- Endpoint bazında p50 / p95 / p99 gecikme ve hata sayısı
+- İstek başına DB round-trip (/metrics'teki sorgu sayaçlarının farkından)
+
+Sonuçlar JSON olarak kaydedilir; --compare ile önceki bir koşuyla karşılaştırılır.
+build_lstm_cache.ps1'in Linux/Python karşılığıdır.
+
+Kullanım:
+    # netpulse_db'yi 10.000 abone ile SIFIRDAN oluşturur (mevcut veri silinir!)
+    python benchmarks/load_test.py --seed 10000 --clients 32 --duration 60
+
+    # Mevcut veritabanına karşı, özel karışım ve karşılaştırma ile
+    python benchmarks/load_test.py --subscribers 500 --mix simulate=6,trend=2,scan=1,tickets=1 \\
+        --json after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT_DIR, 'src', 'backend')
+
+FIRST_SUBSCRIBER_ID = 1001
+
+# işlem adı -> (HTTP metodu, route şablonu)
+# Route şablonu /metrics'teki route/endpoint etiketleriyle birebir aynıdır
+OPERATIONS = {
+    "simulate": ("GET", "/api/simulate/{subscriber_id}"),
+    "trend": ("GET", "/api/trend/{subscriber_id}"),
+    "scan": ("GET", "/api/scan_network"),
+    "tickets": ("GET", "/api/tickets"),
+    "subscriber_tickets": ("GET", "/api/tickets/{subscriber_id}"),
+    "create_ticket": ("POST", "/api/tickets"),
+}
+
+DEFAULT_MIX = "simulate=6,trend=2,scan=1,tickets=1,subscriber_tickets=1"
+
+METRIC_LINE = re.compile(r'^(\w+)\{(.*)\} ([0-9.eE+-]+)$')
+LABEL_PAIR = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_mix(mix: str) -> dict:
+    """'simulate=6,trend=2' -> {'simulate': 6.0, 'trend': 2.0}"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise SystemExit(f"❌ Bilinmeyen işlem: {name} (seçenekler: {', '.join(OPERATIONS)})")
+        weights[name] = float(weight or 1)
+    return {name: w for name, w in weights.items() if w > 0}
+
+
+def seed_database(subscribers: int):
+    """init_db_postgres + seed_db ile netpulse_db'yi yeniden oluşturur"""
+    print(f"🌱 netpulse_db {subscribers:,} abone ile yeniden oluşturuluyor...")
+    for script, extra in (("init_db_postgres.py", ["--subscribers", str(subscribers)]), ("seed_db.py", [])):
+        subprocess.run([sys.executable, script, *extra], cwd=BACKEND_DIR, check=True)
+
+
+def wait_until_ready(base_url: str, timeout: float):
+    """/ready 200 dönene kadar bekler (model warm-up + LSTM cache)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{base_url}/ready", timeout=5).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(1)
+    raise SystemExit(f"❌ Backend {timeout:.0f} sn içinde hazır olmadı: {base_url}/ready")
+
+
+def scrape_metrics(base_url: str) -> dict:
+    """
+    /metrics'ten route bazında HTTP istek ve DB sorgu/bağlantı sayaçlarını okur.
+    Dönen yapı: {"requests": {route: n}, "queries": {route: n}, "connects": {route: n}}
+    """
+    try:
+        text = requests.get(f"{base_url}/metrics", timeout=10).text
+    except requests.RequestException:
+        return {}
+
+    counters = {"requests": defaultdict(float), "queries": defaultdict(float), "connects": defaultdict(float)}
+    series = {
+        "netpulse_http_request_duration_seconds_count": ("requests", "route"),
+        "netpulse_db_query_duration_seconds_count": ("queries", "endpoint"),
+        "netpulse_db_connect_duration_seconds_count": ("connects", "endpoint"),
+    }
+    for line in text.splitlines():
+        match = METRIC_LINE.match(line)
+        if not match or match.group(1) not in series:
+            continue
+        bucket, label = series[match.group(1)]
+        labels = dict(LABEL_PAIR.findall(match.group(2)))
+        counters[bucket][labels.get(label, "")] += float(match.group(3))
+    return counters
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class LoadRunner:
+    """Her istemci kendi requests.Session'ı ile deadline'a kadar karışımdan istek atar"""
+
+    def __init__(self, base_url: str, weights: dict, subscribers: int, seed: int):
+        self.base_url = base_url
+        self.operations = list(weights)
+        self.weights = [weights[name] for name in self.operations]
+        self.subscribers = subscribers
+        self.seed = seed
+        self.samples = defaultdict(list)   # işlem -> [gecikme_sn]
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def _request(self, session: requests.Session, rng: random.Random, operation: str):
+        method, route = OPERATIONS[operation]
+        subscriber_id = FIRST_SUBSCRIBER_ID + rng.randrange(self.subscribers)
+        url = self.base_url + route.format(subscriber_id=subscriber_id)
+
+        if operation == "create_ticket":
+            return session.post(url, json={
+                "subscriber_id": subscriber_id,
+                "fault_type": "CPE",
+                "priority": rng.choice(["HIGH", "MEDIUM", "LOW"]),
+                "scope": "INDIVIDUAL",
+                "technician_note": "load test"
+            }, timeout=60)
+        return session.request(method, url, timeout=60)
+
+    def client(self, client_id: int, deadline: float, max_requests: int):
+        rng = random.Random(self.seed + client_id)
+        session = requests.Session()
+        local_samples = defaultdict(list)
+        local_errors = defaultdict(int)
+        sent = 0
+
+        while time.monotonic() < deadline and (not max_requests or sent < max_requests):
+            operation = rng.choices(self.operations, weights=self.weights)[0]
+            started = time.perf_counter()
+            try:
+                response = self._request(session, rng, operation)
+                ok = response.status_code < 400
+            except requests.RequestException:
+                ok = False
+            local_samples[operation].append(time.perf_counter() - started)
+            if not ok:
+                local_errors[operation] += 1
+            sent += 1
+
+        with self._lock:
+            for operation, values in local_samples.items():
+                self.samples[operation].extend(values)
+            for operation, count in local_errors.items():
+                self.errors[operation] += count
+
+    def run(self, clients: int, duration: float, requests_per_client: int) -> float:
+        deadline = time.monotonic() + duration
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            for client_id in range(clients):
+                pool.submit(self.client, client_id, deadline, requests_per_client)
+        return time.perf_counter() - started
+
+
+def summarize(runner: LoadRunner, elapsed: float, before: dict, after: dict) -> dict:
+    """Endpoint ve toplam istatistiklerini üretir"""
+    operations = {}
+    all_latencies = []
+
+    for operation, values in sorted(runner.samples.items()):
+        values.sort()
+        all_latencies.extend(values)
+        _, route = OPERATIONS[operation]
+        stats = {
+            "route": route,
+            "requests": len(values),
+            "errors": runner.errors.get(operation, 0),
+            "throughput_rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2),
+        }
+        if before and after:
+            served = after["requests"][route] - before["requests"][route]
+            if served > 0:
+                stats["db_queries_per_request"] = round((after["queries"][route] - before["queries"][route]) / served, 2)
+                stats["db_connects_per_request"] = round((after["connects"][route] - before["connects"][route]) / served, 2)
+        operations[operation] = stats
+
+    all_latencies.sort()
+    total = len(all_latencies)
+    return {
+        "requests": total,
+        "errors": sum(runner.errors.values()),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(all_latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(all_latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(all_latencies, 99) * 1000, 2),
+        "operations": operations,
+    }
+
+
+def print_summary(summary: dict):
+    print("\n" + "=" * 104)
+    print(f"{'İşlem':<20}{'İstek':>8}{'Hata':>7}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'DB sorgu/istek':>16}{'DB conn/istek':>14}")
+    print("=" * 104)
+    for operation, stats in summary["operations"].items():
+        queries = stats.get("db_queries_per_request", "-")
+        connects = stats.get("db_connects_per_request", "-")
+        print(f"{operation:<20}{stats['requests']:>8}{stats['errors']:>7}{stats['throughput_rps']:>9.1f}"
+              f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{queries:>16}{connects:>14}")
+    print("-" * 104)
+    print(f"{'TOPLAM':<20}{summary['requests']:>8}{summary['errors']:>7}{summary['throughput_rps']:>9.1f}"
+          f"{summary['p50_ms']:>10.1f}{summary['p95_ms']:>10.1f}{summary['p99_ms']:>10.1f}")
+
+
+def print_comparison(baseline: dict, current: dict):
+    """İki koşunun throughput ve p95 farkını gösterir"""
+    print("\n" + "=" * 72)
+    print(f"KARŞILAŞTIRMA (baseline: {baseline.get('label') or baseline.get('started_at')})")
+    print("=" * 72)
+    print(f"{'İşlem':<20}{'rps önce':>10}{'rps sonra':>11}{'p95 önce':>11}{'p95 sonra':>11}{'Δp95':>9}")
+    for operation, stats in current["summary"]["operations"].items():
+        old = baseline["summary"]["operations"].get(operation)
+        if not old:
+            continue
+        delta = (stats["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0.0
+        print(f"{operation:<20}{old['throughput_rps']:>10.1f}{stats['throughput_rps']:>11.1f}"
+              f"{old['p95_ms']:>11.1f}{stats['p95_ms']:>11.1f}{delta:>+8.1f}%")
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NetPulse NOC API load benchmark")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--seed", type=int, metavar="N",
+                        help="netpulse_db'yi N abone ile yeniden oluştur (mevcut veri silinir)")
+    parser.add_argument("--subscribers", type=int, default=500, help="İstek atılacak abone ID aralığı (1001..)")
+    parser.add_argument("--clients", type=int, default=16, help="Eşzamanlı istemci sayısı")
+    parser.add_argument("--duration", type=float, default=30, help="Ölçüm süresi (sn)")
+    parser.add_argument("--requests-per-client", type=int, default=0, help="0 = süre dolana kadar")
+    parser.add_argument("--warmup", type=float, default=5, help="Ölçüm öncesi ısınma süresi (sn)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"İşlem ağırlıkları (varsayılan: {DEFAULT_MIX})")
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--ready-timeout", type=float, default=600, help="/ready için bekleme süresi (sn)")
+    parser.add_argument("--label", default="", help="Koşu etiketi (JSON'a yazılır)")
+    parser.add_argument("--json", help="Sonuçları JSON dosyasına yaz")
+    parser.add_argument("--compare", help="Karşılaştırılacak önceki JSON sonucu")
+    args = parser.parse_args()
+
+    weights = parse_mix(args.mix)
+    subscribers = args.subscribers
+    if args.seed:
+        seed_database(args.seed)
+        subscribers = args.seed
+        print("⚠️ Backend seed'den önce başlatıldıysa LSTM cache eski abone listesini içerir; yeniden başlatın.")
+
+    print(f"⏳ {args.base_url}/ready bekleniyor...")
+    wait_until_ready(args.base_url, args.ready_timeout)
+
+    if args.warmup > 0:
+        print(f"🔥 Isınma ({args.warmup:.0f} sn)...")
+        LoadRunner(args.base_url, weights, subscribers, args.random_seed - 1).run(args.clients, args.warmup, 0)
+
+    print(f"🚀 {args.clients} istemci, {args.duration:.0f} sn, karışım: {args.mix}")
+    runner = LoadRunner(args.base_url, weights, subscribers, args.random_seed)
+    before = scrape_metrics(args.base_url)
+    elapsed = runner.run(args.clients, args.duration, args.requests_per_client)
+    after = scrape_metrics(args.base_url)
+
+    summary = summarize(runner, elapsed, before, after)
+    print_summary(summary)
+
+    result = {
+        "label": args.label,
+        "started_at": datetime.now().isoformat(),
+        "git_revision": git_revision(),
+        "config": {
+            "base_url": args.base_url,
+            "subscribers": subscribers,
+            "clients": args.clients,
+            "duration_s": args.duration,
+            "requests_per_client": args.requests_per_client,
+            "mix": weights,
+            "random_seed": args.random_seed,
+        },
+        "summary": summary,
+    }
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(json.load(f), result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Sonuçlar kaydedildi: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+NetPulse - LSTM Precision Benchmark
+
+lstm_numpy.NumpyLSTMPredictor'ın float32 / float16 / int8 modlarını referans
+modele (TensorFlow varsa Keras, yoksa NumPy float32) karşı ölçer:
+- doğruluk farkı: train_lstm.load_lstm_dataset ile eğitimdeki held-out %20
+  (karıştırılmamış) ayrım; CSV ya da pandas/sklearn yoksa sentetik pencereler
+  (sadece referansla uyum ve olasılık farkı raporlanır),
+- batch boyutu başına satır / sn (CPU, en iyi tekrar),
+- ağırlık belleği ve en büyük batch'te tracemalloc tepe belleği.
+
+Kullanım:
+    python benchmarks/lstm_precision.py
+    python benchmarks/lstm_precision.py --batch-sizes 1,256,8192 --min-agreement 0.995
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT_DIR, 'src', 'backend')
+MODELS_DIR = os.path.join(ROOT_DIR, 'src', 'models')
+sys.path.insert(0, BACKEND_DIR)
+
+import numpy as np  # noqa: E402
+
+from lstm_numpy import NumpyLSTMPredictor, PRECISIONS  # noqa: E402
+from lstm_service import TENSORFLOW_AVAILABLE  # noqa: E402
+
+DEFAULT_MODEL = os.path.join(ROOT_DIR, 'saved_models', 'netpulse_lstm.h5')
+
+
+def held_out_split(data_path: str):
+    """(X_test, y_test, kaynak) — eğitimdeki test ayrımı ya da sentetik"""
+    if data_path and os.path.exists(data_path):
+        sys.path.insert(0, MODELS_DIR)
+        try:
+            from train_lstm import load_lstm_dataset
+            _, X_test, _, y_test, _, _ = load_lstm_dataset(data_path)
+            return X_test.astype(np.float32), y_test, "held-out %20"
+        except ImportError as e:
+            print(f"⚠️ Held-out ayrım yüklenemedi ({e}), sentetik pencereler kullanılıyor")
+    return None, None, "sentetik"
+
+
+def synthetic_windows(rows: int, steps: int, features: int, seed: int) -> np.ndarray:
+    """Ölçeklenmiş [0, 1] uzayında seviye + eğilim + gürültü"""
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(0, 1, (rows, 1, features))
+    trend = rng.normal(0, 0.04, (rows, 1, features)) * np.arange(steps)[None, :, None]
+    return np.clip(base + trend + rng.normal(0, 0.02, (rows, steps, features)), 0, 1).astype(np.float32)
+
+
+def throughput(model, X: np.ndarray, batch: int, repeat: int) -> float:
+    """Satır / sn; küçük batch'lerde en az ~2000 satır ölçülür"""
+    chunks = [X[(i * batch) % len(X):][:batch] for i in range(max(1, 2000 // batch))]
+    model.predict(chunks[0], verbose=0)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for chunk in chunks:
+            model.predict(chunk, verbose=0)
+        best = min(best, time.perf_counter() - started)
+    return sum(len(c) for c in chunks) / best
+
+
+def traced_peak(model, X: np.ndarray) -> int:
+    tracemalloc.start()
+    model.predict(X, verbose=0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NetPulse LSTM precision benchmark")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="netpulse_lstm.h5 (yanında .npz varsa o okunur)")
+    parser.add_argument("--data", default=os.path.join(ROOT_DIR, 'data', 'netpulse_telemetry_final.csv'))
+    parser.add_argument("--rows", type=int, default=20_000, help="Sentetik pencere sayısı")
+    parser.add_argument("--batch-sizes", default="1,64,1024,8192")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-agreement", type=float, default=0.99, help="Referansla en az sınıf uyumu")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    try:
+        models = {precision: NumpyLSTMPredictor.load(args.model, precision) for precision in PRECISIONS}
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"❌ Model yüklenemedi: {e}")
+        sys.exit(1)
+
+    reference, reference_name = models["float32"], "numpy float32"
+    if TENSORFLOW_AVAILABLE:
+        from tensorflow.keras.models import load_model
+        reference, reference_name = load_model(args.model), "keras"
+        models = {"keras": reference, **models}
+
+    X, y, source = held_out_split(args.data)
+    if X is None:
+        steps, features = 12, models["float32"].layers[0]["kernel"].shape[0]
+        X = synthetic_windows(args.rows, steps, features, args.seed)
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+    print(f"🧪 {len(X):,} pencere ({source}), referans: {reference_name}, batch: {batch_sizes}")
+
+    expected = reference.predict(X, verbose=0)
+    expected_class = expected.argmax(axis=1)
+    print(f"📊 Referans sınıf dağılımı: {np.bincount(expected_class, minlength=expected.shape[1]).tolist()}")
+
+    rows, failed = [], []
+    for name, model in models.items():
+        probs = expected if model is reference else model.predict(X, verbose=0)
+        delta = np.abs(probs - expected)
+        row = {
+            "name": name,
+            "weights": getattr(model, "nbytes", None),
+            "accuracy": float((probs.argmax(axis=1) == y).mean()) if y is not None else None,
+            "agreement": float((probs.argmax(axis=1) == expected_class).mean()),
+            "max_delta": float(delta.max()),
+            "rps": [throughput(model, X, batch, args.repeat) for batch in batch_sizes],
+            "peak": traced_peak(model, X[:max(batch_sizes)]) if name != "keras" else None
+        }
+        rows.append(row)
+        if row["agreement"] < args.min_agreement:
+            failed.append(name)
+
+    width = 14 + 10 + 10 + 10 + 12 + 16 * len(batch_sizes) + 10
+    print("\n" + "=" * width)
+    print(f"{'Mod':<14}{'Ağırlık':>10}{'Doğruluk':>10}{'Uyum':>10}{'Maks Δp':>12}"
+          + "".join(f"{f'b={b} sat/sn':>16}" for b in batch_sizes) + f"{'Tepe':>10}")
+    print("=" * width)
+    for row in rows:
+        weights = f"{row['weights'] / 1024:.0f}KB" if row["weights"] else "-"
+        accuracy = f"{row['accuracy']:.4f}" if row["accuracy"] is not None else "-"
+        peak = f"{row['peak'] / 1e6:.1f}MB" if row["peak"] is not None else "-"
+        print(f"{row['name']:<14}{weights:>10}{accuracy:>10}{row['agreement']:>10.4f}{row['max_delta']:>12.2e}"
+              + "".join(f"{rps:>16,.0f}" for rps in row["rps"]) + f"{peak:>10}")
+    print("=" * width)
+    if y is not None:
+        base = rows[0]["accuracy"]
+        print("Doğruluk farkı (referansa göre): " + ", ".join(
+            f"{row['name']} {(row['accuracy'] - base) * 100:+.2f} puan" for row in rows[1:]
+        ))
+
+    if failed:
+        print(f"⚠️ Referansla uyum %{args.min_agreement * 100:.1f} altında: {failed}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+NetPulse - Model Hot Swap / Shadow Scoring Benchmark
+
+TensorFlow olmadan, versiyon etiketli sahte LSTM model/scaler çiftleriyle:
+- atomiklik: bir thread sürekli predict_batch yaparken ana thread
+  LSTMPredictionService.swap ile versiyonları --swaps kez değiştirir; v_k
+  scaler'ı girdiye k ofseti ekler, v_k modeli ofset kendi versiyonu değilse
+  "karışık" sınıfı döndürür → yarı yeni / yarı eski kullanım sayılır (0 olmalı),
+  pencereler (measurement_cache) swap'lardan sonra aynen durmalı,
+- shadow: aday model yavaş (--shadow-ms) iken aktif batch gecikmesi shadow
+  kapalıyla karşılaştırılır (istek yolu beklememeli), uyum oranı ve atlanan
+  batch'ler raporlanır.
+
+Kullanım:
+    python benchmarks/model_hot_swap.py
+    python benchmarks/model_hot_swap.py --fleet 20000 --swaps 500 --shadow-ms 50
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+import numpy as np  # noqa: E402
+
+from lstm_service import LSTMPredictionService  # noqa: E402
+from model_registry import ShadowScorer, shadow_candidates, ModelBundle  # noqa: E402
+
+FIRST_SUBSCRIBER_ID = 1001
+MIXED_CLASS = 3
+OFFSET = 1000.0
+
+
+class TaggedScaler:
+    def __init__(self, version: int):
+        self.version = version
+
+    def transform(self, X):
+        return X + self.version * OFFSET
+
+
+class TaggedModel:
+    """Girdideki ofset kendi versiyonuyla uyuşmazsa MIXED_CLASS; yoksa versiyona göre 0/1"""
+
+    def __init__(self, version: int, delay: float = 0.0):
+        self.version = version
+        self.delay = delay
+
+    def predict(self, X, verbose=0):
+        if self.delay:
+            time.sleep(self.delay)
+        offset_version = np.rint(X[:, 0, 0] // OFFSET)
+        probs = np.zeros((X.shape[0], 4), dtype=np.float32)
+        classes = np.where(offset_version == self.version, self.version % 2, MIXED_CLASS)
+        probs[np.arange(X.shape[0]), classes] = 1.0
+        return probs
+
+
+def build_service(fleet: int, rng) -> LSTMPredictionService:
+    service = LSTMPredictionService("", "", "", lazy=True)
+    service.swap(TaggedModel(0), TaggedScaler(0), None, version="v0")
+    ids = list(range(FIRST_SUBSCRIBER_ID, FIRST_SUBSCRIBER_ID + fleet))
+    # Ofset hesabı bozulmasın diye ölçümler [0, OFFSET) aralığında
+    features = rng.uniform(1, OFFSET - 1, size=(fleet * service.window_size, 4)).tolist()
+    service.add_measurements_bulk([sid for sid in ids for _ in range(service.window_size)], features)
+    return service
+
+
+def atomicity(service: LSTMPredictionService, swaps: int, batch: int) -> dict:
+    ids = list(service.measurement_cache)
+    before = {sid: list(service.measurement_cache[sid]) for sid in ids[:100]}
+    stop = threading.Event()
+    counts = {"batches": 0, "rows": 0, "mixed": 0, "empty": 0}
+
+    def predictor():
+        i = 0
+        while not stop.is_set():
+            chunk = ids[i:i + batch] or ids[:batch]
+            i = (i + batch) % len(ids)
+            results = service.predict_batch(chunk)
+            if not results:
+                counts["empty"] += 1
+                continue
+            counts["batches"] += 1
+            counts["rows"] += len(results)
+            counts["mixed"] += sum(1 for r in results.values() if r.prediction_class == MIXED_CLASS)
+
+    thread = threading.Thread(target=predictor)
+    thread.start()
+    for version in range(1, swaps + 1):
+        service.swap(TaggedModel(version), TaggedScaler(version), None, version=f"v{version}")
+        time.sleep(0.0005)
+    stop.set()
+    thread.join()
+
+    counts["windows_kept"] = all(list(service.measurement_cache[sid]) == window for sid, window in before.items())
+    return counts
+
+
+def batch_latency(service: LSTMPredictionService, batches: int, batch: int) -> np.ndarray:
+    ids = list(service.measurement_cache)
+    elapsed = []
+    for i in range(batches):
+        chunk = ids[(i * batch) % len(ids):][:batch]
+        started = time.perf_counter()
+        service.predict_batch(chunk)
+        elapsed.append(time.perf_counter() - started)
+    return np.asarray(elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NetPulse model hot swap / shadow benchmark")
+    parser.add_argument("--fleet", type=int, default=10_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--swaps", type=int, default=200)
+    parser.add_argument("--batches", type=int, default=200)
+    parser.add_argument("--shadow-ms", type=float, default=20.0, help="Aday modelin batch başına gecikmesi")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    service = build_service(args.fleet, rng)
+    print(f"🧪 {args.fleet:,} abone penceresi, batch {args.batch}, {args.swaps} swap")
+
+    swap = atomicity(service, args.swaps, args.batch)
+
+    # Shadow: aktif v0 (hızlı), aday v1 (yavaş, farklı sınıf) → uyum ~0, aktif gecikme değişmemeli
+    service.swap(TaggedModel(0), TaggedScaler(0), None, version="v0")
+    service.shadow = None
+    baseline = batch_latency(service, args.batches, args.batch)
+
+    shadow = ShadowScorer()
+    shadow.set_candidates("v1", shadow_candidates(ModelBundle(
+        version="v1", lstm=(TaggedModel(1, delay=args.shadow_ms / 1000), TaggedScaler(1), None)
+    )))
+    service.shadow = shadow
+    shadowed = batch_latency(service, args.batches, args.batch)
+    time.sleep(args.shadow_ms / 1000 * (shadow.max_pending + 1))
+    report = shadow.report()["models"].get("LSTM", {})
+
+    # Aynı versiyon aday olunca uyum 1.0 olmalı
+    shadow.set_candidates("v0", shadow_candidates(ModelBundle(version="v0", lstm=(TaggedModel(0), TaggedScaler(0), None))))
+    batch_latency(service, 20, args.batch)
+    time.sleep(0.2)
+    same = shadow.report()["models"].get("LSTM", {})
+
+    print("\n" + "=" * 60)
+    print(f"{'Swap sırasında batch':<36}{swap['batches']:>12,}")
+    print(f"{'Karışık model/scaler tahmini':<36}{swap['mixed']:>12,}")
+    print(f"{'Boş dönen batch':<36}{swap['empty']:>12,}")
+    print(f"{'Pencereler korundu':<36}{str(swap['windows_kept']):>12}")
+    print("-" * 60)
+    print(f"{'Aktif batch p50 (shadow kapalı)':<36}{np.median(baseline) * 1000:>10.2f} ms")
+    print(f"{'Aktif batch p50 (shadow açık)':<36}{np.median(shadowed) * 1000:>10.2f} ms")
+    print(f"{'Aktif batch p99 (shadow açık)':<36}{np.percentile(shadowed, 99) * 1000:>10.2f} ms")
+    print(f"{'Shadow skorlanan / atlanan batch':<36}{report.get('batches', 0):>6} / {report.get('skipped', 0)}")
+    print(f"{'Uyum (farklı aday)':<36}{report.get('agreement')!s:>12}")
+    print(f"{'Uyum (aynı model)':<36}{same.get('agreement')!s:>12}")
+    print("=" * 60)
+
+    failed = swap["mixed"] or swap["empty"] or not swap["windows_kept"] or same.get("agreement") != 1.0
+    # Aday yavaşken aktif yol beklememeli (aday gecikmesinin yarısından az ek yük)
+    if np.median(shadowed) - np.median(baseline) > args.shadow_ms / 2000:
+        print("⚠️ Shadow aktif batch'i bekletiyor")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+NetPulse - Outage Correlation Benchmark
+
+Bölgelere dağılmış simüle bir filoda ardışık taramalar üretir: her taramada
+abonelerin küçük bir kısmı rastgele YELLOW/RED olur (arka plan gürültüsü),
+--outage-at taramasında seçilen bölgelerde abonelerin --outage-rate oranı
+aynı anda bozulur ve --outage-sweeps tarama sonra düzelir. Rapor:
+- arızalı bölgelerin kaç taramada yakalandığı ve yanlış alarmlar,
+- bastırılan bireysel iş (ticket / bildirim) ve yerine açılan incident sayısı,
+- tarama başına korelasyon süresi.
+DB kullanılmaz (get_db_func=None); saat taramaya göre sabitlenir.
+
+Kullanım:
+    python benchmarks/outage_correlation.py
+    python benchmarks/outage_correlation.py --fleet 500000 --regions 400 --outage-regions 5
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+import numpy as np  # noqa: E402
+
+from outage_correlation import CorrelationConfig, OutageCorrelator  # noqa: E402
+
+SWEEP_SECONDS = 300
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NetPulse outage correlation benchmark")
+    parser.add_argument("--fleet", type=int, default=100_000)
+    parser.add_argument("--regions", type=int, default=80)
+    parser.add_argument("--sweeps", type=int, default=40)
+    parser.add_argument("--noise", type=float, default=0.03, help="Taramada rastgele YELLOW/RED oranı")
+    parser.add_argument("--outage-regions", type=int, default=3)
+    parser.add_argument("--outage-rate", type=float, default=0.6)
+    parser.add_argument("--outage-at", type=int, default=20)
+    parser.add_argument("--outage-sweeps", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--z-threshold", type=float, default=CorrelationConfig.z_threshold)
+    parser.add_argument("--min-fraction", type=float, default=CorrelationConfig.min_fraction)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    subscriber_ids = np.arange(1001, 1001 + args.fleet, dtype=np.int64)
+    # Bölge büyüklükleri dengesiz (küçük ilçe / büyük ilçe)
+    weights = rng.pareto(2.0, args.regions) + 1
+    region_code = rng.choice(args.regions, size=args.fleet, p=weights / weights.sum()).astype(np.int16)
+    regions = [f"Bölge-{i:03d}" for i in range(args.regions)]
+    outage = rng.choice(args.regions, size=args.outage_regions, replace=False)
+    in_outage = np.isin(region_code, outage)
+
+    clock = {"now": 1_700_000_000.0}
+    correlator = OutageCorrelator(
+        config=CorrelationConfig(z_threshold=args.z_threshold, min_fraction=args.min_fraction),
+        clock=lambda: clock["now"]
+    )
+
+    print(f"🧪 {args.fleet:,} abone, {args.regions} bölge, {args.sweeps} tarama "
+          f"(arıza: {args.outage_regions} bölge, tarama {args.outage_at}-{args.outage_at + args.outage_sweeps - 1})")
+
+    detected_at = {}
+    false_alarms = set()
+    opened_total = 0
+    suppressed_work = 0
+    individual_work = 0
+    elapsed = []
+
+    for sweep in range(args.sweeps):
+        clock["now"] += SWEEP_SECONDS
+        degraded = rng.random(args.fleet) < args.noise
+        outage_active = args.outage_at <= sweep < args.outage_at + args.outage_sweeps
+        if outage_active:
+            degraded |= in_outage & (rng.random(args.fleet) < args.outage_rate)
+
+        started = time.perf_counter()
+        opened, _, _ = correlator.detect(region_code, regions, subscriber_ids, degraded)
+        elapsed.append(time.perf_counter() - started)
+
+        opened_total += len(opened)
+        for incident in opened:
+            code = regions.index(incident.group_key)
+            if code in outage and outage_active:
+                detected_at.setdefault(code, sweep - args.outage_at)
+            else:
+                false_alarms.add((sweep, incident.group_key))
+
+        # Her bozulmuş abone normalde bir ticket/bildirim işidir; incident üyeleri bastırılır
+        degraded_ids = subscriber_ids[degraded]
+        suppressed = correlator.suppressed(degraded_ids)
+        suppressed_work += int(suppressed.sum())
+        individual_work += int((~suppressed).sum())
+
+    missed = [regions[c] for c in outage if c not in detected_at]
+    print("\n" + "=" * 56)
+    print(f"{'Yakalanan arızalı bölge':<36}{len(detected_at):>10} / {args.outage_regions}")
+    if detected_at:
+        print(f"{'En geç yakalama (tarama)':<36}{max(detected_at.values()):>10}")
+    print(f"{'Yanlış alarm':<36}{len(false_alarms):>10}")
+    print(f"{'Açılan incident':<36}{opened_total:>10}")
+    print(f"{'Bastırılan bireysel iş':<36}{suppressed_work:>10,}")
+    print(f"{'Kalan bireysel iş':<36}{individual_work:>10,}")
+    print(f"{'Korelasyon süresi (tarama başına)':<36}{np.mean(elapsed) * 1e3:>10.2f} ms")
+    print("=" * 56)
+    if missed or false_alarms:
+        print(f"⚠️ Kaçırılan: {missed} | Yanlış alarm: {sorted(false_alarms)[:5]}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+NetPulse - Random Forest Artifact Benchmark
+
+saved_models/netpulse_classifier.pkl (joblib Pipeline) ile
+saved_models/netpulse_classifier_flat (memory-mapped NumPy) karşılaştırılır:
+- Parity: aynı girdide predict_proba / predict sonuçları eşleşmeli
+- Cold start: joblib.load vs FlatForestPredictor yükleme süresi
+- Tahmin: batch boyutlarına göre predict_proba süresi; üretimde kullanılan
+  load_forest_model sonucu (küçük batch düz model, büyük batch pipeline)
+  herhangi bir batch'te pipeline'dan --max-slowdown kattan yavaşsa çıkış kodu 1
+
+Önce düz modeli üret:
+    python src/models/train_model.py --export-only
+
+Kullanım:
+    python benchmarks/rf_flat_model_bench.py --rows 10000
+    python benchmarks/rf_flat_model_bench.py --max-slowdown 1.1
+"""
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src', 'backend'))
+
+from forest_predictor import FlatForestPredictor, PIPELINE_MIN_ROWS  # noqa: E402
+from scoring import load_forest_model  # noqa: E402
+
+MODEL_PATH = os.path.join(ROOT_DIR, 'saved_models', 'netpulse_classifier.pkl')
+FLAT_MODEL_DIR = os.path.join(ROOT_DIR, 'saved_models', 'netpulse_classifier_flat')
+
+# 1000: ScoringWorker'ın varsayılan --batch-size'ı
+BATCH_SIZES = [1, 100, 1_000, 10_000]
+
+
+def timed(func, repeat=5):
+    """En iyi süreyi (sn) ve son sonucu döndürür"""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def timed_interleaved(funcs, repeat=7):
+    """Her fonksiyonun en iyi süresi; ölçümler sırayla dönüşümlü (yük dalgalanması hepsine aynı yansır)"""
+    best = [float("inf")] * len(funcs)
+    for _ in range(repeat):
+        for i, func in enumerate(funcs):
+            start = time.perf_counter()
+            func()
+            best[i] = min(best[i], time.perf_counter() - start)
+    return best
+
+
+def make_inputs(flat: FlatForestPredictor, rows: int, seed: int = 42) -> pd.DataFrame:
+    """Eğitim dağılımına yakın sentetik girdi (scaler mean/scale + bilinen kategoriler)"""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for column, mean, scale in zip(flat.numeric_columns, flat.mean, flat.scale):
+        data[column] = rng.normal(mean, scale * 1.5, size=rows)
+    for column, categories in zip(flat.categorical_columns, flat.categories):
+        data[column] = rng.choice(categories, size=rows)
+    return pd.DataFrame(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pickle vs flat RF model benchmark")
+    parser.add_argument("--rows", type=int, default=10_000, help="Parity kontrolü için satır sayısı")
+    parser.add_argument("--atol", type=float, default=1e-5, help="predict_proba tolerans")
+    parser.add_argument("--max-slowdown", type=float, default=1.2,
+                        help="Üretim modeli pipeline'dan en fazla bu kat yavaş olabilir (ölçüm gürültüsü payı)")
+    args = parser.parse_args()
+
+    pickle_load, pipeline = timed(lambda: joblib.load(MODEL_PATH), repeat=3)
+    flat_load, flat = timed(lambda: FlatForestPredictor(FLAT_MODEL_DIR), repeat=3)
+
+    pickle_mb = os.path.getsize(MODEL_PATH) / 1e6
+    flat_mb = sum(
+        os.path.getsize(os.path.join(FLAT_MODEL_DIR, f)) for f in os.listdir(FLAT_MODEL_DIR)
+    ) / 1e6
+
+    print("=" * 64)
+    print("YÜKLEME (cold start)")
+    print("=" * 64)
+    print(f"joblib.load (pickle):     {pickle_load * 1000:10.2f} ms   {pickle_mb:8.1f} MB")
+    print(f"FlatForestPredictor mmap: {flat_load * 1000:10.2f} ms   {flat_mb:8.1f} MB")
+
+    # --- Parity ---
+    X = make_inputs(flat, args.rows)
+    expected = pipeline.predict_proba(X)
+    actual = flat.predict_proba(X)
+    max_diff = float(np.abs(expected - actual).max())
+    label_agreement = float((pipeline.predict(X) == flat.predict(X)).mean())
+
+    print("\n" + "=" * 64)
+    print("PARITY")
+    print("=" * 64)
+    print(f"Satır: {args.rows}  max |Δproba|: {max_diff:.2e}  etiket uyumu: {label_agreement * 100:.3f}%")
+
+    # --- Tahmin süresi ---
+    print("\n" + "=" * 64)
+    print("predict_proba")
+    print("=" * 64)
+    # Flat: pipeline_path'siz düz model; Üretim: load_forest_model (>= PIPELINE_MIN_ROWS pipeline'a gider)
+    production = load_forest_model(FLAT_MODEL_DIR, MODEL_PATH)
+    print(f"{'Batch':>8}{'Pipeline (ms)':>16}{'Flat (ms)':>14}{'Üretim (ms)':>14}{'Hızlanma':>10}")
+    slow = []
+    for batch in BATCH_SIZES:
+        X_batch = make_inputs(flat, batch, seed=batch)
+        production.predict_proba(X_batch)  # büyük batch'te pipeline ilk çağrıda yüklenir
+        t_pipe, t_flat, t_prod = timed_interleaved([
+            lambda: pipeline.predict_proba(X_batch),
+            lambda: flat.predict_proba(X_batch),
+            lambda: production.predict_proba(X_batch)
+        ])
+        print(f"{batch:>8}{t_pipe * 1000:>16.2f}{t_flat * 1000:>14.2f}{t_prod * 1000:>14.2f}{t_pipe / t_prod:>9.1f}x")
+        if t_prod > t_pipe * args.max_slowdown:
+            slow.append(batch)
+    print(f"(>= {PIPELINE_MIN_ROWS} satır üretimde pipeline ile skorlanır)")
+
+    failed = False
+    if max_diff > args.atol or label_agreement < 1.0:
+        print("\n❌ Parity başarısız!")
+        failed = True
+    else:
+        print("\n✅ Parity OK")
+    if slow:
+        print(f"❌ Üretim modeli pipeline'dan {args.max_slowdown}x'ten yavaş: batch {slow}")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+NetPulse - Scoring Core Micro-Benchmarks
+
+Saatte milyonlarca kez çalışan fonksiyonları izole olarak ölçer:
+- LSTMPredictionService.add_measurement / predict / analyze_trend
+- HybridEnsembleModel.combine_predictions
+- classify_subscriber_status, simulate_metrics_single (main.py)
+- StatusTracker._analyze_transition
+
+Her fonksiyon farklı filo boyutlarında (varsayılan 1k / 100k / 1M abone) çalışır:
+LSTM cache o kadar abonenin tam penceresiyle doldurulur ve çağrılar rastgele
+abonelere dağıtılır. TensorFlow / model dosyaları yoksa sabit çıktılı bir
+dummy model kullanılır; böylece ölçülen şey servis kodunun kendi yüküdür.
+
+Kullanım:
+    python benchmarks/scoring_microbench.py
+    python benchmarks/scoring_microbench.py --sizes 1000,100000 --json micro.json
+    python benchmarks/scoring_microbench.py --compare micro.json --max-regression 15
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+from lstm_service import LSTMPredictionService, HybridEnsembleModel, PredictionResult  # noqa: E402
+from status_tracker import StatusTracker  # noqa: E402
+from main import (  # noqa: E402
+    classify_subscriber_status, simulate_metrics_single,
+    LSTM_MODEL_PATH, LSTM_SCALER_PATH, LSTM_ENCODER_PATH
+)
+
+FIRST_SUBSCRIBER_ID = 1001
+PLANS = ["24 Mbps VDSL", "35 Mbps VDSL", "100 Mbps Fiber", "500 Mbps Fiber", "1000 Mbps Gamer"]
+STATUSES = ["GREEN", "YELLOW", "RED"]
+
+
+class DummyLSTMModel:
+    """Keras model.predict arayüzü; sabit olasılık döndürür"""
+
+    def predict(self, X, verbose=0):
+        return np.tile(np.array([0.7, 0.2, 0.07, 0.03], dtype=np.float32), (X.shape[0], 1))
+
+
+class IdentityScaler:
+    def transform(self, X):
+        return X
+
+
+def build_lstm_service(use_real_model: bool):
+    """(servis, model türü) döndürür; gerçek model yüklenemezse dummy modele düşer"""
+    service = LSTMPredictionService(LSTM_MODEL_PATH, LSTM_SCALER_PATH, LSTM_ENCODER_PATH, lazy=True)
+    if use_real_model:
+        service.load()
+    if not service.is_available:
+        service.swap(DummyLSTMModel(), IdentityScaler(), None, version="dummy")
+        return service, "dummy"
+    return service, "tensorflow"
+
+
+def fill_cache(service: LSTMPredictionService, fleet_size: int, rng: np.random.Generator):
+    """fleet_size abonenin her biri için tam pencere (window_size ölçüm) oluşturur"""
+    windows = rng.uniform([10, 0, 5, 20], [120, 5, 40, 900], size=(fleet_size, service.window_size, 4))
+    service.measurement_cache = {
+        FIRST_SUBSCRIBER_ID + i: deque(windows[i].tolist(), maxlen=service.window_size)
+        for i in range(fleet_size)
+    }
+
+
+def measure(func, args_list: list, repeat: int) -> float:
+    """args_list'teki her argüman için func çağırır; en iyi tekrarın çağrı başına ns değeri"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter_ns()
+        for args in args_list:
+            func(*args)
+        best = min(best, (time.perf_counter_ns() - started) / len(args_list))
+    return best
+
+
+def bench_fleet(service: LSTMPredictionService, fleet_size: int, calls: int, repeat: int, seed: int) -> dict:
+    """Tek filo boyutu için tüm fonksiyonları ölçer, {isim: ns/çağrı} döndürür"""
+    rng = np.random.default_rng(seed)
+    py_rng = random.Random(seed)
+    fill_cache(service, fleet_size, rng)
+
+    n = min(calls, fleet_size)
+    subscriber_ids = (FIRST_SUBSCRIBER_ID + rng.integers(0, fleet_size, size=n)).tolist()
+    lstm_metrics = [
+        {"latency_ms": v[0], "packet_loss_ratio": v[1], "snr_margin_db": v[2], "download_usage_mbps": v[3]}
+        for v in rng.uniform([10, 0, 5, 20], [120, 5, 40, 900], size=(n, 4)).tolist()
+    ]
+    live_metrics = [simulate_metrics_single(py_rng.choice(PLANS))[0] for _ in range(n)]
+    ai_predictions = rng.integers(0, 4, size=n).tolist()
+    plans = [py_rng.choice(PLANS) for _ in range(n)]
+    transitions = [(py_rng.choice(STATUSES), py_rng.choice(STATUSES)) for _ in range(n)]
+
+    now = datetime.now()
+    rf_results = [PredictionResult("RandomForest", int(c), 0.5, [], now) for c in ai_predictions]
+    lstm_results = [PredictionResult("LSTM", int(c), 0.7, [], now) for c in reversed(ai_predictions)]
+
+    hybrid = HybridEnsembleModel()
+    tracker = StatusTracker(None)
+
+    results = {}
+    results["lstm.add_measurement"] = measure(service.add_measurement, list(zip(subscriber_ids, lstm_metrics)), repeat)
+    results["lstm.predict"] = measure(service.predict, [(sid,) for sid in subscriber_ids], repeat)
+    results["lstm.analyze_trend"] = measure(service.analyze_trend, [(sid,) for sid in subscriber_ids], repeat)
+    results["hybrid.combine_predictions"] = measure(hybrid.combine_predictions, list(zip(rf_results, lstm_results)), repeat)
+    results["classify_subscriber_status"] = measure(classify_subscriber_status, list(zip(live_metrics, ai_predictions)), repeat)
+    results["simulate_metrics_single"] = measure(simulate_metrics_single, [(p,) for p in plans], repeat)
+    results["status_tracker._analyze_transition"] = measure(tracker._analyze_transition, transitions, repeat)
+    return results
+
+
+def print_results(results: dict, sizes: list):
+    names = list(next(iter(results.values())))
+    print("\n" + "=" * (40 + 14 * len(sizes)))
+    print(f"{'Fonksiyon (ns/çağrı)':<40}" + "".join(f"{size:>14,}" for size in sizes))
+    print("=" * (40 + 14 * len(sizes)))
+    for name in names:
+        print(f"{name:<40}" + "".join(f"{results[str(size)][name]:>14,.0f}" for size in sizes))
+
+
+def compare(baseline: dict, current: dict, max_regression: float) -> bool:
+    """Baseline'a göre max_regression yüzdesinden fazla yavaşlayanları listeler"""
+    regressions = []
+    for size, functions in current["results"].items():
+        for name, ns in functions.items():
+            old = baseline["results"].get(size, {}).get(name)
+            if old and (ns - old) / old * 100 > max_regression:
+                regressions.append((size, name, old, ns))
+
+    print("\n" + "=" * 72)
+    if not regressions:
+        print(f"✅ %{max_regression:.0f} üzerinde regresyon yok")
+        return True
+    print(f"❌ %{max_regression:.0f} üzerinde yavaşlayan fonksiyonlar:")
+    for size, name, old, ns in regressions:
+        print(f"  {name:<40} filo={int(size):>9,}  {old:>10,.0f} -> {ns:>10,.0f} ns ({(ns - old) / old * 100:+.1f}%)")
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NetPulse scoring core micro-benchmarks")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="Filo boyutları (virgülle)")
+    parser.add_argument("--calls", type=int, default=20_000, help="Filo boyutu başına fonksiyon çağrısı (üst sınır)")
+    parser.add_argument("--repeat", type=int, default=3, help="Tekrar sayısı (en iyisi alınır)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--real-model", action="store_true", help="Varsa gerçek TensorFlow LSTM modelini kullan")
+    parser.add_argument("--json", help="Sonuçları JSON dosyasına yaz")
+    parser.add_argument("--compare", help="Karşılaştırılacak önceki JSON sonucu")
+    parser.add_argument("--max-regression", type=float, default=20.0, help="İzin verilen yavaşlama (%%)")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    service, model_kind = build_lstm_service(args.real_model)
+    print(f"🧪 LSTM modeli: {model_kind}, filo boyutları: {', '.join(f'{s:,}' for s in sizes)}")
+
+    results = {}
+    for size in sizes:
+        print(f"📊 {size:,} abone ölçülüyor...")
+        results[str(size)] = bench_fleet(service, size, args.calls, args.repeat, args.seed)
+
+    print_results(results, sizes)
+
+    current = {
+        "started_at": datetime.now().isoformat(),
+        "model": model_kind,
+        "calls": args.calls,
+        "results": results
+    }
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Sonuçlar kaydedildi: {args.json}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            if not compare(json.load(f), current, args.max_regression):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
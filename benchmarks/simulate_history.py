@@ -0,0 +1,120 @@
+"""
+NetPulse - /api/simulate → Status History Check
+
+simulate_network'ü DB olmadan, sorguları senaryoya göre cevaplayan bir
+bağlantıyla çalıştırır ve bir durum geçişinin gerçekten
+- StatusHistoryWriter.record'a (subscriber_status_history),
+- RegionAggregator.update_status'a
+ulaştığını doğrular. Kapalı bağlantı kullanımı ya da StatusTracker'ın
+yuttuğu başka bir hata geçişi sessizce düşürürse çıkış kodu 1 olur.
+
+Kullanım:
+    python benchmarks/simulate_history.py
+    python benchmarks/simulate_history.py --calls 50
+"""
+import argparse
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+import main  # noqa: E402
+
+SUBSCRIBER_ID = 2002
+CUSTOMER_ROW = ("Test Abone", "100 Mbps Fiber", "İstanbul/Kadıköy", "F", "05550000000", "ZTE F660",
+                "10.0.0.2", "1 gün", 40.99, 29.03, "Kadıköy, İstanbul")
+
+
+class ScriptedCursor:
+    """simulate_network + StatusTracker sorgularını cevaplar; kapalı bağlantıda hata verir"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+
+    def execute(self, query, params=None):
+        if self.conn.closed:
+            raise RuntimeError("connection already closed")
+        query = " ".join(query.split())
+        if "FROM customers WHERE subscriber_id" in query:
+            self.rows = [CUSTOMER_ROW]
+        elif query.startswith("SELECT COUNT(*)"):
+            self.rows = [(0,)]
+        elif "current_status, previous_status" in query:
+            self.rows = [(self.conn.status, None)]
+        elif "SELECT current_status FROM subscriber_status" in query:
+            self.rows = [(self.conn.status,)]
+        elif "status_changed_at FROM subscriber_status" in query:
+            # Minimum süre dolmuş: iyileşme geçişine izin verilir
+            self.rows = [(datetime.now() - timedelta(hours=1),)]
+        else:
+            self.rows = []
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+
+class ScriptedConnection:
+    def __init__(self, status: str):
+        self.status = status
+        self.closed = False
+
+    def cursor(self):
+        return ScriptedCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class RecordingHistory:
+    def __init__(self):
+        self.rows = []
+
+    def record(self, *args, **kwargs):
+        self.rows.append(args)
+
+
+def main_check():
+    parser = argparse.ArgumentParser(description="NetPulse /api/simulate status history check")
+    parser.add_argument("--calls", type=int, default=20, help="En fazla simulate çağrısı (tahmin rastgele)")
+    parser.add_argument("--db-status", default="YELLOW", choices=["GREEN", "YELLOW", "RED"])
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    history = RecordingHistory()
+    region_updates = []
+    update_status = main.region_aggregator.update_status
+
+    main.get_db_connection = lambda: ScriptedConnection(args.db_status)
+    main.status_history = history
+    main.region_aggregator.update_status = lambda sid, status: region_updates.append((sid, status)) or update_status(sid, status)
+
+    statuses = []
+    for _ in range(args.calls):
+        statuses.append(main.simulate_network(SUBSCRIBER_ID, force_trouble=True)["ai_analysis"]["segment"])
+        if history.rows:
+            break
+
+    print(f"🧪 {len(statuses)} simulate çağrısı, DB durumu {args.db_status}, sonuçlar: {sorted(set(statuses))}")
+    print(f"{'Status history kaydı':<32}{len(history.rows):>6}  {history.rows[:1]}")
+    print(f"{'Bölge durum güncellemesi':<32}{len(region_updates):>6}  {region_updates[:1]}")
+
+    if not history.rows or not region_updates:
+        print("❌ Geçiş status history / bölge sayaçlarına ulaşmadı")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_check()
@@ -0,0 +1,163 @@
+"""
+NetPulse - Status Machine Benchmark
+
+Rastgele bir filo durumu (current_status + status_changed_at) ve önerilen
+durumlar üzerinde:
+- StatusMachine.evaluate() kararlarının gerçek StatusTracker'la
+  (should_allow_status_change + update_status) birebir aynı olduğunu,
+- abone başına değerlendirme süresini (abone başına StatusTracker vs
+  vektörel; StatusTracker sorguları DB yerine filodan cevaplayan bir
+  cursor'a gider, round-trip süresi hariç)
+raporlar. İki tarafta da saat sabitlenir (clock=lambda: NOW ve
+status_tracker.datetime.now), böylece süre sınırındaki aboneler de
+deterministik olarak kontrol edilir.
+
+Kullanım:
+    python benchmarks/status_machine.py
+    python benchmarks/status_machine.py --fleet 1000000 --seed 7
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+import numpy as np  # noqa: E402
+
+from fleet_snapshot import STATUSES, STATUS_CODES  # noqa: E402
+import status_tracker  # noqa: E402
+from status_machine import StatusMachine, TRANSITION_TYPES, MIN_STATUS_DURATION_MINUTES  # noqa: E402
+
+FIRST_SUBSCRIBER_ID = 1001
+NOW = 1_700_000_000.0
+EPOCH = datetime(1970, 1, 1)
+
+
+def as_datetime(ts: float) -> datetime:
+    """Epoch saniye -> naive datetime (yerel saat dilimi / DST kayması olmadan)"""
+    return EPOCH + timedelta(seconds=ts)
+
+
+class PinnedDatetime(datetime):
+    """status_tracker'daki datetime.now() çağrıları için sabit saat"""
+
+    @classmethod
+    def now(cls, tz=None):
+        return as_datetime(NOW)
+
+
+class FleetCursor:
+    """StatusTracker sorgularını filo dizilerinden cevaplar; yazma sorguları yok sayılır"""
+
+    def __init__(self, fleet: dict):
+        self.fleet = fleet
+        self.row = None
+
+    def execute(self, query, params=None):
+        self.row = None
+        if not query.lstrip().startswith("SELECT"):
+            return
+        current, changed_at = self.fleet[params[0]]
+        if "current_status, previous_status" in query:
+            self.row = (current, None)
+        elif "status_changed_at" in query:
+            self.row = (changed_at,)
+
+    def fetchone(self):
+        return self.row
+
+
+class FleetConnection:
+    def __init__(self, fleet: dict):
+        self.fleet = fleet
+
+    def cursor(self):
+        return FleetCursor(self.fleet)
+
+    def commit(self):
+        pass
+
+
+def tracker_decide(tracker, subscriber_id: int, new: str) -> tuple:
+    """main.py'deki sırayla: önce should_allow_status_change, izin varsa update_status"""
+    if not tracker.should_allow_status_change(subscriber_id, new)["allowed"]:
+        return False, False, "none"
+    result = tracker.update_status(subscriber_id, new)
+    return True, result["should_send_sms"], result["transition_type"]
+
+
+def build_fleet(fleet_size: int, seed: int):
+    random.seed(seed)
+    ids, current, changed_at, proposed = [], [], [], []
+    for i in range(fleet_size):
+        ids.append(FIRST_SUBSCRIBER_ID + i)
+        current.append(random.choices(STATUSES, weights=(90, 7, 3))[0])
+        roll = random.random()
+        if roll < 0.05:
+            changed_at.append(None)
+        elif roll < 0.10:
+            # Tam sınırda: min süre tam dolmuş
+            changed_at.append(NOW - MIN_STATUS_DURATION_MINUTES.get(current[-1], 0) * 60)
+        else:
+            changed_at.append(NOW - random.uniform(0, 3 * 3600))
+        proposed.append(random.choices(STATUSES, weights=(80, 12, 8))[0])
+    return ids, current, changed_at, proposed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NetPulse status machine benchmark")
+    parser.add_argument("--fleet", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"🧪 {args.fleet:,} abone simüle ediliyor...")
+    ids, current, changed_at, proposed = build_fleet(args.fleet, args.seed)
+
+    fleet = {
+        sid: (status, as_datetime(ts) if ts is not None else None)
+        for sid, status, ts in zip(ids, current, changed_at)
+    }
+    tracker = status_tracker.StatusTracker(FleetConnection(fleet))
+    status_tracker.datetime = PinnedDatetime
+    started = time.perf_counter()
+    expected = [tracker_decide(tracker, sid, new) for sid, new in zip(ids, proposed)]
+    scalar_elapsed = time.perf_counter() - started
+
+    # Sıralama kontrolü için filo ters sırayla yüklenir
+    machine = StatusMachine(clock=lambda: NOW)
+    machine.load(ids[::-1], current[::-1], changed_at[::-1])
+    id_array = np.asarray(ids, dtype=np.int64)
+    proposed_codes = np.asarray([STATUS_CODES[s] for s in proposed], dtype=np.int8)
+    started = time.perf_counter()
+    batch = machine.evaluate(id_array, proposed_codes)
+    vector_elapsed = time.perf_counter() - started
+
+    actual = zip(batch.allowed.tolist(), batch.send_sms.tolist(), batch.transition_type.tolist())
+    mismatches = sum(1 for exp, (a, s, t) in zip(expected, actual) if exp != (a, s, TRANSITION_TYPES[t]))
+
+    machine.commit(batch)
+    replay = machine.evaluate(ids, proposed)
+    stale = int(replay.changed.sum())
+
+    blocked = int((~batch.allowed).sum())
+    print("\n" + "=" * 56)
+    print(f"{'Durum değiştiren':<36}{int(batch.changed.sum()):>10,}")
+    print(f"{'Süre kuralıyla engellenen':<36}{blocked:>10,}")
+    print(f"{'SMS tetikleyen':<36}{int(batch.send_sms.sum()):>10,}")
+    print(f"{'StatusTracker (abone başına)':<36}{scalar_elapsed / len(ids) * 1e9:>10,.0f} ns")
+    print(f"{'Vektörel (abone başına)':<36}{vector_elapsed / len(ids) * 1e9:>10,.0f} ns")
+    print(f"{'Hızlanma':<36}{scalar_elapsed / max(vector_elapsed, 1e-9):>10.1f}x")
+    print(f"{'Kural uyuşmazlığı':<36}{mismatches:>10,}")
+    print(f"{'Commit sonrası tekrar değişen':<36}{stale:>10,}")
+    print("=" * 56)
+    if mismatches or stale:
+        print("⚠️ StatusMachine, StatusTracker kurallarından farklı karar verdi")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
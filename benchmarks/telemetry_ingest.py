@@ -0,0 +1,177 @@
+"""
+NetPulse - Telemetry Ingestion Throughput
+
+telemetry.ingest_batch'i (decode -> kolon bazlı doğrulama -> LSTM penceresine
+toplu ekleme -> rescoring kuyruğu) süreç içinde, HTTP katmanı olmadan ölçer.
+Her format (json / msgpack / arrow) için okuma/sn raporlanır; hedef tek node'da
+en az 100.000 okuma/sn'dir. msgpack veya pyarrow kurulu değilse o format atlanır.
+
+--url verilirse aynı payload'lar çalışan bir backend'in POST /api/telemetry/batch
+endpoint'ine de gönderilir (uçtan uca, embedded scoring modu gerekir).
+
+Kullanım:
+    python benchmarks/telemetry_ingest.py
+    python benchmarks/telemetry_ingest.py --fleet 100000 --batch 20000 --batches 20
+    python benchmarks/telemetry_ingest.py --url http://localhost:8000 --json ingest.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+from lstm_service import LSTMPredictionService  # noqa: E402
+from telemetry import RescoreQueue, TelemetryError, ingest_batch  # noqa: E402
+
+FIRST_SUBSCRIBER_ID = 1001
+TARGET_READINGS_PER_SECOND = 100_000
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "msgpack": "application/msgpack",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def make_columns(fleet_size: int, batch: int, rng: np.random.Generator) -> dict:
+    """Gerçekçi aralıklarda bir batch; %1 satır bilerek geçersiz (negatif latency)"""
+    columns = {
+        "subscriber_id": FIRST_SUBSCRIBER_ID + rng.integers(0, fleet_size, size=batch),
+        "ts": time.time() + np.sort(rng.uniform(0, 60, size=batch)),
+        "latency": rng.uniform(5, 400, size=batch),
+        "packet_loss": rng.uniform(0, 10, size=batch),
+        "jitter": rng.uniform(1, 50, size=batch),
+        "download_speed": rng.uniform(1, 1000, size=batch),
+        "upload_speed": rng.uniform(1, 100, size=batch),
+        "signal_strength": rng.uniform(-90, -30, size=batch),
+        "snr_margin_db": rng.uniform(5, 40, size=batch),
+    }
+    columns["latency"][rng.random(batch) < 0.01] = -1.0
+    return columns
+
+
+def encode(columns: dict, fmt: str):
+    """Payload byte'ları; format için gereken paket yoksa None"""
+    if fmt == "json":
+        return json.dumps({name: values.tolist() for name, values in columns.items()}).encode("utf-8")
+    if fmt == "msgpack":
+        try:
+            import msgpack
+        except ImportError:
+            return None
+        return msgpack.packb({name: values.tolist() for name, values in columns.items()})
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    table = pa.table(columns)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def build_service(fleet_size: int) -> LSTMPredictionService:
+    """Tüm filo için boş pencereler (ingest sadece izlenen aboneleri kabul eder)"""
+    service = LSTMPredictionService("", "", "", lazy=True)
+    service.measurement_cache = {
+        FIRST_SUBSCRIBER_ID + i: deque(maxlen=service.window_size) for i in range(fleet_size)
+    }
+    return service
+
+
+def bench_in_process(payloads: list, fmt: str, fleet_size: int) -> dict:
+    service = build_service(fleet_size)
+    queue = RescoreQueue()
+    readings = accepted = 0
+    started = time.perf_counter()
+    for body in payloads:
+        result = ingest_batch(body, CONTENT_TYPES[fmt], service, queue)
+        readings += result["received"]
+        accepted += result["accepted"]
+    elapsed = time.perf_counter() - started
+    return {
+        "readings": readings,
+        "accepted": accepted,
+        "seconds": round(elapsed, 3),
+        "readings_per_second": round(readings / elapsed) if elapsed else 0,
+        "payload_kb": round(sum(len(p) for p in payloads) / len(payloads) / 1024, 1)
+    }
+
+
+def bench_http(payloads: list, fmt: str, url: str) -> dict:
+    import requests
+
+    readings = 0
+    started = time.perf_counter()
+    with requests.Session() as session:
+        for body in payloads:
+            res = session.post(f"{url}/api/telemetry/batch", data=body, headers={"Content-Type": CONTENT_TYPES[fmt]})
+            res.raise_for_status()
+            readings += res.json()["received"]
+    elapsed = time.perf_counter() - started
+    return {"readings": readings, "seconds": round(elapsed, 3), "readings_per_second": round(readings / elapsed)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NetPulse telemetry ingestion throughput")
+    parser.add_argument("--fleet", type=int, default=100_000, help="İzlenen abone sayısı")
+    parser.add_argument("--batch", type=int, default=10_000, help="Batch başına okuma")
+    parser.add_argument("--batches", type=int, default=20, help="Format başına batch sayısı")
+    parser.add_argument("--formats", default="json,msgpack,arrow")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", help="Çalışan backend (uçtan uca ölçüm için)")
+    parser.add_argument("--json", help="Sonuçları JSON dosyasına yaz")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    batches = [make_columns(args.fleet, args.batch, rng) for _ in range(args.batches)]
+
+    results = {}
+    print(f"📦 {args.batches} x {args.batch:,} okuma, {args.fleet:,} abone")
+    print("\n" + "=" * 78)
+    print(f"{'Format':<10}{'Mod':<12}{'Okuma/sn':>14}{'Süre (sn)':>12}{'Kabul':>12}{'Payload KB':>14}")
+    print("=" * 78)
+    for fmt in args.formats.split(","):
+        payloads = [encode(columns, fmt) for columns in batches]
+        if payloads[0] is None:
+            print(f"{fmt:<10}{'-':<12}{'paket yok, atlandı':>14}")
+            continue
+
+        try:
+            result = bench_in_process(payloads, fmt, args.fleet)
+        except TelemetryError as e:
+            print(f"{fmt:<10}❌ {e}")
+            continue
+        results[fmt] = {"in_process": result}
+        mark = "✅" if result["readings_per_second"] >= TARGET_READINGS_PER_SECOND else "⚠️"
+        print(
+            f"{fmt:<10}{'süreç içi':<12}{result['readings_per_second']:>14,}{result['seconds']:>12.2f}"
+            f"{result['accepted']:>12,}{result['payload_kb']:>14,.0f}  {mark}"
+        )
+
+        if args.url:
+            http = bench_http(payloads, fmt, args.url.rstrip("/"))
+            results[fmt]["http"] = http
+            print(f"{fmt:<10}{'http':<12}{http['readings_per_second']:>14,}{http['seconds']:>12.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "started_at": datetime.now().isoformat(),
+                "fleet": args.fleet,
+                "batch": args.batch,
+                "results": results
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Sonuçlar kaydedildi: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
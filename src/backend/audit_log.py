@@ -0,0 +1,302 @@
+"""
+Audit Log Writer
+action_log olaylarını bellekte biriktirip COPY ile toplu yazar
+"""
+import csv
+import io
+import logging
+import threading
+from collections import deque
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ACTION_LOG_COLUMNS = ("subscriber_id", "action_type", "new_status", "note", "timestamp")
+
+
+class AuditLogWriter:
+    """
+    Buffered action_log writer:
+    - Request transaction'ı içinde INSERT yapılmaz, olay buffer'a eklenir
+    - Buffer flush_interval saniyede bir veya max_batch dolunca COPY ile yazılır
+    - Aylık partition'lar gerektikçe oluşturulur, eski aylar retention ile düşürülür
+    - Aynı batch max_attempts kez üst üste yazılamazsa ikiye bölünerek yazılır;
+      tek başına da yazılamayan satır dead_letters'a alınır (kuyruğu kilitlemesin)
+
+    Başka partition'lı olay tabloları (ör. status_history.StatusHistoryWriter)
+    aşağıdaki sınıf alanlarını ve _partition_key / _write metodlarını değiştirerek
+    aynı buffer + flush + retention altyapısını kullanır. Satırların son
+    elemanı her zaman partition anahtarı olan zaman damgasıdır.
+    """
+
+    TABLE = "action_log"
+    COLUMNS = ACTION_LOG_COLUMNS
+    ENSURE_PARTITION_FN = "ensure_action_log_partition"
+    DROP_PARTITIONS_FN = "drop_action_log_partitions"
+    LABEL = "Audit"
+
+    def __init__(
+        self,
+        get_db_func,
+        flush_interval: float = 2.0,
+        max_batch: int = 500,
+        max_buffer: int = 50000,
+        retention_months: int = 12,
+        max_attempts: int = 3
+    ):
+        self.get_db = get_db_func
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_buffer = max_buffer
+        # Partition birimi cinsinden (action_log için ay)
+        self.retention = retention_months
+        self.max_attempts = max_attempts
+
+        self._buffer: List[Tuple] = []
+        self._lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Sadece commit edilmiş partition anahtarları
+        self._known_partitions = set()
+        self._failures = 0
+        self.dead_letters: deque = deque(maxlen=1000)
+        self.dead_lettered = 0
+        self._last_retention_run: Optional[datetime] = None
+        self.is_running = False
+
+    def log(self, subscriber_id: int, action_type: str, new_status: str, note: str,
+            timestamp: Optional[datetime] = None):
+        """Olayı buffer'a ekler (DB round-trip yok)"""
+        self._append((subscriber_id, action_type, new_status, note, timestamp or datetime.now()))
+
+    def _append(self, row: Tuple):
+        with self._lock:
+            self._buffer.append(row)
+            if len(self._buffer) > self.max_buffer:
+                # DB uzun süre erişilemezse bellek sınırsız büyümesin
+                dropped = len(self._buffer) - self.max_buffer
+                del self._buffer[:dropped]
+                logger.warning(f"⚠️ {self.LABEL} buffer dolu, en eski {dropped} olay atıldı")
+            buffered = len(self._buffer)
+
+        if buffered >= self.max_batch:
+            self._flush_requested.set()
+
+    def flush(self) -> int:
+        """Buffer'daki tüm olayları COPY ile yazar, yazılan satır sayısını döndürür"""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+
+        if not batch:
+            return 0
+
+        conn = self.get_db()
+        if not conn:
+            self._requeue(batch)
+            logger.error(f"{self.LABEL} flush: Database bağlantısı yok!")
+            return 0
+
+        isolating = self._failures >= self.max_attempts
+        try:
+            if isolating:
+                logger.warning(f"⚠️ {self.LABEL}: batch {self._failures} kez yazılamadı, bölünerek yazılıyor")
+                written = self._write_isolating(conn, batch)
+            else:
+                written = self._commit(conn, batch)
+            self._failures = 0
+            return written
+
+        except Exception as e:
+            self._failures += 1
+            if not isolating:
+                # _write_isolating yazılamayan kısmı kendisi geri koyar
+                self._requeue(batch)
+            logger.error(f"{self.LABEL} flush hatası: {e}")
+            return 0
+        finally:
+            conn.close()
+
+    def _commit(self, conn, batch: List[Tuple]) -> int:
+        """Partition'lar + yazım tek transaction; hata olursa rollback ve exception"""
+        try:
+            cursor = conn.cursor()
+            created = self._ensure_partitions(cursor, batch)
+            self._write(cursor, batch)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            # Rollback bu transaction'da oluşturulan partition'ları da geri alır
+            self._known_partitions -= {self._partition_key(row[-1]) for row in batch}
+            raise
+        self._known_partitions |= created
+        return len(batch)
+
+    def _write_isolating(self, conn, batch: List[Tuple]) -> int:
+        """
+        Batch'i ikiye bölerek yazar; tek satıra kadar inip yine yazılamayanı
+        dead-letter'a alır. Bağlantı koparsa yazılmamış kısım buffer'a döner.
+        """
+        written, stack = 0, [batch]
+        while stack:
+            part = stack.pop()
+            try:
+                written += self._commit(conn, part)
+            except Exception as e:
+                if not _connection_alive(conn):
+                    self._requeue(part + [row for rest in reversed(stack) for row in rest])
+                    raise
+                if len(part) > 1:
+                    middle = len(part) // 2
+                    stack += [part[middle:], part[:middle]]
+                else:
+                    self.dead_letters.append(part[0])
+                    self.dead_lettered += 1
+                    logger.error(f"❌ {self.LABEL} satırı yazılamadı, dead-letter'a alındı: {part[0]!r} ({e})")
+        return written
+
+    def _write(self, cursor, batch: List[Tuple]):
+        cursor.copy_expert(
+            f"COPY {self.TABLE} ({', '.join(self.COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            _csv_buffer(batch)
+        )
+
+    def _requeue(self, batch: List[Tuple]):
+        """Yazılamayan olayları buffer'ın başına geri koyar"""
+        with self._lock:
+            self._buffer[:0] = batch[-self.max_buffer:]
+
+    def _partition_key(self, ts: datetime) -> date:
+        """Zaman damgasının düştüğü partition'ın başlangıcı (ay)"""
+        return ts.date().replace(day=1)
+
+    def _next_partition_key(self) -> date:
+        return (datetime.now().replace(day=1) + timedelta(days=32)).date().replace(day=1)
+
+    def _ensure_partitions(self, cursor, batch: List[Tuple]) -> set:
+        """
+        Batch'teki partition'lar yoksa oluşturur; oluşturulan anahtarları döndürür.
+        Cache'e commit'ten sonra _commit ekler.
+        """
+        created = {self._partition_key(row[-1]) for row in batch} - self._known_partitions
+        for key in created:
+            cursor.execute(f"SELECT {self.ENSURE_PARTITION_FN}(%s)", (key,))
+        return created
+
+    def run_retention(self) -> int:
+        """Retention süresini aşan partition'ları düşürür, bir sonraki partition'ı hazırlar"""
+        conn = self.get_db()
+        if not conn:
+            return 0
+
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {self.ENSURE_PARTITION_FN}(%s)", (self._next_partition_key(),))
+            cursor.execute(f"SELECT {self.DROP_PARTITIONS_FN}(%s)", (self.retention,))
+            dropped = cursor.fetchone()[0]
+            conn.commit()
+
+            if dropped:
+                # Düşürülen partition'lar cache'te kalmasın (ensure idempotent, yeniden kontrol edilir)
+                self._known_partitions.clear()
+                logger.info(f"🗑️ {dropped} eski {self.TABLE} partition'ı silindi")
+            self._last_retention_run = datetime.now()
+            return dropped
+
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"{self.LABEL} retention hatası: {e}")
+            return 0
+        finally:
+            conn.close()
+
+    def _run(self):
+        while self.is_running:
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            self.flush()
+
+            if not self._last_retention_run or datetime.now() - self._last_retention_run > timedelta(days=1):
+                self.run_retention()
+
+    def start(self):
+        """Flush thread'ini başlat"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._thread = threading.Thread(target=self._run, name=f"{self.TABLE}-writer", daemon=True)
+        self._thread.start()
+        logger.info(f"📝 {self.LABEL} writer aktif")
+
+    def stop(self):
+        """Thread'i durdur ve kalan olayları yaz"""
+        self.is_running = False
+        self._flush_requested.set()
+        if self._thread:
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+        logger.info(f"⏹️  {self.LABEL} writer durduruldu")
+
+
+def _connection_alive(conn) -> bool:
+    """Hata satırdan mı bağlantıdan mı: bağlantı hâlâ sorgu çalıştırabiliyor mu"""
+    try:
+        conn.cursor().execute("SELECT 1")
+        conn.rollback()
+        return True
+    except Exception:
+        return False
+
+
+def _csv_buffer(batch: List[Tuple]) -> io.StringIO:
+    """Satırları COPY ... FORMAT csv için yazar (son eleman zaman damgası)"""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in batch:
+        writer.writerow((*row[:-1], row[-1].isoformat(sep=' ')))
+    buf.seek(0)
+    return buf
+
+
+def query_action_log(
+    conn,
+    start: datetime,
+    end: datetime,
+    subscriber_id: Optional[int] = None,
+    action_type: Optional[str] = None,
+    limit: int = 200
+) -> List[dict]:
+    """
+    [start, end) aralığındaki olayları getirir.
+    timestamp aralığı partition pruning'i tetikler; sadece ilgili aylar okunur.
+    """
+    conditions = ["timestamp >= %s", "timestamp < %s"]
+    params = [start, end]
+
+    if subscriber_id is not None:
+        conditions.append("subscriber_id = %s")
+        params.append(subscriber_id)
+    if action_type:
+        conditions.append("action_type = %s")
+        params.append(action_type)
+
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT id, subscriber_id, action_type, new_status, note, timestamp
+        FROM action_log
+        WHERE {" AND ".join(conditions)}
+        ORDER BY timestamp DESC
+        LIMIT %s
+    """, (*params, limit))
+
+    return [
+        {
+            "id": row[0],
+            "subscriber_id": row[1],
+            "action_type": row[2],
+            "new_status": row[3],
+            "note": row[4],
+            "timestamp": row[5].isoformat()
+        }
+        for row in cursor.fetchall()
+    ]
@@ -4,32 +4,73 @@ Otomatik periyodik ölçüm ve LSTM cache yönetimi
 """
 import asyncio
 import logging
-from typing import List
+import time
+from typing import Dict, List
 import random
 
+import metrics
+from monitor_scheduler import MonitorScheduler, SchedulerConfig
+from scoring import lstm_measurement
+
 logger = logging.getLogger(__name__)
 
+# Zamanlayıcının abone listesi + öncelik bayrakları (VIP, açık ticket sayısı)
+SUBSCRIBERS_SQL = """
+    SELECT c.subscriber_id, c.subscription_plan, c.region_id, c.is_vip,
+           COUNT(t.ticket_id) FILTER (WHERE t.status NOT IN ('RESOLVED', 'CLOSED'))
+    FROM customers c
+    LEFT JOIN tickets t ON t.subscriber_id = c.subscriber_id
+    GROUP BY c.subscriber_id
+    ORDER BY c.subscriber_id
+"""
+
 class BackgroundMonitor:
     """
     Profesyonel background monitoring servisi:
     - Startup'ta tüm aboneler için initial cache doldurur
-    - Her 5 dakikada periyodik ölçüm yapar
+    - Risk öncelikli zamanlayıcı ile sürekli ölçüm yapar (riskli: 1 dk, stabil: 15 dk)
     - LSTM için sürekli veri akışı sağlar
     """
     
-    def __init__(self, get_db_func, lstm_service, simulate_func):
+    def __init__(self, get_db_func, lstm_service, simulate_func, on_sweep=None,
+                 scheduler_config: SchedulerConfig = None, notify_interval: float = 300,
+                 sync_interval: float = 300):
         self.get_db = get_db_func
         self.lstm_service = lstm_service
         self.simulate_metrics = simulate_func
+        # notify_interval saniyede bir çağrılır (ör. fleet snapshot rebuild); ayrı thread'de çalışır
+        self.on_sweep = on_sweep
         self.is_running = False
-        self.monitored_subscribers = []
+        self.scheduler = MonitorScheduler(scheduler_config)
+        self.notify_interval = notify_interval
+        # Abone listesi, VIP ve açık ticket bayrakları bu aralıkla yenilenir
+        self.sync_interval = sync_interval
+        # Bölgesel arıza simülasyonu: bölge -> bitiş zamanı (monotonic)
+        self.faulty_regions: Dict[str, float] = {}
+        
+        # /health ve /ready için warm-up ilerlemesi
+        self.cache_ready = False
+        self.cache_progress = {"done": 0, "total": 0}
     
     async def initialize_cache(self):
         """
         Başlangıçta TÜM aboneler için 12 ölçüm oluştur
         LSTM hemen aktif olsun - Profesyonel sistem!
+        Ağır döngü ayrı thread'de çalışır; event loop (API istekleri) bloklanmaz.
         """
-        logger.info("🔧 LSTM Cache initialization başlatıldı (500 abone)...")
+        with metrics.timer(metrics.MONITOR_SWEEP_SECONDS, phase="initial_cache"):
+            await asyncio.to_thread(self._build_initial_cache)
+        await self._notify_sweep()
+    
+    async def _notify_sweep(self):
+        if self.on_sweep:
+            try:
+                await asyncio.to_thread(self.on_sweep)
+            except Exception as e:
+                logger.error(f"on_sweep hatası: {e}")
+    
+    def _build_initial_cache(self):
+        logger.info("🔧 LSTM Cache initialization başlatıldı...")
         
         conn = self.get_db()
         if not conn:
@@ -38,22 +79,23 @@ class BackgroundMonitor:
         
         try:
             cursor = conn.cursor()
-            # TÜM 500 aboneyi al
-            cursor.execute("SELECT subscriber_id, subscription_plan, region_id FROM customers ORDER BY subscriber_id")
+            # TÜM aboneleri al (zamanlayıcı için VIP / açık ticket bilgisiyle)
+            cursor.execute(SUBSCRIBERS_SQL)
             subscribers = cursor.fetchall()
             conn.close()
             
+            self.cache_progress = {"done": 0, "total": len(subscribers)}
             logger.info(f"📊 {len(subscribers)} abone için cache oluşturuluyor...")
             
             # Bölgesel arıza simülasyonu için
             # %5 ihtimalle bir bölgede toplu sorun olsun
             faulty_regions = set()
             all_regions = list(set([sub[2] for sub in subscribers]))
-            if random.random() < 0.05:
+            if all_regions and random.random() < 0.05:
                 faulty_regions.add(random.choice(all_regions))
                 logger.info(f"⚠️ Simülasyon: {list(faulty_regions)[0]} bölgesinde arıza")
             
-            for sub_id, plan, region in subscribers:
+            for sub_id, plan, region, _, _ in subscribers:
                 # Bölgesel arıza varsa %70 ihtimalle etkilenir
                 regional_fault = region in faulty_regions and random.random() < 0.7
                 
@@ -62,61 +104,107 @@ class BackgroundMonitor:
                     # İlk ölçümlerde arıza yok, sonraki ölçümlerde gelişsin (gerçekçi)
                     force_trouble = regional_fault and i >= 6
                     
-                    metrics, _, _ = self.simulate_metrics(plan, force_trouble=force_trouble)
+                    live, _, _ = self.simulate_metrics(plan, force_trouble=force_trouble)
                     
                     if self.lstm_service and self.lstm_service.is_available:
-                        self.lstm_service.add_measurement(sub_id, metrics)
+                        self.lstm_service.add_measurement(sub_id, lstm_measurement(live))
                 
-                self.monitored_subscribers.append((sub_id, plan, region))
+                self.cache_progress["done"] += 1
             
+            self.scheduler.sync(subscribers, time.monotonic())
+            self.cache_ready = True
             logger.info(f"✅ {len(subscribers)} abone için LSTM cache hazır!")
             logger.info(f"📈 Toplam cache boyutu: {len(subscribers) * 12} ölçüm")
             
         except Exception as e:
             logger.error(f"Cache initialization hatası: {e}")
     
+    def _sync_subscribers(self):
+        """Yeni/silinen aboneleri ve VIP / açık ticket bayraklarını zamanlayıcıya yansıtır"""
+        conn = self.get_db()
+        if not conn:
+            logger.error("Database bağlantısı yok!")
+            return
+        try:
+            cursor = conn.cursor()
+            cursor.execute(SUBSCRIBERS_SQL)
+            self.scheduler.sync(cursor.fetchall(), time.monotonic())
+        finally:
+            conn.close()
+    
+    def _measure_batch(self, batch: List[int], now: float) -> int:
+        """Vakti gelen aboneleri ölçer ve yeniden planlar; sorunlu ölçüm sayısını döndürür"""
+        # Bölgesel arıza simülasyonu: 5 dakikada ~%3 ihtimal, 5 dakika sürer
+        for region in [r for r, ends_at in self.faulty_regions.items() if ends_at <= now]:
+            del self.faulty_regions[region]
+        if random.random() < 0.03 * self.scheduler.config.tick_seconds / 300:
+            regions = list({info.region for info in self.scheduler.subscribers.values()})
+            if regions:
+                region = random.choice(regions)
+                self.faulty_regions[region] = now + 300
+                logger.warning(f"⚠️ Bölgesel arıza simüle ediliyor: {region}")
+        
+        problem_count = 0
+        min_interval = self.scheduler.config.min_interval
+        for sub_id in batch:
+            info = self.scheduler.subscribers[sub_id]
+            if info.region in self.faulty_regions:
+                force_trouble = random.random() < 0.6  # %60 etkilenir
+            else:
+                # Normal durum: %5 bireysel arıza ihtimali
+                force_trouble = random.random() < 0.05
+            
+            if force_trouble:
+                problem_count += 1
+            
+            live, _, _ = self.simulate_metrics(info.plan, force_trouble=force_trouble)
+            
+            if self.lstm_service and self.lstm_service.is_available:
+                self.lstm_service.add_measurement(sub_id, lstm_measurement(live))
+            
+            interval = self.scheduler.reschedule(sub_id, live, now)
+            metrics.MONITOR_MEASUREMENTS.inc(cadence="high" if interval <= min_interval else "normal")
+        
+        return problem_count
+    
     async def periodic_monitoring(self):
         """
-        Her 5 dakikada bir TÜM 500 aboneyi tara
-        Gerçekçi dinamik varyasyon ile
+        Risk öncelikli sürekli izleme (monitor_scheduler.py):
+        her tick'te vakti gelen aboneler ölçüm bütçesi dahilinde ölçülür.
         """
-        logger.info("🔄 Periyodik monitoring başlatıldı (5 dakika interval)")
+        config = self.scheduler.config
+        logger.info(
+            f"🔄 Adaptif monitoring başlatıldı ({config.min_interval:.0f}-{config.max_interval:.0f} sn, "
+            f"bütçe {config.budget_per_second:.0f} ölçüm/sn)"
+        )
+        
+        last_sync = last_notify = time.monotonic()
+        measured = problems = 0
         
         while self.is_running:
             try:
-                await asyncio.sleep(300)  # 5 dakika = 300 saniye
+                await asyncio.sleep(config.tick_seconds)
+                now = time.monotonic()
                 
-                logger.info("📡 Periyodik ölçüm yapılıyor (500 abone)...")
+                if now - last_sync >= self.sync_interval:
+                    await asyncio.to_thread(self._sync_subscribers)
+                    last_sync = now
                 
-                # Bölgesel arıza simülasyonu
-                # Her döngüde %3 ihtimalle bir bölgede sorun çıksın
-                faulty_regions = set()
-                if self.monitored_subscribers:
-                    all_regions = list(set([region for _, _, region in self.monitored_subscribers]))
-                    if random.random() < 0.03:
-                        faulty_regions.add(random.choice(all_regions))
-                        logger.warning(f"⚠️ Bölgesel arıza simüle ediliyor: {list(faulty_regions)[0]}")
+                # Lag: bütçe yetmediği için bekleyen en eski abonenin gecikmesi
+                batch, lag = self.scheduler.due(now)
+                metrics.MONITOR_LAG_SECONDS.set(lag)
                 
-                problem_count = 0
-                
-                for sub_id, plan, region in self.monitored_subscribers:
-                    # Bölgesel arıza
-                    if region in faulty_regions:
-                        force_trouble = random.random() < 0.6  # %60 etkilenir
-                    else:
-                        # Normal durum: %5 bireysel arıza ihtimali
-                        force_trouble = random.random() < 0.05
-                    
-                    if force_trouble:
-                        problem_count += 1
-                    
-                    metrics, _, _ = self.simulate_metrics(plan, force_trouble=force_trouble)
-                    
-                    if self.lstm_service and self.lstm_service.is_available:
-                        self.lstm_service.add_measurement(sub_id, metrics)
+                if batch:
+                    problems += await asyncio.to_thread(self._measure_batch, batch, now)
+                    measured += len(batch)
+                    metrics.MONITOR_SWEEP_SECONDS.observe(time.monotonic() - now, phase="tick")
+                    metrics.MONITOR_LAST_SWEEP.set(time.time())
                 
-                logger.info(f"✅ {len(self.monitored_subscribers)} abone ölçümü tamamlandı")
-                logger.info(f"📊 {problem_count} abone sorunlu durumdaydı")
+                if now - last_notify >= self.notify_interval:
+                    logger.info(f"✅ Son {now - last_notify:.0f} sn: {measured} ölçüm, {problems} sorunlu (gecikme {lag:.0f} sn)")
+                    measured = problems = 0
+                    last_notify = now
+                    await self._notify_sweep()
                 
             except Exception as e:
                 logger.error(f"Monitoring hatası: {e}")
@@ -0,0 +1,127 @@
+"""
+Cascade Gate
+İki aşamalı skorlamanın ilk aşaması: son ölçüm ve LSTM penceresi üzerinde
+vektörel eşik + z-score kontrolü. "Açıkça stabil" aboneler RF / LSTM'e
+gönderilmez (GREEN, risk 0); sadece belirsiz veya kötüleşen aboneler batch
+inference'a gider.
+
+Eşikler classify_subscriber_status'takilerden (latency > 80, jitter > 30,
+packet_loss > 5, download_speed < 5) bilerek daha sıkıdır; gate sadece
+kesin durumları eler. Audit modunda (audit_rate > 0) elenen abonelerin bir
+örneği yine de modellerle skorlanır ve gate'in kaçırdığı durumlar sayılır.
+
+Eşikler NETPULSE_GATE_<ALAN> ortam değişkenleriyle ayarlanır
+(ör. NETPULSE_GATE_MAX_LATENCY=40, NETPULSE_GATE_AUDIT_RATE=0.02).
+"""
+import logging
+import os
+from collections import deque
+from dataclasses import dataclass, fields
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class GateConfig:
+    enabled: bool = True
+    max_latency: float = 50.0
+    max_packet_loss: float = 1.0
+    max_jitter: float = 15.0
+    min_download_speed: float = 10.0
+    # Son ölçümün pencerenin geri kalanına göre z-score'u (latency ve packet loss)
+    max_z_score: float = 2.5
+    # Pencere kompozit riskinin (analyze_trend formülü) window_risk_percentile
+    # yüzdeliği bu değeri geçmemeli. Maksimum yerine yüzdelik: simüle filoda
+    # ölçümlerin ~%20'si tekil arıza, 12 adımlık pencerelerin sadece ~%7'si
+    # tamamen temiz; max ile sağlıklı pencerelerin ~%80'i reddediliyordu.
+    # Medyan: pencerenin yarısından fazlasını süren bozulma modele gider.
+    max_window_risk: float = 0.3
+    window_risk_percentile: float = 50.0
+    # Elenen abonelerin modellerle yine de skorlanan oranı (recall denetimi)
+    audit_rate: float = 0.0
+
+    @classmethod
+    def from_env(cls) -> "GateConfig":
+        values = {}
+        for field in fields(cls):
+            raw = os.getenv(f"NETPULSE_GATE_{field.name.upper()}")
+            if raw is None:
+                continue
+            values[field.name] = raw.lower() in ("1", "true", "yes") if field.type is bool else float(raw)
+        return cls(**values)
+
+
+class CascadeGate:
+    def __init__(self, config: GateConfig = None, seed: int = None):
+        self.config = config or GateConfig()
+        self._rng = np.random.default_rng(seed)
+
+    def split(self, subscriber_ids: List[int], live: Dict[int, dict], cache: Dict[int, deque],
+              window_size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns:
+            (stable, audit) bool dizileri; stable = modele gönderilmeyecek,
+            audit = stable olduğu halde denetim için skorlanacak
+        """
+        n = len(subscriber_ids)
+        stable = np.zeros(n, dtype=bool)
+        audit = np.zeros(n, dtype=bool)
+        if not self.config.enabled or n == 0:
+            metrics.CASCADE_DECISIONS.inc(n, decision="scored")
+            return stable, audit
+
+        cfg = self.config
+        latest = np.array(
+            [(m["latency"], m["packet_loss"], m["jitter"], m["download_speed"]) for m in (live[sid] for sid in subscriber_ids)],
+            dtype=np.float64
+        )
+        stable = (
+            (latest[:, 0] <= cfg.max_latency)
+            & (latest[:, 1] <= cfg.max_packet_loss)
+            & (latest[:, 2] <= cfg.max_jitter)
+            & (latest[:, 3] >= cfg.min_download_speed)
+        )
+
+        # Penceresi dolu olmayanlar belirsiz sayılır
+        full = np.array([len(cache.get(sid, ())) == window_size for sid in subscriber_ids], dtype=bool)
+        stable &= full
+
+        candidates = np.flatnonzero(stable)
+        if len(candidates):
+            windows = np.array([list(cache[subscriber_ids[i]]) for i in candidates], dtype=np.float64)
+            stable[candidates] = self._window_stable(windows)
+
+        if cfg.audit_rate > 0:
+            audit = stable & (self._rng.random(n) < cfg.audit_rate)
+
+        gated = int(stable.sum())
+        metrics.CASCADE_DECISIONS.inc(gated - int(audit.sum()), decision="gated")
+        metrics.CASCADE_DECISIONS.inc(int(audit.sum()), decision="audited")
+        metrics.CASCADE_DECISIONS.inc(n - gated, decision="scored")
+        return stable, audit
+
+    def _window_stable(self, windows: np.ndarray) -> np.ndarray:
+        """windows: (n, window_size, 4) [latency_ms, packet_loss_ratio, snr_margin_db, download_usage_mbps]"""
+        latency, packet_loss, snr = windows[..., 0], windows[..., 1], windows[..., 2]
+
+        risk = np.minimum(1.0, latency / 200.0 + packet_loss / 10.0 + np.maximum(0.0, (10 - snr) / 10.0))
+        calm = np.percentile(risk, self.config.window_risk_percentile, axis=1) <= self.config.max_window_risk
+
+        # Son ölçüm önceki ölçümlere göre sıçradıysa (kötüleşme başlangıcı) modele gönder
+        history = windows[:, :-1, :2]
+        z = (windows[:, -1, :2] - history.mean(axis=1)) / np.maximum(history.std(axis=1), 1.0)
+        steady = (z <= self.config.max_z_score).all(axis=1)
+        return calm & steady
+
+    def record_audit(self, subscriber_id: int, segment: str):
+        """Audit edilen abone için model sonucu; GREEN değilse gate kaçırmış demektir"""
+        if segment == "GREEN":
+            metrics.CASCADE_AUDIT.inc(result="agree")
+        else:
+            metrics.CASCADE_AUDIT.inc(result="miss")
+            logger.warning(f"⚠️ Cascade gate kaçırdı: {subscriber_id} stabil sanıldı, model {segment} dedi")
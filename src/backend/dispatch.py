@@ -0,0 +1,362 @@
+"""
+Technician Dispatch
+Açık ticket'ları teknisyenlere toplu olarak atar.
+
+Her turda atama bekleyen tüm ticket'lar (status CREATED, technician_id NULL)
+tek seferde çözülür:
+- maliyet matrisi (ticket × teknisyen) vektörel: haversine yol mesafesi
+  + yetenek uyuşmazlığı cezası - öncelik / bekleme süresi ödülü
+- her teknisyen kalan kapasitesi kadar "slot"a açılır; k. slot için küçük
+  bir ek maliyet yükü dengeler
+- scipy varsa linear_sum_assignment (Hungarian / LAPJV), yoksa öncelik
+  sırasıyla vektörel greedy
+- büyük turlar (binlerce ticket) teknisyen konumlarına göre kümelere bölünür;
+  kümeler bağımsız çözülür, artakalan slot / ticket'lar son bir turda eşlenir
+
+Artımlı: kabul edilmiş / atanmış ticket'lar sabit kalır ve teknisyen
+kapasitesinden düşülür; yeni gelen ticket'lar sadece kalan slotlara çözülür.
+rebalance=True henüz kabul edilmemiş (CREATED) tüm atamaları birlikte yeniden
+çözer. Ağırlıklar NETPULSE_DISPATCH_<ALAN> ortam değişkenleriyle ayarlanır.
+"""
+import importlib.util
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass, fields
+from typing import List, Tuple
+
+import numpy as np
+
+import metrics
+from geo import REGION_COORDS, DEFAULT_COORDS
+
+SCIPY_AVAILABLE = importlib.util.find_spec("scipy") is not None
+
+logger = logging.getLogger(__name__)
+
+FAULT_TYPES = ("INFRASTRUCTURE", "CPE", "NETWORK")
+FAULT_CODES = {fault: code for code, fault in enumerate(FAULT_TYPES)}
+DEFAULT_ASSIGNEE = "Teknisyen Ekibi"
+EARTH_RADIUS_KM = 6371.0
+FORBIDDEN = 1e9
+# Aynı anda tek dispatch turu (birden fazla API süreci olabilir)
+DISPATCH_LOCK_KEY = 470047
+
+
+@dataclass
+class DispatchConfig:
+    km_cost: float = 1.0
+    # Yetenek uyuşmazlığı ~ bu kadar km yol kadar kötü
+    skill_penalty: float = 50.0
+    # priority_rank (HIGH=3 ... LOW=1) başına ödül
+    priority_weight: float = 40.0
+    # Bekleme saati başına ödül (en fazla age_cap_hours)
+    age_weight: float = 2.0
+    age_cap_hours: float = 48.0
+    # Teknisyenin k. yeni işi için k * slot_penalty ek maliyet
+    slot_penalty: float = 5.0
+    # Bundan uzak eşleşmeler yapılmaz
+    max_km: float = 60.0
+    # Büyük turlar teknisyen kümelerine (en fazla bu kadar teknisyen) bölünerek çözülür
+    cluster_size: int = 25
+    # ticket × slot bu boyutun altındaysa tek parça çözülür
+    direct_cells: int = 250_000
+
+    @classmethod
+    def from_env(cls) -> "DispatchConfig":
+        values = {}
+        for f in fields(cls):
+            raw = os.getenv(f"NETPULSE_DISPATCH_{f.name.upper()}")
+            if raw is not None:
+                values[f.name] = int(raw) if f.type is int else float(raw)
+        return cls(**values)
+
+
+@dataclass
+class TechnicianPool:
+    ids: np.ndarray        # int64
+    names: List[str]
+    lat: np.ndarray        # float64
+    lon: np.ndarray
+    skills: np.ndarray     # bool (teknisyen × FAULT_TYPES)
+    free: np.ndarray       # int64, kalan kapasite
+
+
+@dataclass
+class OpenTickets:
+    ids: np.ndarray        # int64
+    lat: np.ndarray
+    lon: np.ndarray
+    fault: np.ndarray      # int64, FAULT_CODES (-1 = bilinmiyor)
+    priority: np.ndarray   # priority_rank
+    age_hours: np.ndarray
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def cost_matrix(tickets: OpenTickets, techs: TechnicianPool, config: DispatchConfig) -> np.ndarray:
+    """(ticket × teknisyen) maliyet; yasak eşleşmeler FORBIDDEN"""
+    distance = haversine_km(tickets.lat[:, None], tickets.lon[:, None], techs.lat[None, :], techs.lon[None, :])
+
+    # Bilinmeyen fault_type: her teknisyen uygun sayılır
+    known = tickets.fault >= 0
+    skilled = np.ones((len(tickets.ids), len(techs.ids)), dtype=bool)
+    skilled[known] = techs.skills[:, tickets.fault[known]].T
+
+    reward = config.priority_weight * tickets.priority + config.age_weight * np.minimum(tickets.age_hours, config.age_cap_hours)
+    cost = config.km_cost * distance + config.skill_penalty * ~skilled - reward[:, None]
+    cost[distance > config.max_km] = FORBIDDEN
+    return cost
+
+
+def solve(tickets: OpenTickets, techs: TechnicianPool, config: DispatchConfig = None) -> Tuple[np.ndarray, np.ndarray, str]:
+    """
+    Returns: (ticket indeksleri, teknisyen indeksleri, solver adı)
+    Kapasite yetmezse düşük öncelikli / uzak ticket'lar atanmadan kalır.
+    """
+    config = config or DispatchConfig()
+    n_tickets = len(tickets.ids)
+    empty = np.zeros(0, dtype=np.int64)
+    if not n_tickets or not len(techs.ids) or techs.free.sum() <= 0:
+        return empty, empty, "none"
+
+    # Kapasiteden fazla ticket varsa sadece en acil 2×slot kadarı yarışır (matris küçük kalır)
+    total_slots = int(techs.free.sum())
+    rows = np.arange(n_tickets)
+    if n_tickets > 2 * total_slots:
+        urgency = tickets.priority * 1000.0 + np.minimum(tickets.age_hours, config.age_cap_hours)
+        rows = np.sort(np.argpartition(-urgency, 2 * total_slots)[:2 * total_slots])
+
+    # Teknisyen başına slot: kalan kapasite, ama ticket sayısına göre üstten sınırlı
+    per_tech = np.minimum(techs.free, max(1, math.ceil(2 * len(rows) / max(1, int((techs.free > 0).sum())))))
+    owner = np.repeat(np.arange(len(techs.ids)), per_tech)
+    rank = np.arange(len(owner)) - np.repeat(np.cumsum(per_tech) - per_tech, per_tech)
+    base = cost_matrix(_subset(tickets, rows), techs, config)
+
+    if not SCIPY_AVAILABLE:
+        row_idx, slot_idx = _greedy(base[:, owner] + config.slot_penalty * rank[None, :], tickets.priority[rows])
+        return rows[row_idx], owner[slot_idx], "greedy"
+
+    if len(rows) * len(owner) <= config.direct_cells:
+        row_idx, slot_idx = _assign(base, owner, rank, np.arange(len(rows)), np.arange(len(owner)), config)
+        return rows[row_idx], owner[slot_idx], "lsa"
+
+    # Kümelere böl: her ticket en ucuz teknisyeninin kümesinde, kümeler bağımsız çözülür;
+    # boşta kalan slotlar ve atanamayan ticket'lar son bir turda birlikte çözülür
+    cluster = _tech_clusters(techs, config.cluster_size)
+    home = cluster[np.argmin(base, axis=1)]
+    slot_cluster = cluster[owner]
+    row_parts, slot_parts = [], []
+    for group in np.unique(home).tolist():
+        r, c = _assign(base, owner, rank, np.flatnonzero(home == group), np.flatnonzero(slot_cluster == group), config)
+        row_parts.append(r)
+        slot_parts.append(c)
+
+    used_rows = np.concatenate(row_parts)
+    used_slots = np.concatenate(slot_parts)
+    free_rows = np.setdiff1d(np.arange(len(rows)), used_rows)
+    free_slots = np.setdiff1d(np.arange(len(owner)), used_slots)
+    r, c = _assign(base, owner, rank, free_rows, free_slots, config)
+
+    row_idx = np.concatenate([used_rows, r])
+    slot_idx = np.concatenate([used_slots, c])
+    return rows[row_idx], owner[slot_idx], "lsa-clustered"
+
+
+def _assign(base: np.ndarray, owner: np.ndarray, rank: np.ndarray, row_ids: np.ndarray, slot_ids: np.ndarray,
+            config: DispatchConfig) -> Tuple[np.ndarray, np.ndarray]:
+    """base[row_ids] × slot_ids alt problemi için linear assignment; yasak eşleşmeler atılır"""
+    if not len(row_ids) or not len(slot_ids):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    from scipy.optimize import linear_sum_assignment
+
+    cost = base[np.ix_(row_ids, owner[slot_ids])] + config.slot_penalty * rank[slot_ids][None, :]
+    r, c = linear_sum_assignment(cost)
+    valid = cost[r, c] < FORBIDDEN / 2
+    return row_ids[r[valid]], slot_ids[c[valid]]
+
+
+def _tech_clusters(techs: TechnicianPool, max_size: int) -> np.ndarray:
+    """Teknisyen konumlarını medyandan (geniş eksen boyunca) böle böle en fazla max_size'lık kümeler"""
+    labels = np.zeros(len(techs.ids), dtype=np.int64)
+    # Boylam farkı enlemde cos(lat) ile kısalır
+    x = techs.lon * np.cos(np.radians(techs.lat.mean()))
+    stack = [np.arange(len(techs.ids))]
+    next_label = 0
+    while stack:
+        members = stack.pop()
+        if len(members) <= max_size:
+            labels[members] = next_label
+            next_label += 1
+            continue
+        axis = techs.lat[members] if np.ptp(techs.lat[members]) >= np.ptp(x[members]) else x[members]
+        order = members[np.argsort(axis, kind="stable")]
+        half = len(order) // 2
+        stack.extend([order[:half], order[half:]])
+    return labels
+
+
+def _subset(tickets: OpenTickets, rows: np.ndarray) -> OpenTickets:
+    return OpenTickets(*(getattr(tickets, f.name)[rows] for f in fields(OpenTickets)))
+
+
+def _greedy(slots: np.ndarray, priority: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Öncelik sırasıyla her ticket'a boştaki en ucuz slot (scipy yoksa)"""
+    cost = slots.copy()
+    row_idx, slot_idx = [], []
+    for row in np.argsort(-priority, kind="stable"):
+        if len(slot_idx) == cost.shape[1]:
+            break
+        best = int(np.argmin(cost[row]))
+        if cost[row, best] >= FORBIDDEN / 2:
+            continue
+        row_idx.append(row)
+        slot_idx.append(best)
+        cost[:, best] = FORBIDDEN
+    return np.asarray(row_idx, dtype=np.int64), np.asarray(slot_idx, dtype=np.int64)
+
+
+def _region_coords(region) -> Tuple[float, float]:
+    return REGION_COORDS.get((region or "").split('/')[0], DEFAULT_COORDS)
+
+
+def load_technicians(cursor, rebalance: bool = False) -> TechnicianPool:
+    """Aktif teknisyenler ve kalan kapasiteleri (açık ticket yükü düşülmüş)"""
+    cursor.execute("""
+        SELECT tech.id, tech.name, tech.latitude, tech.longitude, tech.skills, tech.capacity,
+               COUNT(t.ticket_id) AS open_load
+        FROM technicians tech
+        LEFT JOIN tickets t ON t.technician_id = tech.id
+             AND t.status NOT IN ('RESOLVED', 'CLOSED')
+             AND NOT (%s AND t.status = 'CREATED')
+        WHERE tech.status <> 'Offline'
+        GROUP BY tech.id
+        ORDER BY tech.id
+    """, (rebalance,))
+    rows = cursor.fetchall()
+
+    skills = np.zeros((len(rows), len(FAULT_TYPES)), dtype=bool)
+    for i, row in enumerate(rows):
+        for skill in row[4] or []:
+            if skill in FAULT_CODES:
+                skills[i, FAULT_CODES[skill]] = True
+
+    coords = [(row[2], row[3]) if row[2] is not None else DEFAULT_COORDS for row in rows]
+    return TechnicianPool(
+        ids=np.asarray([row[0] for row in rows], dtype=np.int64),
+        names=[row[1] for row in rows],
+        lat=np.asarray([c[0] for c in coords], dtype=np.float64),
+        lon=np.asarray([c[1] for c in coords], dtype=np.float64),
+        skills=skills,
+        free=np.maximum(np.asarray([row[5] - row[6] for row in rows], dtype=np.int64), 0)
+    )
+
+
+def load_pending_tickets(cursor, rebalance: bool = False) -> OpenTickets:
+    """Atama bekleyen ticket'lar; konum abone konumu, bölgesel ticket'ta bölge merkezi"""
+    cursor.execute("""
+        SELECT t.ticket_id, t.priority_rank, t.fault_type,
+               EXTRACT(EPOCH FROM (NOW() - t.created_at)) / 3600.0,
+               c.latitude, c.longitude, COALESCE(c.region_id, ri.group_key)
+        FROM tickets t
+        LEFT JOIN customers c ON c.subscriber_id = t.subscriber_id
+        LEFT JOIN regional_incidents ri ON ri.ticket_id = t.ticket_id
+        WHERE t.status = 'CREATED' AND (t.technician_id IS NULL OR %s)
+    """, (rebalance,))
+    rows = cursor.fetchall()
+
+    coords = [(row[4], row[5]) if row[4] is not None else _region_coords(row[6]) for row in rows]
+    return OpenTickets(
+        ids=np.asarray([row[0] for row in rows], dtype=np.int64),
+        lat=np.asarray([c[0] for c in coords], dtype=np.float64),
+        lon=np.asarray([c[1] for c in coords], dtype=np.float64),
+        fault=np.asarray([FAULT_CODES.get(row[2], -1) for row in rows], dtype=np.int64),
+        priority=np.asarray([row[1] or 0 for row in rows], dtype=np.float64),
+        age_hours=np.asarray([float(row[3] or 0) for row in rows], dtype=np.float64)
+    )
+
+
+def run_dispatch(conn, config: DispatchConfig = None, rebalance: bool = False) -> dict:
+    """
+    Bir dispatch turu: bekleyen ticket'ları yükle, çöz, atamaları tek UPDATE ile yaz.
+    Başka bir süreç aynı anda dispatch yapıyorsa tur atlanır.
+    """
+    from psycopg2.extras import execute_values
+
+    started = time.perf_counter()
+    cursor = conn.cursor()
+    cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", (DISPATCH_LOCK_KEY,))
+    if not cursor.fetchone()[0]:
+        conn.rollback()
+        return {"skipped": True}
+
+    techs = load_technicians(cursor, rebalance)
+    tickets = load_pending_tickets(cursor, rebalance)
+    metrics.DISPATCH_PENDING.set(len(tickets.ids))
+
+    solve_started = time.perf_counter()
+    ticket_idx, tech_idx, solver = solve(tickets, techs, config)
+    solve_seconds = time.perf_counter() - solve_started
+    metrics.DISPATCH_SECONDS.observe(solve_seconds, phase="solve")
+
+    assignments = [
+        (int(tickets.ids[t]), int(techs.ids[s]), techs.names[s])
+        for t, s in zip(ticket_idx.tolist(), tech_idx.tolist())
+    ]
+    if rebalance:
+        # Bu turda yer bulamayan CREATED ticket'lar havuza döner
+        assigned = set(a[0] for a in assignments)
+        assignments += [(tid, None, DEFAULT_ASSIGNEE) for tid in tickets.ids.tolist() if tid not in assigned]
+
+    if assignments:
+        execute_values(cursor, """
+            UPDATE tickets t
+            SET technician_id = v.technician_id, assigned_to = v.name, updated_at = NOW()
+            FROM (VALUES %s) AS v(ticket_id, technician_id, name)
+            WHERE t.ticket_id = v.ticket_id AND t.status = 'CREATED'
+              AND t.technician_id IS DISTINCT FROM v.technician_id
+        """, assignments, template="(%s, %s::int, %s)")
+    conn.commit()
+
+    metrics.DISPATCH_ASSIGNMENTS.inc(len(ticket_idx), solver=solver)
+    metrics.DISPATCH_SECONDS.observe(time.perf_counter() - started, phase="total")
+    if len(ticket_idx):
+        logger.info(f"🧭 Dispatch: {len(ticket_idx)}/{len(tickets.ids)} ticket atandı ({solver}, {solve_seconds * 1000:.1f} ms)")
+
+    return {
+        "pending": int(len(tickets.ids)),
+        "assigned": int(len(ticket_idx)),
+        "unassigned": int(len(tickets.ids) - len(ticket_idx)),
+        "technicians": int(len(techs.ids)),
+        "free_slots": int(techs.free.sum()),
+        "solver": solver,
+        "solve_ms": round(solve_seconds * 1000, 2),
+        "rebalance": rebalance
+    }
+
+
+def technician_loads(conn) -> List[dict]:
+    """GET /api/technicians için teknisyenler ve açık iş yükleri"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT tech.id, tech.name, tech.expertise, tech.status, tech.skills, tech.capacity,
+               tech.latitude, tech.longitude, COUNT(t.ticket_id)
+        FROM technicians tech
+        LEFT JOIN tickets t ON t.technician_id = tech.id AND t.status NOT IN ('RESOLVED', 'CLOSED')
+        GROUP BY tech.id
+        ORDER BY tech.id
+    """)
+    return [
+        {
+            "id": row[0], "name": row[1], "expertise": row[2], "status": row[3],
+            "skills": row[4] or [], "capacity": row[5],
+            "location": {"latitude": row[6], "longitude": row[7]},
+            "open_tickets": row[8]
+        }
+        for row in cursor.fetchall()
+    ]
@@ -0,0 +1,204 @@
+"""
+Streaming Exports
+Abone ve ticket listelerini Postgres'ten doğrudan CSV / XLSX olarak akıtır.
+
+Tarayıcıda export (exportUtils.js) indirilmiş listeyle sınırlıydı; 100k+
+abonede liste hiç indirilemiyor. Burada:
+- sorgu named (server-side) cursor ile çalışır; satırlar EXPORT_CHUNK_ROWS'luk
+  parçalar halinde çekilir, her parça yazılıp bırakılır (sabit bellek)
+- CSV her parçada yanıta yazılır (ilk byte beklemeden gider)
+- XLSX openpyxl write-only workbook ile geçici dosyaya yazılır (satırlar
+  bellekte tutulmaz), zip kapandıktan sonra parça parça akıtılır
+- status / region / tarih aralığı filtreleri SQL'e iner
+
+Bağlantı generator'a devredilir ve akış bitince (veya istemci koparsa)
+kapatılır.
+"""
+import csv
+import importlib.util
+import io
+import logging
+import os
+import tempfile
+import uuid
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+import metrics
+
+OPENPYXL_AVAILABLE = importlib.util.find_spec("openpyxl") is not None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "5000"))
+# Excel sayfa sınırı (başlık satırı hariç)
+XLSX_MAX_ROWS = 1_048_575
+FILE_CHUNK_BYTES = 1 << 20
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+}
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    name: str
+    sheet: str
+    headers: Tuple[str, ...]
+    # {where} filtrelerle doldurulur
+    query: str
+    status_column: str
+    region_column: str
+    date_column: str
+
+
+@dataclass
+class ExportFilters:
+    status: Optional[str] = None
+    region: Optional[str] = None
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+
+
+SUBSCRIBER_EXPORT = ExportSpec(
+    name="aboneler",
+    sheet="Aboneler",
+    headers=("Abone No", "Ad Soyad", "Bölge", "Paket", "Telefon", "VIP", "Modem",
+             "Durum", "Arıza Tipi", "Durum Değişimi", "Risk Skoru", "Skorlama Zamanı"),
+    query="""
+        SELECT c.subscriber_id, c.full_name, c.region_id, c.subscription_plan, c.phone_number,
+               c.is_vip, c.modem_model, COALESCE(ss.current_status::text, 'GREEN'),
+               ss.fault_type, ss.status_changed_at, sc.risk_score, sc.scored_at
+        FROM customers c
+        LEFT JOIN subscriber_status ss ON ss.subscriber_id = c.subscriber_id
+        LEFT JOIN subscriber_scores sc ON sc.subscriber_id = c.subscriber_id
+        {where}
+        ORDER BY c.subscriber_id
+    """,
+    status_column="COALESCE(ss.current_status::text, 'GREEN')",
+    region_column="c.region_id",
+    date_column="ss.status_changed_at"
+)
+
+TICKET_EXPORT = ExportSpec(
+    name="ticketlar",
+    sheet="Ticketlar",
+    headers=("Ticket No", "Abone No", "Ad Soyad", "Bölge", "Durum", "Öncelik", "Arıza Tipi",
+             "Kapsam", "Atanan", "Oluşturulma", "Güncellenme", "Çözülme"),
+    query="""
+        SELECT t.ticket_id, t.subscriber_id, c.full_name, c.region_id, t.status, t.priority,
+               t.fault_type, t.scope, t.assigned_to, t.created_at, t.updated_at, t.resolved_at
+        FROM tickets t
+        LEFT JOIN customers c ON c.subscriber_id = t.subscriber_id
+        {where}
+        ORDER BY t.ticket_id
+    """,
+    status_column="t.status",
+    region_column="c.region_id",
+    date_column="t.created_at"
+)
+
+
+def build_query(spec: ExportSpec, filters: ExportFilters) -> Tuple[str, List]:
+    conditions, params = [], []
+    if filters.status:
+        conditions.append(f"{spec.status_column} = %s")
+        params.append(filters.status.upper())
+    if filters.region:
+        conditions.append(f"{spec.region_column} = %s")
+        params.append(filters.region)
+    if filters.date_from:
+        conditions.append(f"{spec.date_column} >= %s")
+        params.append(filters.date_from)
+    if filters.date_to:
+        conditions.append(f"{spec.date_column} < %s")
+        params.append(filters.date_to)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return spec.query.format(where=where), params
+
+
+def iter_chunks(conn, spec: ExportSpec, filters: ExportFilters, chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[List[tuple]]:
+    """Named cursor: sonuç sunucuda kalır, her fetchmany bir parça getirir"""
+    query, params = build_query(spec, filters)
+    cursor = conn.cursor(name=f"export_{spec.name}_{uuid.uuid4().hex[:8]}")
+    cursor.itersize = chunk_rows
+    try:
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cursor.close()
+
+
+def stream_csv(conn, spec: ExportSpec, filters: ExportFilters) -> Iterator[bytes]:
+    """Excel'in Türkçe karakterleri doğru açması için UTF-8 BOM ile başlar; bağlantıyı kapatır"""
+    written = 0
+    try:
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(spec.headers)
+        yield ("\ufeff" + buf.getvalue()).encode("utf-8")
+
+        for rows in iter_chunks(conn, spec, filters):
+            buf.seek(0)
+            buf.truncate()
+            writer.writerows(rows)
+            written += len(rows)
+            yield buf.getvalue().encode("utf-8")
+    finally:
+        _finish(conn, spec, "csv", written)
+
+
+def stream_xlsx(conn, spec: ExportSpec, filters: ExportFilters) -> Iterator[bytes]:
+    """Write-only workbook; XLSX_MAX_ROWS'u aşan satırlar yazılmaz (CSV kullanılmalı)"""
+    from openpyxl import Workbook
+
+    written = 0
+    try:
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(spec.sheet)
+        sheet.append(spec.headers)
+
+        with closing(iter_chunks(conn, spec, filters)) as chunks:
+            for rows in chunks:
+                rows = rows[:XLSX_MAX_ROWS - written]
+                for row in rows:
+                    sheet.append(row)
+                written += len(rows)
+                if written >= XLSX_MAX_ROWS:
+                    logger.warning(f"⚠️ {spec.name} XLSX export {XLSX_MAX_ROWS:,} satırda kesildi; tamamı için CSV kullanın")
+                    break
+
+        with tempfile.TemporaryFile() as tmp:
+            workbook.save(tmp)
+            tmp.seek(0)
+            while True:
+                chunk = tmp.read(FILE_CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        _finish(conn, spec, "xlsx", written)
+
+
+def _finish(conn, spec: ExportSpec, fmt: str, written: int):
+    # Sadece okuma yapıldı; named cursor'ın transaction'ı kapatılır
+    try:
+        conn.rollback()
+    finally:
+        conn.close()
+    metrics.EXPORT_ROWS.inc(written, kind=spec.name, format=fmt)
+    logger.info(f"📤 Export: {written:,} {spec.name} ({fmt})")
+
+
+STREAMERS = {"csv": stream_csv, "xlsx": stream_xlsx}
+
+
+def export_filename(spec: ExportSpec, fmt: str) -> str:
+    return f"NetPulse_{spec.name}_{datetime.now().strftime('%Y-%m-%d')}.{fmt}"
@@ -0,0 +1,252 @@
+"""
+Fleet Snapshot
+Tüm filonun durumunu kolon bazlı NumPy dizilerinde tutan immutable snapshot.
+
+Dashboard agregasyonları (bölge × durum sayıları, risk histogramı, en riskli
+aboneler) her istekte abone başına dict üretmek yerine bu dizilerden
+vektörel olarak hesaplanır. Snapshot her monitor taramasından sonra yeniden
+kurulur ve referans ataması ile atomik olarak değiştirilir; okuyucular kilit
+almadan eski veya yeni snapshot'ın tamamını görür.
+"""
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("GREEN", "YELLOW", "RED")
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+RISK_BINS = np.linspace(0.0, 1.0, 11)
+
+
+class FleetSnapshot:
+    """
+    Kolonlar (hepsi aynı uzunlukta, subscriber_id sıralı):
+    - subscriber_id (int32), status (int8: 0=GREEN 1=YELLOW 2=RED)
+    - region_code (int16) -> regions[code], plan_code (int16) -> plans[code]
+    - risk_score (float32, 0-1; bilinmiyorsa NaN)
+    - latency / packet_loss / download_speed (float32, son ölçüm; bilinmiyorsa NaN)
+    """
+
+    def __init__(self, version: int, subscriber_id, full_name, status, region_code, regions,
+                 plan_code, plans, risk_score, latency, packet_loss, download_speed):
+        self.version = version
+        self.built_at = datetime.now()
+        self.subscriber_id = subscriber_id
+        self.full_name = full_name
+        self.status = status
+        self.region_code = region_code
+        self.regions: List[str] = regions
+        self.plan_code = plan_code
+        self.plans: List[str] = plans
+        self.risk_score = risk_score
+        self.latency = latency
+        self.packet_loss = packet_loss
+        self.download_speed = download_speed
+
+        for array in (subscriber_id, status, region_code, plan_code, risk_score, latency, packet_loss, download_speed):
+            array.setflags(write=False)
+
+        self._summary_json: Optional[bytes] = None
+        self._summary_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.subscriber_id)
+
+    def status_counts(self) -> dict:
+        counts = np.bincount(self.status, minlength=len(STATUSES))
+        return {status: int(counts[code]) for code, status in enumerate(STATUSES)}
+
+    def region_status_matrix(self) -> np.ndarray:
+        """(bölge sayısı × 3) sayım matrisi; tek bincount ile"""
+        flat = self.region_code.astype(np.int64) * len(STATUSES) + self.status
+        return np.bincount(flat, minlength=len(self.regions) * len(STATUSES)).reshape(len(self.regions), len(STATUSES))
+
+    def risk_histogram(self) -> dict:
+        known = self.risk_score[~np.isnan(self.risk_score)]
+        counts, _ = np.histogram(known, bins=RISK_BINS)
+        return {
+            "bins": [round(float(b), 2) for b in RISK_BINS],
+            "counts": counts.tolist(),
+            "unknown": int(len(self) - len(known))
+        }
+
+    def top_risky(self, k: int = 20) -> List[dict]:
+        """Risk skoru en yüksek k abone (argpartition: O(n), tam sıralama yok)"""
+        risk = np.where(np.isnan(self.risk_score), -1.0, self.risk_score)
+        k = min(k, len(risk))
+        if k <= 0:
+            return []
+        idx = np.argpartition(-risk, k - 1)[:k]
+        idx = idx[np.argsort(-risk[idx], kind="stable")]
+        return [
+            {
+                "id": int(self.subscriber_id[i]),
+                "name": self.full_name[i],
+                "region": self.regions[self.region_code[i]],
+                "plan": self.plans[self.plan_code[i]],
+                "status": STATUSES[self.status[i]],
+                "risk_score": None if risk[i] < 0 else round(float(risk[i]), 3),
+                "metrics": {
+                    "latency": _nullable(self.latency[i]),
+                    "packet_loss": _nullable(self.packet_loss[i]),
+                    "download_speed": _nullable(self.download_speed[i])
+                }
+            }
+            for i in idx
+        ]
+
+    def summary(self, top_k: int = 20) -> dict:
+        matrix = self.region_status_matrix()
+        return {
+            "version": self.version,
+            "built_at": self.built_at.isoformat(),
+            "total": len(self),
+            "counts": self.status_counts(),
+            "regions": [
+                {"region": region, **{status: int(matrix[r, code]) for code, status in enumerate(STATUSES)}}
+                for r, region in enumerate(self.regions)
+            ],
+            "risk_histogram": self.risk_histogram(),
+            "top_risky": self.top_risky(top_k)
+        }
+
+    def summary_json(self) -> bytes:
+        """Varsayılan özet bir kez serialize edilir, snapshot değişene kadar aynı byte'lar döner"""
+        if self._summary_json is None:
+            with self._summary_lock:
+                if self._summary_json is None:
+                    self._summary_json = json.dumps(self.summary(), ensure_ascii=False).encode("utf-8")
+        return self._summary_json
+
+
+def _nullable(value) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+def _encode(values: list):
+    """Kategorik kolon -> (int16 kodlar, sıralı kategori listesi)"""
+    categories, codes = np.unique(np.asarray(values, dtype=object).astype(str), return_inverse=True)
+    return codes.astype(np.int16), categories.tolist()
+
+
+def _window_risk(lstm_service, subscriber_ids: np.ndarray) -> np.ndarray:
+    """LSTM cache'indeki son ölçümden risk (LSTMPredictionService.analyze_trend formülü)"""
+    risk = np.full(len(subscriber_ids), np.nan, dtype=np.float32)
+    cache = lstm_service.measurement_cache if lstm_service else {}
+    if not cache:
+        return risk
+
+    positions, last = [], []
+    for pos, sid in enumerate(subscriber_ids.tolist()):
+        window = cache.get(sid)
+        if window:
+            positions.append(pos)
+            last.append(window[-1])
+    if not positions:
+        return risk
+
+    latency, packet_loss, snr, _ = np.asarray(last, dtype=np.float64).T
+    values = latency / 200.0 + packet_loss / 10.0 + np.maximum(0.0, (10 - snr) / 10.0)
+    risk[positions] = np.minimum(1.0, values)
+    return risk
+
+
+def build_fleet_snapshot(conn, version: int, lstm_service=None) -> FleetSnapshot:
+    """
+    customers + subscriber_status (+ varsa subscriber_scores) tek sorguda okunur.
+    Scoring worker skoru yoksa risk, bellek içi LSTM cache'inden hesaplanır.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT c.subscriber_id, c.full_name, c.region_id, c.subscription_plan,
+               COALESCE(ss.current_status::text, 'GREEN'),
+               s.risk_score,
+               (s.live_metrics->>'latency')::real,
+               (s.live_metrics->>'packet_loss')::real,
+               (s.live_metrics->>'download_speed')::real
+        FROM customers c
+        LEFT JOIN subscriber_status ss ON ss.subscriber_id = c.subscriber_id
+        LEFT JOIN subscriber_scores s ON s.subscriber_id = c.subscriber_id
+        ORDER BY c.subscriber_id
+    """)
+    rows = cursor.fetchall()
+
+    ids, names, regions, plans, statuses, risks, latencies, losses, speeds = (
+        list(col) for col in zip(*rows)
+    ) if rows else ([] for _ in range(9))
+
+    subscriber_id = np.asarray(ids, dtype=np.int32)
+    region_code, region_names = _encode(regions)
+    plan_code, plan_names = _encode(plans)
+    status = np.asarray([STATUS_CODES.get(s, 0) for s in statuses], dtype=np.int8)
+
+    def as_float(values):
+        return np.asarray([np.nan if v is None else v for v in values], dtype=np.float32)
+
+    risk_score = as_float(risks)
+    missing = np.isnan(risk_score)
+    if missing.any():
+        risk_score[missing] = _window_risk(lstm_service, subscriber_id[missing])
+
+    return FleetSnapshot(
+        version=version,
+        subscriber_id=subscriber_id,
+        full_name=np.asarray(names, dtype=object),
+        status=status,
+        region_code=region_code,
+        regions=region_names,
+        plan_code=plan_code,
+        plans=plan_names,
+        risk_score=risk_score,
+        latency=as_float(latencies),
+        packet_loss=as_float(losses),
+        download_speed=as_float(speeds)
+    )
+
+
+class FleetSnapshotStore:
+    """Güncel snapshot'ı tutar; rebuild() yeni snapshot'ı kurup tek atamayla değiştirir"""
+
+    def __init__(self, get_db_func, lstm_service=None, on_rebuild=None):
+        self.get_db = get_db_func
+        self.lstm_service = lstm_service
+        self.on_rebuild = on_rebuild  # Yeni snapshot ile çağrılır (ör. RegionAggregator.resync)
+        self._snapshot: Optional[FleetSnapshot] = None
+        self._rebuild_lock = threading.Lock()
+        self._version = 0
+
+    @property
+    def current(self) -> Optional[FleetSnapshot]:
+        return self._snapshot
+
+    def rebuild(self) -> Optional[FleetSnapshot]:
+        conn = self.get_db()
+        if not conn:
+            logger.error("Fleet snapshot: Database bağlantısı yok!")
+            return self._snapshot
+
+        # Aynı anda iki rebuild gelirse (monitor + periyodik) biri bekler, versiyon sırası korunur
+        with self._rebuild_lock:
+            try:
+                started = time.perf_counter()
+                snapshot = build_fleet_snapshot(conn, self._version + 1, self.lstm_service)
+                self._version = snapshot.version
+                self._snapshot = snapshot
+                if self.on_rebuild:
+                    self.on_rebuild(snapshot)
+                logger.info(
+                    f"📸 Fleet snapshot v{snapshot.version}: {len(snapshot)} abone "
+                    f"({(time.perf_counter() - started) * 1000:.0f} ms)"
+                )
+                return snapshot
+            except Exception as e:
+                logger.error(f"Fleet snapshot hatası: {e}")
+                return self._snapshot
+            finally:
+                conn.close()
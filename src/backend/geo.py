@@ -0,0 +1,122 @@
+"""
+Subscriber Geo Enrichment
+Abone konumu (lat/lon) ve adresi subscriber_id + region_id'den deterministik
+olarak türetilir. Sonuç customers.latitude / longitude / location_address
+kolonlarında saklanır (006_customer_geo); böylece detay endpoint'i her
+istekte hash ve string üretmez.
+
+region_id değişirse trigger kolonları NULL'lar; eksik konumlar okuma sırasında
+compute_location ile yeniden hesaplanıp yazılır (fill_missing_locations).
+
+Mevcut bir veritabanını doldurmak için:
+    python geo.py
+"""
+import hashlib
+import io
+import logging
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# İstanbul bölgeleri için yaklaşık koordinatlar
+REGION_COORDS = {
+    "Kadıköy": (40.99, 29.03),
+    "Beşiktaş": (41.04, 29.00),
+    "Üsküdar": (41.02, 29.01),
+    "Şişli": (41.06, 28.99),
+    "Bakırköy": (40.98, 28.87)
+}
+DEFAULT_COORDS = (41.01, 28.98)
+
+STREET_NAMES = [
+    "Bağdat Caddesi", "Nispetiye Caddesi", "Acıbadem Caddesi",
+    "Teşvikiye Caddesi", "Atatürk Caddesi", "Cumhuriyet Caddesi",
+    "İstiklal Caddesi", "Bahariye Caddesi", "Moda Caddesi"
+]
+
+
+def compute_location(subscriber_id: int, region: str) -> Tuple[float, float, str]:
+    """(latitude, longitude, adres) - aynı abone için her zaman aynı sonuç"""
+    base_region = region.split('/')[0]  # "Kadıköy/Moda" -> "Kadıköy"
+    base_lat, base_lon = REGION_COORDS.get(base_region, DEFAULT_COORDS)
+
+    # Her abone için benzersiz offset (subscriber_id'ye göre deterministic)
+    hash_val = int(hashlib.md5(str(subscriber_id).encode()).hexdigest(), 16)
+    lat_offset = (hash_val % 100) / 10000.0  # 0.0000-0.0099 arası
+    lon_offset = ((hash_val // 100) % 100) / 10000.0
+
+    latitude = base_lat + lat_offset - 0.005  # Merkezden sapma
+    longitude = base_lon + lon_offset - 0.005
+
+    street_index = subscriber_id % len(STREET_NAMES)
+    building_no = (subscriber_id % 200) + 1
+    address = f"{STREET_NAMES[street_index]} No:{building_no}, {region}"
+
+    return latitude, longitude, address
+
+
+def fill_missing_locations(conn, rows: List[Tuple[int, str]]) -> Dict[int, Tuple[float, float, str]]:
+    """
+    Konumu NULL olan (subscriber_id, region_id) satırları için hesaplar,
+    COPY + tek UPDATE ile customers'a yazar ve commit eder.
+    """
+    if not rows:
+        return {}
+
+    computed = {sid: compute_location(sid, region) for sid, region in rows}
+
+    buf = io.StringIO()
+    for sid, (lat, lon, address) in computed.items():
+        buf.write(f"{sid}\t{lat}\t{lon}\t{_copy_escape(address)}\n")
+    buf.seek(0)
+
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS tmp_customer_geo (
+            subscriber_id INTEGER, latitude DOUBLE PRECISION, longitude DOUBLE PRECISION, location_address TEXT
+        )
+    """)
+    cursor.execute("TRUNCATE tmp_customer_geo")
+    cursor.copy_expert("COPY tmp_customer_geo FROM STDIN", buf)
+    cursor.execute("""
+        UPDATE customers c
+        SET latitude = t.latitude, longitude = t.longitude, location_address = t.location_address
+        FROM tmp_customer_geo t
+        WHERE c.subscriber_id = t.subscriber_id
+    """)
+    conn.commit()
+    return computed
+
+
+def _copy_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def backfill_locations(conn, batch_size: int = 100_000) -> int:
+    """Konumu eksik tüm aboneleri batch'ler halinde doldurur, doldurulan satır sayısını döndürür"""
+    cursor = conn.cursor()
+    total = 0
+    while True:
+        cursor.execute("""
+            SELECT subscriber_id, region_id FROM customers
+            WHERE latitude IS NULL
+            ORDER BY subscriber_id
+            LIMIT %s
+        """, (batch_size,))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        fill_missing_locations(conn, rows)
+        total += len(rows)
+        logger.info(f"   ... {total} abone konumu dolduruldu")
+    return total
+
+
+if __name__ == "__main__":
+    import psycopg2
+
+    logging.basicConfig(level=logging.INFO)
+    conn = psycopg2.connect(dbname="netpulse_db", user="postgres", password="admin", host="localhost", port="5432")
+    filled = backfill_locations(conn)
+    print(f"✅ {filled} abone konumu dolduruldu")
+    conn.close()
@@ -1,7 +1,13 @@
 import psycopg2
 import random
 from faker import Faker
+import argparse
+import csv
+import io
 import os
+import time
+from migrate import apply_migrations
+from geo import backfill_locations
 
 DB_NAME = "netpulse_db"
 DB_USER = "postgres"
@@ -33,27 +39,194 @@ TECHNICIANS = [
     ("Burak Çelik", "Kablo Teknisyeni", "Offline")
 ]
 
-def generate_tr_phone():
-    """Gerçekçi Türk telefon numarası üret"""
-    prefixes = ['530', '531', '532', '533', '535', '536', '541', '542', '543', '544', '545', '555', '505', '506']
-    prefix = random.choice(prefixes)
+PHONE_PREFIXES = ['530', '531', '532', '533', '535', '536', '541', '542', '543', '544', '545', '555', '505', '506']
+PLANS = ["24 Mbps VDSL", "35 Mbps VDSL", "100 Mbps Fiber", "500 Mbps Fiber", "1000 Mbps Gamer"]
+
+CUSTOMER_COLUMNS = (
+    "subscriber_id", "full_name", "gender", "phone_number", "subscription_plan", "region_id",
+    "telegram_chat_id", "is_vip", "modem_model", "ip_address", "uptime"
+)
+
+BATCH_SIZE = 100_000
+NAME_POOL_SIZE = 2000
+
+def build_name_pool(size: int = NAME_POOL_SIZE) -> dict:
+    """Faker'ı satır başına çağırmak yerine bir kez isim havuzu üretir"""
+    return {
+        "Kadın": [fake.name_female() for _ in range(size)],
+        "Erkek": [fake.name_male() for _ in range(size)]
+    }
+
+def generate_customer_columns(start_id: int, count: int, name_pool: dict) -> dict:
+    """
+    count adet müşteriyi kolon kolon üretir (her kolon tek random.choices çağrısı)
+
+    Returns:
+        {kolon_adı: [değerler]} - CUSTOMER_COLUMNS sırasıyla
+    """
+    genders = random.choices(["Kadın", "Erkek"], k=count)
+    plans = random.choices(PLANS, k=count)
+
+    # Gerçekçi Türk telefon numarası: +90 5xx xxx xx xx
+    prefixes = random.choices(PHONE_PREFIXES, k=count)
+    part1 = random.choices(range(100, 1000), k=count)
+    part2 = random.choices(range(10, 100), k=count)
+    part3 = random.choices(range(10, 100), k=count)
+
+    days = random.choices(range(0, 31), k=count)
+    hours = random.choices(range(0, 24), k=count)
+    minutes = random.choices(range(0, 60), k=count)
+
+    return {
+        "subscriber_id": range(start_id, start_id + count),
+        "full_name": [random.choice(name_pool[g]) for g in genders],
+        "gender": genders,
+        "phone_number": [f"+90 {p} {a} {b} {c}" for p, a, b, c in zip(prefixes, part1, part2, part3)],
+        "subscription_plan": plans,
+        "region_id": random.choices(DISTRICTS, k=count),
+        "telegram_chat_id": [""] * count,
+        "is_vip": ["Gamer" in plan or "Platin" in plan for plan in plans],
+        "modem_model": random.choices(MODEM_MODELS, k=count),
+        "ip_address": [f"192.168.1.{n}" for n in random.choices(range(2, 255), k=count)],
+        "uptime": [f"{d}g {h}s {m}dk" for d, h, m in zip(days, hours, minutes)]
+    }
+
+def copy_customer_columns(cursor, columns: dict):
+    """Kolon batch'ini CSV'ye çevirip COPY FROM STDIN ile yükler"""
+    buf = io.StringIO()
+    csv.writer(buf).writerows(zip(*(columns[name] for name in CUSTOMER_COLUMNS)))
+    buf.seek(0)
+    cursor.copy_expert(
+        f"COPY customers ({', '.join(CUSTOMER_COLUMNS)}) FROM STDIN "
+        f"WITH (FORMAT csv, FORCE_NOT_NULL (telegram_chat_id))",
+        buf
+    )
+
+def create_schema(cursor):
+    """
+    Temel tabloları sıfırdan oluşturur (veri üretmez).
+    Sonrasında migrate.apply_migrations ile versiyonlu değişiklikler uygulanır.
+    """
+    # Eski tabloları sil (Sırası önemli, referanslar yüzünden)
+    cursor.execute("DROP TABLE IF EXISTS schema_migrations;")
+    cursor.execute("DROP TABLE IF EXISTS scoring_workers;")
+    cursor.execute("DROP TABLE IF EXISTS subscriber_scores;")
+    cursor.execute("DROP TABLE IF EXISTS subscriber_status_history CASCADE;")
+    cursor.execute("DROP TABLE IF EXISTS regional_incidents;")
+    cursor.execute("DROP TABLE IF EXISTS action_log CASCADE;")
+    cursor.execute("DROP TABLE IF EXISTS ticket_notes CASCADE;")
+    cursor.execute("DROP TABLE IF EXISTS ticket_status_history;")
+    cursor.execute("DROP TABLE IF EXISTS tickets;")
+    cursor.execute("DROP TABLE IF EXISTS technicians;")
+    cursor.execute("DROP TABLE IF EXISTS subscriber_status;")
+    cursor.execute("DROP TABLE IF EXISTS customers;")
+    cursor.execute("DROP TYPE IF EXISTS subscriber_status_t;")
     
-    part1 = random.randint(100, 999)
-    part2 = random.randint(10, 99)
-    part3 = random.randint(10, 99)
+    # 1. Customers tablosu (Gelişmiş)
+    create_customers_table = """
+    CREATE TABLE customers (
+        subscriber_id INTEGER PRIMARY KEY,
+        full_name VARCHAR(100) NOT NULL,
+        gender VARCHAR(10),
+        phone_number VARCHAR(20),
+        subscription_plan VARCHAR(50),
+        region_id VARCHAR(50),
+        telegram_chat_id VARCHAR(50),
+        is_vip BOOLEAN DEFAULT FALSE,
+        modem_model VARCHAR(50),
+        ip_address VARCHAR(20),
+        uptime VARCHAR(20)
+    );
+    """
+    cursor.execute(create_customers_table)
+    print("✅ 'customers' tablosu oluşturuldu")
     
-    return f"+90 {prefix} {part1} {part2} {part3}"
+    # 2. Subscriber Status tablosu
+    create_status_table = """
+    CREATE TABLE subscriber_status (
+        subscriber_id INTEGER PRIMARY KEY REFERENCES customers(subscriber_id),
+        current_status VARCHAR(10) DEFAULT 'GREEN',
+        previous_status VARCHAR(10),
+        last_checked TIMESTAMP DEFAULT NOW(),
+        status_changed_at TIMESTAMP,
+        fault_type VARCHAR(50),
+        estimated_fix_time TIMESTAMP,
+        sms_sent BOOLEAN DEFAULT FALSE,
+        sms_sent_at TIMESTAMP
+    );
+    """
+    cursor.execute(create_status_table)
+    print("✅ 'subscriber_status' tablosu oluşturuldu")
 
-def generate_ip():
-    return f"192.168.1.{random.randint(2, 254)}"
+    # 3. Technicians Table
+    create_tech_table = """
+    CREATE TABLE technicians (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(100),
+        expertise VARCHAR(100),
+        status VARCHAR(20) DEFAULT 'Active'
+    );
+    """
+    cursor.execute(create_tech_table)
+    print("✅ 'technicians' tablosu oluşturuldu")
 
-def generate_uptime():
-    days = random.randint(0, 30)
-    hours = random.randint(0, 23)
-    minutes = random.randint(0, 59)
-    return f"{days}g {hours}s {minutes}dk"
+    # 4. Tickets Table (Arıza Kayıtları) - YENİ TASARIM
+    create_tickets_table = """
+    CREATE TABLE tickets (
+        ticket_id SERIAL PRIMARY KEY,
+        subscriber_id INTEGER REFERENCES customers(subscriber_id),
+        status VARCHAR(20) DEFAULT 'CREATED',
+        priority VARCHAR(10) NOT NULL,
+        fault_type VARCHAR(50),
+        scope VARCHAR(20),
+        technician_note TEXT,
+        assigned_to VARCHAR(100),
+        created_at TIMESTAMP DEFAULT NOW(),
+        updated_at TIMESTAMP DEFAULT NOW(),
+        resolved_at TIMESTAMP,
+        resolution_note TEXT
+    );
+    """
+    cursor.execute(create_tickets_table)
+    print("✅ 'tickets' tablosu oluşturuldu")
 
-def create_database():
+    # 5. Ticket Status History Table (Durum Geçmişi)
+    create_status_history = """
+    CREATE TABLE ticket_status_history (
+        history_id SERIAL PRIMARY KEY,
+        ticket_id INTEGER REFERENCES tickets(ticket_id) ON DELETE CASCADE,
+        old_status VARCHAR(20),
+        new_status VARCHAR(20) NOT NULL,
+        changed_by VARCHAR(100),
+        changed_at TIMESTAMP DEFAULT NOW(),
+        note TEXT
+    );
+    """
+    cursor.execute(create_status_history)
+    print("✅ 'ticket_status_history' tablosu oluşturuldu")
+
+    # Index'ler
+    cursor.execute("CREATE INDEX idx_tickets_subscriber ON tickets(subscriber_id);")
+    cursor.execute("CREATE INDEX idx_tickets_status ON tickets(status);")
+    cursor.execute("CREATE INDEX idx_history_ticket ON ticket_status_history(ticket_id);")
+    print("✅ Ticket index'leri oluşturuldu")
+
+    # 6. Action Log Table (İşlem Logları)
+    create_action_log = """
+    CREATE TABLE action_log (
+        id SERIAL PRIMARY KEY,
+        subscriber_id INTEGER,
+        action_type VARCHAR(50),
+        new_status VARCHAR(50),
+        note TEXT,
+        timestamp TIMESTAMP DEFAULT NOW()
+    );
+    """
+    cursor.execute(create_action_log)
+    cursor.execute("CREATE INDEX idx_action_log_subscriber ON action_log(subscriber_id);")
+    print("✅ 'action_log' tablosu oluşturuldu")
+
+def create_database(total_subscribers: int = TOTAL_SUBSCRIBERS):
     print("PostgreSQL'e bağlanılıyor...")
     try:
         conn = psycopg2.connect(
@@ -62,115 +235,7 @@ def create_database():
         conn.autocommit = True
         cursor = conn.cursor()
 
-        # Eski tabloları sil (Sırası önemli, referanslar yüzünden)
-        cursor.execute("DROP TABLE IF EXISTS tickets;")
-        cursor.execute("DROP TABLE IF EXISTS technicians;")
-        cursor.execute("DROP TABLE IF EXISTS subscriber_status;")
-        cursor.execute("DROP TABLE IF EXISTS customers;")
-        
-        # 1. Customers tablosu (Gelişmiş)
-        create_customers_table = """
-        CREATE TABLE customers (
-            subscriber_id INTEGER PRIMARY KEY,
-            full_name VARCHAR(100) NOT NULL,
-            gender VARCHAR(10),
-            phone_number VARCHAR(20),
-            subscription_plan VARCHAR(50),
-            region_id VARCHAR(50),
-            telegram_chat_id VARCHAR(50),
-            is_vip BOOLEAN DEFAULT FALSE,
-            modem_model VARCHAR(50),
-            ip_address VARCHAR(20),
-            uptime VARCHAR(20)
-        );
-        """
-        cursor.execute(create_customers_table)
-        print("✅ 'customers' tablosu oluşturuldu")
-        
-        # 2. Subscriber Status tablosu
-        create_status_table = """
-        CREATE TABLE subscriber_status (
-            subscriber_id INTEGER PRIMARY KEY REFERENCES customers(subscriber_id),
-            current_status VARCHAR(10) DEFAULT 'GREEN',
-            previous_status VARCHAR(10),
-            last_checked TIMESTAMP DEFAULT NOW(),
-            status_changed_at TIMESTAMP,
-            fault_type VARCHAR(50),
-            estimated_fix_time TIMESTAMP,
-            sms_sent BOOLEAN DEFAULT FALSE,
-            sms_sent_at TIMESTAMP
-        );
-        """
-        cursor.execute(create_status_table)
-        print("✅ 'subscriber_status' tablosu oluşturuldu")
-
-        # 3. Technicians Table
-        create_tech_table = """
-        CREATE TABLE technicians (
-            id SERIAL PRIMARY KEY,
-            name VARCHAR(100),
-            expertise VARCHAR(100),
-            status VARCHAR(20) DEFAULT 'Active'
-        );
-        """
-        cursor.execute(create_tech_table)
-        print("✅ 'technicians' tablosu oluşturuldu")
-
-        # 4. Tickets Table (Arıza Kayıtları) - YENİ TASARIM
-        create_tickets_table = """
-        CREATE TABLE tickets (
-            ticket_id SERIAL PRIMARY KEY,
-            subscriber_id INTEGER REFERENCES customers(subscriber_id),
-            status VARCHAR(20) DEFAULT 'CREATED',
-            priority VARCHAR(10) NOT NULL,
-            fault_type VARCHAR(50),
-            scope VARCHAR(20),
-            technician_note TEXT,
-            assigned_to VARCHAR(100),
-            created_at TIMESTAMP DEFAULT NOW(),
-            updated_at TIMESTAMP DEFAULT NOW(),
-            resolved_at TIMESTAMP,
-            resolution_note TEXT
-        );
-        """
-        cursor.execute(create_tickets_table)
-        print("✅ 'tickets' tablosu oluşturuldu")
-
-        # 5. Ticket Status History Table (Durum Geçmişi)
-        create_status_history = """
-        CREATE TABLE ticket_status_history (
-            history_id SERIAL PRIMARY KEY,
-            ticket_id INTEGER REFERENCES tickets(ticket_id) ON DELETE CASCADE,
-            old_status VARCHAR(20),
-            new_status VARCHAR(20) NOT NULL,
-            changed_by VARCHAR(100),
-            changed_at TIMESTAMP DEFAULT NOW(),
-            note TEXT
-        );
-        """
-        cursor.execute(create_status_history)
-        print("✅ 'ticket_status_history' tablosu oluşturuldu")
-
-        # Index'ler
-        cursor.execute("CREATE INDEX idx_tickets_subscriber ON tickets(subscriber_id);")
-        cursor.execute("CREATE INDEX idx_tickets_status ON tickets(status);")
-        cursor.execute("CREATE INDEX idx_history_ticket ON ticket_status_history(ticket_id);")
-        print("✅ Ticket index'leri oluşturuldu")
-
-        # 6. Action Log Table (İşlem Logları)
-        create_action_log = """
-        CREATE TABLE action_log (
-            id SERIAL PRIMARY KEY,
-            subscriber_id INTEGER,
-            action_type VARCHAR(50),
-            new_status VARCHAR(50),
-            note TEXT,
-            timestamp TIMESTAMP DEFAULT NOW()
-        );
-        """
-        cursor.execute(create_action_log)
-        cursor.execute("CREATE INDEX idx_action_log_subscriber ON action_log(subscriber_id);")
-        print("✅ 'action_log' tablosu oluşturuldu")
+        create_schema(cursor)
 
         # --- DATA GENERATION ---
 
@@ -179,8 +244,8 @@ def create_database():
         cursor.executemany(insert_tech, TECHNICIANS)
         print(f"✅ {len(TECHNICIANS)} teknisyen eklendi.")
 
-        print("500 Müşteri verisi üretiliyor...")
-        customers_data = []
+        print(f"{total_subscribers} Müşteri verisi üretiliyor...")
+        started = time.perf_counter()
         
         # Admin profili - Sibel Akkurt
         sibel_profile = (
@@ -196,46 +261,48 @@ def create_database():
             "192.168.1.100",
             "14g 5s"
         )
-        customers_data.append(sibel_profile)
+        copy_customer_columns(cursor, {name: [value] for name, value in zip(CUSTOMER_COLUMNS, sibel_profile)})
         
-        plans = ["24 Mbps VDSL", "35 Mbps VDSL", "100 Mbps Fiber", "500 Mbps Fiber", "1000 Mbps Gamer"]
+        name_pool = build_name_pool()
         
-        for i in range(1, TOTAL_SUBSCRIBERS):
-            sub_id = 1001 + i
-            region = random.choice(DISTRICTS)
-            plan = random.choice(plans)
-            is_vip = "Gamer" in plan or "Platin" in plan
-            phone = generate_tr_phone()
-            modem = random.choice(MODEM_MODELS)
-            ip = generate_ip()
-            uptime = generate_uptime()
-            
-            gender_choice = random.choice(["Kadın", "Erkek"])
-            name = fake.name_female() if gender_choice == "Kadın" else fake.name_male()
-            
-            customers_data.append((sub_id, name, gender_choice, phone, plan, region, "", is_vip, modem, ip, uptime))
-            
-        insert_sql = """
-        INSERT INTO customers (subscriber_id, full_name, gender, phone_number, subscription_plan, region_id, telegram_chat_id, is_vip, modem_model, ip_address, uptime)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        cursor.executemany(insert_sql, customers_data)
+        # Kalan aboneler BATCH_SIZE'lık kolon batch'leri halinde COPY ile yüklenir
+        for batch_start in range(1, total_subscribers, BATCH_SIZE):
+            count = min(BATCH_SIZE, total_subscribers - batch_start)
+            columns = generate_customer_columns(1001 + batch_start, count, name_pool)
+            copy_customer_columns(cursor, columns)
+            print(f"   ... {batch_start + count}/{total_subscribers}")
+
+        elapsed = time.perf_counter() - started
+        print(f"✅ {total_subscribers} müşteri yüklendi ({total_subscribers / elapsed:,.0f} satır/sn)")
         
-        # Tüm kullanıcıları başlangıçta GREEN olarak işaretle
+        # Tüm kullanıcıları başlangıçta GREEN olarak işaretle (tek INSERT ... SELECT)
         print("Tüm kullanıcılar başlangıç durumuna (GREEN) alınıyor...")
-        for customer in customers_data:
-            sub_id = customer[0]
-            cursor.execute(
-                "INSERT INTO subscriber_status (subscriber_id, current_status) VALUES (%s, 'GREEN')",
-                (sub_id,)
-            )
-        
+        started = time.perf_counter()
+        cursor.execute("""
+            INSERT INTO subscriber_status (subscriber_id, current_status)
+            SELECT subscriber_id, 'GREEN' FROM customers
+        """)
+        status_rows = cursor.rowcount
+        elapsed = time.perf_counter() - started
+        print(f"✅ {status_rows} durum kaydı oluşturuldu ({status_rows / max(elapsed, 1e-9):,.0f} satır/sn)")
         
-        print(f"✅ İŞLEM TAMAM! {len(customers_data)} müşteri kaydedildi.")
+        # Versiyonlu şema değişiklikleri (migrations/)
+        # Index'ler veri yüklendikten sonra tek seferde oluşturulur
+        apply_migrations(conn)
+
+        # Konum/adres zenginleştirmesi (006_customer_geo kolonları)
+        started = time.perf_counter()
+        located = backfill_locations(conn)
+        print(f"✅ {located} abone konumu hesaplandı ({time.perf_counter() - started:.1f} sn)")
+
+        print(f"✅ İŞLEM TAMAM! {total_subscribers} müşteri kaydedildi.")
         conn.close()
 
     except Exception as e:
         print(f"❌ HATA: {e}")
 
 if __name__ == "__main__":
-    create_database()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="NetPulse veritabanını oluşturur ve örnek veri yükler")
+    parser.add_argument("--subscribers", type=int, default=TOTAL_SUBSCRIBERS, help="Üretilecek abone sayısı")
+    args = parser.parse_args()
+    create_database(args.subscribers)
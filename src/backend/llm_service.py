@@ -1,4 +1,3 @@
-import google.generativeai as genai
 import os
 
 # API Key
@@ -9,6 +8,7 @@ def configure_genai():
         print("ERROR: API Key is missing.")
         return False
     try:
+        import google.generativeai as genai  # Ağır import: sadece kullanılırken
         genai.configure(api_key=GEMINI_API_KEY)
         return True
     except Exception as e:
@@ -76,6 +76,7 @@ def generate_proactive_message(customer_name, plan, fault_details, gender, sever
     """
 
     try:
+        import google.generativeai as genai  # Ağır import: sadece kullanılırken
         model = genai.GenerativeModel('gemini-pro')
         response = model.generate_content(prompt)
         return response.text.strip()
@@ -0,0 +1,278 @@
+"""
+NetPulse - NumPy LSTM Predictor
+Keras LSTM modelinin (LSTM → LSTM → Dense softmax) ağırlıklarıyla
+TensorFlow'suz, opsiyonel olarak düşük hassasiyetli inference.
+
+Girdi 12 adım × 4 özellik, model ~30k parametre: Keras predict'in çağrı
+başına sabit maliyeti hesabın kendisinden büyük. Burada:
+- her LSTM katmanında girdi projeksiyonu tüm adımlar için tek matmul,
+  sadece recurrent kısım adım adım
+- satırlar BLOCK_ROWS'luk bloklarda: ara diziler cache'te kalır, büyük
+  batch'te bellek satır sayısıyla büyümez
+- precision:
+    float32  Keras ile aynı hesap
+    float16  ağırlıklar ve katmanlar arası dizi float16 (yarı bellek); matmul
+             ve adım içi durum float32 (CPU'da float16 BLAS yok, adım başı
+             yuvarlama throughput'u ~2x düşürüyor)
+    int8     dynamic-range: ağırlıklar çıkış kolonu başına simetrik int8 +
+             float32 scale; aktivasyonlar float32, ağırlıklar çağrıda açılır
+- predict(X, verbose=0) Keras arayüzüyle aynı; LSTMPredictionService'te
+  model yerine doğrudan kullanılır
+
+Ağırlıklar .h5'ten h5py ile (TensorFlow gerekmez) ya da export edilmiş
+.npz'den okunur.
+"""
+import importlib.util
+import json
+import os
+from typing import List
+
+import numpy as np
+
+H5PY_AVAILABLE = importlib.util.find_spec("h5py") is not None
+
+PRECISIONS = ("float32", "float16", "int8")
+LSTM_WEIGHTS = ("kernel", "recurrent_kernel", "bias")
+# 8192 satırı tek blokta işlemek 512'lik bloklardan ~%25 yavaş (1 çekirdek ölçümü)
+BLOCK_ROWS = int(os.getenv("NETPULSE_LSTM_BLOCK_ROWS", "512"))
+
+
+def numpy_path(model_path: str) -> str:
+    """netpulse_lstm.h5 → netpulse_lstm.npz"""
+    return os.path.splitext(model_path)[0] + ".npz"
+
+
+def _gate_scale(units: int) -> np.ndarray:
+    """
+    Kapı kolonları için ön ölçek: sigmoid(x) = 0.5·tanh(x/2) + 0.5 olduğundan
+    i, f, o kolonları 0.5 ile ölçeklenirse tek bir bitişik tanh tüm kapılara
+    yeter (dilimlerde ayrı sigmoid/tanh'tan ~3x hızlı). 0.5 ölçeği float'ta tam.
+    """
+    scale = np.full(4 * units, 0.5, dtype=np.float32)
+    scale[2 * units:3 * units] = 1.0
+    return scale
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+class QuantizedMatrix:
+    """Kolon başına simetrik int8 ağırlık; matmul float32'de yapılır"""
+
+    def __init__(self, weights: np.ndarray):
+        scale = np.abs(weights).max(axis=0) / 127.0
+        self.scale = np.where(scale > 0, scale, 1.0).astype(np.float32)
+        self.q = np.clip(np.rint(weights / self.scale), -127, 127).astype(np.int8)
+
+    @property
+    def nbytes(self) -> int:
+        return self.q.nbytes + self.scale.nbytes
+
+    def dequantize(self) -> np.ndarray:
+        return self.q.astype(np.float32) * self.scale
+
+
+class NumpyLSTMPredictor:
+    """
+    layers: [{"type": "lstm", "kernel", "recurrent_kernel", "bias", "return_sequences"},
+             {"type": "dense", "kernel", "bias", "activation"}]
+    Keras LSTM kapı sırası: input, forget, cell, output. İçeride diziler
+    zaman-önce (adım, satır, özellik) tutulur; her adımın girdisi bitişik.
+    """
+
+    def __init__(self, layers: List[dict], precision: str = "float32"):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Bilinmeyen LSTM precision: {precision} ({', '.join(PRECISIONS)})")
+        self.precision = precision
+        # Katmanlar arası aktivasyon tipi
+        self.activation_dtype = np.float16 if precision == "float16" else np.float32
+        self.layers = [self._convert(layer) for layer in layers]
+
+    def _convert(self, layer: dict) -> dict:
+        converted = dict(layer)
+        scale = np.float32(1.0)
+        if layer["type"] == "lstm":
+            scale = _gate_scale(np.shape(layer["recurrent_kernel"])[0])
+            converted["gate_scale"] = scale
+            converted["gate_shift"] = np.where(scale == 0.5, 0.5, 0.0).astype(np.float32)
+        for name in ("kernel", "recurrent_kernel"):
+            if name not in layer:
+                continue
+            weights = np.asarray(layer[name], dtype=np.float32) * scale
+            if self.precision == "float16":
+                converted[name] = weights.astype(np.float16)
+            elif self.precision == "int8":
+                converted[name] = QuantizedMatrix(weights)
+            else:
+                converted[name] = weights
+        # Bias küçük; her modda float32
+        converted["bias"] = np.asarray(layer["bias"], dtype=np.float32) * scale
+        return converted
+
+    @staticmethod
+    def _float32(weights) -> np.ndarray:
+        if isinstance(weights, QuantizedMatrix):
+            return weights.dequantize()
+        return weights.astype(np.float32, copy=False)
+
+    @property
+    def nbytes(self) -> int:
+        """Ağırlıkların bellekte kapladığı byte"""
+        total = 0
+        for layer in self.layers:
+            for name in ("kernel", "recurrent_kernel", "bias"):
+                if name in layer:
+                    total += layer[name].nbytes
+        return total
+
+    def predict(self, X, verbose=0) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        # float16 / int8 ağırlıklar çağrı başına bir kez float32'ye açılır (blok başına değil)
+        layers = [
+            {**layer, **{name: self._float32(layer[name]) for name in ("kernel", "recurrent_kernel") if name in layer}}
+            for layer in self.layers
+        ]
+        if len(X) <= BLOCK_ROWS:
+            return self._predict_block(X, layers)
+        return np.concatenate([
+            self._predict_block(X[start:start + BLOCK_ROWS], layers) for start in range(0, len(X), BLOCK_ROWS)
+        ])
+
+    def _predict_block(self, X: np.ndarray, layers: List[dict]) -> np.ndarray:
+        out = np.ascontiguousarray(X.transpose(1, 0, 2))
+        for layer in layers:
+            if layer["type"] == "lstm":
+                out = self._lstm(out, layer)
+            else:
+                if out.ndim == 3:
+                    out = out.transpose(1, 0, 2)
+                logits = out.astype(np.float32, copy=False) @ layer["kernel"] + layer["bias"]
+                out = _softmax(logits) if layer.get("activation") == "softmax" else logits
+        return out.astype(np.float32, copy=False)
+
+    def _lstm(self, X: np.ndarray, layer: dict) -> np.ndarray:
+        steps, n, features = X.shape
+        kernel, recurrent = layer["kernel"], layer["recurrent_kernel"]
+        scale, shift = layer["gate_scale"], layer["gate_shift"]
+        units = recurrent.shape[0]
+
+        # Girdi projeksiyonu tüm adımlar için tek matmul
+        projected = (X.reshape(-1, features).astype(np.float32, copy=False) @ kernel).reshape(steps, n, 4 * units)
+        projected += layer["bias"]
+        h = np.zeros((n, units), dtype=np.float32)
+        c = np.zeros((n, units), dtype=np.float32)
+        sequence = np.empty((steps, n, units), dtype=self.activation_dtype) if layer["return_sequences"] else None
+
+        for t in range(steps):
+            z = h @ recurrent
+            z += projected[t]
+            np.tanh(z, out=z)
+            z *= scale
+            z += shift
+            i, f, g, o = z[:, :units], z[:, units:2 * units], z[:, 2 * units:3 * units], z[:, 3 * units:]
+            c *= f
+            g *= i
+            c += g
+            h = np.tanh(c)
+            h *= o
+            if sequence is not None:
+                sequence[t] = h
+
+        return sequence if sequence is not None else h.astype(self.activation_dtype)
+
+    # --- Yükleme / export ---
+
+    @classmethod
+    def from_h5(cls, path: str, precision: str = "float32") -> "NumpyLSTMPredictor":
+        """Keras .h5 (Sequential) dosyasından; TensorFlow gerekmez"""
+        if not H5PY_AVAILABLE:
+            raise RuntimeError("h5py yok: .h5 okunamıyor (npz export kullanın)")
+        import h5py
+
+        with h5py.File(path, "r") as f:
+            config = json.loads(f.attrs["model_config"])
+            weights_root = f["model_weights"] if "model_weights" in f else f
+
+            def datasets(layer_name: str) -> dict:
+                found = {}
+
+                def collect(name, item):
+                    # Keras 3: .../lstm_cell/kernel, Keras 2: .../kernel:0
+                    if isinstance(item, h5py.Dataset):
+                        found[name.split("/")[-1].split(":")[0]] = item[()]
+
+                weights_root[layer_name].visititems(collect)
+                return found
+
+            layers = []
+            for layer in config["config"]["layers"]:
+                kind, layer_config = layer["class_name"], layer["config"]
+                if kind == "LSTM":
+                    weights = datasets(layer_config["name"])
+                    if layer_config.get("activation", "tanh") != "tanh" or layer_config.get("recurrent_activation", "sigmoid") != "sigmoid":
+                        raise ValueError(f"Desteklenmeyen LSTM aktivasyonu: {layer_config['name']}")
+                    layers.append({
+                        "type": "lstm", "return_sequences": bool(layer_config.get("return_sequences")),
+                        **{name: weights[name] for name in LSTM_WEIGHTS}
+                    })
+                elif kind == "Dense":
+                    weights = datasets(layer_config["name"])
+                    layers.append({
+                        "type": "dense", "activation": layer_config.get("activation"),
+                        "kernel": weights["kernel"], "bias": weights["bias"]
+                    })
+                elif kind not in ("InputLayer", "Dropout"):
+                    raise ValueError(f"Desteklenmeyen katman: {kind}")
+        return cls(layers, precision)
+
+    @classmethod
+    def from_npz(cls, path: str, precision: str = "float32") -> "NumpyLSTMPredictor":
+        with np.load(path, allow_pickle=False) as data:
+            spec = json.loads(str(data["spec"]))
+            layers = []
+            for index, layer in enumerate(spec):
+                layers.append({**layer, **{
+                    name: data[f"{index}_{name}"] for name in ("kernel", "recurrent_kernel", "bias")
+                    if f"{index}_{name}" in data
+                }})
+        return cls(layers, precision)
+
+    @classmethod
+    def load(cls, model_path: str, precision: str = "float32") -> "NumpyLSTMPredictor":
+        """Önce yanındaki .npz export'u, yoksa .h5"""
+        exported = numpy_path(model_path)
+        if os.path.exists(exported):
+            return cls.from_npz(exported, precision)
+        return cls.from_h5(model_path, precision)
+
+    def save(self, path: str):
+        """float32 ağırlıkları .npz olarak yazar (precision yüklemede seçilir)"""
+        arrays, spec = {}, []
+        for index, layer in enumerate(self.layers):
+            spec.append({key: value for key, value in layer.items() if key in ("type", "return_sequences", "activation")})
+            scale = layer.get("gate_scale", np.float32(1.0))
+            for name in ("kernel", "recurrent_kernel"):
+                if name in layer:
+                    arrays[f"{index}_{name}"] = self._float32(layer[name]) / scale
+            arrays[f"{index}_bias"] = layer["bias"] / scale
+        np.savez(path, spec=np.asarray(json.dumps(spec)), **arrays)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Keras LSTM .h5 → NumPy .npz export")
+    parser.add_argument("model_path", help="netpulse_lstm.h5")
+    parser.add_argument("--out", help="Varsayılan: aynı isimle .npz")
+    args = parser.parse_args()
+
+    predictor = NumpyLSTMPredictor.from_h5(args.model_path)
+    out = args.out or numpy_path(args.model_path)
+    predictor.save(out)
+    print(f"✅ {out} ({predictor.nbytes / 1024:.1f} KB float32 ağırlık)")
+
+
+if __name__ == "__main__":
+    main()
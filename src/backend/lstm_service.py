@@ -7,18 +7,45 @@ from collections import deque
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
+import importlib.util
 import logging
+import threading
+import time
 
-try:
-    from tensorflow.keras.models import load_model
-    TENSORFLOW_AVAILABLE = True
-except ImportError:
-    TENSORFLOW_AVAILABLE = False
-    
-import joblib
+import metrics
+from lstm_numpy import PRECISIONS as NUMPY_PRECISIONS
+
+# TensorFlow import'u saniyeler sürdüğü için burada sadece varlığı kontrol edilir;
+# asıl import model yüklenirken (_load_models) yapılır.
+TENSORFLOW_AVAILABLE = importlib.util.find_spec("tensorflow") is not None
 
 logger = logging.getLogger(__name__)
 
+# "keras": TensorFlow modeli; diğerleri lstm_numpy ile TensorFlow'suz inference
+LSTM_PRECISIONS = ("keras",) + NUMPY_PRECISIONS
+
+
+def lstm_precision_available(precision: str) -> bool:
+    return precision != "keras" or TENSORFLOW_AVAILABLE
+
+
+def load_lstm_artifacts(model_path: str, scaler_path: str, encoder_path: str,
+                        precision: str = "keras") -> Tuple:
+    """(model, scaler, encoder) üçlüsünü yükler; keras modunda TensorFlow yoksa RuntimeError"""
+    import joblib
+    
+    if precision != "keras":
+        from lstm_numpy import NumpyLSTMPredictor
+        model = NumpyLSTMPredictor.load(model_path, precision)
+        return model, joblib.load(scaler_path), joblib.load(encoder_path)
+    
+    if not TENSORFLOW_AVAILABLE:
+        raise RuntimeError("TensorFlow not available")
+    
+    from tensorflow.keras.models import load_model
+    
+    return load_model(model_path), joblib.load(scaler_path), joblib.load(encoder_path)
+
 @dataclass
 class PredictionResult:
     """Standardized prediction result"""
@@ -44,33 +71,81 @@ class LSTMPredictionService:
     - Confidence scoring
     - Trend detection
     - Graceful degradation
+    - Lazy loading (lazy=True: model load() çağrılana kadar yüklenmez)
+    - Hot swap: (model, scaler, encoder) tek referansla değişir (swap)
+    - precision: "keras" (TensorFlow) ya da float32 / float16 / int8 (lstm_numpy)
     """
     
     def __init__(self, model_path: str, scaler_path: str, encoder_path: str, 
-                 window_size: int = 12):  # Production setting
+                 window_size: int = 12,  # Production setting
+                 lazy: bool = False, shadow=None, precision: str = "keras"):
+        if precision not in LSTM_PRECISIONS:
+            raise ValueError(f"Bilinmeyen LSTM precision: {precision} ({', '.join(LSTM_PRECISIONS)})")
         self.window_size = window_size
-        self.model = None
-        self.scaler = None
-        self.encoder = None
+        self.precision = precision
+        # Tahmin yolları üçlüyü bir kez okur: swap sırasında yarı yeni / yarı eski model kullanılmaz
+        self._bundle: Tuple = (None, None, None)
+        self.version: Optional[str] = None
         self.is_available = False
+        self.load_state = "pending"  # pending | loading | ready | failed
+        # model_registry.ShadowScorer: her batch aday modelle de skorlanır
+        self.shadow = shadow
         
         # In-memory cache for rolling windows
         self.measurement_cache: Dict[int, deque] = {}
         
-        self._load_models(model_path, scaler_path, encoder_path)
+        self._model_paths = (model_path, scaler_path, encoder_path)
+        self._load_lock = threading.Lock()
+        
+        if not lazy:
+            self.load()
+    
+    @property
+    def model(self):
+        return self._bundle[0]
+    
+    @property
+    def scaler(self):
+        return self._bundle[1]
+    
+    @property
+    def encoder(self):
+        return self._bundle[2]
+    
+    def swap(self, model, scaler, encoder, version: Optional[str] = None):
+        """
+        Restart'sız model değişimi: measurement_cache (pencereler) korunur,
+        uçuştaki tahminler başladıkları modelle tamamlanır.
+        """
+        self._bundle = (model, scaler, encoder)
+        self.version = version
+        self.is_available = True
+        self.load_state = "ready"
+        logger.info(f"🔁 LSTM model değişti (versiyon: {version or 'legacy'})")
+    
+    def load(self) -> bool:
+        """
+        Modeli yükle (idempotent, thread-safe).
+        Warm-up thread'inden çağrılır; eşzamanlı çağrılar ilk yüklemeyi bekler.
+        """
+        with self._load_lock:
+            if self.load_state in ("ready", "failed"):
+                return self.is_available
+            self.load_state = "loading"
+            self._load_models(*self._model_paths)
+            self.load_state = "ready" if self.is_available else "failed"
+            return self.is_available
     
     def _load_models(self, model_path: str, scaler_path: str, encoder_path: str):
         """Load LSTM model with error handling"""
         try:
-            if not TENSORFLOW_AVAILABLE:
+            if not lstm_precision_available(self.precision):
                 logger.warning("TensorFlow not available. LSTM disabled.")
                 return
-                
-            self.model = load_model(model_path)
-            self.scaler = joblib.load(scaler_path)
-            self.encoder = joblib.load(encoder_path)
+            
+            self._bundle = load_lstm_artifacts(model_path, scaler_path, encoder_path, self.precision)
             self.is_available = True
-            logger.info("✅ LSTM model loaded successfully")
+            logger.info(f"✅ LSTM model loaded successfully (precision: {self.precision})")
             
         except Exception as e:
             logger.error(f"❌ LSTM model load failed: {e}")
@@ -97,7 +172,24 @@ class LSTMPredictionService:
         ]
         
         self.measurement_cache[subscriber_id].append(features)
-    
+
+    def add_measurements_bulk(self, subscriber_ids: List[int], features: List[List[float]]):
+        """
+        Append many measurements at once (telemetry ingestion)
+
+        Args:
+            subscriber_ids: Customer IDs in measurement order (may repeat)
+            features: Per measurement [latency_ms, packet_loss_ratio,
+                      snr_margin_db, download_usage_mbps]
+        """
+        cache = self.measurement_cache
+        window_size = self.window_size
+        for subscriber_id, row in zip(subscriber_ids, features):
+            window = cache.get(subscriber_id)
+            if window is None:
+                window = cache[subscriber_id] = deque(maxlen=window_size)
+            window.append(row)
+
     def predict(self, subscriber_id: int) -> Optional[PredictionResult]:
         """
         Make LSTM prediction if enough data available
@@ -110,22 +202,29 @@ class LSTMPredictionService:
             return None
         
         if subscriber_id not in self.measurement_cache:
+            metrics.CACHE_LOOKUPS.inc(cache="lstm_window", result="miss")
             logger.debug(f"No cache for subscriber {subscriber_id}")
             return None
         
         window = self.measurement_cache[subscriber_id]
         
         if len(window) < self.window_size:
+            metrics.CACHE_LOOKUPS.inc(cache="lstm_window", result="miss")
             logger.debug(f"Not enough data: {len(window)}/{self.window_size}")
             return None
         
+        metrics.CACHE_LOOKUPS.inc(cache="lstm_window", result="hit")
+        
+        model, scaler, _ = self._bundle
         try:
             # Prepare input
             X = np.array(list(window)).reshape(1, self.window_size, 4)
-            X_scaled = self.scaler.transform(X.reshape(-1, 4)).reshape(1, self.window_size, 4)
+            X_scaled = scaler.transform(X.reshape(-1, 4)).reshape(1, self.window_size, 4)
             
             # Predict
-            probs = self.model.predict(X_scaled, verbose=0)[0]
+            with metrics.timer(metrics.MODEL_INFERENCE_SECONDS, model="LSTM"):
+                probs = model.predict(X_scaled, verbose=0)[0]
+            metrics.MODEL_BATCH_SIZE.observe(X_scaled.shape[0], model="LSTM")
             pred_class = int(np.argmax(probs))
             confidence = float(np.max(probs))
             
@@ -141,14 +240,68 @@ class LSTMPredictionService:
             logger.error(f"LSTM prediction failed: {e}")
             return None
     
-    def analyze_trend(self, subscriber_id: int) -> Optional[TrendAnalysis]:
+    def predict_batch(self, subscriber_ids: List[int]) -> Dict[int, PredictionResult]:
+        """
+        Tam penceresi olan abonelerin hepsini tek model.predict çağrısında tahmin eder
+        
+        Returns:
+            {subscriber_id: PredictionResult} (yetersiz verisi olanlar dahil edilmez)
+        """
+        if not self.is_available:
+            return {}
+        
+        ready_ids = [
+            sid for sid in subscriber_ids
+            if len(self.measurement_cache.get(sid, ())) == self.window_size
+        ]
+        metrics.CACHE_LOOKUPS.inc(len(ready_ids), cache="lstm_window", result="hit")
+        metrics.CACHE_LOOKUPS.inc(len(subscriber_ids) - len(ready_ids), cache="lstm_window", result="miss")
+        if not ready_ids:
+            return {}
+        
+        model, scaler, _ = self._bundle
+        try:
+            X = np.array([list(self.measurement_cache[sid]) for sid in ready_ids], dtype=np.float64)
+            X_scaled = scaler.transform(X.reshape(-1, 4)).reshape(len(ready_ids), self.window_size, 4)
+            
+            started = time.perf_counter()
+            probs = model.predict(X_scaled, verbose=0)
+            elapsed = time.perf_counter() - started
+            metrics.MODEL_INFERENCE_SECONDS.observe(elapsed, model="LSTM")
+            metrics.MODEL_BATCH_SIZE.observe(len(ready_ids), model="LSTM")
+            
+            now = datetime.now()
+            classes = np.argmax(probs, axis=1)
+            confidences = np.max(probs, axis=1)
+            if self.shadow is not None:
+                self.shadow.submit("LSTM", X, classes, elapsed)
+            return {
+                sid: PredictionResult(
+                    model_name="LSTM",
+                    prediction_class=int(classes[i]),
+                    confidence=float(confidences[i]),
+                    probabilities=probs[i].tolist(),
+                    timestamp=now
+                )
+                for i, sid in enumerate(ready_ids)
+            }
+            
+        except Exception as e:
+            logger.error(f"LSTM batch prediction failed: {e}")
+            return {}
+    
+    def analyze_trend(self, subscriber_id: int, result: Optional[PredictionResult] = None) -> Optional[TrendAnalysis]:
         """
         Analyze trend from rolling window
         
+        Args:
+            result: predict_batch'ten gelen hazır tahmin (verilmezse predict çağrılır)
+        
         Returns:
             TrendAnalysis with risk assessment
         """
-        result = self.predict(subscriber_id)
+        if result is None:
+            result = self.predict(subscriber_id)
         if not result:
             return None
         
@@ -1,15 +1,18 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Match
 from pydantic import BaseModel
 from typing import Optional
 import psycopg2
-import pandas as pd
-import joblib
+import asyncio
 import os
+import base64
 import random
 import time
 import logging
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 import llm_service, telegram_service
 from lstm_service import (
     LSTMPredictionService,
@@ -17,7 +20,27 @@ from lstm_service import (
     PredictionResult
 )
 from status_tracker import StatusTracker
+from status_machine import StatusMachine
 from background_monitor import BackgroundMonitor
+from monitor_scheduler import SchedulerConfig
+from audit_log import AuditLogWriter, query_action_log
+from status_history import StatusHistoryWriter, query_status_history, count_flapping
+from scoring import (
+    simulate_metrics_single, classify_subscriber_status, load_forest_model, lstm_measurement
+)
+import metrics
+from fleet_snapshot import FleetSnapshotStore, STATUSES
+from region_stats import RegionAggregator
+from geo import fill_missing_locations
+from telemetry import RescoreQueue, TelemetryError, ingest_batch
+from scoring_worker import ScoringWorker
+from cascade_gate import CascadeGate, GateConfig
+from outage_correlation import OutageCorrelator, CorrelationConfig, query_incidents
+from dispatch import DispatchConfig, run_dispatch, technician_loads
+from model_registry import ModelManager, ModelRegistry, ShadowScorer
+from exports import (
+    ExportFilters, SUBSCRIBER_EXPORT, TICKET_EXPORT, STREAMERS, MEDIA_TYPES, OPENPYXL_AVAILABLE, export_filename
+)
 
 logger = logging.getLogger(__name__)
 
@@ -31,13 +54,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    """
+    Route şablonu bazında istek süresi ölçer ve şablonu current_endpoint'e yazar;
+    böylece aynı istekteki DB sorguları bu endpoint etiketiyle sayılır.
+    """
+    route_path = "unmatched"
+    for route in app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            route_path = route.path
+            break
+    
+    token = metrics.current_endpoint.set(route_path)
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method, route=route_path, status=status_code
+        )
+        metrics.current_endpoint.reset(token)
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 MODEL_PATH = os.path.join(BASE_DIR, 'saved_models', 'netpulse_classifier.pkl')
+FLAT_MODEL_DIR = os.path.join(BASE_DIR, 'saved_models', 'netpulse_classifier_flat')
 
 # LSTM Model Paths
 LSTM_MODEL_PATH = os.path.join(BASE_DIR, 'saved_models', 'netpulse_lstm.h5')
 LSTM_SCALER_PATH = os.path.join(BASE_DIR, 'saved_models', 'lstm_scaler.pkl')
 LSTM_ENCODER_PATH = os.path.join(BASE_DIR, 'saved_models', 'lstm_encoder.pkl')
+# keras (TensorFlow) | float32 | float16 | int8 (NumPy inference, TensorFlow gerekmez)
+LSTM_PRECISION = os.getenv("NETPULSE_LSTM_PRECISION", "keras")
+
+# Versiyonlu modeller (ACTIVE / SHADOW pointer'ları); yoksa yukarıdaki legacy dosyalar kullanılır
+MODEL_REGISTRY_DIR = os.getenv("NETPULSE_MODEL_REGISTRY", os.path.join(BASE_DIR, 'saved_models', 'registry'))
+# Pointer dosyaları bu aralıkla kontrol edilir (0 = sadece admin endpoint'leri)
+MODEL_WATCH_SECONDS = float(os.getenv("MODEL_WATCH_SECONDS", "30"))
 
 DB_CONFIG = {
     "dbname": "netpulse_db",
@@ -47,17 +105,38 @@ DB_CONFIG = {
     "port": "5432"
 }
 
-# Load Random Forest Model
+# Warm-up durumu (/health ve /ready)
+# Ağır modeller import sırasında değil, startup sonrası arka planda yüklenir.
+warmup_state = {
+    "rf_model": "pending",      # pending | loading | ready | failed
+    "lstm_cache": "pending",    # pending | loading | ready | disabled | external
+    "started_at": None,
+    "finished_at": None
+}
+
+# Random Forest Model (load_rf_model ile arka planda yüklenir)
 model = None
-try:
-    model = joblib.load(MODEL_PATH)
-    logger.info("✅ Random Forest model loaded")
-except Exception as e:
-    logger.warning(f"⚠️ Random Forest load failed: {e}")
 
-# Initialize LSTM Service
+def load_rf_model():
+    global model
+    if model is not None:
+        # Registry versiyonu zaten yüklendi
+        return
+    warmup_state["rf_model"] = "loading"
+    try:
+        model = load_forest_model(FLAT_MODEL_DIR, MODEL_PATH)
+        warmup_state["rf_model"] = "ready"
+    except Exception as e:
+        warmup_state["rf_model"] = "failed"
+        logger.warning(f"⚠️ Random Forest load failed: {e}")
+
+# Aday model (shadow) aktif modelle aynı batch'leri arka planda skorlar
+shadow_scorer = ShadowScorer()
+
+# Initialize LSTM Service (lazy: TensorFlow warm-up sırasında yüklenir)
 lstm_service = LSTMPredictionService(
-    LSTM_MODEL_PATH, LSTM_SCALER_PATH, LSTM_ENCODER_PATH
+    LSTM_MODEL_PATH, LSTM_SCALER_PATH, LSTM_ENCODER_PATH, lazy=True, shadow=shadow_scorer,
+    precision=LSTM_PRECISION
 )
 
 # Initialize Hybrid Ensemble Model
@@ -66,81 +145,90 @@ hybrid_model = HybridEnsembleModel(rf_weight=0.6, lstm_weight=0.4)
 # Background Monitor (initialized at startup)
 background_monitor = None
 
+# Scoring modu:
+# - embedded: BackgroundMonitor bu süreçte çalışır (tek uvicorn worker)
+# - external: skorlama scoring_worker.py shard'larında; API subscriber_scores'tan okur
+#             (süreç durumsuzdur, istenen sayıda uvicorn worker ile çalışabilir)
+SCORING_MODE = os.getenv("NETPULSE_SCORING_MODE", "embedded")
+
+# Dashboard agregasyonları için kolon bazlı fleet snapshot
+# Her monitor taramasından sonra ve en geç FLEET_SNAPSHOT_REFRESH_SECONDS'ta bir yenilenir
+FLEET_SNAPSHOT_REFRESH_SECONDS = float(os.getenv("FLEET_SNAPSHOT_REFRESH_SECONDS", "60"))
+
+# Embedded monitor: saniye başına toplam ölçüm bütçesi (riskli aboneler 1 dk, stabil olanlar 15 dk aralıkla)
+MONITOR_BUDGET_PER_SECOND = float(os.getenv("MONITOR_BUDGET_PER_SECOND", "200"))
+
+# Telemetri ile ölçümü gelen aboneler bu aralıkta, en fazla TELEMETRY_RESCORE_BATCH'lik gruplarla skorlanır
+TELEMETRY_RESCORE_SECONDS = float(os.getenv("TELEMETRY_RESCORE_SECONDS", "2"))
+TELEMETRY_RESCORE_BATCH = int(os.getenv("TELEMETRY_RESCORE_BATCH", "1000"))
+
+# Açık ticket'lar en geç DISPATCH_INTERVAL_SECONDS'ta bir toplu olarak teknisyenlere atanır;
+# yeni ticket açıldığında tur beklemeden tetiklenir (0 = otomatik dispatch kapalı)
+DISPATCH_INTERVAL_SECONDS = float(os.getenv("DISPATCH_INTERVAL_SECONDS", "30"))
+dispatch_config = DispatchConfig.from_env()
+dispatch_wakeup = threading.Event()
+
 def get_db_connection():
+    endpoint = metrics.current_endpoint.get()
     try:
-        return psycopg2.connect(**DB_CONFIG)
+        with metrics.timer(metrics.DB_CONNECT_SECONDS, endpoint=endpoint):
+            return psycopg2.connect(cursor_factory=metrics.InstrumentedCursor, **DB_CONFIG)
     except:
+        metrics.DB_CONNECT_FAILURES.inc(endpoint=endpoint)
         return None
 
-# --- YARDIMCI FONKSİYONLAR ---
+# Audit Log Writer (action_log olayları buffer'lanıp COPY ile yazılır)
+audit_writer = AuditLogWriter(get_db_func=get_db_connection)
 
-def generate_fault_scenario(scenario_type):
-    """Arıza türüne göre mantıklı bir SEBEP, AKSİYON ve SÜRE üretir."""
-    if scenario_type == "ping":
-        return {"cause": "Bölgesel veri trafiği yoğunluğu", "action": "Yük dengeleme aktif edildi", "eta": "30 dk"}
-    elif scenario_type == "speed":
-        return {"cause": "Ana fiber omurgada sinyal zayıflaması", "action": "Santral optimizasyonu başlatıldı", "eta": "1 saat"}
-    elif scenario_type == "loss":
-        return {"cause": "Saha dolabında donanım arızası", "action": "Saha ekibi yönlendirildi", "eta": "3 saat"}
+# Durum geçişleri subscriber_status_history'ye aynı şekilde buffer'lanıp toplu yazılır
+status_history = StatusHistoryWriter(get_db_func=get_db_connection)
+
+def notify_outage_incident(event: str, incident):
+    """Bölgesel arıza açılış / kapanışında abone başına değil, incident başına tek kayıt + bildirim"""
+    if event == "opened":
+        note = f"Bölgesel arıza #{incident.incident_id}: {incident.group_key} - {incident.affected}/{incident.member_count} abone etkilendi (ticket #{incident.ticket_id})"
     else:
-        return {"cause": "Planlı bakım çalışması", "action": "Sistem güncelleniyor", "eta": "15 dk"}
+        note = f"Bölgesel arıza #{incident.incident_id} kapandı: {incident.group_key} (en fazla {incident.peak_affected} abone)"
+    audit_writer.log(0, f'regional_incident_{event}', incident.group_key, note)
+    icon = "🚨" if event == "opened" else "✅"
+    telegram_service.send_telegram_message(f"{icon} **NetPulse NOC**\n\n{note}")
+
+# Her taramadan sonra eş zamanlı bozulmalar bölge bazında korele edilir (bkz. outage_correlation.py)
+outage_correlator = OutageCorrelator(
+    get_db_func=get_db_connection, config=CorrelationConfig.from_env(), on_incident=notify_outage_incident
+)
 
-def simulate_metrics_single(plan, force_trouble=False):
-    """Tekil kullanıcı için detaylı simülasyon (Eski fonksiyonumuz)"""
-    is_problem = random.random() < 0.2 or force_trouble
-    
-    metrics = {
-        "latency": random.uniform(10, 50),
-        "packet_loss": random.uniform(0, 0.05),
-        "jitter": random.uniform(1, 10),
-        "download_speed": 100.0,
-        "upload_speed": 20.0,
-        "signal_strength": random.uniform(-60, -30),
-        "connected_devices": random.randint(1, 10)
-    }
-    
-    fault_details = None
-
-    if "1000" in plan: metrics["download_speed"] = random.uniform(800, 1000)
-    elif "100" in plan: metrics["download_speed"] = random.uniform(80, 100)
-    else: metrics["download_speed"] = random.uniform(20, 50)
-
-    if is_problem:
-        scenario_type = random.choice(["ping", "speed", "loss"])
-        if force_trouble: scenario_type = "loss"
-        
-        if scenario_type == "ping":
-            metrics["latency"] = random.uniform(150, 400)
-            metrics["jitter"] = random.uniform(50, 150)
-        elif scenario_type == "speed":
-            metrics["download_speed"] = random.uniform(1, 10)
-        elif scenario_type == "loss":
-            metrics["packet_loss"] = random.uniform(10, 40)
-            metrics["signal_strength"] = random.uniform(-90, -80)
-            
-        fault_details = generate_fault_scenario(scenario_type)
+# Bölge özeti fleet snapshot'la senkronlanır, aradaki durum/risk değişiklikleri artımlı işlenir
+region_aggregator = RegionAggregator()
 
-    return metrics, fault_details, is_problem
+def on_snapshot_rebuild(snapshot):
+    region_aggregator.resync(snapshot)
+    outage_correlator.observe(snapshot)
+    metrics.OUTAGE_ACTIVE_INCIDENTS.set(len(outage_correlator.active))
 
-# --- YENİ EKLENEN KISIM: TRAFFIC LIGHT SEGMENTASYONU ---
+fleet_store = FleetSnapshotStore(get_db_func=get_db_connection, lstm_service=lstm_service, on_rebuild=on_snapshot_rebuild)
 
-def classify_subscriber_status(metrics, ai_prediction):
-    """
-    Traffic Light Algoritması:
-    Ham verileri ve AI tahminini birleştirip RENK kararı verir.
-    """
-    # 1. Kırmızı Kuralı (Kritik)
-    if ai_prediction in [2, 3] or metrics['packet_loss'] > 5 or metrics['download_speed'] < 5:
-        return "RED"
-    
-    # 2. Sarı Kuralı (Riskli / Warning)
-    # AI 'Normal' dese bile Ping yüksekse veya Hız dalgalıysa SARI yak.
-    # Bu, "Kestirimci Bakım" (Predictive) özelliğidir.
-    if metrics['latency'] > 80 or metrics['jitter'] > 30 or ai_prediction == 1:
-        return "YELLOW"
-    
-    # 3. Yeşil Kuralı (Normal)
-    return "GREEN"
+# Telemetri rescoring: worker'ın batch skorlama + reconcile + publish yolu tek shard olarak kullanılır
+rescore_queue = RescoreQueue()
+telemetry_scorer = ScoringWorker(
+    shard_id=0, shard_count=1, get_db_func=get_db_connection,
+    lstm_service=lstm_service, batch_size=TELEMETRY_RESCORE_BATCH,
+    gate=CascadeGate(GateConfig.from_env()), history=status_history, shadow=shadow_scorer
+)
+
+def swap_rf_model(new_model):
+    """Hot swap: uçuştaki istekler eski referansla biter"""
+    global model
+    model = new_model
+    telemetry_scorer.rf_model = new_model
+    warmup_state["rf_model"] = "ready"
+
+# External modda LSTM bu süreçte çalışmaz; registry sadece RF'i değiştirir
+model_manager = ModelManager(
+    ModelRegistry(MODEL_REGISTRY_DIR),
+    lstm_service=lstm_service if SCORING_MODE != "external" else None,
+    on_rf_swap=swap_rf_model, shadow=shadow_scorer
+)
 
 @app.get("/")
 def home():
@@ -158,11 +246,30 @@ from typing import List, Optional
 @app.get("/api/technicians")
 def get_technicians():
     conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, name, expertise, status FROM technicians")
-    techs = cursor.fetchall()
-    conn.close()
-    return [{"id": t[0], "name": t[1], "expertise": t[2], "status": t[3]} for t in techs]
+    try:
+        return technician_loads(conn)
+    finally:
+        conn.close()
+
+@app.post("/api/dispatch/run")
+def trigger_dispatch(rebalance: bool = False):
+    """
+    Bekleyen ticket'ları hemen teknisyenlere atar.
+    rebalance=true henüz kabul edilmemiş (CREATED) atamaları da yeniden çözer.
+    """
+    try:
+        conn = get_db_connection()
+        if not conn:
+            raise HTTPException(status_code=500, detail="Database fail")
+        try:
+            return run_dispatch(conn, dispatch_config, rebalance=rebalance)
+        finally:
+            conn.close()
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Dispatch error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/actions/{action_type}")
 def perform_action(action_type: str, subscriber_id: int = 0):
@@ -179,7 +286,8 @@ def simulate_network(subscriber_id: int, force_trouble: bool = False):
     cursor = conn.cursor()
     # Fetch extended info
     cursor.execute("""
-        SELECT full_name, subscription_plan, region_id, gender, phone_number, modem_model, ip_address, uptime 
+        SELECT full_name, subscription_plan, region_id, gender, phone_number, modem_model, ip_address, uptime,
+               latitude, longitude, location_address
         FROM customers WHERE subscriber_id = %s
     """, (subscriber_id,))
     customer = cursor.fetchone()
@@ -188,37 +296,11 @@ def simulate_network(subscriber_id: int, force_trouble: bool = False):
         conn.close()
         raise HTTPException(status_code=404, detail="User not found")
 
-    name, plan, region, gender, phone, modem, ip, uptime = customer
-    
-    # Generate unique location based on subscriber_id  
-    # İstanbul bölgeleri için yaklaşık koordinatlar
-    region_coords = {
-        "Kadıköy": (40.99, 29.03),
-        "Beşiktaş": (41.04, 29.00),
-        "Üsküdar": (41.02, 29.01),
-        "Şişli": (41.06, 28.99),
-        "Bakırköy": (40.98, 28.87)
-    }
-    
-    base_region = region.split('/')[0]  # "Kadıköy/Moda" -> "Kadıköy"
-    base_lat, base_lon = region_coords.get(base_region, (41.01, 28.98))
-    
-    # Her abone için benzersiz offset (subscriber_id'ye göre deterministic)
-    import hashlib
-    hash_val = int(hashlib.md5(str(subscriber_id).encode()).hexdigest(), 16)
-    lat_offset = (hash_val % 100) / 10000.0  # 0.0000-0.0099 arası
-    lon_offset = ((hash_val // 100) % 100) / 10000.0
-    
-    subscriber_lat = base_lat + lat_offset - 0.005  # Merkezden sapma
-    subscriber_lon = base_lon + lon_offset - 0.005
+    name, plan, region, gender, phone, modem, ip, uptime, subscriber_lat, subscriber_lon, location_address = customer
     
-    # Rastgele sokak adı (subscriber_id'ye göre deterministic)
-    street_names = ["Bağdat Caddesi", "Nispetiye Caddesi", "Acıbadem Caddesi", 
-                    "Teşvikiye Caddesi", "Atatürk Caddesi", "Cumhuriyet Caddesi",
-                    "İstiklal Caddesi", "Bahariye Caddesi", "Moda Caddesi"]
-    street_index = subscriber_id % len(street_names)
-    building_no = (subscriber_id % 200) + 1
-    location_address = f"{street_names[street_index]} No:{building_no}, {region}"
+    # Konum customers'ta önceden hesaplı (006_customer_geo); eksikse bir kez hesaplanıp yazılır
+    if subscriber_lat is None:
+        subscriber_lat, subscriber_lon, location_address = fill_missing_locations(conn, [(subscriber_id, region)])[subscriber_id]
     
     # Fetch Recent Tickets (YENİ SCHEMA)
     cursor.execute("""
@@ -245,7 +327,7 @@ def simulate_network(subscriber_id: int, force_trouble: bool = False):
     row = cursor.fetchone()
     db_status = row[0] if row else None
     
-    conn.close()
+    # conn açık kalır: aşağıdaki StatusTracker aynı bağlantıyı kullanır (finally'de kapanır)
 
     # Eğer DB'de bir sorun kaydı varsa, simülasyonu ona göre zorla
     force_metrics_state = None
@@ -276,25 +358,31 @@ def simulate_network(subscriber_id: int, force_trouble: bool = False):
     # 1. LSTM
     lstm_result = None
     if lstm_service and lstm_service.is_available:
-        lstm_service.add_measurement(subscriber_id, live_data)
+        lstm_service.add_measurement(subscriber_id, lstm_measurement(live_data))
         lstm_result = lstm_service.predict(subscriber_id)
         
     # 2. RF
     prediction_code = 0
     rf_confidence = 0.5
     try:
-        prediction_code = int(model.predict(pd.DataFrame([live_data]))[0]) if model else 0
+        if model:
+            import pandas as pd
+            with metrics.timer(metrics.MODEL_INFERENCE_SECONDS, model="RandomForest"):
+                prediction_code = int(model.predict(pd.DataFrame([live_data]))[0])
+            metrics.MODEL_BATCH_SIZE.observe(1, model="RandomForest")
     except: pass
     
     rf_result = PredictionResult("RandomForest", prediction_code, rf_confidence, [], datetime.now())
     
     # 3. Hybrid
     final_risk, segment_color, ensemble_reason = hybrid_model.combine_predictions(rf_result, lstm_result) if hybrid_model else (0, "GREEN", "System Log")
+    if hybrid_model:
+        region_aggregator.update_risk(subscriber_id, final_risk)
     
     # [KRITIK] Status Persistence - Prevent rapid status flipping
     # Use StatusTracker to enforce minimum durations (RED=10min, YELLOW=5min)
     try:
-        tracker = StatusTracker(conn)
+        tracker = StatusTracker(conn, history=status_history)
         
         # Check if we're allowed to change to the AI-predicted status
         permission = tracker.should_allow_status_change(subscriber_id, segment_color)
@@ -309,15 +397,19 @@ def simulate_network(subscriber_id: int, force_trouble: bool = False):
             # Status change allowed and different from DB - update via tracker
             logger.info(f"✅ Status change allowed for {subscriber_id}: {db_status} → {segment_color}")
             tracker.update_status(subscriber_id, segment_color, fault_type="network_degradation")
+            region_aggregator.update_status(subscriber_id, segment_color)
         elif not db_status:
             # First time - initialize status
             tracker.update_status(subscriber_id, segment_color)
+            region_aggregator.update_status(subscriber_id, segment_color)
     except Exception as e:
         logger.error(f"❌ StatusTracker error for {subscriber_id}: {e}")
         # Fallback to old behavior
         if db_status and db_status in ["RED", "YELLOW", "GREEN"]:
             segment_color = db_status
             ensemble_reason = f"DB synchronized status ({db_status})"
+    finally:
+        conn.close()
 
     
     # --- DETAILED NARRATIVE ANALYSIS ---
@@ -329,7 +421,10 @@ def simulate_network(subscriber_id: int, force_trouble: bool = False):
         estimated_fix = "Gerekli değil"
     else:
         # Story logic
-        if region_fault_count > 5:
+        incident = outage_correlator.incident_for(subscriber_id)
+        if incident:
+            region_fault_count = max(region_fault_count, incident.affected)
+        if incident or region_fault_count > 5:
             analysis_story = f"{region} bölgesinde kritik seviyede altyapı sorunu tespit edildi. Sorun sadece sizin hattınızda değil, bölge genelindeki {region_fault_count} aboneyi etkiliyor. Analiz sonuçları ana dağıtım noktasında (MDF/ODF) fiziksel veya konfigürasyon problemi olduğunu gösteriyor. Saha ekiplerimiz acil müdahale için görevlendirilmiştir. Fiber altyapı testi ve dağıtım noktası kontrolü yapılacaktır. Bu tür bölgesel arızalar genellikle 2-4 saat içinde çözülmektedir."
             estimated_fix = "2-4 Saat"
         else:
@@ -391,6 +486,7 @@ def scan_network_batch():
     }
     
     # Toplu Simülasyon Döngüsü
+    proposed = []
     for cust in customers:
         sub_id, name, plan, region = cust
         
@@ -432,36 +528,29 @@ def scan_network_batch():
             ai_pred = 0 # AI henüz hata demiyor ama biz RISK görüyoruz
             
         # Segmentasyon Fonksiyonunu Çağır
-        proposed_color = classify_subscriber_status(metrics, ai_pred)
-        
-        # [PERSISTENCE] Status Tracker Entegrasyonu
-        # Random üretim GREEN dese bile, eğer DB'de RED varsa ve süre dolmadıysa RED kalmalı
-        
-        final_color = proposed_color
-        try:
-            tracker = StatusTracker(conn)
-            permission = tracker.should_allow_status_change(sub_id, proposed_color)
-            
-            if permission["allowed"]:
-                # Değişikliğe izin var, yeni durumu kaydet
-                if proposed_color != "GREEN": # Sadece sorunları logla, performansı koru
-                    logger.info(f"⚡ Batch Scan: Status change allowed for {sub_id}: → {proposed_color}")
-                
-                tracker.update_status(sub_id, proposed_color)
-                final_color = proposed_color
-            else:
-                # İzin yok, mevcut durumu koru (DB'den ne geldiyse o)
-                # Ancak DB statüsünü bilmiyoruz, sorgulamamız lazım
-                current_status_info = tracker.get_current_status(sub_id)
-                final_color = current_status_info["current"]
-                # logger.info(f"🔒 Batch Scan: Status change blocked for {sub_id}: {permission['reason']}")
-
-        except Exception as e:
-            logger.error(f"Batch scan persistence error: {e}")
-            # Hata durumunda proposed kullan
-            final_color = proposed_color
-            
-        color = final_color
+        proposed.append((cust, classify_subscriber_status(metrics, ai_pred), metrics))
+    
+    # [PERSISTENCE] Status Machine Entegrasyonu
+    # Random üretim GREEN dese bile, eğer DB'de RED varsa ve süre dolmadıysa RED kalmalı.
+    # Kurallar tüm tarama için tek sorgu + tek vektörel çağrıyla değerlendirilir.
+    final_colors = [color for _, color, _ in proposed]
+    try:
+        sub_ids = [cust[0] for cust, _, _ in proposed]
+        machine = StatusMachine.from_env()
+        machine.load_from_db(conn, sub_ids)
+        decision = machine.evaluate(sub_ids, final_colors)
+        
+        changes = StatusTracker(conn, history=status_history).apply_transitions(decision)
+        for change in changes:
+            if change["new_status"] != "GREEN": # Sadece sorunları logla, performansı koru
+                logger.info(f"⚡ Batch Scan: Status change allowed for {change['subscriber_id']}: → {change['new_status']}")
+        final_colors = [STATUSES[code] for code in decision.final_status.tolist()]
+    except Exception as e:
+        logger.error(f"Batch scan persistence error: {e}")
+        # Hata durumunda proposed kullan
+    
+    for (cust, _, metrics), color in zip(proposed, final_colors):
+        sub_id, name, plan, region = cust
 
         # İstatistiklere Ekle
         results["counts"][color] += 1
@@ -484,6 +573,40 @@ def scan_network_batch():
     return results
 
 
+@app.post("/api/telemetry/batch")
+async def ingest_telemetry(request: Request):
+    """
+    Collector'lardan toplu ölçüm (msgpack / Arrow IPC / JSON, bkz. telemetry.py).
+    Geçerli satırlar LSTM penceresine eklenir ve aboneler rescoring kuyruğuna alınır;
+    geçersiz satırlar nedenleriyle sayılıp atlanır.
+    """
+    if SCORING_MODE == "external":
+        raise HTTPException(status_code=501, detail="Telemetry ingestion requires embedded scoring mode")
+    if warmup_state["lstm_cache"] != "ready":
+        raise HTTPException(
+            status_code=503,
+            detail=f"LSTM cache is {warmup_state['lstm_cache']}. Retry shortly.",
+            headers={"Retry-After": "10"}
+        )
+    
+    body = await request.body()
+    started = time.perf_counter()
+    try:
+        result = await asyncio.to_thread(
+            ingest_batch, body, request.headers.get("content-type"), lstm_service, rescore_queue
+        )
+    except TelemetryError as e:
+        metrics.TELEMETRY_READINGS.inc(result="invalid_batch")
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    
+    metrics.TELEMETRY_BATCH_SECONDS.observe(time.perf_counter() - started, format=result["format"])
+    metrics.TELEMETRY_READINGS.inc(result["accepted"], result="accepted")
+    for reason, count in result["rejected"].items():
+        metrics.TELEMETRY_READINGS.inc(count, result=reason)
+    metrics.RESCORE_QUEUE_DEPTH.set(result["rescore_queue"])
+    return JSONResponse(status_code=202, content=result)
+
+
 # --- 3. ENDPOINT: LSTM TREND ANALİZİ (YENİ!) ---
 @app.get("/api/trend/{subscriber_id}")
 def get_trend_analysis(subscriber_id: int):
@@ -491,7 +614,16 @@ def get_trend_analysis(subscriber_id: int):
     LSTM-based trend analysis for proactive monitoring
     Returns detailed risk forecast and trend direction
     """
+    if SCORING_MODE == "external":
+        return get_trend_from_store(subscriber_id)
+    
     if not lstm_service.is_available:
+        if lstm_service.load_state in ("pending", "loading"):
+            raise HTTPException(
+                status_code=503,
+                detail="LSTM model is warming up. Retry shortly.",
+                headers={"Retry-After": "5"}
+            )
         raise HTTPException(
             status_code=503, 
             detail="LSTM service unavailable. Model not loaded."
@@ -537,30 +669,407 @@ def get_trend_analysis(subscriber_id: int):
             "model_name": "LSTM"
         }
     }
+def get_trend_from_store(subscriber_id: int):
+    """External scoring modunda trend analizi scoring worker'ın son yazdığı sonuçtan okunur"""
+    try:
+        conn = get_db_connection()
+        if not conn:
+            raise HTTPException(status_code=500, detail="Database fail")
+        
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT c.full_name, s.trend, s.scored_at, s.lstm_class
+            FROM customers c
+            LEFT JOIN subscriber_scores s ON s.subscriber_id = c.subscriber_id
+            WHERE c.subscriber_id = %s
+        """, (subscriber_id,))
+        row = cursor.fetchone()
+        conn.close()
+        
+        if not row:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        customer_name, trend, scored_at, lstm_class = row
+        if not trend:
+            raise HTTPException(
+                status_code=400,
+                detail="Not enough data for trend analysis. Scoring worker has not published a trend yet."
+            )
+        
+        return {
+            "subscriber_id": subscriber_id,
+            "customer_name": customer_name,
+            "analysis": {
+                "current_risk": round(trend["current_risk"], 3),
+                "trend_direction": trend["trend_direction"],
+                "forecast_30min": round(trend["forecast_30min"], 3),
+                "risk_chart": [round(r, 3) for r in trend["risk_chart"]],
+                "recommendation": trend["recommendation"],
+                "severity": "HIGH" if trend["forecast_30min"] > 0.7 else ("MEDIUM" if trend["forecast_30min"] > 0.4 else "LOW")
+            },
+            "metadata": {
+                "measurements_count": len(trend["risk_chart"]),
+                "window_size": lstm_service.window_size,
+                "model_status": "external",
+                "model_name": "LSTM",
+                "scored_at": scored_at.isoformat()
+            }
+        }
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Trend store read error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/fleet/summary")
+def get_fleet_summary(top_k: int = Query(20, ge=1, le=500)):
+    """
+    Dashboard özeti: durum sayıları, bölge × durum matrisi, risk histogramı, en riskli aboneler.
+    Güncel fleet snapshot'tan hesaplanır; varsayılan top_k için önceden serialize edilmiş yanıt döner.
+    """
+    snapshot = fleet_store.current
+    if snapshot is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Fleet snapshot is warming up. Retry shortly.",
+            headers={"Retry-After": "5"}
+        )
+    
+    headers = {"X-Fleet-Snapshot-Version": str(snapshot.version)}
+    if top_k == 20:
+        return Response(content=snapshot.summary_json(), media_type="application/json", headers=headers)
+    return JSONResponse(content=snapshot.summary(top_k), headers=headers)
+
+
+@app.get("/api/regions/summary")
+def get_region_summary(request: Request):
+    """
+    RegionalMap / InteractiveTurkeyMap için bölge başına durum sayıları, ortalama risk
+    ve en kötü abone id'leri. Yanıt filo boyutundan bağımsız birkaç KB'dır;
+    içerik değişmediyse If-None-Match ile 304 döner.
+    """
+    if fleet_store.current is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Fleet snapshot is warming up. Retry shortly.",
+            headers={"Retry-After": "5"}
+        )
+    
+    etag, body = region_aggregator.payload()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@app.get("/api/subscribers/geo")
+def get_subscribers_geo(region: Optional[str] = None, status: Optional[str] = None):
+    """
+    Harita için tüm abonelerin konumu (kolon bazlı, kompakt):
+    {"ids": [...], "lat": [...], "lon": [...], "status": [...], "region": [...]}
+    Konumlar customers'tan okunur; eksik olanlar hesaplanıp yazılır.
+    """
+    try:
+        conn = get_db_connection()
+        if not conn:
+            raise HTTPException(status_code=500, detail="Database fail")
+        
+        conditions, params = [], []
+        if region:
+            conditions.append("c.region_id = %s")
+            params.append(region)
+        if status:
+            conditions.append("COALESCE(ss.current_status::text, 'GREEN') = %s")
+            params.append(status.upper())
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT c.subscriber_id, c.region_id, c.latitude, c.longitude,
+                   COALESCE(ss.current_status::text, 'GREEN')
+            FROM customers c
+            LEFT JOIN subscriber_status ss ON ss.subscriber_id = c.subscriber_id
+            {where}
+            ORDER BY c.subscriber_id
+        """, params)
+        rows = cursor.fetchall()
+        
+        missing = [(r[0], r[1]) for r in rows if r[2] is None]
+        filled = fill_missing_locations(conn, missing) if missing else {}
+        conn.close()
+        
+        result = {"ids": [], "lat": [], "lon": [], "status": [], "region": []}
+        for sid, reg, lat, lon, current in rows:
+            if lat is None:
+                lat, lon, _ = filled[sid]
+            result["ids"].append(sid)
+            result["lat"].append(round(lat, 5))
+            result["lon"].append(round(lon, 5))
+            result["status"].append(current)
+            result["region"].append(reg)
+        
+        return result
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Geo endpoint error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/scores/{subscriber_id}")
+def get_subscriber_score(subscriber_id: int):
+    """Scoring worker'ın abone için yayınladığı son skor"""
+    try:
+        conn = get_db_connection()
+        if not conn:
+            raise HTTPException(status_code=500, detail="Database fail")
+        
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT shard_id, segment, proposed_segment, risk_score, reason,
+                   rf_class, lstm_class, lstm_confidence, live_metrics, scored_at
+            FROM subscriber_scores
+            WHERE subscriber_id = %s
+        """, (subscriber_id,))
+        row = cursor.fetchone()
+        conn.close()
+        
+        if not row:
+            raise HTTPException(status_code=404, detail="Score not found")
+        
+        return {
+            "subscriber_id": subscriber_id,
+            "shard_id": row[0],
+            "segment": row[1],
+            "proposed_segment": row[2],
+            "risk_score": row[3],
+            "reason": row[4],
+            "rf_class": row[5],
+            "lstm_class": row[6],
+            "lstm_confidence": row[7],
+            "live_metrics": row[8],
+            "scored_at": row[9].isoformat()
+        }
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Score read error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/scoring/workers")
+def get_scoring_workers(stale_after_seconds: int = 900):
+    """Scoring worker heartbeat'leri; stale_after_seconds'tan eski heartbeat 'stale' sayılır"""
+    try:
+        conn = get_db_connection()
+        if not conn:
+            raise HTTPException(status_code=500, detail="Database fail")
+        
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT shard_id, shard_count, hostname, pid, subscribers, last_sweep_ms,
+                   started_at, heartbeat_at,
+                   heartbeat_at < NOW() - make_interval(secs => %s) AS stale
+            FROM scoring_workers
+            ORDER BY shard_id
+        """, (stale_after_seconds,))
+        workers = [
+            {
+                "shard_id": r[0],
+                "shard_count": r[1],
+                "hostname": r[2],
+                "pid": r[3],
+                "subscribers": r[4],
+                "last_sweep_ms": r[5],
+                "started_at": r[6].isoformat(),
+                "heartbeat_at": r[7].isoformat(),
+                "stale": r[8]
+            }
+            for r in cursor.fetchall()
+        ]
+        conn.close()
+        
+        return {"mode": SCORING_MODE, "workers": workers}
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Scoring workers read error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # === STARTUP & SHUTDOWN EVENTS ===
 
+async def start_background_monitor():
+    """Embedded modda LSTM cache'i kurar ve periyodik monitoring'i başlatır"""
+    global background_monitor
+    
+    if not lstm_service.is_available:
+        warmup_state["lstm_cache"] = "disabled"
+        logger.warning("⚠️ LSTM unavailable, background monitoring disabled")
+        return
+    
+    warmup_state["lstm_cache"] = "loading"
+    background_monitor = BackgroundMonitor(
+        get_db_func=get_db_connection,
+        lstm_service=lstm_service,
+        simulate_func=simulate_metrics_single,
+        on_sweep=fleet_store.rebuild,
+        scheduler_config=SchedulerConfig(budget_per_second=MONITOR_BUDGET_PER_SECOND)
+    )
+    
+    await background_monitor.start()
+    warmup_state["lstm_cache"] = "ready"
+    logger.info("✅ Background monitoring aktif!")
+
+
+async def warm_up():
+    """
+    Arka plan warm-up:
+    1. Random Forest modelini yükle
+    2. (embedded) TensorFlow + LSTM modelini yükle
+    3. (embedded) Tüm aboneler için LSTM cache oluştur (12 ölçüm) ve periodic monitoring başlat
+    Bu sürede API istek kabul eder; model gerektiren endpoint'ler degrade çalışır.
+    """
+    warmup_state["started_at"] = datetime.now()
+    
+    # Registry'de aktif versiyon varsa o yüklenir; eksik kalan modeller legacy dosyalardan
+    await asyncio.to_thread(model_manager.poll)
+    await asyncio.to_thread(load_rf_model)
+    
+    if SCORING_MODE == "external":
+        # LSTM ve monitoring scoring_worker.py shard'larında çalışır
+        warmup_state["lstm_cache"] = "external"
+        logger.info("📡 Scoring modu: external (skorlar scoring worker'larından okunur)")
+    else:
+        await asyncio.to_thread(lstm_service.load)
+        await start_background_monitor()
+        asyncio.create_task(rescore_telemetry())
+    
+    warmup_state["finished_at"] = datetime.now()
+    elapsed = (warmup_state["finished_at"] - warmup_state["started_at"]).total_seconds()
+    logger.info(f"🔥 Warm-up tamamlandı ({elapsed:.1f} sn)")
+
+
 @app.on_event("startup")
 async def startup_event():
     """
-    Backend başlangıcında:
-    1. Tüm 500 abone için LSTM cache oluştur (12 ölçüm)
-    2. Otomatik periodic monitoring başlat (her 5 dakika)
+    Backend başlangıcında audit writer'ı başlatır ve model warm-up'ını
+    arka plana atar; sunucu modeller yüklenmeden istek kabul etmeye başlar.
     """
-    global background_monitor
-    
     logger.info("🚀 NetPulse Backend başlatılıyor...")
     
-    if lstm_service and lstm_service.is_available:
-        background_monitor = BackgroundMonitor(
-            get_db_func=get_db_connection,
-            lstm_service=lstm_service,
-            simulate_func=simulate_metrics_single
-        )
-        
-        await background_monitor.start()
-        logger.info("✅ Background monitoring aktif! (500 abone)")
-    else:
-        logger.warning("⚠️ LSTM unavailable, background monitoring disabled")
+    audit_writer.start()
+    status_history.start()
+    asyncio.create_task(warm_up())
+    asyncio.create_task(refresh_fleet_snapshot())
+    if DISPATCH_INTERVAL_SECONDS > 0:
+        asyncio.create_task(dispatch_loop())
+    if MODEL_WATCH_SECONDS > 0:
+        asyncio.create_task(watch_model_registry())
+
+
+async def refresh_fleet_snapshot():
+    """Fleet snapshot'ı periyodik olarak yeniden kurar (monitor taramalarına ek olarak)"""
+    while True:
+        await asyncio.to_thread(fleet_store.rebuild)
+        await asyncio.sleep(FLEET_SNAPSHOT_REFRESH_SECONDS)
+
+
+async def rescore_telemetry():
+    """Telemetri kuyruğundaki aboneleri periyodik olarak batch halinde yeniden skorlar"""
+    while True:
+        await asyncio.sleep(TELEMETRY_RESCORE_SECONDS)
+        while len(rescore_queue):
+            await asyncio.to_thread(rescore_subscribers, rescore_queue.drain(TELEMETRY_RESCORE_BATCH))
+        metrics.RESCORE_QUEUE_DEPTH.set(len(rescore_queue))
+
+
+async def watch_model_registry():
+    """ACTIVE / SHADOW pointer'ları değişince modeller restart'sız değişir"""
+    while True:
+        await asyncio.sleep(MODEL_WATCH_SECONDS)
+        await asyncio.to_thread(model_manager.poll)
+
+
+async def dispatch_loop():
+    """Açık ticket'ları periyodik olarak (veya yeni ticket gelince) toplu atar"""
+    while True:
+        await asyncio.to_thread(dispatch_wakeup.wait, DISPATCH_INTERVAL_SECONDS)
+        dispatch_wakeup.clear()
+        await asyncio.to_thread(dispatch_pending_tickets)
+
+
+def dispatch_pending_tickets():
+    conn = get_db_connection()
+    if not conn:
+        logger.error("Dispatch: Database bağlantısı yok, tur atlandı")
+        return
+    
+    try:
+        run_dispatch(conn, dispatch_config)
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Dispatch error: {e}")
+    finally:
+        conn.close()
+
+
+def rescore_subscribers(live: dict):
+    """Telemetri ölçümleriyle skorlar; sonuçlar subscriber_scores'a ve bölge özetine yansır"""
+    conn = get_db_connection()
+    if not conn:
+        logger.error(f"Telemetry rescoring: Database bağlantısı yok, {len(live)} abone atlandı")
+        return
+    
+    try:
+        telemetry_scorer.rf_model = model
+        rows, transitions = telemetry_scorer.publish_batch(conn, [(sid, None, None) for sid in live], live)
+        for row in rows:
+            region_aggregator.update_risk(row[0], row[3])
+        for transition in transitions:
+            region_aggregator.update_status(transition["subscriber_id"], transition["new_status"])
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Telemetry rescoring error: {e}")
+    finally:
+        conn.close()
+
+
+def get_warmup_status() -> dict:
+    cache_progress = background_monitor.cache_progress if background_monitor else {"done": 0, "total": 0}
+    return {
+        "rf_model": warmup_state["rf_model"],
+        "lstm_model": lstm_service.load_state,
+        "lstm_precision": lstm_service.precision,
+        "model_version": model_manager.active_version,
+        "lstm_cache": warmup_state["lstm_cache"],
+        "lstm_cache_progress": cache_progress,
+        "started_at": warmup_state["started_at"].isoformat() if warmup_state["started_at"] else None,
+        "finished_at": warmup_state["finished_at"].isoformat() if warmup_state["finished_at"] else None
+    }
+
+
+@app.get("/health")
+def health():
+    """Liveness: süreç ayakta mı? Warm-up ilerlemesini de raporlar."""
+    return {"status": "ok", "warmup": get_warmup_status()}
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Prometheus scrape endpoint (text exposition format)"""
+    return Response(content=metrics.render_latest(), media_type=metrics.CONTENT_TYPE_LATEST)
+
+
+@app.get("/ready")
+def ready():
+    """Readiness: warm-up bitene kadar 503 (load balancer trafiği bekletir)."""
+    status = get_warmup_status()
+    is_ready = warmup_state["finished_at"] is not None
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"ready": is_ready, "warmup": status}
+    )
 
 
 @app.on_event("shutdown")
@@ -568,6 +1077,8 @@ async def shutdown_event():
     """Backend kapatılırken monitoring durdur"""
     if background_monitor:
         background_monitor.stop()
+    audit_writer.stop()
+    status_history.stop()
     logger.info("👋 NetPulse Backend kapatıldı")
 
 # --- 3. ENDPOINT: ENHANCED TICKET NOTE GENERATION (LLM Style) ---
@@ -581,6 +1092,12 @@ def send_telegram_notification(request: TelegramNotificationRequest):
     """
     Send Telegram notification to user
     """
+    incident = outage_correlator.incident_for(request.subscriber_id)
+    if incident:
+        # Bölgesel arızada bildirim incident başına bir kez gönderilir (notify_outage_incident)
+        metrics.OUTAGE_SUPPRESSED.inc(action="notification")
+        return {"status": "suppressed", "message": f"Bölgesel arıza #{incident.incident_id} kapsamında bildirildi", "incident_id": incident.incident_id}
+    
     try:
         # Format professional notification message
         notification_text = f"""🔔 **NetPulse Bildirim**
@@ -638,21 +1155,26 @@ def generate_ticket_note(request: TicketRequest):
              
         region_id, modem_model = cust_data
         
-        # 2. Bölgesel Analiz
-        cursor.execute("""
-            SELECT COUNT(*) 
-            FROM customers c
-            JOIN subscriber_status s ON c.subscriber_id = s.subscriber_id
-            WHERE c.region_id = %s 
-              AND s.current_status IN ('RED', 'YELLOW')
-              AND c.subscriber_id != %s
-        """, (region_id, request.subscriber_id))
-        
-        neighbor_faults = cursor.fetchone()[0]
-        conn.close()
+        # 2. Bölgesel Analiz (açık bölgesel incident varsa komşu sayımı gerekmez)
+        incident = outage_correlator.incident_for(request.subscriber_id)
+        if incident:
+            conn.close()
+            neighbor_faults = max(incident.affected - 1, 0)
+        else:
+            cursor.execute("""
+                SELECT COUNT(*) 
+                FROM customers c
+                JOIN subscriber_status s ON c.subscriber_id = s.subscriber_id
+                WHERE c.region_id = %s 
+                  AND s.current_status IN ('RED', 'YELLOW')
+                  AND c.subscriber_id != %s
+            """, (region_id, request.subscriber_id))
+            
+            neighbor_faults = cursor.fetchone()[0]
+            conn.close()
         
         # 3. Kapsam Belirleme
-        scope = "REGIONAL" if neighbor_faults > 3 else "INDIVIDUAL"
+        scope = "REGIONAL" if incident or neighbor_faults > 3 else "INDIVIDUAL"
         
         # 4. Öncelik ve Durum
         priority_map = {
@@ -737,6 +1259,7 @@ def generate_ticket_note(request: TicketRequest):
         return {
             "scope": scope,
             "neighbor_count": neighbor_faults,
+            "incident_id": incident.incident_id if incident else None,
             "header": {
                 "timestamp": timestamp,
                 "subscriber_id": request.subscriber_id,
@@ -794,6 +1317,34 @@ def create_ticket(ticket: TicketCreate):
         
         cursor = conn.cursor()
         
+        # Açık bölgesel arızanın üyesi: ayrı ticket yerine not incident ticket'ına eklenir
+        incident = outage_correlator.incident_for(ticket.subscriber_id)
+        if incident and incident.ticket_id:
+            cursor.execute("""
+                INSERT INTO ticket_notes (ticket_id, author, note)
+                VALUES (%s, %s, %s)
+                RETURNING created_at
+            """, (incident.ticket_id, ticket.assigned_to, f"Abone #{ticket.subscriber_id}: {ticket.technician_note}"))
+            created_at = cursor.fetchone()[0]
+            conn.commit()
+            cursor.close()
+            conn.close()
+            
+            metrics.OUTAGE_SUPPRESSED.inc(action="ticket")
+            audit_writer.log(
+                ticket.subscriber_id,
+                'ticket_merged',
+                ticket.priority,
+                f'Bölgesel arıza #{incident.incident_id} kaydına (#{incident.ticket_id}) bağlandı'
+            )
+            return {
+                "success": True,
+                "ticket_id": incident.ticket_id,
+                "status": "MERGED",
+                "incident_id": incident.incident_id,
+                "created_at": created_at.isoformat()
+            }
+        
         # 1. Ticket oluştur
         cursor.execute("""
             INSERT INTO tickets 
@@ -819,21 +1370,20 @@ def create_ticket(ticket: TicketCreate):
             VALUES (%s, %s, %s, %s, %s)
         """, (ticket_id, None, 'CREATED', 'System', f'Ticket oluşturuldu - {ticket.assigned_to}'))
         
-        # 3. Action log'a kaydet
-        cursor.execute("""
-            INSERT INTO action_log 
-            (subscriber_id, action_type, new_status, note, timestamp)
-            VALUES (%s, %s, %s, %s, NOW())
-        """, (
+        conn.commit()
+        cursor.close()
+        conn.close()
+        
+        # Yeni ticket: dispatch turunu beklemeden teknisyen ata
+        dispatch_wakeup.set()
+        
+        # 3. Action log'a kaydet (buffer'lı, commit sonrası)
+        audit_writer.log(
             ticket.subscriber_id,
             'ticket_created',
             ticket.priority,
             f'Arıza kaydı #{ticket_id} oluşturuldu - {ticket.scope} arıza'
-        ))
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
+        )
         
         return {
             "success": True,
@@ -898,12 +1448,37 @@ def get_subscriber_tickets(subscriber_id: int):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _encode_ticket_cursor(priority_rank: int, created_at: datetime, ticket_id: int) -> str:
+    """Kuyruktaki son satırın sıralama anahtarını opak bir cursor'a çevirir."""
+    raw = f"{priority_rank}|{created_at.isoformat()}|{ticket_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_ticket_cursor(token: str):
+    """Cursor'ı (priority_rank, created_at, ticket_id) anahtarına geri çevirir."""
+    try:
+        raw = base64.urlsafe_b64decode(token.encode()).decode()
+        priority_rank, created_at, ticket_id = raw.split("|")
+        return int(priority_rank), datetime.fromisoformat(created_at), int(ticket_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @app.get("/api/tickets")
-def get_all_tickets(status: Optional[str] = None, limit: int = 50):
+def get_all_tickets(
+    status: Optional[str] = None,
+    limit: int = 50,
+    page_cursor: Optional[str] = Query(None, alias="cursor")
+):
     """
     Tüm ticketları getirir (saha ekibi paneli için).
     Status filtresi opsiyonel.
+
+    Sıralama: priority_rank DESC, created_at DESC, ticket_id DESC
+    (idx_tickets_open_queue / idx_tickets_status_queue ile index'ten okunur).
+    Sonraki sayfa için yanıttaki next_cursor değeri ?cursor= ile gönderilir.
     """
+    limit = max(1, min(limit, 500))
+
     try:
         conn = get_db_connection()
         if not conn:
@@ -911,48 +1486,40 @@ def get_all_tickets(status: Optional[str] = None, limit: int = 50):
         
         cursor = conn.cursor()
         
+        conditions = []
+        params = []
+
         if status:
-            query = """
-                SELECT 
-                    t.ticket_id, t.subscriber_id, t.status, t.priority, 
-                    t.fault_type, t.scope, t.assigned_to, t.created_at,
-                    c.full_name, c.region_id, c.phone_number
-                FROM tickets t
-                LEFT JOIN customers c ON t.subscriber_id = c.subscriber_id
-                WHERE t.status = %s
-                ORDER BY 
-                    CASE t.priority
-                        WHEN 'HIGH' THEN 1
-                        WHEN 'MEDIUM' THEN 2
-                        WHEN 'LOW' THEN 3
-                    END,
-                    t.created_at DESC
-                LIMIT %s
-            """
-            cursor.execute(query, (status, limit))
+            conditions.append("t.status = %s")
+            params.append(status)
         else:
-            query = """
-                SELECT 
-                    t.ticket_id, t.subscriber_id, t.status, t.priority, 
-                    t.fault_type, t.scope, t.assigned_to, t.created_at,
-                    c.full_name, c.region_id, c.phone_number
-                FROM tickets t
-                LEFT JOIN customers c ON t.subscriber_id = c.subscriber_id
-                WHERE t.status != 'CLOSED'
-                ORDER BY 
-                    CASE t.priority
-                        WHEN 'HIGH' THEN 1
-                        WHEN 'MEDIUM' THEN 2
-                        WHEN 'LOW' THEN 3
-                    END,
-                    t.created_at DESC
-                LIMIT %s
-            """
-            cursor.execute(query, (limit,))
+            conditions.append("t.status <> 'CLOSED'")
+
+        if page_cursor:
+            # Keyset: son görülen satırdan sonrasını oku (OFFSET yok)
+            conditions.append("(t.priority_rank, t.created_at, t.ticket_id) < (%s, %s, %s)")
+            params.extend(_decode_ticket_cursor(page_cursor))
+
+        query = f"""
+            SELECT 
+                t.ticket_id, t.subscriber_id, t.status, t.priority, 
+                t.fault_type, t.scope, t.assigned_to, t.created_at,
+                c.full_name, c.region_id, c.phone_number, t.priority_rank
+            FROM tickets t
+            LEFT JOIN customers c ON t.subscriber_id = c.subscriber_id
+            WHERE {" AND ".join(conditions)}
+            ORDER BY t.priority_rank DESC, t.created_at DESC, t.ticket_id DESC
+            LIMIT %s
+        """
+        # Bir fazla satır çek: sonraki sayfa var mı?
+        cursor.execute(query, (*params, limit + 1))
         
         rows = cursor.fetchall()
         cursor.close()
         conn.close()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
         
         tickets = []
         for row in rows:
@@ -969,9 +1536,16 @@ def get_all_tickets(status: Optional[str] = None, limit: int = 50):
                 "customer_location": row[9],
                 "customer_phone": row[10]
             })
+
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = _encode_ticket_cursor(last[11], last[7], last[0])
         
-        return {"tickets": tickets, "count": len(tickets)}
+        return {"tickets": tickets, "count": len(tickets), "next_cursor": next_cursor}
         
+    except HTTPException as he:
+        raise he
     except Exception as e:
         logger.error(f"Get All Tickets Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1033,16 +1607,12 @@ def update_ticket_status(ticket_id: int, update: TicketStatusUpdate):
         if update.note:
             log_note += f" | {update.note}"
         
-        cursor.execute("""
-            INSERT INTO action_log 
-            (subscriber_id, action_type, new_status, note, timestamp)
-            VALUES (%s, %s, %s, %s, NOW())
-        """, (subscriber_id, 'ticket_status_update', update.new_status, log_note))
-        
         conn.commit()
         cursor.close()
         conn.close()
         
+        audit_writer.log(subscriber_id, 'ticket_status_update', update.new_status, log_note)
+        
         return {
             "success": True,
             "ticket_id": ticket_id,
@@ -1061,6 +1631,8 @@ def update_ticket_status(ticket_id: int, update: TicketStatusUpdate):
 def add_technician_note(ticket_id: int, note_data: TechnicianNote):
     """
     Teknisyen notu ekler ve action_log'a kaydeder.
+    Her not ticket_notes tablosuna tek satır olarak eklenir (append-only),
+    mevcut notlar okunmaz veya yeniden yazılmaz.
     """
     try:
         conn = get_db_connection()
@@ -1070,35 +1642,38 @@ def add_technician_note(ticket_id: int, note_data: TechnicianNote):
         cursor = conn.cursor()
         
         # 1. Ticket var mı kontrol et
-        cursor.execute("SELECT subscriber_id, technician_note FROM tickets WHERE ticket_id = %s", (ticket_id,))
+        cursor.execute("SELECT subscriber_id FROM tickets WHERE ticket_id = %s", (ticket_id,))
         result = cursor.fetchone()
         
         if not result:
             raise HTTPException(status_code=404, detail="Ticket not found")
         
-        subscriber_id, existing_note = result
-        
-        # 2. Notu ekle (mevcut nota append)
-        updated_note = f"{existing_note}\n\n--- {note_data.author} ({datetime.now().strftime('%Y-%m-%d %H:%M')}) ---\n{note_data.note}"
+        subscriber_id = result[0]
         
+        # 2. Notu ekle (tek satır insert)
         cursor.execute("""
-            UPDATE tickets 
-            SET technician_note = %s, updated_at = NOW()
-            WHERE ticket_id = %s
-        """, (updated_note, ticket_id))
+            INSERT INTO ticket_notes (ticket_id, author, note)
+            VALUES (%s, %s, %s)
+            RETURNING note_id, created_at
+        """, (ticket_id, note_data.author, note_data.note))
         
-        # 3. Action log ekle
-        cursor.execute("""
-            INSERT INTO action_log 
-            (subscriber_id, action_type, new_status, note, timestamp)
-            VALUES (%s, %s, %s, %s, NOW())
-        """, (subscriber_id, 'technician_note_added', 'INFO', f"Ticket #{ticket_id} - {note_data.author}: {note_data.note[:50]}..."))
+        note_id, created_at = cursor.fetchone()
+        
+        cursor.execute("UPDATE tickets SET updated_at = NOW() WHERE ticket_id = %s", (ticket_id,))
         
         conn.commit()
         cursor.close()
         conn.close()
         
-        return {"success": True, "ticket_id": ticket_id}
+        # 3. Action log ekle
+        audit_writer.log(subscriber_id, 'technician_note_added', 'INFO', f"Ticket #{ticket_id} - {note_data.author}: {note_data.note[:50]}...")
+        
+        return {
+            "success": True,
+            "ticket_id": ticket_id,
+            "note_id": note_id,
+            "created_at": created_at.isoformat()
+        }
         
     except HTTPException as he:
         raise he
@@ -1106,3 +1681,284 @@ def add_technician_note(ticket_id: int, note_data: TechnicianNote):
         logger.error(f"Add Note Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@app.get("/api/tickets/{ticket_id}/notes")
+def get_ticket_notes(ticket_id: int, after: int = 0, limit: int = 50):
+    """
+    Ticket notlarını eklenme sırasına göre sayfalı getirir.
+    Sonraki sayfa için yanıttaki next_after değeri ?after= ile gönderilir.
+    """
+    limit = max(1, min(limit, 200))
+
+    try:
+        conn = get_db_connection()
+        if not conn:
+            raise HTTPException(status_code=500, detail="Database fail")
+        
+        cursor = conn.cursor()
+        
+        # idx_ticket_notes_ticket (ticket_id, note_id) üzerinden keyset okuma
+        cursor.execute("""
+            SELECT note_id, author, note, created_at
+            FROM ticket_notes
+            WHERE ticket_id = %s AND note_id > %s
+            ORDER BY note_id
+            LIMIT %s
+        """, (ticket_id, after, limit + 1))
+        
+        rows = cursor.fetchall()
+        cursor.close()
+        conn.close()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        notes = [
+            {
+                "note_id": row[0],
+                "author": row[1],
+                "note": row[2],
+                "created_at": row[3].isoformat()
+            }
+            for row in rows
+        ]
+        
+        return {
+            "ticket_id": ticket_id,
+            "notes": notes,
+            "count": len(notes),
+            "next_after": notes[-1]["note_id"] if has_more else None
+        }
+        
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Get Notes Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/action_log")
+def get_action_log(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    subscriber_id: Optional[int] = None,
+    action_type: Optional[str] = None,
+    limit: int = 200
+):
+    """
+    Zaman aralığına göre işlem logları (varsayılan: son 24 saat).
+    Aralık dışındaki aylık partition'lar sorguya hiç dahil edilmez.
+    """
+    end = end or datetime.now()
+    start = start or end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    try:
+        conn = get_db_connection()
+        if not conn:
+            raise HTTPException(status_code=500, detail="Database fail")
+        
+        events = query_action_log(
+            conn, start, end,
+            subscriber_id=subscriber_id,
+            action_type=action_type,
+            limit=max(1, min(limit, 1000))
+        )
+        conn.close()
+        
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "events": events,
+            "count": len(events)
+        }
+        
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Get Action Log Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/status_history")
+def get_status_history(
+    region: Optional[str] = None,
+    subscriber_id: Optional[int] = None,
+    hours: float = Query(24, gt=0, le=24 * 90),
+    limit: int = 500
+):
+    """
+    Son N saatteki durum geçişleri (ör. "Kadıköy'de son 6 saat").
+    Sadece aralığa düşen günlük partition'lar, bölge / abone index'i üzerinden okunur.
+    """
+    end = datetime.now()
+    start = end - timedelta(hours=hours)
+
+    try:
+        conn = get_db_connection()
+        if not conn:
+            raise HTTPException(status_code=500, detail="Database fail")
+        
+        transitions = query_status_history(
+            conn, start, end,
+            region=region,
+            subscriber_id=subscriber_id,
+            limit=max(1, min(limit, 5000))
+        )
+        conn.close()
+        
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "region": region,
+            "transitions": transitions,
+            "count": len(transitions)
+        }
+        
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Get Status History Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/status_history/flapping")
+def get_flapping_subscribers(
+    region: Optional[str] = None,
+    hours: float = Query(24, gt=0, le=24 * 90),
+    min_transitions: int = Query(4, ge=2),
+    limit: int = 100
+):
+    """Son N saatte en az min_transitions kez durum değiştiren aboneler (flapping)"""
+    end = datetime.now()
+    start = end - timedelta(hours=hours)
+
+    try:
+        conn = get_db_connection()
+        if not conn:
+            raise HTTPException(status_code=500, detail="Database fail")
+        
+        subscribers = count_flapping(
+            conn, start, end, region=region,
+            min_transitions=min_transitions, limit=max(1, min(limit, 1000))
+        )
+        conn.close()
+        
+        return {"start": start.isoformat(), "end": end.isoformat(), "region": region, "subscribers": subscribers}
+        
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Get Flapping Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/incidents")
+def get_incidents(status: Optional[str] = None, limit: int = 50):
+    """Bölgesel arıza kayıtları (outage correlation); active = bu sürecin bastırdığı açık incident'lar"""
+    try:
+        conn = get_db_connection()
+        if not conn:
+            raise HTTPException(status_code=500, detail="Database fail")
+        
+        incidents = query_incidents(conn, status=status, limit=max(1, min(limit, 500)))
+        conn.close()
+        
+        return {"active": outage_correlator.snapshot(), "incidents": incidents}
+        
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Get Incidents Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def stream_export(spec, fmt: str, filters: ExportFilters) -> StreamingResponse:
+    """Bağlantı akışa devredilir; generator bitince kapatır"""
+    fmt = fmt.lower()
+    if fmt not in STREAMERS:
+        raise HTTPException(status_code=400, detail=f"Desteklenmeyen format: {fmt} (csv / xlsx)")
+    if fmt == "xlsx" and not OPENPYXL_AVAILABLE:
+        raise HTTPException(status_code=501, detail="XLSX export için openpyxl kurulu değil; format=csv kullanın")
+    
+    conn = get_db_connection()
+    if not conn:
+        raise HTTPException(status_code=500, detail="Database fail")
+    
+    return StreamingResponse(
+        STREAMERS[fmt](conn, spec, filters),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(spec, fmt)}"'}
+    )
+
+
+@app.get("/api/export/subscribers")
+def export_subscribers(
+    fmt: str = Query("csv", alias="format"),
+    status: Optional[str] = None,
+    region: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+):
+    """
+    Abone listesi CSV / XLSX (server-side cursor ile akış, sabit bellek).
+    date_from / date_to son durum değişimine (status_changed_at) uygulanır.
+    """
+    return stream_export(SUBSCRIBER_EXPORT, fmt, ExportFilters(status, region, date_from, date_to))
+
+
+@app.get("/api/export/tickets")
+def export_tickets(
+    fmt: str = Query("csv", alias="format"),
+    status: Optional[str] = None,
+    region: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+):
+    """Ticket listesi CSV / XLSX; date_from / date_to created_at'e uygulanır"""
+    return stream_export(TICKET_EXPORT, fmt, ExportFilters(status, region, date_from, date_to))
+
+
+# --- MODEL REGISTRY (hot swap / shadow) ---
+
+def _model_admin(action, *args):
+    """Model yükleme threadpool'da çalışır; inference bu sırada eski modelle devam eder"""
+    try:
+        return action(*args)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Model admin error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/models")
+def get_models():
+    """Registry versiyonları, aktif versiyon ve shadow karşılaştırması (uyum oranı, gecikme)"""
+    return model_manager.status()
+
+
+@app.post("/api/models/activate")
+def activate_model(version: str):
+    """Versiyonu yükleyip atomik olarak aktif yapar; diğer süreçler ACTIVE pointer'ından geçer"""
+    return _model_admin(model_manager.activate, version)
+
+
+@app.post("/api/models/shadow")
+def start_shadow_model(version: str):
+    """Versiyonu aday olarak yükler; her batch iki modelle skorlanır, sonuç aktif modelden"""
+    return _model_admin(model_manager.start_shadow, version)
+
+
+@app.delete("/api/models/shadow")
+def stop_shadow_model():
+    return _model_admin(model_manager.stop_shadow)
+
+
+@app.post("/api/models/promote")
+def promote_shadow_model():
+    """Gölgedeki adayı yeniden yüklemeden aktif yapar"""
+    return _model_admin(model_manager.promote)
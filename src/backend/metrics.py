@@ -0,0 +1,297 @@
+"""
+NetPulse Metrics
+Hot-path ölçümleri ve Prometheus text formatında /metrics çıktısı
+
+Ek bağımlılık yok: Counter / Gauge / Histogram burada tanımlıdır ve
+prometheus_client ile aynı exposition formatını üretir.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+import psycopg2.extensions
+
+# Saniye cinsinden varsayılan histogram sınırları (1 ms - 10 sn)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# Aktif isteğin route şablonu (/api/simulate/{subscriber_id}); DB metriklerinde etiket olarak kullanılır
+current_endpoint: contextvars.ContextVar[str] = contextvars.ContextVar("current_endpoint", default="background")
+
+_registry: List["_Metric"] = []
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: str = "") -> str:
+        parts = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}_total{self._format_labels(key)} {value}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{self._format_labels(key)} {value}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket sayaçları..., +Inf sayacı, toplam]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            state[index] += 1
+            state[-1] += value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = [(key, list(state)) for key, state in sorted(self._values.items())]
+
+        for key, state in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{self._format_labels(key, le)} {cumulative}")
+            cumulative += state[len(self.buckets)]
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{self._format_labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {state[-1]}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+@contextmanager
+def timer(histogram: Histogram, **labels):
+    """
+    Bloğun süresini histograma yazar. Decorator olarak da kullanılabilir:
+
+        with timer(LSTM_INFERENCE_SECONDS, model="LSTM"): ...
+
+        @timer(STATUS_TRACKER_SECONDS, method="update_status")
+        def update_status(...): ...
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - started, **labels)
+
+
+def render_latest() -> str:
+    """Tüm metrikleri Prometheus text exposition formatında döndürür"""
+    lines: List[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# --- NetPulse metrikleri ---
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "netpulse_http_request_duration_seconds", "HTTP istek süresi (route şablonu bazında)",
+    ("method", "route", "status")
+)
+DB_CONNECT_SECONDS = Histogram(
+    "netpulse_db_connect_duration_seconds", "Postgres bağlantı açma süresi", ("endpoint",)
+)
+DB_CONNECT_FAILURES = Counter(
+    "netpulse_db_connect_failures", "Başarısız Postgres bağlantı denemeleri", ("endpoint",)
+)
+DB_QUERY_SECONDS = Histogram(
+    "netpulse_db_query_duration_seconds", "Sorgu süresi; _count endpoint başına sorgu sayısıdır", ("endpoint",)
+)
+MODEL_INFERENCE_SECONDS = Histogram(
+    "netpulse_model_inference_duration_seconds", "Model tahmin süresi", ("model",)
+)
+MODEL_BATCH_SIZE = Histogram(
+    "netpulse_model_batch_size", "Tek tahmin çağrısındaki örnek sayısı", ("model",), buckets=BATCH_BUCKETS
+)
+STATUS_TRACKER_SECONDS = Histogram(
+    "netpulse_status_tracker_duration_seconds", "StatusTracker metod süreleri", ("method",)
+)
+MONITOR_SWEEP_SECONDS = Histogram(
+    "netpulse_monitor_sweep_duration_seconds", "Background monitor tam tarama süresi", ("phase",),
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+)
+MONITOR_LAG_SECONDS = Gauge(
+    "netpulse_monitor_lag_seconds", "Planlanan ve gerçekleşen tarama başlangıcı arasındaki gecikme"
+)
+MONITOR_LAST_SWEEP = Gauge(
+    "netpulse_monitor_last_sweep_timestamp_seconds", "Son tamamlanan taramanın unix zamanı"
+)
+MONITOR_MEASUREMENTS = Counter(
+    "netpulse_monitor_measurements", "Zamanlayıcının yaptığı ölçümler (sonraki aralığa göre cadence)", ("cadence",)
+)
+CACHE_LOOKUPS = Counter(
+    "netpulse_cache_lookups", "Cache erişimleri (hit/miss)", ("cache", "result")
+)
+NOTIFICATION_SECONDS = Histogram(
+    "netpulse_notification_duration_seconds", "Bildirim gönderim süresi", ("channel", "result")
+)
+NOTIFICATION_INFLIGHT = Gauge(
+    "netpulse_notification_inflight", "Gönderimde bekleyen bildirim sayısı (kuyruk derinliği)", ("channel",)
+)
+TELEMETRY_READINGS = Counter(
+    "netpulse_telemetry_readings", "POST /api/telemetry/batch ile gelen ölçümler (accepted / red nedeni)", ("result",)
+)
+TELEMETRY_BATCH_SECONDS = Histogram(
+    "netpulse_telemetry_batch_duration_seconds", "Telemetri batch'i decode + doğrulama + ekleme süresi", ("format",)
+)
+RESCORE_QUEUE_DEPTH = Gauge(
+    "netpulse_rescore_queue_depth", "Yeniden skorlanmayı bekleyen abone sayısı"
+)
+CASCADE_DECISIONS = Counter(
+    "netpulse_cascade_decisions", "Cascade gate kararları (gated / scored / audited)", ("decision",)
+)
+CASCADE_AUDIT = Counter(
+    "netpulse_cascade_audit", "Audit edilen stabil abonelerde model sonucu (agree / miss)", ("result",)
+)
+
+OUTAGE_ACTIVE_INCIDENTS = Gauge(
+    "netpulse_outage_active_incidents", "Açık bölgesel arıza (incident) sayısı"
+)
+OUTAGE_SUPPRESSED = Counter(
+    "netpulse_outage_suppressed", "Bölgesel arıza üyeleri için bastırılan bireysel işler", ("action",)
+)
+
+DISPATCH_SECONDS = Histogram(
+    "netpulse_dispatch_duration_seconds", "Teknisyen atama turu süresi (solve / total)", ("phase",)
+)
+DISPATCH_PENDING = Gauge(
+    "netpulse_dispatch_pending", "Son dispatch turunda atama bekleyen ticket sayısı"
+)
+DISPATCH_ASSIGNMENTS = Counter(
+    "netpulse_dispatch_assignments", "Dispatch ile yapılan ticket atamaları", ("solver",)
+)
+
+EXPORT_ROWS = Counter(
+    "netpulse_export_rows", "Export ile akıtılan satırlar", ("kind", "format")
+)
+
+MODEL_VERSION = Gauge(
+    "netpulse_model_version", "Aktif model versiyonu (aktif olan 1)", ("version",)
+)
+SHADOW_BATCHES = Counter(
+    "netpulse_shadow_batches", "Aday modelle gölgede skorlanan batch'ler (scored / skipped / error)", ("model", "result")
+)
+SHADOW_ROWS = Counter(
+    "netpulse_shadow_rows", "Gölge skorlamada aktif modelle uyuşan / uyuşmayan tahminler", ("model", "result")
+)
+SHADOW_INFERENCE_SECONDS = Histogram(
+    "netpulse_shadow_inference_duration_seconds", "Aynı batch için aktif ve aday model inference süresi", ("model", "role")
+)
+
+
+@contextmanager
+def track_notification(channel: str):
+    """
+    Bildirim gönderimini ölçer. Çağıran, dönen dict'e result yazar:
+
+        with track_notification("sms") as outcome:
+            ...
+            outcome["result"] = "success"
+    """
+    outcome = {"result": "error"}
+    NOTIFICATION_INFLIGHT.inc(channel=channel)
+    started = time.perf_counter()
+    try:
+        yield outcome
+    finally:
+        NOTIFICATION_INFLIGHT.dec(channel=channel)
+        NOTIFICATION_SECONDS.observe(time.perf_counter() - started, channel=channel, result=outcome["result"])
+
+
+class InstrumentedCursor(psycopg2.extensions.cursor):
+    """Her execute / executemany / copy_expert çağrısını aktif endpoint etiketiyle ölçer"""
+
+    def execute(self, query, vars=None):
+        with timer(DB_QUERY_SECONDS, endpoint=current_endpoint.get()):
+            return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        with timer(DB_QUERY_SECONDS, endpoint=current_endpoint.get()):
+            return super().executemany(query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        with timer(DB_QUERY_SECONDS, endpoint=current_endpoint.get()):
+            return super().copy_expert(sql, file, size)
@@ -0,0 +1,105 @@
+"""
+Schema Migration Runner
+migrations/ klasöründeki versiyonlu SQL dosyalarını sırayla uygular.
+
+Dosya adı formatı: <versiyon>_<açıklama>.sql (örn. 001_ticket_priority_rank.sql)
+Uygulanan versiyonlar schema_migrations tablosunda tutulur; her migration
+kendi transaction'ı içinde çalışır.
+"""
+import os
+import psycopg2
+
+# DB Config (same as main.py)
+DB_CONFIG = {
+    "dbname": "netpulse_db",
+    "user": "postgres",
+    "password": "admin",
+    "host": "localhost",
+    "port": "5432"
+}
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+
+def list_migrations():
+    """
+    migrations/ klasöründeki SQL dosyalarını versiyon sırasına göre döndürür
+
+    Returns:
+        [(version, name, path), ...]
+    """
+    migrations = []
+    for file_name in os.listdir(MIGRATIONS_DIR):
+        if not file_name.endswith('.sql'):
+            continue
+        version = int(file_name.split('_', 1)[0])
+        migrations.append((version, file_name, os.path.join(MIGRATIONS_DIR, file_name)))
+    return sorted(migrations)
+
+
+def apply_migrations(conn, target_version: int = None) -> list:
+    """
+    Henüz uygulanmamış migration'ları sırayla çalıştırır
+
+    Args:
+        conn: psycopg2 bağlantısı
+        target_version: Verilirse bu versiyondan sonrakiler uygulanmaz
+
+    Returns:
+        Uygulanan migration dosya adları
+    """
+    previous_autocommit = conn.autocommit
+    conn.autocommit = False
+    applied_now = []
+
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR(200) NOT NULL,
+                applied_at TIMESTAMP DEFAULT NOW()
+            )
+        """)
+        conn.commit()
+
+        cursor.execute("SELECT version FROM schema_migrations")
+        applied = {row[0] for row in cursor.fetchall()}
+
+        for version, name, path in list_migrations():
+            if version in applied:
+                continue
+            if target_version is not None and version > target_version:
+                break
+
+            with open(path, encoding='utf-8') as f:
+                sql = f.read()
+
+            try:
+                cursor.execute(sql)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                    (version, name)
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+            applied_now.append(name)
+            print(f"✅ Migration uygulandı: {name}")
+    finally:
+        conn.autocommit = previous_autocommit
+
+    return applied_now
+
+
+if __name__ == "__main__":
+    try:
+        conn = psycopg2.connect(**DB_CONFIG)
+        applied = apply_migrations(conn)
+        if not applied:
+            print("✅ Şema güncel, uygulanacak migration yok.")
+        conn.close()
+    except Exception as e:
+        print(f"❌ Migration hatası: {e}")
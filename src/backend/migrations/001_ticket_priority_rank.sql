@@ -0,0 +1,28 @@
+-- 001: Saha ekibi ticket kuyruğu için sıralanabilir öncelik kolonu
+-- CASE t.priority ... ifadesiyle sıralama index kullanamıyordu; rank artık
+-- satırda saklanıyor ve kuyruk sırası (priority_rank DESC, created_at DESC,
+-- ticket_id DESC) tamamen index'ten okunuyor.
+
+-- Yüksek değer = daha acil (HIGH=3, MEDIUM=2, LOW=1, bilinmeyen=0).
+-- Tüm kolonlar aynı yönde sıralandığı için keyset cursor tek bir
+-- satır karşılaştırmasıyla ifade edilebilir.
+ALTER TABLE tickets
+    ADD COLUMN IF NOT EXISTS priority_rank SMALLINT
+    GENERATED ALWAYS AS (
+        CASE priority
+            WHEN 'HIGH' THEN 3
+            WHEN 'MEDIUM' THEN 2
+            WHEN 'LOW' THEN 1
+            ELSE 0
+        END
+    ) STORED;
+
+-- Varsayılan kuyruk: CLOSED hariç tüm açık ticketlar
+CREATE INDEX IF NOT EXISTS idx_tickets_open_queue
+    ON tickets (priority_rank DESC, created_at DESC, ticket_id DESC)
+    WHERE status <> 'CLOSED';
+
+-- Status filtreli kuyruk (ASSIGNED, EN_ROUTE, ...)
+CREATE INDEX IF NOT EXISTS idx_tickets_status_queue
+    ON tickets (status, priority_rank DESC, created_at DESC, ticket_id DESC)
+    WHERE status <> 'CLOSED';
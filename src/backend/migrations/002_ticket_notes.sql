@@ -0,0 +1,67 @@
+-- 002: Append-only teknisyen notları
+-- Eskiden her not tickets.technician_note TEXT alanının tamamı okunup
+-- Python'da birleştirilerek geri yazılıyordu (büyüyen WAL + lost update).
+-- Artık her not ticket_notes tablosuna tek satır olarak ekleniyor;
+-- tickets.technician_note sadece ticket açılışındaki ilk notu tutar.
+
+CREATE TABLE IF NOT EXISTS ticket_notes (
+    note_id BIGSERIAL PRIMARY KEY,
+    ticket_id INTEGER NOT NULL REFERENCES tickets(ticket_id) ON DELETE CASCADE,
+    author VARCHAR(100),
+    note TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_ticket_notes_ticket ON ticket_notes (ticket_id, note_id);
+
+-- Mevcut birleştirilmiş notları satırlara ayır.
+-- Eski format: <ilk not>\n\n--- <yazar> (YYYY-MM-DD HH:MM) ---\n<not> ...
+-- regexp_matches başlıkları, regexp_split_to_table gövdeleri verir;
+-- (k). başlık (k+1). gövdeye karşılık gelir.
+WITH headers AS (
+    SELECT t.ticket_id,
+           h.ord,
+           h.m[1] AS author,
+           to_timestamp(h.m[2], 'YYYY-MM-DD HH24:MI')::timestamp AS created_at
+    FROM tickets t,
+         regexp_matches(
+             t.technician_note,
+             '\n\n--- ([^\n]*) \((\d{4}-\d{2}-\d{2} \d{2}:\d{2})\) ---\n',
+             'g'
+         ) WITH ORDINALITY AS h(m, ord)
+),
+bodies AS (
+    SELECT t.ticket_id, b.ord, b.body
+    FROM tickets t,
+         regexp_split_to_table(
+             t.technician_note,
+             '\n\n--- [^\n]* \(\d{4}-\d{2}-\d{2} \d{2}:\d{2}\) ---\n'
+         ) WITH ORDINALITY AS b(body, ord)
+)
+INSERT INTO ticket_notes (ticket_id, author, note, created_at)
+SELECT h.ticket_id, h.author, b.body, h.created_at
+FROM headers h
+JOIN bodies b ON b.ticket_id = h.ticket_id AND b.ord = h.ord + 1
+ORDER BY h.ticket_id, h.ord;
+
+UPDATE tickets
+SET technician_note = (regexp_split_to_array(
+        technician_note,
+        '\n\n--- [^\n]* \(\d{4}-\d{2}-\d{2} \d{2}:\d{2}\) ---\n'
+    ))[1]
+WHERE technician_note ~ '\n\n--- [^\n]* \(\d{4}-\d{2}-\d{2} \d{2}:\d{2}\) ---\n';
+
+-- Geriye uyumluluk: eski birleştirilmiş technician_note metnini yeniden üretir
+CREATE OR REPLACE VIEW ticket_technician_note_compat AS
+SELECT t.ticket_id,
+       COALESCE(t.technician_note, '') || COALESCE(
+           string_agg(
+               E'\n\n--- ' || COALESCE(n.author, '') || ' (' ||
+               to_char(n.created_at, 'YYYY-MM-DD HH24:MI') || E') ---\n' || n.note,
+               '' ORDER BY n.note_id
+           ),
+           ''
+       ) AS technician_note
+FROM tickets t
+LEFT JOIN ticket_notes n ON n.ticket_id = t.ticket_id
+GROUP BY t.ticket_id;
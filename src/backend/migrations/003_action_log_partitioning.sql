@@ -0,0 +1,79 @@
+-- 003: action_log aylık range partition'a dönüştürülüyor
+-- Tablo sınırsız büyüyordu ve sadece subscriber_id index'i vardı.
+-- Yeni yapı: PARTITION BY RANGE (timestamp), her ay için action_log_YYYY_MM.
+-- Partition oluşturma ve retention audit_log.AuditLogWriter tarafından
+-- aşağıdaki fonksiyonlar üzerinden yapılır.
+
+ALTER TABLE action_log RENAME TO action_log_legacy;
+ALTER INDEX IF EXISTS idx_action_log_subscriber RENAME TO idx_action_log_legacy_subscriber;
+
+CREATE TABLE action_log (
+    id BIGSERIAL,
+    subscriber_id INTEGER,
+    action_type VARCHAR(50),
+    new_status VARCHAR(50),
+    note TEXT,
+    timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+CREATE INDEX idx_action_log_subscriber ON action_log (subscriber_id, timestamp);
+CREATE INDEX idx_action_log_timestamp ON action_log (timestamp);
+
+-- Verilen tarihin ayı için partition yoksa oluşturur
+CREATE OR REPLACE FUNCTION ensure_action_log_partition(p_month DATE) RETURNS TEXT AS $$
+DECLARE
+    start_month DATE := date_trunc('month', p_month)::date;
+    end_month DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::date;
+    partition_name TEXT := 'action_log_' || to_char(start_month, 'YYYY_MM');
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF action_log FOR VALUES FROM (%L) TO (%L)',
+        partition_name, start_month, end_month
+    );
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Son p_keep_months aydan eski partition'ları düşürür (retention)
+CREATE OR REPLACE FUNCTION drop_action_log_partitions(p_keep_months INTEGER) RETURNS INTEGER AS $$
+DECLARE
+    cutoff DATE := (date_trunc('month', NOW()) - make_interval(months => p_keep_months))::date;
+    part RECORD;
+    dropped INTEGER := 0;
+BEGIN
+    FOR part IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'action_log'::regclass
+          AND c.relname ~ '^action_log_\d{4}_\d{2}$'
+    LOOP
+        IF to_date(substring(part.relname FROM '(\d{4}_\d{2})$'), 'YYYY_MM') < cutoff THEN
+            EXECUTE format('DROP TABLE IF EXISTS %I', part.relname);
+            dropped := dropped + 1;
+        END IF;
+    END LOOP;
+    RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Eski veriyi ve önümüzdeki 2 ayı kapsayan partition'lar
+SELECT ensure_action_log_partition(m::date)
+FROM generate_series(
+    date_trunc('month', LEAST(COALESCE((SELECT MIN(timestamp) FROM action_log_legacy), NOW()), NOW())),
+    date_trunc('month', GREATEST(COALESCE((SELECT MAX(timestamp) FROM action_log_legacy), NOW()), NOW() + INTERVAL '2 months')),
+    INTERVAL '1 month'
+) AS m;
+
+INSERT INTO action_log (id, subscriber_id, action_type, new_status, note, timestamp)
+SELECT id, subscriber_id, action_type, new_status, note, COALESCE(timestamp, NOW())
+FROM action_log_legacy;
+
+SELECT setval(
+    pg_get_serial_sequence('action_log', 'id'),
+    COALESCE((SELECT MAX(id) FROM action_log), 0) + 1,
+    false
+);
+
+DROP TABLE action_log_legacy;
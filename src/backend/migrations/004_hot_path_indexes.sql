@@ -0,0 +1,60 @@
+-- 004: Sık çalışan sorgular için index ve constraint paketi
+--
+-- Sorgu                                      | Kaynak                         | Index
+-- -------------------------------------------+--------------------------------+------------------------------
+-- Bölgedeki RED/YELLOW abone sayısı           | main.simulate_network,         | idx_customers_region,
+--                                            | main.generate_ticket_note      | idx_subscriber_status_faulty
+-- Sorunlu aboneler (current_status <> GREEN) | debug_status.py,               | idx_subscriber_status_faulty
+--                                            | StatusTracker.get_all_by_status|
+-- Abonenin son ticketları                    | main.simulate_network,         | idx_tickets_subscriber_created
+--                                            | main.get_subscriber_tickets    |
+--
+-- Not: İndexler migration transaction'ı içinde oluşturulur. Canlı ve büyük
+-- bir veritabanında aynı index'ler önce CREATE INDEX CONCURRENTLY ile elle
+-- oluşturulabilir; IF NOT EXISTS sayesinde migration bunları atlar.
+
+-- Status kolonları kompakt enum olarak saklanır (4 byte, sabit sıralama).
+-- Uygulama tarafı değişmez: enum değerleri metin olarak okunur/yazılır.
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'subscriber_status_t') THEN
+        CREATE TYPE subscriber_status_t AS ENUM ('GREEN', 'YELLOW', 'RED');
+    END IF;
+END
+$$;
+
+UPDATE subscriber_status SET current_status = 'GREEN' WHERE current_status IS NULL;
+
+ALTER TABLE subscriber_status ALTER COLUMN current_status DROP DEFAULT;
+ALTER TABLE subscriber_status
+    ALTER COLUMN current_status TYPE subscriber_status_t USING current_status::subscriber_status_t,
+    ALTER COLUMN previous_status TYPE subscriber_status_t USING previous_status::subscriber_status_t;
+ALTER TABLE subscriber_status
+    ALTER COLUMN current_status SET DEFAULT 'GREEN',
+    ALTER COLUMN current_status SET NOT NULL;
+
+-- Bölgesel komşu sayımı: region_id ile abone listesi (index-only scan)
+CREATE INDEX IF NOT EXISTS idx_customers_region
+    ON customers (region_id, subscriber_id);
+
+-- Sorunlu aboneler: filonun küçük bir kısmı, partial index küçük kalır
+CREATE INDEX IF NOT EXISTS idx_subscriber_status_faulty
+    ON subscriber_status (subscriber_id) INCLUDE (current_status)
+    WHERE current_status <> 'GREEN';
+
+-- Abone ticket geçmişi: WHERE subscriber_id = ? ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_tickets_subscriber_created
+    ON tickets (subscriber_id, created_at DESC);
+DROP INDEX IF EXISTS idx_tickets_subscriber;
+
+-- Constraint'ler (NOT VALID: mevcut satırlar taranmaz, yeni yazımlar kontrol edilir)
+ALTER TABLE tickets
+    ADD CONSTRAINT chk_tickets_priority
+    CHECK (priority IN ('HIGH', 'MEDIUM', 'LOW')) NOT VALID;
+ALTER TABLE tickets
+    ADD CONSTRAINT chk_tickets_status
+    CHECK (status IN ('CREATED', 'ASSIGNED', 'EN_ROUTE', 'ON_SITE', 'RESOLVED', 'CLOSED')) NOT VALID;
+
+ANALYZE customers;
+ANALYZE subscriber_status;
+ANALYZE tickets;
@@ -0,0 +1,37 @@
+-- 005: Scoring worker'larının paylaşılan sonuç deposu
+--
+-- scoring_worker.py süreçleri abonelerin hash-partition'lı bir shard'ına
+-- (subscriber_id % shard_count = shard_id) sahiptir ve her taramanın sonucunu
+-- buraya upsert eder. API süreçleri (NETPULSE_SCORING_MODE=external) bu
+-- tablolardan okur; bellek içi durum tutmadığı için istenen sayıda uvicorn
+-- worker'ı ile çalışabilir.
+
+CREATE TABLE IF NOT EXISTS subscriber_scores (
+    subscriber_id INTEGER PRIMARY KEY REFERENCES customers(subscriber_id) ON DELETE CASCADE,
+    shard_id SMALLINT NOT NULL,
+    segment subscriber_status_t NOT NULL,        -- StatusTracker kurallarından sonraki kesin durum
+    proposed_segment subscriber_status_t NOT NULL, -- Modelin önerdiği durum
+    risk_score REAL NOT NULL,
+    reason TEXT,
+    rf_class SMALLINT,
+    lstm_class SMALLINT,
+    lstm_confidence REAL,
+    trend JSONB,                                 -- TrendAnalysis (risk_chart, forecast_30min ...)
+    live_metrics JSONB,
+    scored_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_subscriber_scores_segment
+    ON subscriber_scores (segment, risk_score DESC) WHERE segment <> 'GREEN';
+
+-- Worker heartbeat'leri: hangi shard'lar canlı, son tarama ne kadar sürdü
+CREATE TABLE IF NOT EXISTS scoring_workers (
+    shard_id SMALLINT PRIMARY KEY,
+    shard_count SMALLINT NOT NULL,
+    hostname TEXT,
+    pid INTEGER,
+    subscribers INTEGER NOT NULL DEFAULT 0,
+    last_sweep_ms REAL,
+    started_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    heartbeat_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
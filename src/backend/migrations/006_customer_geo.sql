@@ -0,0 +1,34 @@
+-- 006: Abone konumu (lat/lon, adres) customers üzerinde saklanır
+--
+-- Değerler geo.compute_location ile Python tarafında üretilir (MD5 tabanlı
+-- offset). init_db_postgres veri yüklemesinden sonra geo.backfill_locations
+-- çağırır; mevcut veritabanları için `python geo.py` yeterlidir.
+-- Eksik kalan satırlar okuma sırasında hesaplanıp yazılır.
+
+ALTER TABLE customers
+    ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS location_address TEXT;
+
+-- Invalidation: region_id değişirse (ve aynı UPDATE konumu yazmıyorsa) konum sıfırlanır
+CREATE OR REPLACE FUNCTION invalidate_customer_geo() RETURNS trigger AS $$
+BEGIN
+    IF NEW.latitude IS NOT DISTINCT FROM OLD.latitude
+       AND NEW.longitude IS NOT DISTINCT FROM OLD.longitude THEN
+        NEW.latitude := NULL;
+        NEW.longitude := NULL;
+        NEW.location_address := NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_customers_geo_invalidate ON customers;
+CREATE TRIGGER trg_customers_geo_invalidate
+    BEFORE UPDATE OF region_id ON customers
+    FOR EACH ROW
+    WHEN (OLD.region_id IS DISTINCT FROM NEW.region_id)
+    EXECUTE FUNCTION invalidate_customer_geo();
+
+CREATE INDEX IF NOT EXISTS idx_customers_geo_missing
+    ON customers (subscriber_id) WHERE latitude IS NULL;
@@ -0,0 +1,87 @@
+-- 007: Abone durum geçişlerinin geçmişi
+-- subscriber_status sadece current/previous durumunu tutuyordu; daha eski
+-- geçişler kayboluyordu. Her geçiş (GREEN -> YELLOW, RED -> GREEN, ...)
+-- burada saklanır: flapping analizi ve SLA raporları bu tablodan yapılır.
+--
+-- Günlük range partition (changed_at); "bölge X'te son N saat" sorgusu
+-- partition pruning ile sadece ilgili günleri, (region_id, changed_at)
+-- index'i ile de sadece o bölgenin satırlarını okur. region_id geçiş anındaki
+-- bölgedir (sonradan abone taşınsa da geçmiş değişmez).
+-- Satırlar status_history.StatusHistoryWriter tarafından buffer'lanıp
+-- toplu yazılır; partition oluşturma ve retention aşağıdaki fonksiyonlarla yapılır.
+
+CREATE TABLE IF NOT EXISTS subscriber_status_history (
+    id BIGSERIAL,
+    subscriber_id INTEGER NOT NULL,
+    region_id VARCHAR(50),
+    old_status subscriber_status_t,
+    new_status subscriber_status_t NOT NULL,
+    transition_type VARCHAR(20),        -- degradation / recovery
+    fault_type VARCHAR(50),
+    changed_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, changed_at)
+) PARTITION BY RANGE (changed_at);
+
+CREATE INDEX IF NOT EXISTS idx_status_history_region
+    ON subscriber_status_history (region_id, changed_at DESC);
+CREATE INDEX IF NOT EXISTS idx_status_history_subscriber
+    ON subscriber_status_history (subscriber_id, changed_at DESC);
+
+-- Verilen günün partition'ı yoksa oluşturur
+CREATE OR REPLACE FUNCTION ensure_status_history_partition(p_day DATE) RETURNS TEXT AS $$
+DECLARE
+    partition_name TEXT := 'subscriber_status_history_' || to_char(p_day, 'YYYY_MM_DD');
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF subscriber_status_history FOR VALUES FROM (%L) TO (%L)',
+        partition_name, p_day, p_day + 1
+    );
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Son p_keep_days günden eski partition'ları düşürür (retention)
+CREATE OR REPLACE FUNCTION drop_status_history_partitions(p_keep_days INTEGER) RETURNS INTEGER AS $$
+DECLARE
+    cutoff DATE := CURRENT_DATE - p_keep_days;
+    part RECORD;
+    dropped INTEGER := 0;
+BEGIN
+    FOR part IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'subscriber_status_history'::regclass
+          AND c.relname ~ '^subscriber_status_history_\d{4}_\d{2}_\d{2}$'
+    LOOP
+        IF to_date(substring(part.relname FROM '(\d{4}_\d{2}_\d{2})$'), 'YYYY_MM_DD') < cutoff THEN
+            EXECUTE format('DROP TABLE IF EXISTS %I', part.relname);
+            dropped := dropped + 1;
+        END IF;
+    END LOOP;
+    RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Mevcut son geçişler kaybolmasın: previous_status'u olan satırlar (son 90 gün)
+-- tek kayıt olarak taşınır; bu günlerin ve yarının partition'ları oluşturulur
+SELECT ensure_status_history_partition(d::date)
+FROM generate_series(
+    GREATEST(
+        CURRENT_DATE - 90,
+        LEAST(CURRENT_DATE, COALESCE((
+            SELECT MIN(status_changed_at)::date FROM subscriber_status WHERE previous_status IS NOT NULL
+        ), CURRENT_DATE))
+    ),
+    CURRENT_DATE + 1,
+    INTERVAL '1 day'
+) AS d;
+
+INSERT INTO subscriber_status_history (subscriber_id, region_id, old_status, new_status, changed_at)
+SELECT ss.subscriber_id, c.region_id, ss.previous_status::subscriber_status_t, ss.current_status,
+       COALESCE(ss.status_changed_at, NOW())
+FROM subscriber_status ss
+JOIN customers c ON c.subscriber_id = ss.subscriber_id
+WHERE ss.previous_status IS NOT NULL
+  AND COALESCE(ss.status_changed_at, NOW()) >= CURRENT_DATE - 90
+  AND COALESCE(ss.status_changed_at, NOW()) < CURRENT_DATE + 2;
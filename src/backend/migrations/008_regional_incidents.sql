@@ -0,0 +1,30 @@
+-- 008: Bölgesel arıza (incident) kayıtları
+-- Kabin / OLT arızasında yüzlerce abone aynı taramada YELLOW/RED olur.
+-- outage_correlation.OutageCorrelator her taramadan sonra bozulmaları
+-- region_id bazında gruplar; change-point testi geçen bölge için burada tek
+-- incident ve tek REGIONAL ticket açılır, etkilenen abonelerin bireysel
+-- ticket / bildirimleri bastırılır. group_type ileride kabin / OLT
+-- topolojisi için ('cabinet', 'olt') kullanılacak.
+
+CREATE TABLE IF NOT EXISTS regional_incidents (
+    incident_id SERIAL PRIMARY KEY,
+    group_type VARCHAR(20) NOT NULL DEFAULT 'region',
+    group_key VARCHAR(50) NOT NULL,
+    status VARCHAR(10) NOT NULL DEFAULT 'OPEN',     -- OPEN / CLOSED
+    opened_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    closed_at TIMESTAMP,
+    affected_count INTEGER NOT NULL,
+    peak_affected INTEGER NOT NULL,
+    member_count INTEGER NOT NULL,
+    baseline_rate REAL,
+    z_score REAL,
+    member_ids INTEGER[] NOT NULL DEFAULT '{}',     -- Bastırılan aboneler (restart sonrası geri yüklenir)
+    ticket_id INTEGER REFERENCES tickets(ticket_id) ON DELETE SET NULL
+);
+
+-- Bir grup için aynı anda tek açık incident (birden fazla API süreci aynı taramayı görebilir)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_regional_incidents_open
+    ON regional_incidents (group_type, group_key) WHERE status = 'OPEN';
+
+CREATE INDEX IF NOT EXISTS idx_regional_incidents_opened
+    ON regional_incidents (opened_at DESC);
@@ -0,0 +1,40 @@
+-- 009: Teknisyen atama (dispatch) için konum, yetenek ve kapasite
+-- Ticket'lar "Teknisyen Ekibi" varsayılanıyla açılıyordu; dispatch.py açık
+-- ticket'ları teknisyenlere toplu olarak atar (mesafe + yetenek + öncelik
+-- maliyet matrisi, linear assignment). Atama tickets.technician_id'ye yazılır,
+-- assigned_to geriye uyumluluk için teknisyen adını tutar.
+
+ALTER TABLE technicians
+    ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS skills TEXT[] NOT NULL DEFAULT '{}',   -- Çözebildiği fault_type'lar
+    ADD COLUMN IF NOT EXISTS capacity SMALLINT NOT NULL DEFAULT 4;   -- Aynı anda üstlenebileceği açık ticket
+
+ALTER TABLE tickets
+    ADD COLUMN IF NOT EXISTS technician_id INTEGER REFERENCES technicians(id) ON DELETE SET NULL;
+
+-- Teknisyen başına açık iş yükü (kapasite hesabı)
+CREATE INDEX IF NOT EXISTS idx_tickets_technician_open
+    ON tickets (technician_id) WHERE status NOT IN ('RESOLVED', 'CLOSED');
+
+-- Atama bekleyen ticket'lar (dispatch turunun girdisi)
+CREATE INDEX IF NOT EXISTS idx_tickets_dispatch_pending
+    ON tickets (ticket_id) WHERE technician_id IS NULL AND status = 'CREATED';
+
+-- Mevcut teknisyenler: uzmanlıktan yetenek, id'ye göre bölge merkezlerine dağıtılmış konum
+UPDATE technicians
+SET skills = CASE expertise
+        WHEN 'Fiber Uzmanı' THEN ARRAY['INFRASTRUCTURE', 'NETWORK']
+        WHEN 'Saha Operasyonu' THEN ARRAY['CPE', 'INFRASTRUCTURE']
+        WHEN 'Ağ Mühendisi' THEN ARRAY['NETWORK', 'INFRASTRUCTURE']
+        WHEN 'Müşteri Destek' THEN ARRAY['CPE']
+        WHEN 'Kablo Teknisyeni' THEN ARRAY['INFRASTRUCTURE', 'CPE']
+        ELSE ARRAY['CPE']
+    END
+WHERE skills = '{}';
+
+UPDATE technicians t
+SET latitude = c.lat, longitude = c.lon
+FROM (VALUES (0, 40.99, 29.03), (1, 41.04, 29.00), (2, 41.02, 29.01), (3, 41.06, 28.99), (4, 40.98, 28.87))
+    AS c(slot, lat, lon)
+WHERE t.latitude IS NULL AND t.id % 5 = c.slot;
@@ -0,0 +1,470 @@
+"""
+Model Registry
+Versiyonlu model artifact'ları, restart'sız hot swap ve shadow scoring.
+
+Dizin yapısı (NETPULSE_MODEL_REGISTRY, varsayılan saved_models/registry):
+    registry/
+        ACTIVE                  aktif versiyon adı
+        SHADOW                  (opsiyonel) gölgede skorlanan aday versiyon
+        <versiyon>/
+            manifest.json       notlar, yayın zamanı
+            netpulse_lstm.h5, lstm_scaler.pkl, lstm_encoder.pkl        (LSTM, opsiyonel)
+            netpulse_classifier_flat/ veya netpulse_classifier.pkl      (RF, opsiyonel)
+
+- Yayın: artifact'lar geçici dizine kopyalanır, tek rename ile görünür olur;
+  pointer dosyaları geçici dosya + os.replace ile atomik yazılır.
+- Hot swap: yeni versiyon istek yolunun dışında tamamen yüklenir, geçiş tek
+  referans atamasıdır (LSTM: model/scaler/encoder üçlüsü birlikte, RF:
+  on_rf_swap). Uçuştaki istekler başladıkları modelle biter; LSTM
+  measurement_cache (pencereler) korunur. Versiyonda olmayan model değişmez.
+- Shadow: her batch aktif modelle skorlanır, aynı girdiler arka plan
+  thread'inde aday modelle de skorlanır; uyum oranı ve gecikme kaydedilir.
+  Aday meşgulse batch atlanır, istek yolu beklemez.
+- Pointer değişiklikleri poll() ile yansır (API'de MODEL_WATCH_SECONDS'ta bir,
+  scoring worker'da her taramadan önce); admin endpoint'leri aynı pointer'ları
+  yazdığı için tüm süreçler aynı versiyona yakınsar.
+"""
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import metrics
+from lstm_numpy import numpy_path
+from lstm_service import LSTMPredictionService, lstm_precision_available, load_lstm_artifacts
+from scoring import load_forest_model
+
+logger = logging.getLogger(__name__)
+
+LSTM_FILES = ("netpulse_lstm.h5", "lstm_scaler.pkl", "lstm_encoder.pkl")
+RF_FLAT_DIR = "netpulse_classifier_flat"
+RF_PICKLE = "netpulse_classifier.pkl"
+POINTERS = ("ACTIVE", "SHADOW")
+VERSION_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+@dataclass
+class ModelBundle:
+    version: str
+    rf_model: object = None
+    # (model, scaler, encoder)
+    lstm: Optional[Tuple] = None
+    loaded_at: datetime = field(default_factory=datetime.now)
+
+    @property
+    def models(self) -> List[str]:
+        return [name for name, part in (("RandomForest", self.rf_model), ("LSTM", self.lstm)) if part is not None]
+
+
+class ModelRegistry:
+    """Versiyon dizinleri ve ACTIVE / SHADOW pointer'ları"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, version: str) -> str:
+        if not version or not VERSION_PATTERN.match(version):
+            raise ValueError(f"Geçersiz model versiyonu: {version!r}")
+        return os.path.join(self.root, version)
+
+    def versions(self) -> List[dict]:
+        if not os.path.isdir(self.root):
+            return []
+        result = []
+        for version in sorted(os.listdir(self.root)):
+            directory = os.path.join(self.root, version)
+            if version.startswith(".") or not os.path.isdir(directory):
+                continue
+            manifest_path = os.path.join(directory, "manifest.json")
+            manifest = {}
+            if os.path.exists(manifest_path):
+                with open(manifest_path, encoding="utf-8") as f:
+                    manifest = json.load(f)
+            result.append({
+                "version": version,
+                "lstm": all(os.path.exists(os.path.join(directory, name)) for name in LSTM_FILES),
+                "rf": _has_rf(directory),
+                **manifest
+            })
+        return result
+
+    def read_pointer(self, name: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, name), encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def write_pointer(self, name: str, version: Optional[str]):
+        """Atomik: okuyan süreç ya eski ya yeni versiyonu görür"""
+        if name not in POINTERS:
+            raise ValueError(f"Bilinmeyen pointer: {name}")
+        target = os.path.join(self.root, name)
+        if version is None:
+            if os.path.exists(target):
+                os.remove(target)
+            return
+        self.path(version)
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=f".{name}.")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(version + "\n")
+        os.replace(tmp, target)
+
+    def publish(self, version: str, source_dir: str, notes: str = "") -> dict:
+        """source_dir'deki LSTM / RF artifact'larını yeni versiyon olarak yayınlar (aktif etmez)"""
+        target = self.path(version)
+        if os.path.exists(target):
+            raise ValueError(f"Versiyon zaten var: {version}")
+
+        staging = tempfile.mkdtemp(dir=self._ensure_root(), prefix=f".{version}.")
+        try:
+            copied = []
+            if all(os.path.exists(os.path.join(source_dir, name)) for name in LSTM_FILES):
+                for name in LSTM_FILES:
+                    shutil.copy2(os.path.join(source_dir, name), staging)
+                # Opsiyonel NumPy export'u (h5py'siz düşük hassasiyetli inference)
+                exported = numpy_path(os.path.join(source_dir, LSTM_FILES[0]))
+                if os.path.exists(exported):
+                    shutil.copy2(exported, staging)
+                copied.append("LSTM")
+            if os.path.isdir(os.path.join(source_dir, RF_FLAT_DIR)):
+                shutil.copytree(os.path.join(source_dir, RF_FLAT_DIR), os.path.join(staging, RF_FLAT_DIR))
+                copied.append("RandomForest")
+            elif os.path.exists(os.path.join(source_dir, RF_PICKLE)):
+                shutil.copy2(os.path.join(source_dir, RF_PICKLE), staging)
+                copied.append("RandomForest")
+            if not copied:
+                raise ValueError(f"{source_dir} içinde LSTM veya RF artifact'ı yok")
+
+            manifest = {"published_at": datetime.now().isoformat(), "models": copied, "notes": notes}
+            with open(os.path.join(staging, "manifest.json"), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            os.rename(staging, target)
+            return {"version": version, **manifest}
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+    def load(self, version: str, lstm: bool = True, lstm_precision: str = "keras") -> ModelBundle:
+        """
+        Versiyondaki modelleri yükler (yavaş; istek yolunun dışında çağrılmalı).
+        lstm=False veya keras modunda TensorFlow yoksa LSTM artifact'ları atlanır.
+        """
+        directory = self.path(version)
+        if not os.path.isdir(directory):
+            raise FileNotFoundError(f"Model versiyonu bulunamadı: {version}")
+
+        bundle = ModelBundle(version=version)
+        if _has_rf(directory):
+            bundle.rf_model = load_forest_model(os.path.join(directory, RF_FLAT_DIR), os.path.join(directory, RF_PICKLE))
+        lstm_paths = [os.path.join(directory, name) for name in LSTM_FILES]
+        if lstm and all(os.path.exists(p) for p in lstm_paths):
+            if lstm_precision_available(lstm_precision):
+                bundle.lstm = load_lstm_artifacts(*lstm_paths, precision=lstm_precision)
+            else:
+                logger.warning(f"⚠️ {version}: TensorFlow yok, LSTM artifact'ları atlandı")
+        if not bundle.models:
+            raise ValueError(f"{version} içinde yüklenecek model yok")
+        return bundle
+
+    def _ensure_root(self) -> str:
+        os.makedirs(self.root, exist_ok=True)
+        return self.root
+
+
+def _has_rf(directory: str) -> bool:
+    return (os.path.exists(os.path.join(directory, RF_FLAT_DIR, "meta.json"))
+            or os.path.exists(os.path.join(directory, RF_PICKLE)))
+
+
+class ShadowScorer:
+    """
+    Aktif modelin skorladığı batch'leri aday modelle arka planda yeniden skorlar.
+    submit() hiçbir zaman beklemez: en fazla max_pending batch kuyrukta olabilir,
+    fazlası atlanır (skipped).
+    """
+
+    def __init__(self, max_pending: int = 2):
+        self.max_pending = max_pending
+        self.version: Optional[str] = None
+        self._candidates: Dict[str, Callable] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow-scorer")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats: Dict[str, dict] = {}
+
+    @property
+    def active(self) -> bool:
+        return bool(self._candidates)
+
+    def set_candidates(self, version: Optional[str], candidates: Dict[str, Callable]):
+        """candidates: model adı -> fn(girdi) -> sınıf dizisi; istatistikler sıfırlanır"""
+        with self._lock:
+            self.version = version
+            self._candidates = dict(candidates)
+            self._stats = {}
+
+    def clear(self):
+        self.set_candidates(None, {})
+
+    def submit(self, model_name: str, inputs, primary_classes, primary_seconds: float):
+        candidate = self._candidates.get(model_name)
+        if candidate is None:
+            return
+        with self._lock:
+            stats = self._stats_for(model_name)
+            if self._pending >= self.max_pending:
+                stats["skipped"] += 1
+                metrics.SHADOW_BATCHES.inc(model=model_name, result="skipped")
+                return
+            self._pending += 1
+            version = self.version
+        self._executor.submit(self._run, model_name, version, candidate, inputs,
+                              np.asarray(primary_classes), primary_seconds)
+
+    def _run(self, model_name: str, version: str, candidate: Callable, inputs, primary: np.ndarray, primary_seconds: float):
+        try:
+            started = time.perf_counter()
+            shadow = np.asarray(candidate(inputs)).astype(primary.dtype, copy=False)
+            shadow_seconds = time.perf_counter() - started
+        except Exception as e:
+            logger.warning(f"⚠️ Shadow {model_name} ({version}) skorlama hatası: {e}")
+            with self._lock:
+                self._pending -= 1
+                if version == self.version:
+                    self._stats_for(model_name)["errors"] += 1
+            metrics.SHADOW_BATCHES.inc(model=model_name, result="error")
+            return
+
+        agree = primary == shadow
+        metrics.SHADOW_BATCHES.inc(model=model_name, result="scored")
+        metrics.SHADOW_ROWS.inc(int(agree.sum()), model=model_name, result="agree")
+        metrics.SHADOW_ROWS.inc(int((~agree).sum()), model=model_name, result="disagree")
+        metrics.SHADOW_INFERENCE_SECONDS.observe(primary_seconds, model=model_name, role="active")
+        metrics.SHADOW_INFERENCE_SECONDS.observe(shadow_seconds, model=model_name, role="shadow")
+
+        with self._lock:
+            self._pending -= 1
+            # Bu arada aday değiştiyse sonuç eski adaya aittir
+            if version != self.version:
+                return
+            stats = self._stats_for(model_name)
+            stats["batches"] += 1
+            stats["rows"] += len(agree)
+            stats["agree"] += int(agree.sum())
+            stats["active_seconds"] += primary_seconds
+            stats["shadow_seconds"] += shadow_seconds
+            pairs, counts = np.unique(np.stack([primary[~agree], shadow[~agree]], axis=1), axis=0, return_counts=True)
+            for (old, new), count in zip(pairs.tolist(), counts.tolist()):
+                key = f"{old}->{new}"
+                stats["disagreements"][key] = stats["disagreements"].get(key, 0) + count
+
+    def _stats_for(self, model_name: str) -> dict:
+        stats = self._stats.get(model_name)
+        if stats is None:
+            stats = self._stats[model_name] = {
+                "batches": 0, "rows": 0, "agree": 0, "skipped": 0, "errors": 0,
+                "active_seconds": 0.0, "shadow_seconds": 0.0, "disagreements": {}
+            }
+        return stats
+
+    def report(self) -> dict:
+        with self._lock:
+            models = {}
+            for model_name, stats in self._stats.items():
+                batches = max(stats["batches"], 1)
+                models[model_name] = {
+                    "batches": stats["batches"],
+                    "rows": stats["rows"],
+                    "agreement": round(stats["agree"] / stats["rows"], 4) if stats["rows"] else None,
+                    "skipped": stats["skipped"],
+                    "errors": stats["errors"],
+                    "active_ms_avg": round(stats["active_seconds"] * 1000 / batches, 2),
+                    "shadow_ms_avg": round(stats["shadow_seconds"] * 1000 / batches, 2),
+                    "disagreements": dict(stats["disagreements"])
+                }
+            return {"version": self.version, "models": models}
+
+
+def shadow_candidates(bundle: ModelBundle) -> Dict[str, Callable]:
+    """Aday versiyonun modellerini aktif modelin girdileriyle çağrılabilir hale getirir"""
+    candidates = {}
+    if bundle.rf_model is not None:
+        rf = bundle.rf_model
+        candidates["RandomForest"] = lambda frame: rf.predict(frame)
+    if bundle.lstm is not None:
+        model, scaler, _ = bundle.lstm
+
+        def lstm_classes(X: np.ndarray) -> np.ndarray:
+            n, window, width = X.shape
+            X_scaled = scaler.transform(X.reshape(-1, width)).reshape(n, window, width)
+            return np.argmax(model.predict(X_scaled, verbose=0), axis=1)
+
+        candidates["LSTM"] = lstm_classes
+    return candidates
+
+
+class ModelManager:
+    """
+    Registry pointer'larını sürecin modellerine uygular:
+    - poll(): ACTIVE / SHADOW değiştiyse yeni versiyonu yükleyip geçer
+    - activate / start_shadow / stop_shadow / promote: admin işlemleri (pointer'ı da yazar)
+    Yükleme _lock altında seri yapılır; inference bu kilidi hiç almaz.
+    """
+
+    def __init__(self, registry: ModelRegistry, lstm_service: Optional[LSTMPredictionService] = None,
+                 on_rf_swap: Optional[Callable] = None, shadow: Optional[ShadowScorer] = None):
+        self.registry = registry
+        self.lstm_service = lstm_service
+        self.on_rf_swap = on_rf_swap
+        self.shadow = shadow or ShadowScorer()
+        self.active_version: Optional[str] = None
+        self.shadow_version: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.swapped_at: Optional[datetime] = None
+        self._shadow_bundle: Optional[ModelBundle] = None
+        # Yüklenemeyen versiyonlar her poll'da tekrar denenmez
+        self._failed: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def poll(self) -> bool:
+        """Pointer'lar değiştiyse uygular; bir şey değiştiyse True"""
+        changed = False
+        with self._lock:
+            active = self.registry.read_pointer("ACTIVE")
+            if active and active != self.active_version and active not in self._failed:
+                changed |= self._try(active, lambda: self._swap(self._load(active)))
+
+            shadow = self.registry.read_pointer("SHADOW")
+            if shadow != self.shadow_version and shadow not in self._failed:
+                changed |= self._try(shadow, lambda: self._set_shadow(self._load(shadow) if shadow else None))
+        return changed
+
+    def activate(self, version: str) -> dict:
+        with self._lock:
+            bundle = self._shadow_bundle if version == self.shadow_version else self._load(version)
+            self._swap(bundle)
+            self.registry.write_pointer("ACTIVE", version)
+            if version == self.shadow_version:
+                self._set_shadow(None)
+                self.registry.write_pointer("SHADOW", None)
+        return self.status()
+
+    def promote(self) -> dict:
+        """Gölgedeki adayı (yeniden yüklemeden) aktif yapar"""
+        if not self.shadow_version:
+            raise ValueError("Shadow modda aday model yok")
+        return self.activate(self.shadow_version)
+
+    def start_shadow(self, version: str) -> dict:
+        with self._lock:
+            self._set_shadow(self._load(version))
+            self.registry.write_pointer("SHADOW", version)
+        return self.status()
+
+    def stop_shadow(self) -> dict:
+        with self._lock:
+            self._set_shadow(None)
+            self.registry.write_pointer("SHADOW", None)
+        return self.status()
+
+    def status(self) -> dict:
+        return {
+            "registry": self.registry.root,
+            "active_version": self.active_version,
+            "lstm_version": self.lstm_service.version if self.lstm_service else None,
+            "swapped_at": self.swapped_at.isoformat() if self.swapped_at else None,
+            "shadow": self.shadow.report() if self.shadow_version else None,
+            "failed": dict(self._failed),
+            "versions": self.registry.versions()
+        }
+
+    def _load(self, version: str) -> ModelBundle:
+        started = time.perf_counter()
+        bundle = self.registry.load(
+            version, lstm=self.lstm_service is not None,
+            lstm_precision=self.lstm_service.precision if self.lstm_service else "keras"
+        )
+        logger.info(f"📦 Model {version} yüklendi ({', '.join(bundle.models)}, {time.perf_counter() - started:.1f} sn)")
+        return bundle
+
+    def _swap(self, bundle: ModelBundle):
+        if bundle.lstm is not None and self.lstm_service is not None:
+            self.lstm_service.swap(*bundle.lstm, version=bundle.version)
+        if bundle.rf_model is not None and self.on_rf_swap is not None:
+            self.on_rf_swap(bundle.rf_model)
+        if self.active_version:
+            metrics.MODEL_VERSION.set(0, version=self.active_version)
+        metrics.MODEL_VERSION.set(1, version=bundle.version)
+        self._failed.pop(bundle.version, None)
+        self.active_version = bundle.version
+        self.swapped_at = datetime.now()
+        logger.info(f"🔁 Aktif model versiyonu: {bundle.version}")
+
+    def _set_shadow(self, bundle: Optional[ModelBundle]):
+        self._shadow_bundle = bundle
+        self.shadow_version = bundle.version if bundle else None
+        if bundle:
+            self._failed.pop(bundle.version, None)
+            self.shadow.set_candidates(bundle.version, shadow_candidates(bundle))
+            logger.info(f"👥 Shadow scoring: {bundle.version} ({', '.join(bundle.models)})")
+        else:
+            self.shadow.clear()
+
+    def _try(self, version: str, action: Callable) -> bool:
+        try:
+            action()
+            return True
+        except Exception as e:
+            self._failed[version] = str(e)
+            self.last_error = f"{version}: {e}"
+            logger.error(f"❌ Model {version} uygulanamadı: {e}")
+            return False
+
+
+def main():
+    import argparse
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser = argparse.ArgumentParser(description="NetPulse model registry")
+    parser.add_argument("--registry", default=os.getenv("NETPULSE_MODEL_REGISTRY", os.path.join(base_dir, "saved_models", "registry")))
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Versiyonlar ve pointer'lar")
+    publish = sub.add_parser("publish", help="Artifact dizinini yeni versiyon olarak yayınla")
+    publish.add_argument("version")
+    publish.add_argument("--from", dest="source", default=os.path.join(base_dir, "saved_models"))
+    publish.add_argument("--notes", default="")
+    activate = sub.add_parser("activate", help="ACTIVE pointer'ını değiştir (süreçler poll ile geçer)")
+    activate.add_argument("version")
+    shadow = sub.add_parser("shadow", help="SHADOW pointer'ı (versiyon verilmezse kapatır)")
+    shadow.add_argument("version", nargs="?")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.registry)
+    if args.command == "publish":
+        print(json.dumps(registry.publish(args.version, args.source, args.notes), ensure_ascii=False, indent=2))
+    elif args.command == "activate":
+        registry.write_pointer("ACTIVE", args.version)
+    elif args.command == "shadow":
+        registry.write_pointer("SHADOW", args.version)
+
+    print(json.dumps({
+        "ACTIVE": registry.read_pointer("ACTIVE"),
+        "SHADOW": registry.read_pointer("SHADOW"),
+        "versions": registry.versions()
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Monitor Scheduler
+BackgroundMonitor için risk öncelikli ölçüm zamanlayıcısı.
+
+Her abonenin bir sonraki ölçüm zamanı (next-due) vardır ve aboneler bu zamana
+göre bir min-heap'te tutulur. Her tick'te vakti gelmiş aboneler, saniye başına
+ölçüm bütçesini aşmayacak şekilde batch halinde alınır. Ölçümden sonra aralık:
+- son risk skoru yüksek / trend yükseliyor / açık ticket var -> min_interval (1 dk)
+- stabil ve düşük riskli -> max_interval (15 dk)
+- arası risk ile doğrusal; VIP abonelerde aralık yarıya iner
+Bütçe yetmezse vakti geçmiş aboneler heap'te bekler; en eski gecikme
+MONITOR_LAG_SECONDS olarak raporlanır.
+
+Heap'ten silme yoktur: her abonenin geçerli kaydı _queued'da (due_at, seq)
+olarak tutulur, seq'i uymayan heap kayıtları (silinip yeniden eklenen,
+önceliği değişip yeniden planlanan aboneler) pop edildiğinde atlanır.
+"""
+import heapq
+import itertools
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from scoring import classify_subscriber_status
+
+SEVERITY_RISK = {"GREEN": 0.0, "YELLOW": 0.5, "RED": 1.0}
+
+
+@dataclass
+class SchedulerConfig:
+    min_interval: float = 60.0
+    max_interval: float = 900.0
+    # Bu riskin üzerindeki aboneler min_interval ile ölçülür
+    high_risk: float = 0.6
+    # Ardışık iki ölçüm arasında bu kadar risk artışı "rising" sayılır
+    trend_delta: float = 0.15
+    # Saniye başına en fazla ölçüm (tüm aboneler için toplam)
+    budget_per_second: float = 200.0
+    tick_seconds: float = 1.0
+    vip_factor: float = 0.5
+
+
+@dataclass
+class SubscriberInfo:
+    plan: str
+    region: str
+    is_vip: bool = False
+    open_tickets: int = 0
+    last_risk: float = 0.0
+    trend: str = "stable"
+
+
+def measurement_risk(live: dict) -> float:
+    """Tek ölçümden 0-1 risk: trafik ışığı kuralı + latency / packet loss kompoziti"""
+    severity = SEVERITY_RISK[classify_subscriber_status(live, 0)]
+    composite = live["latency"] / 200.0 + live["packet_loss"] / 10.0
+    return min(1.0, max(severity, composite))
+
+
+class MonitorScheduler:
+    def __init__(self, config: SchedulerConfig = None):
+        self.config = config or SchedulerConfig()
+        self.subscribers: Dict[int, SubscriberInfo] = {}
+        self._heap: List[Tuple[float, int, int]] = []
+        self._seq = itertools.count()
+        # sid -> (due_at, seq): abonenin heap'teki geçerli kaydı; ölçümdeyken yok
+        self._queued: Dict[int, Tuple[float, int]] = {}
+        self._credit = 0.0
+
+    def __len__(self) -> int:
+        return len(self.subscribers)
+
+    def sync(self, rows: List[tuple], now: float):
+        """
+        Abone listesini ve öncelik bayraklarını günceller.
+        rows: [(subscriber_id, plan, region, is_vip, open_tickets), ...]
+        Yeni aboneler ilk aralıklarına yayılarak eklenir (hepsi aynı anda ölçülmesin).
+        VIP olan ya da ticket'ı açılan abonenin zamanı yeni aralığına çekilir.
+        """
+        seen = set()
+        for sid, plan, region, is_vip, open_tickets in rows:
+            seen.add(sid)
+            info = self.subscribers.get(sid)
+            if info is None:
+                info = self.subscribers[sid] = SubscriberInfo(plan, region, bool(is_vip), int(open_tickets or 0))
+                self._push(sid, now + random.uniform(0, self.interval_for(info)))
+            else:
+                previous = self.interval_for(info)
+                info.plan, info.region = plan, region
+                info.is_vip, info.open_tickets = bool(is_vip), int(open_tickets or 0)
+                interval = self.interval_for(info)
+                queued = self._queued.get(sid)
+                if interval < previous and queued and now + interval < queued[0]:
+                    self._push(sid, now + interval)
+
+        # Silinen aboneler heap'te kalır, pop edildiğinde atlanır
+        for sid in [sid for sid in self.subscribers if sid not in seen]:
+            del self.subscribers[sid]
+            self._queued.pop(sid, None)
+
+    def interval_for(self, info: SubscriberInfo) -> float:
+        cfg = self.config
+        if info.trend == "rising" or info.open_tickets > 0 or info.last_risk >= cfg.high_risk:
+            interval = cfg.min_interval
+        else:
+            interval = cfg.max_interval - (cfg.max_interval - cfg.min_interval) * (info.last_risk / cfg.high_risk)
+        if info.is_vip:
+            interval *= cfg.vip_factor
+        return max(cfg.min_interval, interval)
+
+    def due(self, now: float) -> Tuple[List[int], float]:
+        """
+        Bu tick'te ölçülecek aboneler (bütçe kadar) ve en eski gecikme (sn).
+        Bütçe tick'ler arasında birikir; kullanılmayan kısmı bir tick'le sınırlıdır.
+        """
+        cfg = self.config
+        self._credit = min(self._credit + cfg.budget_per_second * cfg.tick_seconds, cfg.budget_per_second * cfg.tick_seconds)
+        limit = int(self._credit)
+
+        batch = []
+        lag = 0.0
+        while self._heap and self._heap[0][0] <= now:
+            due_at, seq, sid = self._heap[0]
+            if self._queued.get(sid, (None, None))[1] != seq:
+                heapq.heappop(self._heap)
+                continue
+            if len(batch) >= limit:
+                lag = now - due_at
+                break
+            heapq.heappop(self._heap)
+            del self._queued[sid]
+            batch.append(sid)
+
+        self._credit -= len(batch)
+        return batch, lag
+
+    def reschedule(self, sid: int, live: dict, now: float) -> float:
+        """Ölçüm sonucuna göre risk/trend'i günceller ve bir sonraki zamanı planlar"""
+        info = self.subscribers.get(sid)
+        if info is None:
+            return 0.0
+        risk = measurement_risk(live)
+        if risk >= info.last_risk + self.config.trend_delta:
+            info.trend = "rising"
+        elif risk <= info.last_risk - self.config.trend_delta:
+            info.trend = "falling"
+        else:
+            info.trend = "stable"
+        info.last_risk = risk
+
+        interval = self.interval_for(info)
+        self._push(sid, now + interval)
+        return interval
+
+    def _push(self, sid: int, due_at: float):
+        """Abonenin önceki heap kaydı (varsa) bayatlar"""
+        seq = next(self._seq)
+        self._queued[sid] = (due_at, seq)
+        heapq.heappush(self._heap, (due_at, seq, sid))
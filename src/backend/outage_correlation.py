@@ -0,0 +1,397 @@
+"""
+Outage Correlation
+Her taramadan sonra (fleet snapshot yeniden kurulduğunda) eş zamanlı
+bozulmaları bölge bazında gruplar ve bölgesel arızaları tek incident'a
+indirger.
+
+- Group-by: bincount ile bölge başına abone sayısı (n) ve YELLOW/RED sayısı (k)
+- Change-point: k, bölgenin EWMA baseline oranına (p) göre binom z-score ile
+  test edilir: z = (k - n·p) / sqrt(n·p·(1-p)). z eşiği, minimum etkilenen
+  abone sayısı ve oranı birlikte geçilirse incident açılır; baseline sadece
+  incident olmayan bölgelerde güncellenir.
+- Açık incident'ın üyeleri (etkilenen aboneler) için bireysel ticket,
+  bildirim ve ticket notu üretimi bastırılır: iş O(abone) yerine O(bölge).
+- Oran clear_fraction'ın altına inince incident kapanır.
+
+Gruplama anahtarı bölgedir; detect() herhangi bir grup kodu dizisi kabul
+ettiği için kabin / OLT topolojisi geldiğinde aynı test kullanılır.
+Eşikler NETPULSE_OUTAGE_<ALAN> ortam değişkenleriyle ayarlanır
+(ör. NETPULSE_OUTAGE_MIN_AFFECTED=10).
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fleet_snapshot import FleetSnapshot, STATUS_CODES
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CorrelationConfig:
+    enabled: bool = True
+    # Bölgede en az bu kadar YELLOW/RED abone ve bölgenin en az bu oranı
+    min_affected: int = 5
+    min_fraction: float = 0.2
+    # Baseline orana göre binom z-score eşiği (change-point testi)
+    z_threshold: float = 4.0
+    # Baseline oranın alt sınırı; sessiz bölgelerde z-score patlamasın
+    baseline_floor: float = 0.02
+    baseline_alpha: float = 0.1
+    # Etkilenen oran bunun altına inince incident kapanır (histerezis)
+    clear_fraction: float = 0.1
+
+    @classmethod
+    def from_env(cls) -> "CorrelationConfig":
+        values = {}
+        for f in fields(cls):
+            raw = os.getenv(f"NETPULSE_OUTAGE_{f.name.upper()}")
+            if raw is None:
+                continue
+            if f.type is bool:
+                values[f.name] = raw.lower() in ("1", "true", "yes")
+            else:
+                values[f.name] = int(raw) if f.type is int else float(raw)
+        return cls(**values)
+
+
+@dataclass
+class Incident:
+    group_key: str
+    opened_at: datetime
+    affected: int
+    member_count: int
+    baseline_rate: float
+    z_score: float
+    members: np.ndarray = field(repr=False)  # sıralı subscriber_id'ler
+    peak_affected: int = 0
+    incident_id: Optional[int] = None
+    ticket_id: Optional[int] = None
+    group_type: str = "region"
+
+    def as_dict(self) -> dict:
+        return {
+            "incident_id": self.incident_id,
+            "group_type": self.group_type,
+            "group_key": self.group_key,
+            "opened_at": self.opened_at.isoformat(),
+            "affected": self.affected,
+            "peak_affected": self.peak_affected,
+            "member_count": self.member_count,
+            "baseline_rate": round(self.baseline_rate, 4),
+            "z_score": round(self.z_score, 2),
+            "ticket_id": self.ticket_id
+        }
+
+
+class OutageCorrelator:
+    def __init__(self, get_db_func=None, config: CorrelationConfig = None,
+                 on_incident: Callable[[str, Incident], None] = None,
+                 clock: Callable[[], float] = time.time):
+        self.get_db_func = get_db_func
+        self.config = config or CorrelationConfig()
+        self.on_incident = on_incident  # ("opened" | "closed", incident) ile çağrılır
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.active: Dict[str, Incident] = {}
+        self._baseline: Dict[str, float] = {}
+        self._member_of: Dict[int, str] = {}
+        self._loaded = get_db_func is None
+
+    # --- Sorgular (API hot path'i; DB yok) ---
+
+    def incident_for(self, subscriber_id: int) -> Optional[Incident]:
+        """Abone açık bir incident'ın üyesiyse o incident"""
+        with self._lock:
+            key = self._member_of.get(subscriber_id)
+            return self.active.get(key) if key is not None else None
+
+    def suppressed(self, subscriber_ids: Sequence[int]) -> np.ndarray:
+        """Açık incident üyesi olan aboneler için True (vektörel)"""
+        with self._lock:
+            members = [incident.members for incident in self.active.values()]
+        if not members:
+            return np.zeros(len(subscriber_ids), dtype=bool)
+        return np.isin(np.asarray(subscriber_ids, dtype=np.int64), np.concatenate(members))
+
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            return [incident.as_dict() for incident in self.active.values()]
+
+    # --- Tarama sonrası ---
+
+    def observe(self, snapshot: FleetSnapshot):
+        """FleetSnapshotStore.on_rebuild ile her yeni snapshot için çağrılır"""
+        if not self.config.enabled or not len(snapshot):
+            return
+        if not self._loaded:
+            self._load_active()
+
+        degraded = snapshot.status != STATUS_CODES["GREEN"]
+        opened, updated, closed = self.detect(
+            snapshot.region_code, snapshot.regions, snapshot.subscriber_id, degraded
+        )
+        if self.get_db_func and (opened or updated or closed):
+            # Birden fazla süreç aynı snapshot'ı görür; bildirimi sadece DB'de
+            # açan / kapatan süreç gönderir
+            opened, closed = self._persist(opened, updated, closed)
+
+        for incident in opened:
+            logger.warning(
+                f"🚨 Bölgesel arıza: {incident.group_key} - {incident.affected}/{incident.member_count} abone "
+                f"(baseline %{incident.baseline_rate * 100:.1f}, z={incident.z_score:.1f})"
+            )
+            self._notify("opened", incident)
+        for incident in closed:
+            logger.info(f"✅ Bölgesel arıza kapandı: {incident.group_key}")
+            self._notify("closed", incident)
+
+    def detect(self, group_codes: np.ndarray, groups: Sequence[str], subscriber_ids: np.ndarray,
+               degraded: np.ndarray) -> Tuple[List[Incident], List[Incident], List[Incident]]:
+        """
+        Grup bazında change-point testi; active / baseline durumunu günceller.
+        group_codes[i] -> groups[...] abone i'nin grubu, degraded[i] YELLOW/RED mi.
+        Returns: (açılan, üyeleri güncellenen, kapanan) incident'lar
+        """
+        cfg = self.config
+        codes = np.asarray(group_codes, dtype=np.int64)
+        degraded = np.asarray(degraded, dtype=bool)
+        n_groups = len(groups)
+
+        n = np.bincount(codes, minlength=n_groups).astype(np.float64)
+        k = np.bincount(codes, weights=degraded, minlength=n_groups)
+        fraction = k / np.maximum(n, 1)
+
+        with self._lock:
+            base = np.asarray([self._baseline.get(g, 0.0) for g in groups], dtype=np.float64)
+            active = np.asarray([g in self.active for g in groups], dtype=bool)
+        p = np.maximum(base, cfg.baseline_floor)
+        z = (k - n * p) / np.sqrt(np.maximum(n * p * (1 - p), 1e-12))
+
+        trigger = ~active & (k >= cfg.min_affected) & (fraction >= cfg.min_fraction) & (z >= cfg.z_threshold)
+        clear = active & (fraction < cfg.clear_fraction)
+        ongoing = active & ~clear
+        quiet = ~active & ~trigger
+        base[quiet] = (1 - cfg.baseline_alpha) * base[quiet] + cfg.baseline_alpha * fraction[quiet]
+
+        # Açılan / devam eden grupların bozulmuş üyeleri, grup koduna göre sıralı tek geçişte
+        members = {}
+        selected = np.flatnonzero(degraded & (trigger | ongoing)[codes])
+        if len(selected):
+            order = selected[np.argsort(codes[selected], kind="stable")]
+            group_of = codes[order]
+            starts = np.flatnonzero(np.r_[True, group_of[1:] != group_of[:-1]])
+            for start, stop in zip(starts, np.r_[starts[1:], len(order)]):
+                members[int(group_of[start])] = np.sort(np.asarray(subscriber_ids, dtype=np.int64)[order[start:stop]])
+
+        now = datetime.fromtimestamp(self.clock())
+        opened, updated, closed = [], [], []
+        with self._lock:
+            for code, group in enumerate(groups):
+                if quiet[code]:
+                    self._baseline[group] = float(base[code])
+
+            for code in np.flatnonzero(trigger).tolist():
+                incident = Incident(
+                    group_key=groups[code], opened_at=now, affected=int(k[code]), member_count=int(n[code]),
+                    baseline_rate=float(p[code]), z_score=float(z[code]), members=members[code],
+                    peak_affected=int(k[code])
+                )
+                self.active[incident.group_key] = incident
+                opened.append(incident)
+
+            for code in np.flatnonzero(ongoing).tolist():
+                incident = self.active[groups[code]]
+                current = members.get(code, np.zeros(0, dtype=np.int64))
+                incident.affected = int(k[code])
+                incident.peak_affected = max(incident.peak_affected, incident.affected)
+                incident.member_count = int(n[code])
+                # İyileşen üyeler de incident kapanana kadar bastırılmış kalır
+                merged = np.union1d(incident.members, current)
+                if len(merged) != len(incident.members):
+                    incident.members = merged
+                    updated.append(incident)
+
+            for code in np.flatnonzero(clear).tolist():
+                closed.append(self.active.pop(groups[code]))
+
+            if opened or updated or closed:
+                self._member_of = {
+                    sid: key for key, incident in self.active.items() for sid in incident.members.tolist()
+                }
+
+        return opened, updated, closed
+
+    # --- Kalıcılık ---
+
+    def _load_active(self):
+        """Restart sonrası açık incident'ları (ve bastırılan üyeleri) DB'den geri yükler"""
+        conn = self.get_db_func()
+        if not conn:
+            return
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT incident_id, group_type, group_key, opened_at, affected_count, peak_affected,
+                       member_count, baseline_rate, z_score, member_ids, ticket_id
+                FROM regional_incidents
+                WHERE status = 'OPEN' AND group_type = 'region'
+            """)
+            with self._lock:
+                for (incident_id, group_type, key, opened_at, affected, peak, member_count,
+                     baseline, z_score, member_ids, ticket_id) in cursor.fetchall():
+                    self.active[key] = Incident(
+                        group_key=key, opened_at=opened_at, affected=affected, member_count=member_count,
+                        baseline_rate=baseline or 0.0, z_score=z_score or 0.0,
+                        members=np.sort(np.asarray(member_ids or [], dtype=np.int64)),
+                        peak_affected=peak, incident_id=incident_id, ticket_id=ticket_id, group_type=group_type
+                    )
+                self._member_of = {
+                    sid: key for key, incident in self.active.items() for sid in incident.members.tolist()
+                }
+            self._loaded = True
+            if self.active:
+                logger.info(f"🔁 {len(self.active)} açık bölgesel arıza geri yüklendi")
+        except Exception as e:
+            logger.error(f"Incident yükleme hatası: {e}")
+        finally:
+            conn.close()
+
+    def _persist(self, opened: List[Incident], updated: List[Incident],
+                 closed: List[Incident]) -> Tuple[List[Incident], List[Incident]]:
+        """
+        Açılışta incident + tek REGIONAL ticket; güncelleme / kapanış tek transaction'da.
+        Returns: (bu sürecin açtığı, bu sürecin kapattığı) incident'lar; yarışı
+        kaybedilenler ve commit edilemeyenler dahil değil
+        """
+        conn = self.get_db_func()
+        if not conn:
+            logger.error("Incident kaydı: Database bağlantısı yok")
+            return [], []
+        opened_here, closed_here = [], []
+        try:
+            cursor = conn.cursor()
+            for incident in opened:
+                cursor.execute("""
+                    INSERT INTO regional_incidents
+                        (group_type, group_key, opened_at, affected_count, peak_affected, member_count,
+                         baseline_rate, z_score, member_ids)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (group_type, group_key) WHERE status = 'OPEN' DO NOTHING
+                    RETURNING incident_id
+                """, (incident.group_type, incident.group_key, incident.opened_at, incident.affected,
+                      incident.peak_affected, incident.member_count, incident.baseline_rate, incident.z_score,
+                      incident.members.tolist()))
+                row = cursor.fetchone()
+                if row is None:
+                    # Başka bir süreç aynı incident'ı zaten açtı: üyeler yine bastırılır,
+                    # ticket ve bildirim o sürecin
+                    cursor.execute(
+                        "SELECT incident_id, ticket_id FROM regional_incidents "
+                        "WHERE group_type = %s AND group_key = %s AND status = 'OPEN'",
+                        (incident.group_type, incident.group_key)
+                    )
+                    existing = cursor.fetchone()
+                    if existing:
+                        incident.incident_id, incident.ticket_id = existing
+                    continue
+
+                opened_here.append(incident)
+                incident.incident_id = row[0]
+                cursor.execute("""
+                    INSERT INTO tickets (subscriber_id, status, priority, fault_type, scope, technician_note, assigned_to)
+                    VALUES (NULL, 'CREATED', 'HIGH', 'INFRASTRUCTURE', 'REGIONAL', %s, 'Teknisyen Ekibi')
+                    RETURNING ticket_id
+                """, (f"Bölgesel arıza #{incident.incident_id}: {incident.group_key} bölgesinde "
+                      f"{incident.affected}/{incident.member_count} abone etkilendi",))
+                incident.ticket_id = cursor.fetchone()[0]
+                cursor.execute("""
+                    INSERT INTO ticket_status_history (ticket_id, old_status, new_status, changed_by, note)
+                    VALUES (%s, NULL, 'CREATED', 'System', %s)
+                """, (incident.ticket_id, f"Outage correlation - incident #{incident.incident_id}"))
+                cursor.execute(
+                    "UPDATE regional_incidents SET ticket_id = %s WHERE incident_id = %s",
+                    (incident.ticket_id, incident.incident_id)
+                )
+
+            for incident in updated:
+                if incident.incident_id is None:
+                    continue
+                cursor.execute("""
+                    UPDATE regional_incidents
+                    SET affected_count = %s, peak_affected = GREATEST(peak_affected, %s),
+                        member_count = %s, member_ids = %s
+                    WHERE incident_id = %s
+                """, (incident.affected, incident.peak_affected, incident.member_count,
+                      incident.members.tolist(), incident.incident_id))
+
+            for incident in closed:
+                if incident.incident_id is None:
+                    continue
+                cursor.execute("""
+                    UPDATE regional_incidents
+                    SET status = 'CLOSED', closed_at = NOW(), affected_count = %s
+                    WHERE incident_id = %s AND status = 'OPEN'
+                """, (incident.affected, incident.incident_id))
+                if cursor.rowcount == 1:
+                    closed_here.append(incident)
+
+            conn.commit()
+            return opened_here, closed_here
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Incident kayıt hatası: {e}")
+            return [], []
+        finally:
+            conn.close()
+
+    def _notify(self, event: str, incident: Incident):
+        if not self.on_incident:
+            return
+        try:
+            self.on_incident(event, incident)
+        except Exception as e:
+            logger.error(f"Incident callback hatası: {e}")
+
+
+def query_incidents(conn, status: Optional[str] = None, limit: int = 50) -> List[dict]:
+    """Son incident'lar (en yeni önce); member_ids döndürülmez"""
+    conditions, params = [], []
+    if status:
+        conditions.append("status = %s")
+        params.append(status)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT incident_id, group_type, group_key, status, opened_at, closed_at,
+               affected_count, peak_affected, member_count, baseline_rate, z_score, ticket_id
+        FROM regional_incidents
+        {where}
+        ORDER BY opened_at DESC
+        LIMIT %s
+    """, (*params, limit))
+
+    return [
+        {
+            "incident_id": row[0],
+            "group_type": row[1],
+            "group_key": row[2],
+            "status": row[3],
+            "opened_at": row[4].isoformat(),
+            "closed_at": row[5].isoformat() if row[5] else None,
+            "affected": row[6],
+            "peak_affected": row[7],
+            "member_count": row[8],
+            "baseline_rate": row[9],
+            "z_score": row[10],
+            "ticket_id": row[11]
+        }
+        for row in cursor.fetchall()
+    ]
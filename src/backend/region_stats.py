@@ -0,0 +1,139 @@
+"""
+Region Aggregator
+Bölge (district) bazında durum sayıları, ortalama risk ve en kötü aboneleri
+artımlı sayaçlarla tutar. Harita bileşenleri tüm abone listesini indirip
+tarayıcıda gruplamak yerine birkaç KB'lık bu özeti kullanır.
+
+- resync(snapshot): fleet snapshot'tan tam yeniden kurulum (vektörel)
+- update_status / update_risk: tek abone değişikliğinde sadece o bölgenin sayaçları güncellenir
+- payload(): JSON byte'ları ve içerik hash'inden türetilen ETag (değişmeyen harita = 304)
+
+Abone durumları/riskleri dizilerde tutulur: güncellemeler O(1), en kötü
+aboneler payload'da kilit dışında dizilerin kopyası üzerinde vektörel seçilir
+(200k abonede birkaç ms); update_* çağrıları hesaplama sırasında beklemez.
+"""
+import hashlib
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from fleet_snapshot import FleetSnapshot, STATUSES, STATUS_CODES
+
+
+class RegionAggregator:
+    def __init__(self, worst_k: int = 3):
+        self.worst_k = worst_k
+        self._lock = threading.Lock()
+        self._regions: List[str] = []
+        # subscriber_id -> dizi satırı; satırda bölge indeksi, durum kodu, risk (NaN = bilinmiyor)
+        self._index: Dict[int, int] = {}
+        self._sid = np.zeros(0, dtype=np.int64)
+        self._region = np.zeros(0, dtype=np.int64)
+        self._status = np.zeros(0, dtype=np.int64)
+        self._risk = np.zeros(0, dtype=np.float64)
+        self._counts = np.zeros((0, len(STATUSES)), dtype=np.int64)
+        self._risk_sum = np.zeros(0, dtype=np.float64)
+        self._risk_n = np.zeros(0, dtype=np.int64)
+        # Her değişiklikte artar; kilit dışında üretilen payload sadece versiyon aynıysa cache'lenir
+        self._version = 0
+        self._cached: Optional[Tuple[int, str, bytes]] = None
+
+    def resync(self, snapshot: FleetSnapshot):
+        """Sayaçları snapshot kolonlarından tek seferde yeniden hesaplar"""
+        n_regions = len(snapshot.regions)
+        sid = snapshot.subscriber_id.astype(np.int64)
+        region = snapshot.region_code.astype(np.int64)
+        status = snapshot.status.astype(np.int64)
+        risk = snapshot.risk_score.astype(np.float64)
+        known = ~np.isnan(risk)
+
+        counts = np.bincount(region * len(STATUSES) + status, minlength=n_regions * len(STATUSES))
+        risk_sum = np.bincount(region[known], weights=risk[known], minlength=n_regions)
+        risk_n = np.bincount(region[known], minlength=n_regions)
+        index = dict(zip(sid.tolist(), range(len(sid))))
+
+        with self._lock:
+            self._regions = list(snapshot.regions)
+            self._index = index
+            self._sid, self._region, self._status, self._risk = sid, region, status, risk
+            self._counts = counts.reshape(n_regions, len(STATUSES))
+            self._risk_sum = risk_sum
+            self._risk_n = risk_n
+            self._version += 1
+
+    def update_status(self, subscriber_id: int, new_status: str):
+        """StatusTracker geçişlerinden çağrılır; bilinmeyen abone bir sonraki resync'e kadar yok sayılır"""
+        code = STATUS_CODES.get(new_status)
+        with self._lock:
+            row = self._index.get(subscriber_id)
+            if row is None or code is None or self._status[row] == code:
+                return
+            region = self._region[row]
+            self._counts[region, self._status[row]] -= 1
+            self._counts[region, code] += 1
+            self._status[row] = code
+            self._version += 1
+
+    def update_risk(self, subscriber_id: int, risk: float):
+        with self._lock:
+            row = self._index.get(subscriber_id)
+            if row is None:
+                return
+            region, old = self._region[row], self._risk[row]
+            if not np.isnan(old):
+                self._risk_sum[region] -= old
+                self._risk_n[region] -= 1
+            self._risk_sum[region] += risk
+            self._risk_n[region] += 1
+            self._risk[row] = risk
+            self._version += 1
+
+    def payload(self) -> Tuple[str, bytes]:
+        """(ETag, JSON byte'ları); sayaçlar değişmedikçe aynı nesne döner"""
+        with self._lock:
+            if self._cached is not None and self._cached[0] == self._version:
+                return self._cached[1:]
+            version = self._version
+            region_names = self._regions
+            counts, risk_sum, risk_n = self._counts.copy(), self._risk_sum.copy(), self._risk_n.copy()
+            sid, region, status, risk = self._sid, self._region, self._status.copy(), self._risk.copy()
+
+        # Kilit dışında: update_* bu sırada beklemez (sid / region sadece resync'te yeniden atanır)
+        worst = _worst(sid, region, status, risk, self.worst_k)
+        regions = []
+        for i, region_name in enumerate(region_names):
+            regions.append({
+                "region": region_name,
+                **{status_name: int(counts[i, code]) for code, status_name in enumerate(STATUSES)},
+                "total": int(counts[i].sum()),
+                "mean_risk": round(float(risk_sum[i] / risk_n[i]), 3) if risk_n[i] else None,
+                "worst": worst.get(i, [])
+            })
+
+        body = json.dumps({"regions": regions}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        with self._lock:
+            if version == self._version:
+                self._cached = (version, etag, body)
+        return etag, body
+
+
+def _worst(sid: np.ndarray, region: np.ndarray, status: np.ndarray, risk: np.ndarray, k: int) -> Dict[int, List[int]]:
+    """Bölge başına en kötü k abone: önce durum (RED > YELLOW), sonra risk, eşitlikte küçük id"""
+    risk_key = np.where(np.isnan(risk), -1.0, risk)
+    # Sağlıklı aboneler (GREEN ve risk < 0.3 / bilinmiyor) listeye giremez
+    rows = np.flatnonzero((status != 0) | (risk_key >= 0.3))
+    if not len(rows):
+        return {}
+    rows = rows[np.lexsort((sid[rows], -risk_key[rows], -status[rows], region[rows]))]
+    ordered = region[rows]
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    rank = np.arange(len(rows)) - np.repeat(starts, np.diff(np.r_[starts, len(rows)]))
+    keep = rank < k
+
+    worst: Dict[int, List[int]] = {}
+    for r, subscriber_id in zip(ordered[keep].tolist(), sid[rows[keep]].tolist()):
+        worst.setdefault(r, []).append(subscriber_id)
+    return worst
@@ -0,0 +1,427 @@
+"""
+NetPulse Scoring Worker
+Abonelerin hash-partition'lı bir shard'ı için ingest → pencereleme → batch
+inference → status reconciliation döngüsünü API sürecinden bağımsız çalıştırır.
+
+Her worker sadece subscriber_id % shard_count = shard_id olan aboneleri işler,
+kendi LSTM measurement_cache'ini tutar ve sonuçları Postgres'teki
+subscriber_scores tablosuna yazar. API süreçleri NETPULSE_SCORING_MODE=external
+ile başlatıldığında BackgroundMonitor çalıştırmaz, skorları bu tablodan okur.
+
+Kullanım (4 shard):
+    python scoring_worker.py --shard 0 --shards 4
+    python scoring_worker.py --shard 1 --shards 4
+    ...
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+import metrics
+from lstm_service import LSTMPredictionService, HybridEnsembleModel, PredictionResult, LSTM_PRECISIONS
+from scoring import simulate_metrics_single, classify_subscriber_status, load_forest_model, lstm_measurement
+from status_tracker import StatusTracker
+from cascade_gate import CascadeGate, GateConfig
+from status_history import StatusHistoryWriter
+from model_registry import ModelManager, ModelRegistry, ShadowScorer
+
+logger = logging.getLogger("scoring_worker")
+
+DB_CONFIG = {
+    "dbname": "netpulse_db",
+    "user": "postgres",
+    "password": "admin",
+    "host": "localhost",
+    "port": "5432"
+}
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MODEL_PATH = os.path.join(BASE_DIR, 'saved_models', 'netpulse_classifier.pkl')
+FLAT_MODEL_DIR = os.path.join(BASE_DIR, 'saved_models', 'netpulse_classifier_flat')
+LSTM_MODEL_PATH = os.path.join(BASE_DIR, 'saved_models', 'netpulse_lstm.h5')
+LSTM_SCALER_PATH = os.path.join(BASE_DIR, 'saved_models', 'lstm_scaler.pkl')
+LSTM_ENCODER_PATH = os.path.join(BASE_DIR, 'saved_models', 'lstm_encoder.pkl')
+MODEL_REGISTRY_DIR = os.getenv("NETPULSE_MODEL_REGISTRY", os.path.join(BASE_DIR, 'saved_models', 'registry'))
+
+SEVERITY = {"GREEN": 0, "YELLOW": 1, "RED": 2}
+
+# subscriber_scores upsert'i; NULL olabilen kolonlar VALUES içinde açıkça cast edilir
+PUBLISH_SQL = """
+    INSERT INTO subscriber_scores (
+        subscriber_id, shard_id, segment, proposed_segment, risk_score, reason,
+        rf_class, lstm_class, lstm_confidence, trend, live_metrics, scored_at
+    )
+    SELECT v.subscriber_id, v.shard_id, ss.current_status, v.proposed_segment::subscriber_status_t,
+           v.risk_score, v.reason, v.rf_class, v.lstm_class, v.lstm_confidence, v.trend, v.live_metrics, NOW()
+    FROM (VALUES %s) AS v(subscriber_id, shard_id, proposed_segment, risk_score, reason,
+                          rf_class, lstm_class, lstm_confidence, trend, live_metrics)
+    JOIN subscriber_status ss ON ss.subscriber_id = v.subscriber_id
+    ON CONFLICT (subscriber_id) DO UPDATE SET
+        shard_id = EXCLUDED.shard_id,
+        segment = EXCLUDED.segment,
+        proposed_segment = EXCLUDED.proposed_segment,
+        risk_score = EXCLUDED.risk_score,
+        reason = EXCLUDED.reason,
+        rf_class = EXCLUDED.rf_class,
+        lstm_class = EXCLUDED.lstm_class,
+        lstm_confidence = EXCLUDED.lstm_confidence,
+        trend = EXCLUDED.trend,
+        live_metrics = EXCLUDED.live_metrics,
+        scored_at = EXCLUDED.scored_at
+"""
+PUBLISH_TEMPLATE = "(%s, %s, %s, %s::real, %s, %s::smallint, %s::smallint, %s::real, %s::jsonb, %s::jsonb)"
+
+
+def get_db_connection():
+    try:
+        return psycopg2.connect(cursor_factory=metrics.InstrumentedCursor, **DB_CONFIG)
+    except Exception as e:
+        logger.error(f"Database bağlantı hatası: {e}")
+        return None
+
+
+class ScoringWorker:
+    """
+    Tek shard'ın sahibi:
+    - load_shard: shard'daki aboneleri (yeni eklenenler dahil) her taramada yeniler
+    - ingest: her aboneye bir ölçüm ekler (LSTM rolling window)
+    - score_batch: cascade gate'ten geçemeyenler için RF + LSTM tahminlerini batch halinde yapar
+    - reconcile + publish: StatusTracker kuralları tek UPDATE ile, skorlar tek upsert ile yazılır
+    """
+
+    def __init__(
+        self,
+        shard_id: int,
+        shard_count: int,
+        get_db_func,
+        lstm_service: LSTMPredictionService,
+        rf_model=None,
+        interval: float = 300,
+        batch_size: int = 1000,
+        gate: Optional[CascadeGate] = None,
+        history: Optional[StatusHistoryWriter] = None,
+        shadow: Optional[ShadowScorer] = None,
+        models: Optional[ModelManager] = None
+    ):
+        if not 0 <= shard_id < shard_count:
+            raise ValueError(f"shard_id {shard_id} aralık dışında (0..{shard_count - 1})")
+
+        self.shard_id = shard_id
+        self.shard_count = shard_count
+        self.get_db = get_db_func
+        self.lstm_service = lstm_service
+        self.rf_model = rf_model
+        self.hybrid_model = HybridEnsembleModel(rf_weight=0.6, lstm_weight=0.4)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.gate = gate or CascadeGate(GateConfig(enabled=False))
+        self.history = history
+        self.shadow = shadow
+        # Registry pointer'ları her taramadan önce kontrol edilir (hot swap)
+        self.models = models
+
+        self.subscribers: List[Tuple[int, str, str]] = []
+        self.stop_event = threading.Event()
+
+    def load_shard(self, conn) -> int:
+        """Shard'a düşen aboneleri yükler; artık shard'da olmayanların cache'ini siler"""
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT subscriber_id, subscription_plan, region_id
+            FROM customers
+            WHERE subscriber_id %% %s = %s
+            ORDER BY subscriber_id
+        """, (self.shard_count, self.shard_id))
+        self.subscribers = cursor.fetchall()
+
+        owned = {sid for sid, _, _ in self.subscribers}
+        for stale in [sid for sid in self.lstm_service.measurement_cache if sid not in owned]:
+            del self.lstm_service.measurement_cache[stale]
+        return len(self.subscribers)
+
+    def warm_cache(self):
+        """Yeni aboneler için pencereyi doldurur (BackgroundMonitor.initialize_cache ile aynı)"""
+        missing = [
+            (sid, plan) for sid, plan, _ in self.subscribers
+            if len(self.lstm_service.measurement_cache.get(sid, ())) < self.lstm_service.window_size
+        ]
+        for sid, plan in missing:
+            for _ in range(self.lstm_service.window_size):
+                live_data, _, _ = simulate_metrics_single(plan)
+                self.lstm_service.add_measurement(sid, lstm_measurement(live_data))
+        if missing:
+            logger.info(f"🔧 Shard {self.shard_id}: {len(missing)} abone için LSTM cache dolduruldu")
+
+    def ingest(self) -> Dict[int, dict]:
+        """Her aboneye bir ölçüm ekler, son ölçümleri döndürür"""
+        # Bölgesel arıza simülasyonu (BackgroundMonitor.periodic_monitoring ile aynı olasılıklar)
+        faulty_regions = set()
+        regions = sorted({region for _, _, region in self.subscribers})
+        if regions and random.random() < 0.03:
+            faulty_regions.add(random.choice(regions))
+
+        live = {}
+        for sid, plan, region in self.subscribers:
+            if region in faulty_regions:
+                force_trouble = random.random() < 0.6
+            else:
+                force_trouble = random.random() < 0.05
+            live_data, _, _ = simulate_metrics_single(plan, force_trouble=force_trouble)
+            self.lstm_service.add_measurement(sid, lstm_measurement(live_data))
+            live[sid] = live_data
+        return live
+
+    def _predict_rf(self, rows: List[dict]) -> List[int]:
+        if self.rf_model is None:
+            return [0] * len(rows)
+        try:
+            import pandas as pd
+            frame = pd.DataFrame(rows)
+            started = time.perf_counter()
+            predictions = self.rf_model.predict(frame)
+            elapsed = time.perf_counter() - started
+            metrics.MODEL_INFERENCE_SECONDS.observe(elapsed, model="RandomForest")
+            metrics.MODEL_BATCH_SIZE.observe(len(rows), model="RandomForest")
+            if self.shadow is not None:
+                self.shadow.submit("RandomForest", frame, predictions, elapsed)
+            return [int(p) for p in predictions]
+        except Exception as e:
+            logger.warning(f"⚠️ RF batch prediction failed: {e}")
+            return [0] * len(rows)
+
+    def score_batch(self, batch: List[Tuple[int, str, str]], live: Dict[int, dict]) -> Tuple[list, list]:
+        """
+        (publish satırları, reconcile önerileri) döndürür.
+        Cascade gate'in stabil dediği aboneler modellere gönderilmez (GREEN, risk 0).
+        """
+        ids = [sid for sid, _, _ in batch]
+        stable, audit = self.gate.split(ids, live, self.lstm_service.measurement_cache, self.lstm_service.window_size)
+        gated = {sid for sid, s, a in zip(ids, stable.tolist(), audit.tolist()) if s and not a}
+        audited = {sid for sid, a in zip(ids, audit.tolist()) if a}
+
+        scored_ids = [sid for sid in ids if sid not in gated]
+        lstm_results = self.lstm_service.predict_batch(scored_ids) if self.lstm_service.is_available and scored_ids else {}
+        rf_classes = dict(zip(scored_ids, self._predict_rf([live[sid] for sid in scored_ids]))) if scored_ids else {}
+
+        now = datetime.now()
+        rows, proposals = [], []
+        for sid in ids:
+            if sid in gated:
+                # Trend grafiği pencereden hesaplanır; model çağrısı yok
+                rf_class, lstm_result = None, None
+                risk, segment, reason = 0.0, "GREEN", "Cascade gate: metrikler ve trend stabil"
+                trend = self.lstm_service.analyze_trend(sid, PredictionResult("CascadeGate", 0, 1.0, [], now))
+            else:
+                rf_class = rf_classes[sid]
+                rf_result = PredictionResult("RandomForest", rf_class, 0.5, [], now)
+                lstm_result: Optional[PredictionResult] = lstm_results.get(sid)
+
+                risk, segment, reason = self.hybrid_model.combine_predictions(rf_result, lstm_result)
+
+                # Ham metrik kuralları (classify_subscriber_status) modelden daha kötü diyorsa o geçerli
+                rule_segment = classify_subscriber_status(live[sid], lstm_result.prediction_class if lstm_result else rf_class)
+                if SEVERITY[rule_segment] > SEVERITY[segment]:
+                    segment = rule_segment
+                    reason = "Anlık metrikler eşik değerleri aştı"
+
+                if sid in audited:
+                    self.gate.record_audit(sid, segment)
+
+                trend = self.lstm_service.analyze_trend(sid, lstm_result) if lstm_result else None
+
+            trend_json = json.dumps({
+                "current_risk": trend.current_risk,
+                "trend_direction": trend.trend_direction,
+                "forecast_30min": trend.forecast_30min,
+                "risk_chart": trend.risk_chart,
+                "recommendation": trend.recommendation
+            }, ensure_ascii=False) if trend else None
+
+            rows.append((
+                sid, self.shard_id, segment, risk, reason, rf_class,
+                lstm_result.prediction_class if lstm_result else None,
+                lstm_result.confidence if lstm_result else None,
+                trend_json, json.dumps(live[sid])
+            ))
+            proposals.append((sid, segment, "network_degradation" if segment != "GREEN" else None))
+        return rows, proposals
+
+    def publish_batch(self, conn, batch: List[Tuple[int, str, str]], live: Dict[int, dict]) -> Tuple[list, list]:
+        """score_batch + reconcile + subscriber_scores upsert; (publish satırları, durum geçişleri) döndürür"""
+        rows, proposals = self.score_batch(batch, live)
+        transitions = StatusTracker(conn, history=self.history).reconcile_batch(proposals)
+        execute_values(conn.cursor(), PUBLISH_SQL, rows, template=PUBLISH_TEMPLATE, page_size=self.batch_size)
+        conn.commit()
+        return rows, transitions
+
+    def heartbeat(self, conn, sweep_ms: Optional[float]):
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO scoring_workers (shard_id, shard_count, hostname, pid, subscribers, last_sweep_ms, heartbeat_at)
+            VALUES (%s, %s, %s, %s, %s, %s, NOW())
+            ON CONFLICT (shard_id) DO UPDATE SET
+                shard_count = EXCLUDED.shard_count,
+                hostname = EXCLUDED.hostname,
+                pid = EXCLUDED.pid,
+                subscribers = EXCLUDED.subscribers,
+                last_sweep_ms = COALESCE(EXCLUDED.last_sweep_ms, scoring_workers.last_sweep_ms),
+                heartbeat_at = NOW()
+        """, (self.shard_id, self.shard_count, socket.gethostname(), os.getpid(), len(self.subscribers), sweep_ms))
+        conn.commit()
+
+    def sweep(self) -> bool:
+        """Shard'ın tam bir taraması; DB erişilemezse False"""
+        started = time.monotonic()
+        if self.models:
+            self.models.poll()
+        conn = self.get_db()
+        if not conn:
+            return False
+
+        try:
+            self.load_shard(conn)
+            self.warm_cache()
+            live = self.ingest()
+
+            changed = 0
+            for i in range(0, len(self.subscribers), self.batch_size):
+                _, transitions = self.publish_batch(conn, self.subscribers[i:i + self.batch_size], live)
+                changed += len(transitions)
+
+            sweep_seconds = time.monotonic() - started
+            metrics.MONITOR_SWEEP_SECONDS.observe(sweep_seconds, phase="shard_sweep")
+            metrics.MONITOR_LAST_SWEEP.set(time.time())
+            self.heartbeat(conn, sweep_seconds * 1000)
+
+            logger.info(
+                f"✅ Shard {self.shard_id}/{self.shard_count}: {len(self.subscribers)} abone skorlandı, "
+                f"{changed} durum değişti ({sweep_seconds:.1f} sn)"
+            )
+            return True
+
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"❌ Shard {self.shard_id} tarama hatası: {e}")
+            return False
+        finally:
+            conn.close()
+
+    def run(self):
+        """stop() çağrılana kadar interval saniyede bir tarama yapar"""
+        logger.info(f"🚀 Scoring worker başladı: shard {self.shard_id}/{self.shard_count}, interval {self.interval:.0f} sn")
+        next_run = time.monotonic()
+        while not self.stop_event.is_set():
+            now = time.monotonic()
+            if now < next_run:
+                self.stop_event.wait(next_run - now)
+                continue
+
+            metrics.MONITOR_LAG_SECONDS.set(now - next_run)
+            self.sweep()
+            next_run = max(next_run, now) + self.interval
+
+        logger.info(f"⏹️  Scoring worker durduruldu (shard {self.shard_id})")
+
+    def stop(self, *_):
+        self.stop_event.set()
+
+
+def start_metrics_server(port: int):
+    """Worker'ın kendi /metrics endpoint'i (Prometheus scrape için)"""
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = metrics.render_latest().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", metrics.CONTENT_TYPE_LATEST)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info(f"📈 Metrics: http://0.0.0.0:{port}/metrics")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(message)s")
+
+    parser = argparse.ArgumentParser(description="NetPulse shard scoring worker")
+    parser.add_argument("--shard", type=int, default=int(os.getenv("NETPULSE_SHARD_ID", 0)))
+    parser.add_argument("--shards", type=int, default=int(os.getenv("NETPULSE_SHARD_COUNT", 1)))
+    parser.add_argument("--interval", type=float, default=300, help="Tarama aralığı (sn)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Inference/yazma batch boyutu")
+    parser.add_argument("--metrics-port", type=int, default=0, help="0 = kapalı")
+    parser.add_argument("--once", action="store_true", help="Tek tarama yap ve çık")
+    parser.add_argument("--no-gate", action="store_true", help="Cascade gate'i kapat (herkes modellerle skorlanır)")
+    parser.add_argument("--gate-audit-rate", type=float, help="Elenen abonelerin denetim için skorlanan oranı")
+    parser.add_argument("--lstm-precision", choices=LSTM_PRECISIONS, default=os.getenv("NETPULSE_LSTM_PRECISION", "keras"),
+                        help="keras (TensorFlow) ya da NumPy inference: float32 / float16 / int8")
+    args = parser.parse_args()
+
+    rf_model = None
+    try:
+        rf_model = load_forest_model(FLAT_MODEL_DIR, MODEL_PATH)
+    except Exception as e:
+        logger.warning(f"⚠️ Random Forest load failed: {e}")
+
+    shadow = ShadowScorer()
+    lstm_service = LSTMPredictionService(
+        LSTM_MODEL_PATH, LSTM_SCALER_PATH, LSTM_ENCODER_PATH, shadow=shadow, precision=args.lstm_precision
+    )
+
+    gate_config = GateConfig.from_env()
+    if args.no_gate:
+        gate_config.enabled = False
+    if args.gate_audit_rate is not None:
+        gate_config.audit_rate = args.gate_audit_rate
+
+    worker = ScoringWorker(
+        shard_id=args.shard,
+        shard_count=args.shards,
+        get_db_func=get_db_connection,
+        lstm_service=lstm_service,
+        rf_model=rf_model,
+        interval=args.interval,
+        batch_size=args.batch_size,
+        gate=CascadeGate(gate_config),
+        history=StatusHistoryWriter(get_db_func=get_db_connection),
+        shadow=shadow
+    )
+    worker.models = ModelManager(
+        ModelRegistry(MODEL_REGISTRY_DIR), lstm_service,
+        on_rf_swap=lambda rf_model: setattr(worker, "rf_model", rf_model), shadow=shadow
+    )
+
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+
+    worker.history.start()
+
+    if args.once:
+        ok = worker.sweep()
+        worker.history.stop()
+        raise SystemExit(0 if ok else 1)
+
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+    worker.history.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 import psycopg2
+from psycopg2.extras import execute_values
 import random
+import time
 from datetime import datetime, timedelta
 
 # DB Config
@@ -39,44 +41,41 @@ def seed_database_status():
             return
 
         # 3. Select random victims
-        # Target: 25 RED (Peak Hour Fault), 45 YELLOW (Proactive Detection)
-        targets_red = random.sample(all_ids, 25)
-        remaining_ids = list(set(all_ids) - set(targets_red))
-        targets_yellow = random.sample(remaining_ids, 45)
+        # Target (500 abone için): 25 RED (Peak Hour Fault), 45 YELLOW (Proactive Detection)
+        # Daha büyük filolarda aynı oran korunur (%5 RED, %9 YELLOW)
+        red_count = max(25, len(all_ids) * 25 // 500)
+        yellow_count = max(45, len(all_ids) * 45 // 500)
+        victims = random.sample(all_ids, red_count + yellow_count)
+        targets_red = victims[:red_count]
+        targets_yellow = victims[red_count:]
         
         print(f"🎯 Selected {len(targets_red)} for RED and {len(targets_yellow)} for YELLOW")
 
-        # 4. Update RED subscribers
-        # Arıza YENİ başlamış olsun ki persistence (10dk) korusun ve silinmesin!
-        for sub_id in targets_red:
-            changed_at = datetime.now() # Şimdi başladı
-            estimated_fix = datetime.now() + timedelta(hours=random.randint(2, 4))
-            
-            cursor.execute("""
-                UPDATE subscriber_status
-                SET current_status = 'RED',
-                    previous_status = 'GREEN',
-                    fault_type = 'packet_loss',
-                    estimated_fix_time = %s,
-                    status_changed_at = %s,
-                    last_checked = NOW()
-                WHERE subscriber_id = %s
-            """, (estimated_fix, changed_at, sub_id))
-
-        # 5. Update YELLOW subscribers
-        # Sorun YENİ başlamış olsun (5dk persistence koruması)
-        for sub_id in targets_yellow:
-            changed_at = datetime.now()
-            
-            cursor.execute("""
-                UPDATE subscriber_status
-                SET current_status = 'YELLOW',
-                    previous_status = 'GREEN',
-                    fault_type = 'high_latency',
-                    status_changed_at = %s,
-                    last_checked = NOW()
-                WHERE subscriber_id = %s
-            """, (changed_at, sub_id))
+        # 4. RED + YELLOW tek set-based UPDATE (VALUES listesi)
+        # Arıza YENİ başlamış olsun ki persistence korusun ve silinmesin!
+        now = datetime.now()
+        fault_rows = [
+            (sub_id, 'RED', 'packet_loss', now + timedelta(hours=random.randint(2, 4)))
+            for sub_id in targets_red
+        ] + [
+            (sub_id, 'YELLOW', 'high_latency', None)
+            for sub_id in targets_yellow
+        ]
+        
+        started = time.perf_counter()
+        execute_values(cursor, """
+            UPDATE subscriber_status ss
+            SET current_status = v.status,
+                previous_status = 'GREEN',
+                fault_type = v.fault_type,
+                estimated_fix_time = v.estimated_fix,
+                status_changed_at = NOW(),
+                last_checked = NOW()
+            FROM (VALUES %s) AS v(subscriber_id, status, fault_type, estimated_fix)
+            WHERE ss.subscriber_id = v.subscriber_id
+        """, fault_rows, template="(%s, %s::subscriber_status_t, %s, %s::timestamp)", page_size=len(fault_rows))
+        elapsed = time.perf_counter() - started
+        print(f"⚡ {len(fault_rows)} arıza kaydı uygulandı ({len(fault_rows) / max(elapsed, 1e-9):,.0f} satır/sn)")
 
         conn.commit()
         print("✅ Database seeding complete!")
@@ -1,8 +1,7 @@
 import os
-import vonage
-from vonage_sms import requests as sms_requests
 import logging
 from dotenv import load_dotenv
+from metrics import track_notification
 
 # Load .env file explicitly
 load_dotenv()
@@ -17,6 +16,13 @@ VONAGE_API_SECRET = os.getenv("VONAGE_API_SECRET", "")
 VONAGE_BRAND_NAME = os.getenv("VONAGE_BRAND_NAME", "905366251652")
 
 def send_sms(phone_number: str, message: str) -> tuple[bool, str]:
+    """Gönderim süresi ve bekleyen bildirim sayısı /metrics'e yazılır"""
+    with track_notification("sms") as outcome:
+        success, response_msg = _send_sms(phone_number, message)
+        outcome["result"] = "success" if success else "error"
+        return success, response_msg
+
+def _send_sms(phone_number: str, message: str) -> tuple[bool, str]:
     """
     Gerçek SMS gönder (Vonage ile)
     
@@ -27,6 +33,10 @@ def send_sms(phone_number: str, message: str) -> tuple[bool, str]:
         if not VONAGE_API_KEY or not VONAGE_API_SECRET:
              return False, "Vonage CREDENTIALS MISSING IN .ENV"
 
+        # Vonage SDK sadece SMS gönderilirken yüklenir (lazy import)
+        import vonage
+        from vonage_sms import requests as sms_requests
+
         # Clean phone number (remove spaces)
         formatted_phone = phone_number.replace(" ", "").replace("+", "") 
         
@@ -0,0 +1,133 @@
+"""
+Status History Writer
+Abone durum geçişlerini (StatusTracker.update_status / reconcile_batch)
+buffer'layıp subscriber_status_history'ye toplu yazar (007 migration).
+
+AuditLogWriter altyapısı kullanılır; farklar:
+- günlük partition'lar (retention gün cinsinden)
+- region_id yazma anında customers'tan alınır (çağıranların bölgeyi bilmesi gerekmez)
+"""
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+from audit_log import AuditLogWriter, _csv_buffer
+
+STATUS_HISTORY_COLUMNS = ("subscriber_id", "old_status", "new_status", "transition_type", "fault_type", "changed_at")
+
+
+class StatusHistoryWriter(AuditLogWriter):
+    TABLE = "subscriber_status_history"
+    COLUMNS = STATUS_HISTORY_COLUMNS
+    ENSURE_PARTITION_FN = "ensure_status_history_partition"
+    DROP_PARTITIONS_FN = "drop_status_history_partitions"
+    LABEL = "Status history"
+
+    def __init__(self, get_db_func, retention_days: int = 90, **kwargs):
+        super().__init__(get_db_func, **kwargs)
+        self.retention = retention_days
+
+    def record(self, subscriber_id: int, old_status: Optional[str], new_status: str,
+               transition_type: Optional[str] = None, fault_type: Optional[str] = None,
+               changed_at: Optional[datetime] = None):
+        """Geçişi buffer'a ekler (DB round-trip yok)"""
+        self._append((subscriber_id, old_status, new_status, transition_type, fault_type, changed_at or datetime.now()))
+
+    def _partition_key(self, ts: datetime) -> date:
+        return ts.date()
+
+    def _next_partition_key(self) -> date:
+        return date.today() + timedelta(days=1)
+
+    def _write(self, cursor, batch: List[Tuple]):
+        """COPY ile geçici tabloya, oradan bölge bilgisiyle tek INSERT ... SELECT"""
+        cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS tmp_status_history (
+                subscriber_id INTEGER, old_status TEXT, new_status TEXT,
+                transition_type VARCHAR(20), fault_type VARCHAR(50), changed_at TIMESTAMP
+            )
+        """)
+        cursor.execute("TRUNCATE tmp_status_history")
+        cursor.copy_expert(
+            f"COPY tmp_status_history ({', '.join(self.COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            _csv_buffer(batch)
+        )
+        cursor.execute(f"""
+            INSERT INTO subscriber_status_history (region_id, {', '.join(self.COLUMNS)})
+            SELECT c.region_id, t.subscriber_id, t.old_status::subscriber_status_t, t.new_status::subscriber_status_t,
+                   t.transition_type, t.fault_type, t.changed_at
+            FROM tmp_status_history t
+            LEFT JOIN customers c ON c.subscriber_id = t.subscriber_id
+        """)
+
+
+def query_status_history(
+    conn,
+    start: datetime,
+    end: datetime,
+    region: Optional[str] = None,
+    subscriber_id: Optional[int] = None,
+    limit: int = 500
+) -> List[dict]:
+    """
+    [start, end) aralığındaki geçişler, en yeni önce.
+    changed_at aralığı partition pruning'i tetikler; region / subscriber_id
+    filtreleri ilgili partition'ların (region_id, changed_at) /
+    (subscriber_id, changed_at) index'lerinden okunur.
+    """
+    conditions = ["changed_at >= %s", "changed_at < %s"]
+    params = [start, end]
+
+    if region:
+        conditions.append("region_id = %s")
+        params.append(region)
+    if subscriber_id is not None:
+        conditions.append("subscriber_id = %s")
+        params.append(subscriber_id)
+
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT subscriber_id, region_id, old_status, new_status, transition_type, fault_type, changed_at
+        FROM subscriber_status_history
+        WHERE {" AND ".join(conditions)}
+        ORDER BY changed_at DESC
+        LIMIT %s
+    """, (*params, limit))
+
+    return [
+        {
+            "subscriber_id": row[0],
+            "region": row[1],
+            "old_status": row[2],
+            "new_status": row[3],
+            "transition_type": row[4],
+            "fault_type": row[5],
+            "changed_at": row[6].isoformat()
+        }
+        for row in cursor.fetchall()
+    ]
+
+
+def count_flapping(conn, start: datetime, end: datetime, region: Optional[str] = None,
+                   min_transitions: int = 4, limit: int = 100) -> List[dict]:
+    """Aralıkta en az min_transitions geçiş yapan (flapping) aboneler, en çok geçiş yapan önce"""
+    conditions = ["changed_at >= %s", "changed_at < %s"]
+    params = [start, end]
+    if region:
+        conditions.append("region_id = %s")
+        params.append(region)
+
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT subscriber_id, COUNT(*) AS transitions, MAX(changed_at) AS last_change
+        FROM subscriber_status_history
+        WHERE {" AND ".join(conditions)}
+        GROUP BY subscriber_id
+        HAVING COUNT(*) >= %s
+        ORDER BY transitions DESC, last_change DESC
+        LIMIT %s
+    """, (*params, min_transitions, limit))
+
+    return [
+        {"subscriber_id": row[0], "transitions": row[1], "last_change": row[2].isoformat()}
+        for row in cursor.fetchall()
+    ]
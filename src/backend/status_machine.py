@@ -0,0 +1,251 @@
+"""
+Status Machine
+Durum histerezisi (minimum süre) kurallarının vektörel hali.
+
+StatusTracker.should_allow_status_change her abone için ayrı DB sorgusu ve
+tuple karşılaştırması yapar. Burada tüm filonun durum kodu ve
+status_changed_at değeri NumPy dizilerinde tutulur; N abone için önerilen
+durumlar tek evaluate() çağrısıyla izin / SMS / geçiş türü kararına çevrilir.
+
+Kurallar (eski, yeni) durum çifti başına TransitionRule ile tanımlanır ve
+3x3 tablolara açılır; karar sadece tablo indekslemesidir:
+- kötüleşme (GREEN->YELLOW, GREEN->RED, YELLOW->RED): her zaman, SMS
+- iyileşme: eski durumun minimum süresi dolduysa; SMS sadece GREEN'e dönüşte
+Süreler NETPULSE_STATUS_HOLD ile çift bazında değiştirilebilir
+(ör. NETPULSE_STATUS_HOLD="RED>GREEN=90,RED>YELLOW=45").
+
+Zaman epoch saniyesidir; clock enjekte edilebilir (varsayılan time.time),
+evaluate(now=...) ile de tek çağrı için sabitlenebilir.
+"""
+import logging
+import os
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fleet_snapshot import STATUSES, STATUS_CODES
+
+logger = logging.getLogger(__name__)
+
+# İyileşme (recovery) öncesi durumun korunması gereken minimum süre (Demo için uzatıldı)
+MIN_STATUS_DURATION_MINUTES = {"RED": 60, "YELLOW": 30}
+DEGRADATIONS = [("GREEN", "YELLOW"), ("GREEN", "RED"), ("YELLOW", "RED")]
+RECOVERIES = [("RED", "GREEN"), ("RED", "YELLOW"), ("YELLOW", "GREEN")]
+
+TRANSITION_TYPES = ("none", "degradation", "recovery")
+TRANSITION_CODES = {name: code for code, name in enumerate(TRANSITION_TYPES)}
+
+
+@dataclass(frozen=True)
+class TransitionRule:
+    allowed: bool = True
+    # Eski durumda en az bu kadar kalınmadan geçişe izin verilmez
+    min_duration_seconds: float = 0.0
+    send_sms: bool = False
+    transition_type: str = "none"
+
+
+def default_rules() -> Dict[Tuple[str, str], TransitionRule]:
+    """StatusTracker'ın mevcut davranışı (_analyze_transition + should_allow_status_change)"""
+    rules = {(status, status): TransitionRule() for status in STATUSES}
+    for old, new in DEGRADATIONS:
+        rules[(old, new)] = TransitionRule(send_sms=True, transition_type="degradation")
+    for old, new in RECOVERIES:
+        rules[(old, new)] = TransitionRule(
+            min_duration_seconds=MIN_STATUS_DURATION_MINUTES[old] * 60.0,
+            send_sms=(new == "GREEN"),
+            transition_type="recovery"
+        )
+    return rules
+
+
+def parse_hold_overrides(spec: str) -> Dict[Tuple[str, str], float]:
+    """"RED>GREEN=90,YELLOW>GREEN=15" -> {("RED", "GREEN"): 5400.0, ...} (dakika -> saniye)"""
+    overrides = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        pair, _, minutes = item.partition("=")
+        old, _, new = pair.strip().upper().partition(">")
+        if old not in STATUS_CODES or new not in STATUS_CODES or not minutes:
+            raise ValueError(f"Invalid status hold rule: {item!r}")
+        overrides[(old, new)] = float(minutes) * 60.0
+    return overrides
+
+
+@dataclass
+class TransitionBatch:
+    """evaluate() sonucu; tüm diziler girişteki abone sırasıyla hizalıdır"""
+    subscriber_id: np.ndarray
+    old_status: np.ndarray
+    new_status: np.ndarray
+    allowed: np.ndarray
+    changed: np.ndarray
+    send_sms: np.ndarray
+    transition_type: np.ndarray
+    remaining_seconds: np.ndarray
+    now: float
+
+    @property
+    def final_status(self) -> np.ndarray:
+        """İzin verilmeyen abonelerde eski durum korunur"""
+        return np.where(self.allowed, self.new_status, self.old_status)
+
+    def transitions(self) -> list:
+        """Değişen aboneler, StatusTracker.reconcile_batch ile aynı formatta"""
+        return [
+            {
+                "subscriber_id": sid,
+                "old_status": STATUSES[old],
+                "new_status": STATUSES[new],
+                "should_send_sms": sms,
+                "transition_type": TRANSITION_TYPES[kind]
+            }
+            for sid, old, new, sms, kind in zip(
+                self.subscriber_id[self.changed].tolist(),
+                self.old_status[self.changed].tolist(),
+                self.new_status[self.changed].tolist(),
+                self.send_sms[self.changed].tolist(),
+                self.transition_type[self.changed].tolist()
+            )
+        ]
+
+
+class StatusMachine:
+    """
+    Kolonlar (subscriber_id sıralı):
+    - subscriber_id (int64), status (int8: 0=GREEN 1=YELLOW 2=RED)
+    - changed_at (float64, epoch sn; bilinmiyorsa NaN -> süre kuralı uygulanmaz)
+    Bilinmeyen aboneler GREEN kabul edilir (get_current_status ile aynı) ve
+    commit() ile eklenir.
+    """
+
+    def __init__(self, rules: Optional[Dict[Tuple[str, str], TransitionRule]] = None,
+                 clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self.rules = default_rules()
+        self.rules.update(rules or {})
+
+        n = len(STATUSES)
+        self._allowed = np.ones((n, n), dtype=bool)
+        self._min_seconds = np.zeros((n, n), dtype=np.float64)
+        self._sms = np.zeros((n, n), dtype=bool)
+        self._type = np.zeros((n, n), dtype=np.int8)
+        for (old, new), rule in self.rules.items():
+            i, j = STATUS_CODES[old], STATUS_CODES[new]
+            self._allowed[i, j] = rule.allowed
+            self._min_seconds[i, j] = rule.min_duration_seconds
+            self._sms[i, j] = rule.send_sms
+            self._type[i, j] = TRANSITION_CODES[rule.transition_type]
+
+        self.subscriber_id = np.zeros(0, dtype=np.int64)
+        self.status = np.zeros(0, dtype=np.int8)
+        self.changed_at = np.zeros(0, dtype=np.float64)
+
+    @classmethod
+    def from_env(cls, clock: Callable[[], float] = time.time) -> "StatusMachine":
+        rules = default_rules()
+        spec = os.getenv("NETPULSE_STATUS_HOLD")
+        if spec:
+            for pair, seconds in parse_hold_overrides(spec).items():
+                rules[pair] = replace(rules[pair], min_duration_seconds=seconds)
+        return cls(rules, clock=clock)
+
+    def __len__(self) -> int:
+        return len(self.subscriber_id)
+
+    def load(self, subscriber_ids: Sequence[int], statuses: Sequence[str], changed_at: Sequence[float]):
+        """Dizileri verilen satırlardan yeniden kurar (changed_at epoch sn, None/NaN = bilinmiyor)"""
+        ids = np.asarray(subscriber_ids, dtype=np.int64)
+        order = np.argsort(ids, kind="stable")
+        status = np.asarray([STATUS_CODES.get(s, 0) for s in statuses], dtype=np.int8)
+        stamps = np.asarray([np.nan if ts is None else ts for ts in changed_at], dtype=np.float64)
+
+        self.subscriber_id = ids[order]
+        self.status = status[order]
+        self.changed_at = stamps[order]
+
+    def load_from_db(self, conn, subscriber_ids: Optional[Sequence[int]] = None):
+        """subscriber_status'tan tek sorguyla yükler (subscriber_ids verilirse sadece onlar)"""
+        cursor = conn.cursor()
+        if subscriber_ids is None:
+            cursor.execute("SELECT subscriber_id, current_status, status_changed_at FROM subscriber_status")
+        else:
+            cursor.execute(
+                "SELECT subscriber_id, current_status, status_changed_at FROM subscriber_status WHERE subscriber_id = ANY(%s)",
+                (list(subscriber_ids),)
+            )
+        rows = cursor.fetchall()
+        # status_changed_at NOW() ile yazılan yerel saat; timestamp() de yereli varsayar
+        self.load(
+            [row[0] for row in rows],
+            [row[1] for row in rows],
+            [row[2].timestamp() if row[2] else None for row in rows]
+        )
+
+    def _lookup(self, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(pozisyon, bilinen mi); bilinmeyenlerin pozisyonu anlamsızdır"""
+        if not len(self.subscriber_id):
+            return np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=bool)
+        pos = np.minimum(np.searchsorted(self.subscriber_id, ids), len(self.subscriber_id) - 1)
+        return pos, self.subscriber_id[pos] == ids
+
+    def evaluate(self, subscriber_ids: Sequence[int], proposed: Sequence, now: Optional[float] = None) -> TransitionBatch:
+        """
+        Önerilen durumlar için kararlar (dizileri değiştirmez; uygulamak için commit()).
+        proposed: durum adları ("RED") veya kodları (2)
+        """
+        now = self.clock() if now is None else float(now)
+        ids = np.asarray(subscriber_ids, dtype=np.int64)
+        new = _as_codes(proposed)
+
+        pos, known = self._lookup(ids)
+        old = np.zeros(len(ids), dtype=np.int8)
+        since = np.full(len(ids), np.nan)
+        old[known] = self.status[pos[known]]
+        since[known] = self.changed_at[pos[known]]
+
+        min_seconds = self._min_seconds[old, new]
+        elapsed = now - since
+        held = np.isnan(since) | (elapsed >= min_seconds)
+        allowed = self._allowed[old, new] & held
+        changed = allowed & (old != new)
+
+        return TransitionBatch(
+            subscriber_id=ids,
+            old_status=old,
+            new_status=new,
+            allowed=allowed,
+            changed=changed,
+            send_sms=changed & self._sms[old, new],
+            transition_type=np.where(changed, self._type[old, new], 0).astype(np.int8),
+            remaining_seconds=np.where(allowed, 0.0, np.where(held, np.inf, min_seconds - elapsed)),
+            now=now
+        )
+
+    def commit(self, batch: TransitionBatch):
+        """Değişen abonelerin durumunu ve changed_at'ini batch.now ile günceller"""
+        ids = batch.subscriber_id[batch.changed]
+        new = batch.new_status[batch.changed]
+        if not len(ids):
+            return
+
+        pos, known = self._lookup(ids)
+        self.status[pos[known]] = new[known]
+        self.changed_at[pos[known]] = batch.now
+
+        if not known.all():
+            fresh, index = np.unique(ids[~known], return_index=True)
+            merged = np.concatenate([self.subscriber_id, fresh])
+            order = np.argsort(merged, kind="stable")
+            self.subscriber_id = merged[order]
+            self.status = np.concatenate([self.status, new[~known][index]])[order]
+            self.changed_at = np.concatenate([self.changed_at, np.full(len(fresh), batch.now)])[order]
+
+
+def _as_codes(proposed: Sequence) -> np.ndarray:
+    values = np.asarray(proposed)
+    if values.dtype.kind in "iu":
+        return values.astype(np.int8)
+    names, inverse = np.unique(values, return_inverse=True)
+    return np.asarray([STATUS_CODES[s] for s in names.tolist()], dtype=np.int8)[inverse.reshape(-1)]
@@ -2,17 +2,24 @@ from datetime import datetime, timedelta
 import logging
 import psycopg2
 
+from metrics import timer, STATUS_TRACKER_SECONDS
+from status_machine import MIN_STATUS_DURATION_MINUTES, DEGRADATIONS, TransitionBatch
+
 logger = logging.getLogger(__name__)
 
 class StatusTracker:
     """
     Subscriber durumlarını track eder ve değişiklikleri tespit eder.
     GREEN → YELLOW → RED geçişlerini izler ve SMS tetikler.
+    history verilirse (status_history.StatusHistoryWriter) her geçiş
+    subscriber_status_history'ye yazılmak üzere buffer'lanır.
     """
     
-    def __init__(self, db_connection):
+    def __init__(self, db_connection, history=None):
         self.conn = db_connection
+        self.history = history
     
+    @timer(STATUS_TRACKER_SECONDS, method="get_current_status")
     def get_current_status(self, subscriber_id: int) -> dict:
         """
         Kullanıcının mevcut durumunu al
@@ -38,6 +45,7 @@ class StatusTracker:
         
         return {"current": result[0], "previous": result[1]}
     
+    @timer(STATUS_TRACKER_SECONDS, method="update_status")
     def update_status(
         self, 
         subscriber_id: int, 
@@ -109,6 +117,9 @@ class StatusTracker:
         # SMS gönderilmeli mi ve ne türden bir geçiş?
         transition = self._analyze_transition(old_status, new_status)
         
+        if self.history:
+            self.history.record(subscriber_id, old_status, new_status, transition["type"], fault_type)
+        
         return {
             "changed": True,
             "old_status": old_status,
@@ -157,6 +168,7 @@ class StatusTracker:
                 "severity": "info"
             }
     
+    @timer(STATUS_TRACKER_SECONDS, method="should_allow_status_change")
     def should_allow_status_change(self, subscriber_id: int, new_status: str) -> dict:
         """
         Check if status change should be allowed based on minimum duration rules
@@ -182,7 +194,7 @@ class StatusTracker:
             return {"allowed": True, "reason": "No change"}
         
         # Degradation is always allowed (problem getting worse)
-        if (current_status, new_status) in [("GREEN", "YELLOW"), ("GREEN", "RED"), ("YELLOW", "RED")]:
+        if (current_status, new_status) in DEGRADATIONS:
             return {"allowed": True, "reason": "Degradation allowed"}
         
         # Recovery check - need minimum duration
@@ -202,7 +214,7 @@ class StatusTracker:
             time_elapsed = datetime.now() - status_changed_at
             
             # Minimum durations (Demo için uzatıldı: 1 Saat / 30 Dk)
-            min_duration_minutes = 60 if current_status == "RED" else 30  # RED=60min, YELLOW=30min
+            min_duration_minutes = MIN_STATUS_DURATION_MINUTES[current_status]
             min_duration = timedelta(minutes=min_duration_minutes)
             
             if time_elapsed < min_duration:
@@ -218,6 +230,135 @@ class StatusTracker:
         # Other transitions allowed
         return {"allowed": True, "reason": "Allowed"}
     
+    @timer(STATUS_TRACKER_SECONDS, method="reconcile_batch")
+    def reconcile_batch(self, proposals: list, estimated_fix_hours: int = 2) -> list:
+        """
+        should_allow_status_change + update_status kurallarını bir abone grubu için
+        tek UPDATE ile uygular (scoring worker'ları için).
+        
+        Args:
+            proposals: [(subscriber_id, yeni_durum, fault_type), ...]
+        
+        Returns:
+            Değişen aboneler: [{"subscriber_id", "old_status", "new_status", "should_send_sms", "transition_type"}]
+        """
+        if not proposals:
+            return []
+        
+        from psycopg2.extras import execute_values
+        
+        cursor = self.conn.cursor()
+        subscriber_ids = [p[0] for p in proposals]
+        
+        # İlk kez görülen aboneler GREEN başlar (get_current_status ile aynı)
+        cursor.execute("""
+            INSERT INTO subscriber_status (subscriber_id, current_status)
+            SELECT unnest(%s::int[]), 'GREEN'
+            ON CONFLICT (subscriber_id) DO NOTHING
+        """, (subscriber_ids,))
+        
+        # Kötüleşme her zaman, iyileşme minimum süre dolduysa uygulanır
+        changed = execute_values(cursor, """
+            UPDATE subscriber_status ss
+            SET previous_status = ss.current_status,
+                current_status = v.new_status::subscriber_status_t,
+                status_changed_at = NOW(),
+                last_checked = NOW(),
+                fault_type = v.fault_type,
+                estimated_fix_time = NOW() + make_interval(hours => %(fix_hours)s),
+                sms_sent = FALSE
+            FROM (VALUES %%s) AS v(subscriber_id, new_status, fault_type)
+            WHERE ss.subscriber_id = v.subscriber_id
+              AND ss.current_status <> v.new_status::subscriber_status_t
+              AND (
+                    (ss.current_status, v.new_status) IN (('GREEN', 'YELLOW'), ('GREEN', 'RED'), ('YELLOW', 'RED'))
+                 OR ss.status_changed_at IS NULL
+                 OR ss.status_changed_at <= NOW() - make_interval(mins =>
+                        CASE ss.current_status WHEN 'RED' THEN %(red_min)s ELSE %(yellow_min)s END)
+              )
+            RETURNING ss.subscriber_id, ss.previous_status, ss.current_status
+        """ % {
+            "fix_hours": int(estimated_fix_hours),
+            "red_min": MIN_STATUS_DURATION_MINUTES["RED"],
+            "yellow_min": MIN_STATUS_DURATION_MINUTES["YELLOW"]
+        }, proposals, template="(%s, %s, %s)", fetch=True)
+        
+        # Değişmeyenler için sadece last_checked
+        cursor.execute(
+            "UPDATE subscriber_status SET last_checked = NOW() WHERE subscriber_id = ANY(%s)",
+            (subscriber_ids,)
+        )
+        self.conn.commit()
+        
+        transitions = []
+        fault_types = {p[0]: p[2] for p in proposals}
+        for subscriber_id, old_status, new_status in changed:
+            transition = self._analyze_transition(old_status, new_status)
+            if self.history:
+                self.history.record(subscriber_id, old_status, new_status, transition["type"], fault_types.get(subscriber_id))
+            transitions.append({
+                "subscriber_id": subscriber_id,
+                "old_status": old_status,
+                "new_status": new_status,
+                "should_send_sms": transition["send_sms"],
+                "transition_type": transition["type"]
+            })
+        
+        if transitions:
+            logger.info(f"🔄 Batch reconcile: {len(transitions)}/{len(proposals)} abone durum değiştirdi")
+        return transitions
+    
+    @timer(STATUS_TRACKER_SECONDS, method="apply_transitions")
+    def apply_transitions(self, batch: TransitionBatch, fault_types: dict = None, estimated_fix_hours: int = 2) -> list:
+        """
+        StatusMachine.evaluate() kararlarını yazar: değişenler tek UPDATE,
+        diğerleri için last_checked. Kurallar burada tekrar kontrol edilmez.
+        
+        Returns:
+            Değişen aboneler (reconcile_batch ile aynı format)
+        """
+        from psycopg2.extras import execute_values
+        
+        fault_types = fault_types or {}
+        transitions = batch.transitions()
+        subscriber_ids = batch.subscriber_id.tolist()
+        cursor = self.conn.cursor()
+        
+        cursor.execute("""
+            INSERT INTO subscriber_status (subscriber_id, current_status)
+            SELECT unnest(%s::int[]), 'GREEN'
+            ON CONFLICT (subscriber_id) DO NOTHING
+        """, (subscriber_ids,))
+        
+        if transitions:
+            execute_values(cursor, """
+                UPDATE subscriber_status ss
+                SET previous_status = ss.current_status,
+                    current_status = v.new_status::subscriber_status_t,
+                    status_changed_at = NOW(),
+                    fault_type = v.fault_type,
+                    estimated_fix_time = NOW() + make_interval(hours => %(fix_hours)s),
+                    sms_sent = FALSE
+                FROM (VALUES %%s) AS v(subscriber_id, new_status, fault_type)
+                WHERE ss.subscriber_id = v.subscriber_id
+            """ % {"fix_hours": int(estimated_fix_hours)}, [
+                (t["subscriber_id"], t["new_status"], fault_types.get(t["subscriber_id"]))
+                for t in transitions
+            ], template="(%s, %s, %s)")
+        
+        cursor.execute(
+            "UPDATE subscriber_status SET last_checked = NOW() WHERE subscriber_id = ANY(%s)",
+            (subscriber_ids,)
+        )
+        self.conn.commit()
+        
+        if self.history:
+            for t in transitions:
+                self.history.record(t["subscriber_id"], t["old_status"], t["new_status"],
+                                    t["transition_type"], fault_types.get(t["subscriber_id"]))
+        return transitions
+    
+    @timer(STATUS_TRACKER_SECONDS, method="mark_sms_sent")
     def mark_sms_sent(self, subscriber_id: int):
         """SMS gönderildi olarak işaretle"""
         cursor = self.conn.cursor()
@@ -228,6 +369,7 @@ class StatusTracker:
         self.conn.commit()
         logger.info(f"✅ SMS sent flag updated for subscriber {subscriber_id}")
     
+    @timer(STATUS_TRACKER_SECONDS, method="get_all_by_status")
     def get_all_by_status(self) -> dict:
         """
         Tüm kullanıcıları durumlarına göre grupla
@@ -1,7 +1,7 @@
-import requests
 import os
 import logging
 from dotenv import load_dotenv
+from metrics import track_notification
 
 # Load .env explicitly
 load_dotenv()
@@ -14,6 +14,13 @@ TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
 def send_telegram_message(message: str) -> tuple[bool, str]:
+    """Gönderim süresi ve bekleyen bildirim sayısı /metrics'e yazılır"""
+    with track_notification("telegram") as outcome:
+        success, response_msg = _send_telegram_message(message)
+        outcome["result"] = "success" if success else "error"
+        return success, response_msg
+
+def _send_telegram_message(message: str) -> tuple[bool, str]:
     """
     Send a message to a Telegram Chat via Bot API
     """
@@ -32,6 +39,7 @@ def send_telegram_message(message: str) -> tuple[bool, str]:
     }
     
     try:
+        import requests  # Lazy: backend açılışını yavaşlatmasın
         response = requests.post(url, json=payload, timeout=10)
         data = response.json()
         
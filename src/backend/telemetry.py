@@ -0,0 +1,254 @@
+"""
+Telemetry Ingestion
+Collector'ların (modem poller, TR-069 / SNMP exporter) gönderdiği gerçek
+ölçümleri toplu olarak çözer, kolon bazında doğrular ve LSTM rolling window'una
+ekler. Etkilenen aboneler yeniden skorlanmak üzere RescoreQueue'ya alınır.
+
+Desteklenen gövde formatları (Content-Type):
+- application/msgpack (veya application/x-msgpack)  -> msgpack paketi gerekir
+- application/vnd.apache.arrow.stream / .file        -> pyarrow gerekir
+- application/json                                   -> her zaman
+
+Gövde kolon bazlı ({"subscriber_id": [...], "latency": [...], ...}) ya da
+kayıt listesi ([{"subscriber_id": 1001, "latency": 23.1, ...}, ...]) olabilir;
+Arrow için kolon adları aynıdır.
+"""
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from scoring import snr_margin_from_signal
+
+# Zorunlu kolonlar; diğerleri eksikse varsayılan değer alır
+REQUIRED_COLUMNS = ("subscriber_id", "latency", "packet_loss", "download_speed")
+OPTIONAL_COLUMNS = {
+    "jitter": 0.0,
+    "upload_speed": 0.0,
+    "signal_strength": -50.0,
+    "connected_devices": 1.0,
+    "ts": np.nan  # Unix zamanı; verilirse ölçümler bu sıraya göre eklenir
+}
+
+# snr_margin_db de opsiyoneldir ama sabit varsayılan almaz: eksik/boş değerler
+# signal_strength'ten türetilir (0 dB LSTM'e "ölü hat" olarak görünürdü)
+
+# Canlı metrik sözlüğü (simulate_metrics_single / RF modeli ile aynı anahtarlar)
+LIVE_KEYS = ("latency", "packet_loss", "jitter", "download_speed", "upload_speed", "signal_strength", "connected_devices")
+# LSTM penceresi kolon sırası: latency_ms, packet_loss_ratio, snr_margin_db, download_usage_mbps
+LSTM_SOURCE_COLUMNS = ("latency", "packet_loss", "snr_margin_db", "download_speed")
+
+# Fiziksel olarak mümkün aralıklar (dışındaki satırlar reddedilir)
+BOUNDS = {
+    "latency": (0.0, 10_000.0),
+    "packet_loss": (0.0, 100.0),
+    "jitter": (0.0, 10_000.0),
+    "download_speed": (0.0, 10_000.0),
+    "upload_speed": (0.0, 10_000.0),
+    "signal_strength": (-150.0, 0.0),
+    "connected_devices": (0.0, 1_000.0),
+    "snr_margin_db": (-20.0, 100.0)
+}
+
+MAX_BATCH_ROWS = 500_000
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+ARROW_STREAM_TYPES = ("application/vnd.apache.arrow.stream",)
+ARROW_FILE_TYPES = ("application/vnd.apache.arrow.file",)
+
+
+class TelemetryError(ValueError):
+    """Batch bütünüyle işlenemez; status_code HTTP yanıtına aktarılır"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def payload_format(content_type: Optional[str]) -> str:
+    media_type = (content_type or "application/json").split(";")[0].strip().lower()
+    if media_type in MSGPACK_TYPES:
+        return "msgpack"
+    if media_type in ARROW_STREAM_TYPES:
+        return "arrow_stream"
+    if media_type in ARROW_FILE_TYPES:
+        return "arrow_file"
+    if media_type == "application/json":
+        return "json"
+    raise TelemetryError(f"Unsupported content type: {media_type}", status_code=415)
+
+
+def decode_batch(body: bytes, fmt: str) -> Dict[str, np.ndarray]:
+    """Gövdeyi {kolon: float64 dizi} sözlüğüne çevirir"""
+    if fmt.startswith("arrow"):
+        return _decode_arrow(body, fmt)
+
+    if fmt == "msgpack":
+        try:
+            import msgpack
+        except ImportError:
+            raise TelemetryError("msgpack payloads are not supported on this node (msgpack not installed)", 415)
+        try:
+            data = msgpack.unpackb(body, raw=False)
+        except Exception as e:
+            raise TelemetryError(f"Invalid msgpack payload: {e}")
+    else:
+        try:
+            data = json.loads(body)
+        except ValueError as e:
+            raise TelemetryError(f"Invalid JSON payload: {e}")
+
+    if isinstance(data, list):
+        data = _records_to_columns(data)
+    if not isinstance(data, dict):
+        raise TelemetryError("Payload must be a column map or a list of records")
+    return {name: _as_column(name, values) for name, values in data.items() if name in BOUNDS or name in ("subscriber_id", "ts")}
+
+
+def _decode_arrow(body: bytes, fmt: str) -> Dict[str, np.ndarray]:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise TelemetryError("Arrow payloads are not supported on this node (pyarrow not installed)", 415)
+    try:
+        source = pa.BufferReader(body)
+        reader = pa.ipc.open_stream(source) if fmt == "arrow_stream" else pa.ipc.open_file(source)
+        table = reader.read_all()
+    except Exception as e:
+        raise TelemetryError(f"Invalid Arrow payload: {e}")
+
+    columns = {}
+    for name in table.column_names:
+        if name in BOUNDS or name in ("subscriber_id", "ts"):
+            # Null'lar NaN olur ve doğrulamada reddedilir
+            columns[name] = table.column(name).cast(pa.float64()).to_numpy(zero_copy_only=False)
+    return columns
+
+
+def _records_to_columns(records: list) -> Dict[str, list]:
+    if not all(isinstance(r, dict) for r in records):
+        raise TelemetryError("Record list must contain objects")
+    # Opsiyonel bir alan sadece bazı kayıtlarda olabilir: kolonlar tüm kayıtların
+    # birleşimi, alanı olmayan kayıt varsayılanı alır (snr_margin_db: None -> türetilir)
+    names = set(REQUIRED_COLUMNS).union(*records)
+    defaults = {name: OPTIONAL_COLUMNS.get(name) for name in names}
+    return {name: [r.get(name, defaults[name]) for r in records] for name in names}
+
+
+def _as_column(name: str, values) -> np.ndarray:
+    if not isinstance(values, (list, tuple)):
+        raise TelemetryError(f"Column '{name}' must be an array")
+    try:
+        # None -> NaN (doğrulamada reddedilir)
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise TelemetryError(f"Column '{name}' must be numeric")
+
+
+def validate_batch(columns: Dict[str, np.ndarray], known_ids=None) -> Tuple[np.ndarray, Dict[str, np.ndarray], Dict[str, int]]:
+    """
+    Satırları kolon bazında (vektörel) doğrular.
+
+    Returns:
+        (subscriber_ids int64, {kolon: geçerli değerler}, {red nedeni: satır sayısı})
+        Geçerli satırlar ts verildiyse ts'ye göre (stable) sıralıdır.
+    """
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise TelemetryError(f"Missing required columns: {', '.join(missing)}")
+
+    n = len(columns["subscriber_id"])
+    if n > MAX_BATCH_ROWS:
+        raise TelemetryError(f"Batch too large: {n} rows (max {MAX_BATCH_ROWS})", status_code=413)
+    for name, values in columns.items():
+        if len(values) != n:
+            raise TelemetryError(f"Column '{name}' has {len(values)} rows, expected {n}")
+
+    for name, default in OPTIONAL_COLUMNS.items():
+        if name not in columns:
+            columns[name] = np.full(n, default, dtype=np.float64)
+    derived_snr = snr_margin_from_signal(columns["signal_strength"])
+    snr = columns.get("snr_margin_db")
+    columns["snr_margin_db"] = derived_snr if snr is None else np.where(np.isnan(snr), derived_snr, snr)
+
+    rejected = {}
+    valid = np.ones(n, dtype=bool)
+
+    def reject(mask: np.ndarray, reason: str):
+        mask = mask & valid
+        count = int(mask.sum())
+        if count:
+            rejected[reason] = rejected.get(reason, 0) + count
+            valid[mask] = False
+
+    raw_ids = columns["subscriber_id"]
+    reject(~np.isfinite(raw_ids) | (raw_ids <= 0) | (raw_ids != np.floor(raw_ids)), "invalid_subscriber_id")
+
+    for name, (low, high) in BOUNDS.items():
+        values = columns[name]
+        reject(~np.isfinite(values), f"missing_{name}")
+        reject((values < low) | (values > high), f"out_of_range_{name}")
+
+    subscriber_ids = np.where(valid, raw_ids, 0).astype(np.int64)
+    if known_ids is not None:
+        reject(~np.fromiter((sid in known_ids for sid in subscriber_ids.tolist()), dtype=bool, count=n), "unknown_subscriber")
+
+    idx = np.flatnonzero(valid)
+    ts = columns["ts"][idx]
+    if not np.isnan(ts).all():
+        idx = idx[np.argsort(np.where(np.isnan(ts), -np.inf, ts), kind="stable")]
+
+    return subscriber_ids[idx], {name: columns[name][idx] for name in BOUNDS}, rejected
+
+
+class RescoreQueue:
+    """
+    Yeni ölçümü gelen abonelerin son canlı metrikleri; aynı abone tekrar gelirse
+    üzerine yazılır (en güncel ölçüm skorlanır). Rescoring döngüsü drain() ile tüketir.
+    """
+
+    def __init__(self):
+        self._pending: Dict[int, list] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, subscriber_ids: List[int], live_rows: List[list]):
+        latest = dict(zip(subscriber_ids, live_rows))
+        with self._lock:
+            self._pending.update(latest)
+
+    def drain(self, limit: int) -> Dict[int, dict]:
+        """En fazla limit aboneyi kuyruktan alır: {subscriber_id: canlı metrik sözlüğü}"""
+        with self._lock:
+            ids = list(self._pending)[:limit]
+            rows = [self._pending.pop(sid) for sid in ids]
+        return {sid: dict(zip(LIVE_KEYS, row)) for sid, row in zip(ids, rows)}
+
+
+def ingest_batch(body: bytes, content_type: Optional[str], lstm_service, queue: RescoreQueue) -> dict:
+    """
+    decode -> validate -> LSTM penceresine toplu ekleme -> rescoring kuyruğu.
+    Sadece LSTM cache'inde penceresi olan (izlenen) aboneler kabul edilir.
+    """
+    fmt = payload_format(content_type)
+    columns = decode_batch(body, fmt)
+    subscriber_ids, values, rejected = validate_batch(columns, known_ids=lstm_service.measurement_cache)
+
+    ids = subscriber_ids.tolist()
+    lstm_rows = np.column_stack([values[name] for name in LSTM_SOURCE_COLUMNS]).tolist() if ids else []
+    lstm_service.add_measurements_bulk(ids, lstm_rows)
+
+    live_rows = np.column_stack([values[name] for name in LIVE_KEYS]).tolist() if ids else []
+    queue.add(ids, live_rows)
+
+    return {
+        "format": fmt,
+        "received": int(len(columns["subscriber_id"])),
+        "accepted": len(ids),
+        "rejected": rejected,
+        "subscribers": len(set(ids)),
+        "rescore_queue": len(queue)
+    }
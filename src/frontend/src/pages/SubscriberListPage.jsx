@@ -115,8 +115,8 @@ const SubscriberListPage = () => {
                     {/* Excel Export Button - Sağ üstte */}
                     <button
                         className="export-btn"
-                        onClick={() => exportListToExcel(subscribers, getPageTitle())}
-                        disabled={subscribers.length === 0}
+                        onClick={() => exportListToExcel(filter)}
+                        title="CSV olarak indirir (Excel'de açılır)"
                         style={{
                             position: 'absolute',
                             top: '1.5rem',
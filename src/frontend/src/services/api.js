@@ -25,6 +25,35 @@ export const api = {
         }
     },
 
+    // Dashboard özeti (fleet snapshot: bölge × durum, risk histogramı, en riskli aboneler)
+    getFleetSummary: async (topK = 20) => {
+        try {
+            const res = await fetch(`${API_BASE}/api/fleet/summary?top_k=${topK}`);
+            if (!res.ok) throw new Error('Fleet summary unavailable');
+            return await res.json();
+        } catch (error) {
+            console.error('Error fetching fleet summary:', error);
+            throw error;
+        }
+    },
+
+    // Bölge özeti (durum sayıları, ortalama risk, en kötü aboneler); tarayıcı ETag ile 304 alır
+    getRegionSummary: async () => {
+        const res = await fetch(`${API_BASE}/api/regions/summary`, { cache: 'no-cache' });
+        if (!res.ok) throw new Error('Region summary unavailable');
+        return await res.json();
+    },
+
+    // Harita için abone konumları (kolon bazlı: ids, lat, lon, status, region)
+    getSubscribersGeo: async (region = null, status = null) => {
+        const params = new URLSearchParams();
+        if (region) params.append('region', region);
+        if (status) params.append('status', status);
+        const res = await fetch(`${API_BASE}/api/subscribers/geo?${params.toString()}`);
+        if (!res.ok) throw new Error('Geo data unavailable');
+        return await res.json();
+    },
+
     // LSTM trend analizi
     getTrendAnalysis: async (subscriberId) => {
         try {
@@ -106,9 +135,13 @@ export const api = {
         return await res.json();
     },
 
-    getAllTickets: async (status = null) => {
-        const url = status
-            ? `${API_BASE}/api/tickets?status=${status}`
+    getAllTickets: async (status = null, cursor = null) => {
+        const params = new URLSearchParams();
+        if (status) params.append('status', status);
+        if (cursor) params.append('cursor', cursor);
+        const query = params.toString();
+        const url = query
+            ? `${API_BASE}/api/tickets?${query}`
             : `${API_BASE}/api/tickets`;
         const res = await fetch(url);
         if (!res.ok) throw new Error('Failed to fetch tickets');
@@ -133,5 +166,21 @@ export const api = {
         });
         if (!res.ok) throw new Error('Failed to add note');
         return await res.json();
+    },
+
+    getTicketNotes: async (ticketId, after = 0) => {
+        const res = await fetch(`${API_BASE}/api/tickets/${ticketId}/notes?after=${after}`);
+        if (!res.ok) throw new Error('Failed to fetch notes');
+        return await res.json();
+    },
+
+    // Sunucu tarafı export (CSV / XLSX akışı); kind: 'subscribers' | 'tickets'
+    getExportUrl: (kind, { format = 'xlsx', status = null, region = null, dateFrom = null, dateTo = null } = {}) => {
+        const params = new URLSearchParams({ format });
+        if (status) params.append('status', status);
+        if (region) params.append('region', region);
+        if (dateFrom) params.append('date_from', dateFrom);
+        if (dateTo) params.append('date_to', dateTo);
+        return `${API_BASE}/api/export/${kind}?${params.toString()}`;
     }
 };
@@ -4,9 +4,6 @@ import joblib
 import os
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
 
-import tensorflow as tf
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
 from sklearn.preprocessing import MinMaxScaler, LabelEncoder
 from sklearn.model_selection import train_test_split
 
@@ -14,16 +11,20 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 DATA_PATH = os.path.join(BASE_DIR, 'data', 'netpulse_telemetry_final.csv')
 MODEL_DIR = os.path.join(BASE_DIR, 'src', 'models', 'saved_objects')
 
-os.makedirs(MODEL_DIR, exist_ok=True)
+FEATURES = ['latency_ms', 'packet_loss_ratio', 'snr_margin_db', 'download_usage_mbps']
+WINDOW_SIZE = 12
 
-print(f"LSTM (Zaman Serisi) Egitimi Basliyor...\nVeri Yolu: {DATA_PATH}")
 
-def train_lstm_model():
-    if not os.path.exists(DATA_PATH):
-        print("HATA: CSV dosyasi bulunamadi! Lutfen once veri uretin.")
-        return
+def load_lstm_dataset(data_path=DATA_PATH):
+    """
+    Egitimle ayni pencereler ve ayni (karistirilmamis) %20 test ayrimi.
+    (X_train, X_test, y_train, y_test, scaler, encoder) ya da CSV yoksa None doner.
+    benchmarks/lstm_precision.py de held-out degerlendirme icin bunu kullanir.
+    """
+    if not os.path.exists(data_path):
+        return None
 
-    df = pd.read_csv(DATA_PATH)
+    df = pd.read_csv(data_path)
     df['timestamp'] = pd.to_datetime(df['timestamp'])
     df = df.sort_values('timestamp')
 
@@ -31,24 +32,37 @@ def train_lstm_model():
     
     print(f"Veri Hazir: {len(df_sample)} satir zaman serisi isleniyor.")
 
-    features = ['latency_ms', 'packet_loss_ratio', 'snr_margin_db', 'download_usage_mbps']
-    
     encoder = LabelEncoder()
     df_sample['root_cause_code'] = encoder.fit_transform(df_sample['root_cause'])
     
     scaler = MinMaxScaler()
-    data_scaled = scaler.fit_transform(df_sample[features])
+    data_scaled = scaler.fit_transform(df_sample[FEATURES])
 
     X, y = [], []
-    window_size = 12 
-
-    for i in range(window_size, len(data_scaled)):
-        X.append(data_scaled[i-window_size:i])
+    for i in range(WINDOW_SIZE, len(data_scaled)):
+        X.append(data_scaled[i-WINDOW_SIZE:i])
         y.append(df_sample['root_cause_code'].iloc[i])
 
     X, y = np.array(X), np.array(y)
 
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, shuffle=False)
+    return X_train, X_test, y_train, y_test, scaler, encoder
+
+
+def train_lstm_model():
+    # TensorFlow sadece egitimde gerekli; load_lstm_dataset onsuz da kullanilabilir
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import LSTM, Dense, Dropout
+
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    print(f"LSTM (Zaman Serisi) Egitimi Basliyor...\nVeri Yolu: {DATA_PATH}")
+
+    dataset = load_lstm_dataset()
+    if dataset is None:
+        print("HATA: CSV dosyasi bulunamadi! Lutfen once veri uretin.")
+        return
+    X_train, X_test, y_train, y_test, scaler, encoder = dataset
+    y = np.concatenate([y_train, y_test])
 
     print(f"Model Tasarlaniyor... (Girdi Sekli: {X_train.shape})")
 
@@ -74,6 +88,7 @@ def train_lstm_model():
     print("\n" + "="*50)
     print("LSTM Modeli Kaydedildi.")
     print(f"Yer: {MODEL_DIR}")
+    print("TensorFlow'suz inference icin: python src/backend/lstm_numpy.py <netpulse_lstm.h5>")
     print("="*50)
 
 if __name__ == "__main__":
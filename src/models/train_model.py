@@ -1,60 +1,92 @@
 import pandas as pd
 import numpy as np
 import joblib
+import argparse
+import json
 import os
 import sys
 import time
-from sklearn.model_selection import train_test_split, GridSearchCV
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import (
+    train_test_split, GridSearchCV, HalvingGridSearchCV, HalvingRandomSearchCV
+)
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report, accuracy_score, confusion_matrix
+from sklearn.metrics import classification_report, accuracy_score, confusion_matrix, f1_score
 from sklearn.preprocessing import LabelEncoder, StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 DATA_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'train_data.csv')
+ALT_DATA_PATH = os.path.join(BASE_DIR, 'data', 'netpulse_telemetry_final.csv')
 MODEL_DIR = os.path.join(BASE_DIR, 'saved_models')
+MODEL_PATH = os.path.join(MODEL_DIR, 'netpulse_classifier.pkl')
+# Backend'in memory-map ile yukledigi duz node dizileri (forest_predictor.FlatForestPredictor)
+FLAT_MODEL_DIR = os.path.join(MODEL_DIR, 'netpulse_classifier_flat')
+
+# Pipeline(memory=...) icin onisleme cache'i: ayni fold icin ColumnTransformer bir kez fit edilir
+CACHE_DIR = os.path.join(BASE_DIR, 'data', 'cache', 'rf_preprocessing')
+
+SEARCH_MODES = ['grid', 'halving-grid', 'halving-random']
+
+PARAM_GRID = {
+    'classifier__n_estimators': [100, 200],
+    'classifier__max_depth': [None, 10, 20],
+    'classifier__min_samples_split': [2, 5],
+    'classifier__class_weight': ['balanced', None]
+}
 
 os.makedirs(MODEL_DIR, exist_ok=True)
 
 print("NetPulse AI (Random Forest) Egitim Modulu Baslatiliyor...")
 print(f"Hedef Klasor: {MODEL_DIR}")
 
-def train_rf_model():
-    start_time = time.time()
+def parquet_path_for(csv_path):
+    return os.path.splitext(csv_path)[0] + '.parquet'
 
-    if not os.path.exists(DATA_PATH):
-        ALT_DATA_PATH = os.path.join(BASE_DIR, 'data', 'netpulse_telemetry_final.csv')
+def to_float32(df):
+    """float64 kolonlari float32'ye indirir (bellek ve okuma suresi yariya iner)"""
+    float_cols = df.select_dtypes(include=['float64']).columns
+    df[float_cols] = df[float_cols].astype(np.float32)
+    return df
+
+def load_training_data(use_parquet=True):
+    """
+    Egitim verisini yukler.
+    Ayni isimli float32 Parquet dosyasi CSV'den yeniyse onu okur; yoksa (ya da CSV
+    yeniden uretildiyse) CSV'yi okuyup bir sonraki calisma icin Parquet olarak kaydeder.
+    """
+    csv_path = DATA_PATH
+    if not os.path.exists(csv_path):
         if os.path.exists(ALT_DATA_PATH):
-             print(f"Processed veri bulunamadi, ham veri kullaniliyor: {ALT_DATA_PATH}")
-             df = pd.read_csv(ALT_DATA_PATH)
-        else:
+            print(f"Processed veri bulunamadi, ham veri kullaniliyor: {ALT_DATA_PATH}")
+            csv_path = ALT_DATA_PATH
+        elif not (use_parquet and os.path.exists(parquet_path_for(DATA_PATH))):
             print(f"HATA: Veri dosyasi bulunamadi! ({DATA_PATH})")
             sys.exit()
-    else:
-        print(f"Veri yukleniyor: {DATA_PATH}")
-        df = pd.read_csv(DATA_PATH)
 
-    drop_cols = ['timestamp', 'device_id', 'modem_temperature', 'customer_id'] 
-    df = df.drop(columns=[c for c in drop_cols if c in df.columns], errors='ignore')
+    parquet_path = parquet_path_for(csv_path)
 
-    target_col = 'root_cause'
-    if target_col not in df.columns:
-        print(f"HATA: '{target_col}' sutunu bulunamadi.")
-        return
+    if use_parquet and os.path.exists(parquet_path):
+        if not os.path.exists(csv_path) or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+            print(f"Veri yukleniyor (Parquet): {parquet_path}")
+            return pd.read_parquet(parquet_path)
+        print(f"CSV Parquet kopyasindan yeni, kopya yeniden olusturuluyor: {csv_path}")
 
-    X = df.drop(columns=[target_col])
-    y = df[target_col]
+    print(f"Veri yukleniyor: {csv_path}")
+    df = to_float32(pd.read_csv(csv_path))
 
-    le = LabelEncoder()
-    y_encoded = le.fit_transform(y)
-    
-    class_names = list(le.classes_)
-    print(f"Hedef Siniflar: {class_names}")
+    if use_parquet:
+        try:
+            df.to_parquet(parquet_path, index=False)
+            print(f"Parquet kopyasi olusturuldu: {parquet_path}")
+        except ImportError:
+            print("UYARI: pyarrow/fastparquet yok, Parquet kopyasi olusturulamadi.")
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y_encoded, test_size=0.2, random_state=42, stratify=y_encoded)
+    return df
 
-    numeric_features = X.select_dtypes(include=['int64', 'float64']).columns
+def build_pipeline(X, memory=None):
+    numeric_features = X.select_dtypes(include=['number']).columns
     categorical_features = X.select_dtypes(include=['object']).columns
 
     numeric_transformer = StandardScaler()
@@ -66,53 +98,211 @@ def train_rf_model():
             ('cat', categorical_transformer, categorical_features)
         ])
 
-    pipeline = Pipeline(steps=[
+    return Pipeline(steps=[
         ('preprocessor', preprocessor),
         ('classifier', RandomForestClassifier(random_state=42))
-    ])
-
-    print("\nGrid Search ile en iyi parametreler araniyor...")
-    
-    param_grid = {
-        'classifier__n_estimators': [100, 200],
-        'classifier__max_depth': [None, 10, 20],
-        'classifier__min_samples_split': [2, 5],
-        'classifier__class_weight': ['balanced', None]
-    }
+    ], memory=memory)
 
-    grid_search = GridSearchCV(
-        pipeline, 
-        param_grid, 
-        cv=3, 
-        n_jobs=-1, 
-        scoring='f1_macro',
-        verbose=1
-    )
-    
-    grid_search.fit(X_train, y_train)
+def build_search(mode, pipeline):
+    common = dict(cv=3, n_jobs=-1, scoring='f1_macro', verbose=1)
+
+    if mode == 'grid':
+        return GridSearchCV(pipeline, PARAM_GRID, **common)
+    if mode == 'halving-grid':
+        # Tum adaylar kucuk orneklemle baslar, her turda en iyi 1/3'u 3 kat veriyle devam eder
+        return HalvingGridSearchCV(pipeline, PARAM_GRID, factor=3, random_state=42, **common)
+    if mode == 'halving-random':
+        return HalvingRandomSearchCV(
+            pipeline, PARAM_GRID, n_candidates='exhaust', factor=3, random_state=42, **common
+        )
+    raise ValueError(f"Bilinmeyen arama modu: {mode}")
 
+def run_search(mode, X_train, y_train, X_test, y_test, use_cache=True):
+    memory = joblib.Memory(CACHE_DIR, verbose=0) if use_cache else None
+    pipeline = build_pipeline(X_train, memory=memory)
+    search = build_search(mode, pipeline)
+
+    start_time = time.time()
+    search.fit(X_train, y_train)
     elapsed_time = time.time() - start_time
-    print(f"\nEgitim Tamamlandi! Sure: {elapsed_time:.2f} sn")
-    print(f"En Iyi Parametreler: {grid_search.best_params_}")
-    print(f"En Iyi CV Skoru: {grid_search.best_score_:.4f}")
 
-    best_model = grid_search.best_estimator_
+    best_model = search.best_estimator_
     y_pred = best_model.predict(X_test)
 
+    return {
+        "mode": mode,
+        "search": search,
+        "model": best_model,
+        "y_pred": y_pred,
+        "wall_time": elapsed_time,
+        "best_score": search.best_score_,
+        "test_f1": f1_score(y_test, y_pred, average='macro'),
+        "test_accuracy": accuracy_score(y_test, y_pred)
+    }
+
+def print_comparison(results):
+    print("\n" + "="*72)
+    print("ARAMA KARSILASTIRMASI")
+    print("="*72)
+    print(f"{'Mod':<16}{'Sure (sn)':>12}{'CV f1_macro':>14}{'Test f1_macro':>16}{'Test acc':>12}")
+    for r in results:
+        print(f"{r['mode']:<16}{r['wall_time']:>12.2f}{r['best_score']:>14.4f}{r['test_f1']:>16.4f}{r['test_accuracy']:>12.4f}")
+
+    baseline = next((r for r in results if r['mode'] == 'grid'), None)
+    if baseline:
+        for r in results:
+            if r is not baseline and r['wall_time'] > 0:
+                print(f"{r['mode']}: {baseline['wall_time'] / r['wall_time']:.1f}x daha hizli, "
+                      f"CV skor farki {r['best_score'] - baseline['best_score']:+.4f}")
+
+def export_flat_forest(pipeline, out_dir=FLAT_MODEL_DIR):
+    """
+    Pipeline(ColumnTransformer + RandomForest) modelini duz NumPy dizilerine yazar.
+    Tum agaclarin node'lari tek dizide birlestirilir; cocuk indeksleri mutlak
+    (global) indekse cevrilir, yapraklar -1 olarak kalir.
+    """
+    preprocessor = pipeline.named_steps['preprocessor']
+    forest = pipeline.named_steps['classifier']
+
+    transformers = {name: (trans, cols) for name, trans, cols in preprocessor.transformers_}
+    scaler, numeric_columns = transformers['num']
+    encoder, categorical_columns = transformers['cat']
+
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        roots.append(offset)
+        features.append(tree.feature.astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+        lefts.append(np.where(tree.children_left == -1, -1, tree.children_left + offset).astype(np.int32))
+        rights.append(np.where(tree.children_right == -1, -1, tree.children_right + offset).astype(np.int32))
+        # Node sinif dagilimi -> olasilik (predict_proba ile ayni normalizasyon)
+        value = tree.value[:, 0, :].astype(np.float64)
+        values.append((value / value.sum(axis=1, keepdims=True)).astype(np.float32))
+        offset += tree.node_count
+
+    os.makedirs(out_dir, exist_ok=True)
+    arrays = {
+        'feature': np.concatenate(features),
+        'threshold': np.concatenate(thresholds),
+        'children_left': np.concatenate(lefts),
+        'children_right': np.concatenate(rights),
+        'value': np.concatenate(values),
+        'roots': np.asarray(roots, dtype=np.int32)
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(out_dir, f'{name}.npy'), np.ascontiguousarray(array))
+
+    has_categorical = len(categorical_columns) > 0
+    meta = {
+        'classes': forest.classes_.tolist(),
+        'n_trees': len(forest.estimators_),
+        'n_nodes': int(offset),
+        'max_depth': int(max(e.tree_.max_depth for e in forest.estimators_)),
+        'numeric_columns': list(numeric_columns),
+        'mean': scaler.mean_.tolist(),
+        'scale': scaler.scale_.tolist(),
+        'categorical_columns': list(categorical_columns),
+        'categories': [c.tolist() for c in encoder.categories_] if has_categorical else []
+    }
+    with open(os.path.join(out_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    size_mb = sum(a.nbytes for a in arrays.values()) / 1e6
+    print(f"Duz model export edildi: {out_dir} ({meta['n_trees']} agac, {offset} node, {size_mb:.1f} MB)")
+    return out_dir
+
+def train_rf_model(search_mode='grid', max_rows=None, use_parquet=True, use_cache=True, compare=False):
+    df = load_training_data(use_parquet=use_parquet)
+
+    drop_cols = ['timestamp', 'device_id', 'modem_temperature', 'customer_id']
+    df = df.drop(columns=[c for c in drop_cols if c in df.columns], errors='ignore')
+
+    target_col = 'root_cause'
+    if target_col not in df.columns:
+        print(f"HATA: '{target_col}' sutunu bulunamadi.")
+        return
+
+    if max_rows and len(df) > max_rows:
+        # Nadir siniflar kaybolmasin diye sinif oranlari korunarak orneklenir
+        df, _ = train_test_split(df, train_size=max_rows, random_state=42, stratify=df[target_col])
+        print(f"Veri {max_rows} satira orneklendi.")
+
+    X = df.drop(columns=[target_col])
+    y = df[target_col]
+
+    le = LabelEncoder()
+    y_encoded = le.fit_transform(y)
+
+    class_names = list(le.classes_)
+    print(f"Hedef Siniflar: {class_names}")
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y_encoded, test_size=0.2, random_state=42, stratify=y_encoded)
+
+    modes = [search_mode]
+    if compare and search_mode != 'grid':
+        modes = ['grid', search_mode]
+
+    results = []
+    for mode in modes:
+        print(f"\n[{mode}] ile en iyi parametreler araniyor...")
+        result = run_search(mode, X_train, y_train, X_test, y_test, use_cache=use_cache)
+        results.append(result)
+
+        print(f"\nEgitim Tamamlandi! Sure: {result['wall_time']:.2f} sn")
+        print(f"En Iyi Parametreler: {result['search'].best_params_}")
+        print(f"En Iyi CV Skoru: {result['best_score']:.4f}")
+
+    if len(results) > 1:
+        print_comparison(results)
+
+    chosen = results[-1]
+    best_model = chosen['model']
+    # Cache yolu modelle birlikte kaydedilmesin
+    best_model.set_params(memory=None)
+
     print("\n" + "="*60)
     print("SINIFLANDIRMA RAPORU")
     print("="*60)
-    print(classification_report(y_test, y_pred, target_names=class_names))
+    print(classification_report(y_test, chosen['y_pred'], target_names=class_names))
 
-    model_path = os.path.join(MODEL_DIR, 'netpulse_classifier.pkl')
+    model_path = MODEL_PATH
     joblib.dump(best_model, model_path)
-    
+    flat_path = export_flat_forest(best_model)
+
     encoder_path = os.path.join(MODEL_DIR, 'infra_encoder.pkl')
     joblib.dump(le, encoder_path)
-    
+
     print(f"\nDOSYALAR KAYDEDILDI:")
     print(f"   1. Model:   {model_path}")
     print(f"   2. Encoder: {encoder_path}")
+    print(f"   3. Duz model: {flat_path}")
 
 if __name__ == "__main__":
-    train_rf_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="NetPulse Random Forest egitimi")
+    parser.add_argument("--search", choices=SEARCH_MODES, default='grid',
+                        help="Hiperparametre arama modu (halving-* modlari cok daha hizli)")
+    parser.add_argument("--max-rows", type=int, default=None,
+                        help="Egitim verisini bu satir sayisina orneklendir")
+    parser.add_argument("--csv", action="store_true",
+                        help="Parquet yerine CSV oku (Parquet kopyasi olusturma)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Onisleme cache'ini (Pipeline memory) kapat")
+    parser.add_argument("--compare", action="store_true",
+                        help="Secilen modu mevcut GridSearchCV ile karsilastir (sure + skor)")
+    parser.add_argument("--export-only", action="store_true",
+                        help="Egitim yapma, mevcut pickle modeli duz formata export et")
+    args = parser.parse_args()
+
+    if args.export_only:
+        export_flat_forest(joblib.load(MODEL_PATH))
+        sys.exit()
+
+    train_rf_model(
+        search_mode=args.search,
+        max_rows=args.max_rows,
+        use_parquet=not args.csv,
+        use_cache=not args.no_cache,
+        compare=args.compare
+    )